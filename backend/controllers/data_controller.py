@@ -1,13 +1,12 @@
 # Handles data preprocessing and SQL logic
 import asyncio
-from typing import Optional
+from typing import Any, Optional
 from fastapi import Form
 from fastapi.responses import JSONResponse
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler
-from sklearn.impute import SimpleImputer, KNNImputer
-from sklearn.ensemble import IsolationForest
+from sklearn.impute import SimpleImputer
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -22,34 +21,54 @@ import json
 from fastapi import Request
 import logging
 import pyarrow.parquet as pq
+from .preprocessing import multivariate_outliers
 from .preprocessing.io_utils import (
-    read_parquet_from_minio,
     to_preview_records,
     sanitize_dataframe_for_parquet,
     standardize_missing_indicators,
     _download_to_tempfile,
+    open_minio_dataset,
+    open_minio_parquet,
 )
-from .preprocessing.remove_duplicates import apply as apply_remove_duplicates
-from .preprocessing.remove_nulls import apply as apply_remove_nulls
-from .preprocessing.fill_nulls import apply as apply_fill_nulls
-from .preprocessing.drop_columns import apply as apply_drop_columns
-from .preprocessing.remove_outliers import apply as apply_remove_outliers
+from .preprocessing.plan import compile_plan, execute_plan
+from .preprocessing.streaming import run_streaming_plan, should_stream
+from .preprocessing.correlation import correlation_summary
 from .preprocessing.diff_utils import compute_diff_marks
+from .preprocessing.dtype_optimizer import optimize_loaded, with_fill_categories
+from .preprocessing.imputation import knn_impute
+from .preprocessing.memory_budget import JobMemoryBudget, MemoryBudgetExceeded, estimate_file_bytes
+from .preprocessing.profiler import ColumnProfiler, DatasetProfile
+from .preprocessing.result_cache import cache_key, preprocessing_results
+from .preprocessing.row_window import PARQUET_WRITE_OPTIONS, RowWindowError, read_row_window
+from .preprocessing.sampling import SamplingThresholds, profile_with_sampling
+from .preprocessing.sketches import iqr_bounds
 from backend.utils.json_utils import _to_json_safe
 from backend.services import progress_tracker
-from .preprocessing.recommendations import build_preprocessing_suggestions
+from backend.services.tracing import Tracer
+from .preprocessing.recommendations import build_preprocessing_suggestions, column_recommendation
 
 # Preview and diff limits for performance
-MAX_PREVIEW_ROWS = 1000  # Show first 1000 rows in preview (prevents massive JSON responses)
+# Rows embedded in the job result; later rows are paged via get_row_window
+MAX_PREVIEW_ROWS = int(os.getenv("MAX_PREVIEW_ROWS", "200"))
 MAX_DIFF_ROWS = 5000  # Compute diffs only for first 5000 rows (cell comparison is expensive)
 DIFF_ROW_LIMIT = int(os.getenv("DIFF_ROW_LIMIT", "10000"))  # Maximum diff markers to return
+# Sampled recommendations rescan in full only when a column's suggestion could flip
+PREPROCESSING_SAMPLING_THRESHOLDS = SamplingThresholds(decision=column_recommendation)
+# Quality report entries the streaming path computes from the leading rows only
+STREAMING_SAMPLED_QUALITY_FIELDS = ['outliers', 'data_types', 'correlations']
 
-def analyze_data_quality(df):
-    """Comprehensive data quality analysis"""
-    df = standardize_missing_indicators(df)
+def analyze_data_quality(df, profile: Optional[DatasetProfile] = None):
+    """Comprehensive data quality analysis
+
+    Pass a precomputed ``profile`` of the standardized frame to skip profiling.
+    """
+    if profile is None:
+        df = standardize_missing_indicators(df)
+        profile = ColumnProfiler().profile(df)
+    total_rows = profile.total_rows
     quality_report = {
-        'total_rows': len(df),
-        'total_columns': len(df.columns),
+        'total_rows': total_rows,
+        'total_columns': len(profile.columns),
         'missing_data': {},
         'duplicate_rows': 0,
         'outliers': {},
@@ -60,52 +79,49 @@ def analyze_data_quality(df):
     }
     
     # Missing data analysis
-    if len(df) == 0:
-        missing_percentages = pd.Series({col: 0.0 for col in df.columns})
-    else:
-        missing_percentages = (df.isnull().sum() / len(df)) * 100
     quality_report['missing_data'] = {
-        col: {
-            'count': int(df[col].isnull().sum()),
-            'percentage': float(missing_percentages[col]),
-            'type': 'critical' if missing_percentages[col] > 50 else 'moderate' if missing_percentages[col] > 10 else 'minor'
+        name: {
+            'count': col.missing_count,
+            'percentage': float(col.missing_percentage),
+            'type': 'critical' if col.missing_percentage > 50 else 'moderate' if col.missing_percentage > 10 else 'minor'
         }
-        for col in df.columns if df[col].isnull().sum() > 0
+        for name, col in profile.columns.items() if col.missing_count > 0
     }
     
     # Duplicate analysis
-    quality_report['duplicate_rows'] = int(df.duplicated().sum())
+    quality_report['duplicate_rows'] = int(profile.duplicate_rows or 0)
     
     # Data type analysis
     quality_report['data_types'] = {
-        col: {
-            'type': str(df[col].dtype),
-            'unique_values': int(df[col].nunique()),
-            'is_categorical': df[col].dtype == 'object' or df[col].nunique() < len(df) * 0.1
+        name: {
+            'type': col.dtype,
+            'unique_values': col.unique_count,
+            'is_categorical': col.is_object or col.unique_count < total_rows * 0.1
         }
-        for col in df.columns
+        for name, col in profile.columns.items()
     }
     
     # Outlier analysis for numerical columns
-    numerical_cols = df.select_dtypes(include=[np.number]).columns
-    for col in numerical_cols:
-        if df[col].isnull().sum() < len(df) * 0.5:  # Only analyze if not mostly missing
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
-            
-            pct = float((len(outliers) / len(df)) * 100) if len(df) > 0 else 0.0
-            quality_report['outliers'][col] = {
-                'count': int(len(outliers)),
-                'percentage': pct,
-                'lower_bound': float(lower_bound),
-                'upper_bound': float(upper_bound)
+    for name in profile.numeric_columns():
+        col = profile[name]
+        if col.missing_count < total_rows * 0.5 and col.has_outlier_stats:  # Only analyze if not mostly missing
+            quality_report['outliers'][name] = {
+                'count': col.outlier_count,
+                'percentage': float(col.outlier_percentage),
+                'lower_bound': float(col.lower_bound),
+                'upper_bound': float(col.upper_bound)
             }
     
-    # Calculate quality score
+    # Strongly correlated numeric pairs, computed blockwise on a row sample
+    numeric_columns = profile.numeric_columns()
+    if len(numeric_columns) > 1:
+        quality_report['correlations'] = correlation_summary(df, numeric_columns)
+
+    return score_quality_report(quality_report)
+
+
+def score_quality_report(quality_report):
+    """Fill in the quality score and recommendations from the report's counts."""
     missing_penalty = sum(info['percentage'] for info in quality_report['missing_data'].values()) * 0.5
     duplicate_penalty = ((quality_report['duplicate_rows'] / quality_report['total_rows']) * 100) if quality_report['total_rows'] > 0 else 0
     outlier_penalty = sum(info['percentage'] for info in quality_report['outliers'].values()) * 0.3
@@ -113,6 +129,7 @@ def analyze_data_quality(df):
     quality_report['quality_score'] = max(0, 100 - missing_penalty - duplicate_penalty - outlier_penalty)
     
     # Generate recommendations
+    quality_report['recommendations'] = []
     if quality_report['missing_data']:
         quality_report['recommendations'].append("Missing values detected - applying smart imputation")
     if quality_report['duplicate_rows'] > 0:
@@ -124,7 +141,8 @@ def analyze_data_quality(df):
 
 def smart_imputation(df, quality_report):
     """Intelligent imputation based on data characteristics"""
-    df_cleaned = df.copy()
+    df_cleaned = df.copy(deep=False)
+    neighbour_cols = []
     
     for col in df_cleaned.columns:
         if df_cleaned[col].isnull().any():
@@ -145,14 +163,16 @@ def smart_imputation(df, quality_report):
                     if len(mode_value) > 0:
                         df_cleaned[col] = df_cleaned[col].fillna(mode_value[0])
                     else:
+                        df_cleaned = with_fill_categories(df_cleaned, {col: 'Unknown'})
                         df_cleaned[col] = df_cleaned[col].fillna('Unknown')
                 else:
-                    # Use KNN for larger missing data
+                    # Indicator columns for larger missing data
                     try:
                         # Create dummy variables for categorical columns
                         dummy_cols = pd.get_dummies(df_cleaned[col], prefix=col, dummy_na=True)
                         df_cleaned = pd.concat([df_cleaned.drop(columns=[col]), dummy_cols], axis=1)
                     except:
+                        df_cleaned = with_fill_categories(df_cleaned, {col: 'Unknown'})
                         df_cleaned[col] = df_cleaned[col].fillna('Unknown')
             else:
                 # Numerical imputation
@@ -160,18 +180,26 @@ def smart_imputation(df, quality_report):
                     # Use median for small missing data
                     df_cleaned[col] = df_cleaned[col].fillna(df_cleaned[col].median())
                 else:
-                    # Use KNN for larger missing data
-                    try:
-                        imputer = KNNImputer(n_neighbors=min(5, len(df_cleaned) - 1))
-                        df_cleaned[col] = imputer.fit_transform(df_cleaned[[col]])[:, 0]
-                    except:
-                        df_cleaned[col] = df_cleaned[col].fillna(df_cleaned[col].median())
+                    # Larger gaps are filled from similar rows below
+                    neighbour_cols.append(col)
+
+    if neighbour_cols:
+        # Approximate nearest neighbours on the other numeric columns (sampled KD-tree index)
+        try:
+            df_cleaned, report = knn_impute(df_cleaned, neighbour_cols)
+        except Exception:
+            logging.warning("Nearest-neighbour imputation failed; falling back to medians", exc_info=True)
+            for col in neighbour_cols:
+                df_cleaned[col] = df_cleaned[col].fillna(df_cleaned[col].median())
+        else:
+            logging.info(f"Imputation report: {report.to_dict()}")
+            quality_report.setdefault('imputation', []).append(report.to_dict())
     
     return df_cleaned
 
 def smart_outlier_handling(df, quality_report):
     """Intelligent outlier detection and handling"""
-    df_cleaned = df.copy()
+    df_cleaned = df.copy(deep=False)
     numerical_cols = df_cleaned.select_dtypes(include=[np.number]).columns
     
     for col in numerical_cols:
@@ -182,30 +210,21 @@ def smart_outlier_handling(df, quality_report):
                 # Too many outliers - use robust scaling
                 scaler = RobustScaler()
                 df_cleaned[col] = scaler.fit_transform(df_cleaned[[col]])[:, 0]
-            elif outlier_pct > 5:
+                continue
+
+            lower_bound, upper_bound = iqr_bounds(df_cleaned[col])
+            if outlier_pct > 5:
                 # Moderate outliers - cap them
-                Q1 = df_cleaned[col].quantile(0.25)
-                Q3 = df_cleaned[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                
                 df_cleaned[col] = df_cleaned[col].clip(lower=lower_bound, upper=upper_bound)
             else:
                 # Few outliers - remove them
-                Q1 = df_cleaned[col].quantile(0.25)
-                Q3 = df_cleaned[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                
                 df_cleaned = df_cleaned[(df_cleaned[col] >= lower_bound) & (df_cleaned[col] <= upper_bound)]
     
     return df_cleaned
 
 def smart_scaling(df, quality_report):
     """Intelligent feature scaling based on data distribution"""
-    df_scaled = df.copy()
+    df_scaled = df.copy(deep=False)
     numerical_cols = df_scaled.select_dtypes(include=[np.number]).columns
     
     for col in numerical_cols:
@@ -227,109 +246,17 @@ def get_original_preview(df):
     return df.head(10).replace([float('nan'), float('inf'), float('-inf')], None).where(pd.notnull(df.head(10)), None).to_dict(orient='records')
 
 def _update_progress(job_id: Optional[str], progress: float, message: str) -> None:
+    """Report progress; also the job's cancellation checkpoint between pipeline steps."""
     if not job_id:
         return
+    progress_tracker.raise_if_cancelled(job_id)
     try:
         progress_tracker.update_job(job_id, progress=progress, message=message, status="running")
     except progress_tracker.JobNotFoundError:
         logging.warning("Skipping progress update; job %s no longer tracked", job_id)
 
 
-def run_preprocessing_pipeline(
-    filename: str,
-    steps: Optional[dict] = None,
-    preprocessing: Optional[str] = None,
-    full: bool = False,
-    job_id: Optional[str] = None,
-):
-    steps = steps or {}
-    _update_progress(job_id, 5, "Loading dataset from storage")
-    temp_path: Optional[str] = None
-
-    try:
-        if filename.endswith('.parquet'):
-            df = read_parquet_from_minio(filename)
-        else:
-            temp_path = _download_to_tempfile(filename)
-            if filename.endswith('.csv'):
-                df = pd.read_csv(temp_path)
-            elif filename.endswith('.xlsx'):
-                df = pd.read_excel(temp_path)
-            elif filename.endswith('.json'):
-                df = pd.read_json(temp_path)
-            else:
-                raise ValueError("Unsupported file format.")
-
-        df = standardize_missing_indicators(df)
-        if "_orig_idx" not in df.columns:
-            df = df.reset_index(drop=False).rename(columns={"index": "_orig_idx"})
-        _update_progress(job_id, 12, f"Dataset loaded ({len(df)} rows)")
-    except Exception as exc:
-        raise RuntimeError(f"Error reading file: {exc}") from exc
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-
-    change_metadata: list[dict] = []
-    df_cleaned = df.copy()
-    original_row_count = len(df)
-
-    if steps.get("removeDuplicates"):
-        _update_progress(job_id, 25, "Removing duplicate rows")
-        df_cleaned, meta = apply_remove_duplicates(df_cleaned, steps.get("duplicateSubset", []))
-        change_metadata.append(meta)
-    else:
-        _update_progress(job_id, 25, "Duplicate removal skipped")
-
-    if steps.get("removeNulls"):
-        _update_progress(job_id, 35, "Removing rows with null values")
-        df_cleaned, meta = apply_remove_nulls(df_cleaned, steps.get("removeNullsColumns", []))
-        change_metadata.append(meta)
-    else:
-        _update_progress(job_id, 35, "Null-row removal skipped")
-
-    if steps.get("fillNulls"):
-        _update_progress(job_id, 45, "Filling missing values")
-        df_cleaned, meta = apply_fill_nulls(df_cleaned, steps.get("fillStrategies", {}))
-        if "summary" in meta:
-            change_metadata.extend(meta["summary"])
-        else:
-            change_metadata.append(meta)
-    else:
-        _update_progress(job_id, 45, "No fill-null strategy requested")
-
-    if steps.get("dropColumns"):
-        _update_progress(job_id, 55, "Dropping selected columns")
-        df_cleaned, meta = apply_drop_columns(df_cleaned, steps.get("dropColumns", []))
-        if "summary" in meta:
-            change_metadata.extend(meta["summary"])
-        else:
-            change_metadata.append(meta)
-    else:
-        _update_progress(job_id, 55, "No columns dropped")
-
-    if steps.get("removeOutliers"):
-        _update_progress(job_id, 65, "Handling statistical outliers")
-        outlier_cfg = steps.get("removeOutliersConfig", {"method": "iqr", "factor": 1.5, "columns": []})
-        logging.info(f"Outlier removal config: {outlier_cfg}")
-        logging.info(f"DataFrame before outlier removal: {len(df_cleaned)} rows")
-        df_cleaned, meta = apply_remove_outliers(df_cleaned, outlier_cfg)
-        logging.info(f"DataFrame after outlier removal: {len(df_cleaned)} rows")
-        logging.info(f"Outlier removal metadata: {meta}")
-        if "summary" in meta:
-            change_metadata.extend(meta["summary"])
-        else:
-            change_metadata.append(meta)
-    else:
-        _update_progress(job_id, 65, "Outlier handling skipped")
-
-    _update_progress(job_id, 75, "Analyzing changes against original data")
-    # Only compute diffs for preview rows (massive performance improvement)
-    df_for_diff = df.head(MAX_DIFF_ROWS) if len(df) > MAX_DIFF_ROWS else df
-    df_cleaned_for_diff = df_cleaned.head(MAX_DIFF_ROWS) if len(df_cleaned) > MAX_DIFF_ROWS else df_cleaned
-    deleted, updated_cells = compute_diff_marks(df_for_diff, df_cleaned_for_diff)
-    diff_truncated = len(df) > MAX_DIFF_ROWS or len(df_cleaned) > MAX_DIFF_ROWS
-    
+def _truncate_diff(deleted, updated_cells, diff_truncated):
     if len(deleted) > DIFF_ROW_LIMIT:
         deleted = deleted[:DIFF_ROW_LIMIT]
         diff_truncated = True
@@ -339,33 +266,45 @@ def run_preprocessing_pipeline(
             limited_updates[idx] = updated_cells[idx]
         updated_cells = limited_updates
         diff_truncated = True
+    return deleted, updated_cells, diff_truncated
 
-    _update_progress(job_id, 85, "Packaging cleaned dataset")
-    try:
-        df_to_save = sanitize_dataframe_for_parquet(df_cleaned)
-        logging.info(f"Packaging cleaned dataset: {len(df_to_save)} rows, {len(df_to_save.columns)} columns")
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.parquet') as tmp_file:
-            df_to_save.to_parquet(tmp_file.name, engine='pyarrow', index=False)
-            temp_cleaned_path = tmp_file.name
-            # Verify file was written correctly
-            verify_df = pd.read_parquet(temp_cleaned_path)
-            logging.info(f"Verified temp file has {len(verify_df)} rows after write")
-            cleaned_filename = f"cleaned_{os.path.splitext(filename)[0]}.parquet"
-    except Exception as exc:
-        raise RuntimeError(f"Error saving cleaned Parquet: {exc}") from exc
+
+def _build_preprocessing_payload(
+    filename: str,
+    original_df: pd.DataFrame,
+    cleaned_df: pd.DataFrame,
+    *,
+    original_row_count: int,
+    cleaned_row_count: int,
+    change_metadata,
+    execution_plan: dict,
+    quality_report: dict,
+    temp_cleaned_path: str,
+    execution_mode: str,
+    job_id: Optional[str] = None,
+    tracer: Optional[Tracer] = None,
+) -> dict:
+    """Shared diff/preview packaging for the in-memory and streaming paths.
+
+    ``original_df``/``cleaned_df`` may be the full frames or just their leading rows;
+    only the first ``MAX_DIFF_ROWS`` rows are ever compared.
+    """
+    # A fitted outlier detector is uploaded with the dataset when it is saved
+    multivariate_outliers.stage_detector(change_metadata, temp_cleaned_path)
+
+    _update_progress(job_id, 88, "Analyzing changes against original data")
+    df_for_diff = original_df.head(MAX_DIFF_ROWS) if len(original_df) > MAX_DIFF_ROWS else original_df
+    df_cleaned_for_diff = cleaned_df.head(MAX_DIFF_ROWS) if len(cleaned_df) > MAX_DIFF_ROWS else cleaned_df
+    deleted, updated_cells = compute_diff_marks(df_for_diff, df_cleaned_for_diff)
+    diff_truncated = original_row_count > MAX_DIFF_ROWS or cleaned_row_count > MAX_DIFF_ROWS
+    deleted, updated_cells, diff_truncated = _truncate_diff(deleted, updated_cells, diff_truncated)
 
     _update_progress(job_id, 92, "Building preview tables")
     # Only return preview chunk (prevents massive JSON responses)
-    original_preview = to_preview_records(df, MAX_PREVIEW_ROWS)
-    preview = to_preview_records(df_cleaned, MAX_PREVIEW_ROWS)
+    original_preview = to_preview_records(original_df, MAX_PREVIEW_ROWS)
+    preview = to_preview_records(cleaned_df, MAX_PREVIEW_ROWS)
 
     full_data = None  # Full data not returned (use pagination or download)
-    
-    _update_progress(job_id, 97, "Summarizing data quality insights")
-    try:
-        quality_report = analyze_data_quality(df_cleaned)
-    except Exception:
-        quality_report = {}
 
     response_payload = {
         "original_preview": original_preview,
@@ -373,13 +312,17 @@ def run_preprocessing_pipeline(
         "full_data": full_data,
         "diff_marks": {"deleted_row_indices": deleted, "updated_cells": updated_cells},
         "change_metadata": change_metadata,
+        "execution_plan": execution_plan,
+        "execution_mode": execution_mode,
+        "cache_hit": False,
+        "trace": tracer.to_list() if tracer is not None else [],
         "quality_report": quality_report,
-        "cleaned_filename": cleaned_filename,
+        "cleaned_filename": f"cleaned_{os.path.splitext(filename)[0]}.parquet",
         "temp_cleaned_path": temp_cleaned_path,
         "original_row_count": int(original_row_count),
-        "cleaned_row_count": int(len(df_cleaned)),
+        "cleaned_row_count": int(cleaned_row_count),
         "preview_row_limit": MAX_PREVIEW_ROWS,
-        "is_preview_truncated": len(df_cleaned) > MAX_PREVIEW_ROWS,
+        "is_preview_truncated": cleaned_row_count > MAX_PREVIEW_ROWS,
         "diff_truncated": diff_truncated,
         "diff_row_limit": DIFF_ROW_LIMIT,
         "max_diff_rows": MAX_DIFF_ROWS,
@@ -390,15 +333,245 @@ def run_preprocessing_pipeline(
         len(original_preview),
         len(preview),
         MAX_PREVIEW_ROWS,
-        len(df_cleaned),
+        cleaned_row_count,
     )
-    if len(df_cleaned) > MAX_PREVIEW_ROWS:
-        logging.info(f"Preview truncated: showing first {MAX_PREVIEW_ROWS} of {len(df_cleaned)} rows")
+    if cleaned_row_count > MAX_PREVIEW_ROWS:
+        logging.info(f"Preview truncated: showing first {MAX_PREVIEW_ROWS} of {cleaned_row_count} rows")
     logging.info(f"Deleted row indices count: {len(deleted)}, updated cells count: {len(updated_cells)}")
 
     return _to_json_safe(response_payload)
 
 
+def _run_streaming_pipeline(
+    filename: str,
+    source_path: str,
+    steps: dict,
+    job_id: Optional[str],
+    tracer: Optional[Tracer] = None,
+) -> dict:
+    """Preprocess a Parquet file that does not fit the memory budget, row group by row group."""
+    _update_progress(job_id, 12, "Dataset exceeds memory budget; streaming row groups")
+    tracer = tracer or Tracer("preprocessing", job_id)
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.parquet') as tmp_file:
+        temp_cleaned_path = tmp_file.name
+    try:
+        source_meta = pq.read_metadata(source_path)
+        # Both streaming passes are one traced step; batches are not traced individually
+        with tracer.span("streaming_plan", rows=source_meta.num_rows, columns=source_meta.num_columns) as span:
+            plan, result = run_streaming_plan(
+                source_path,
+                steps,
+                temp_cleaned_path,
+                normalize=standardize_missing_indicators,
+                sanitize=sanitize_dataframe_for_parquet,
+                head_rows=max(MAX_DIFF_ROWS, MAX_PREVIEW_ROWS),
+                on_progress=lambda progress, message: _update_progress(job_id, progress, message),
+            )
+            span.set_output(rows=result.cleaned_row_count, columns=len(result.cleaned_head.columns))
+    except Exception as exc:
+        if os.path.exists(temp_cleaned_path):
+            os.remove(temp_cleaned_path)
+        raise RuntimeError(f"Error streaming preprocessing: {exc}") from exc
+    logging.info(
+        f"Streamed preprocessing plan over {result.batches} batches: "
+        f"{result.cleaned_row_count} of {result.original_row_count} rows kept"
+    )
+
+    _update_progress(job_id, 85, "Summarizing data quality insights")
+    try:
+        # Row, missing and duplicate counts are exact; outliers, types and correlations
+        # only see the leading rows, and the score is recomputed from the exact counts
+        quality_report = analyze_data_quality(result.cleaned_head)
+        quality_report['total_rows'] = result.cleaned_row_count
+        quality_report['duplicate_rows'] = result.duplicate_rows
+        quality_report['missing_data'] = {
+            col: {
+                'count': count,
+                'percentage': (count / result.cleaned_row_count) * 100,
+                'type': 'critical' if count > result.cleaned_row_count * 0.5 else 'moderate' if count > result.cleaned_row_count * 0.1 else 'minor'
+            }
+            for col, count in result.missing_counts.items() if count > 0
+        }
+        quality_report = score_quality_report(quality_report)
+        quality_report['is_sampled'] = True
+        quality_report['sample_rows'] = len(result.cleaned_head)
+        quality_report['sampled_fields'] = list(STREAMING_SAMPLED_QUALITY_FIELDS)
+    except Exception:
+        quality_report = {}
+
+    return _build_preprocessing_payload(
+        filename,
+        result.original_head,
+        result.cleaned_head,
+        original_row_count=result.original_row_count,
+        cleaned_row_count=result.cleaned_row_count,
+        change_metadata=result.change_metadata,
+        execution_plan=plan.to_dict(),
+        quality_report=quality_report,
+        temp_cleaned_path=temp_cleaned_path,
+        execution_mode="streaming",
+        job_id=job_id,
+        tracer=tracer,
+    )
+
+
+def _source_cache_key(filename: str, steps: dict) -> Optional[str]:
+    """Result-cache key for ``filename`` as currently stored, or None if it cannot be versioned."""
+    try:
+        etag = minio_client.stat_object(MINIO_BUCKET, filename).etag
+    except Exception as exc:  # noqa: BLE001
+        logging.warning("Skipping preprocessing result cache for %s: %s", filename, exc)
+        return None
+    return cache_key(etag, steps) if etag else None
+
+
+def run_preprocessing_pipeline(
+    filename: str,
+    steps: Optional[dict] = None,
+    preprocessing: Optional[str] = None,
+    full: bool = False,
+    job_id: Optional[str] = None,
+):
+    steps = steps or {}
+    key = _source_cache_key(filename, steps)
+    if key is not None:
+        cached = preprocessing_results.get(key)
+        if cached is not None:
+            logging.info("Reusing cached preprocessing result for %s", filename)
+            _update_progress(job_id, 95, "Reusing cached preprocessing result")
+            return cached
+
+    result = _execute_preprocessing_pipeline(filename, steps, job_id)
+    if key is not None:
+        preprocessing_results.put(key, result)
+    return result
+
+
+def _load_source_frame(
+    filename: str, temp_path: str, budget: JobMemoryBudget, span: Any = None
+) -> Optional[pd.DataFrame]:
+    """Read the downloaded source, or None when a Parquet source should be streamed."""
+    if filename.endswith('.parquet'):
+        if should_stream(temp_path, budget.limit_bytes):
+            return None
+        df = pd.read_parquet(temp_path, engine="pyarrow")
+    elif filename.endswith(('.csv', '.xlsx', '.json')):
+        # Text formats cannot be streamed; refuse before parsing what would not fit
+        budget.check(estimate_file_bytes(temp_path, filename), "Loading the dataset")
+        if filename.endswith('.csv'):
+            df = pd.read_csv(temp_path)
+        elif filename.endswith('.xlsx'):
+            df = pd.read_excel(temp_path)
+        else:
+            df = pd.read_json(temp_path)
+    else:
+        raise ValueError("Unsupported file format.")
+
+    df = optimize_loaded(standardize_missing_indicators(df), filename, span)
+    # Preserve a stable original index for diffing
+    if "_orig_idx" not in df.columns:
+        df = df.reset_index(drop=False).rename(columns={"index": "_orig_idx"})
+    return df
+
+
+def _execute_preprocessing_pipeline(filename: str, steps: dict, job_id: Optional[str]) -> dict:
+    _update_progress(job_id, 5, "Loading dataset from storage")
+    temp_path: Optional[str] = None
+    budget = JobMemoryBudget(job_id=job_id)
+    tracer = Tracer("preprocessing", job_id)
+
+    try:
+        try:
+            temp_path = _download_to_tempfile(filename)
+            with tracer.span("load") as span:
+                df = _load_source_frame(filename, temp_path, budget, span)
+                span.set_output(df)
+            if df is not None:
+                _update_progress(job_id, 12, f"Dataset loaded ({len(df)} rows)")
+        except MemoryBudgetExceeded:
+            raise
+        except Exception as exc:
+            raise RuntimeError(f"Error reading file: {exc}") from exc
+
+        if df is None:
+            return _run_streaming_pipeline(filename, temp_path, steps, job_id, tracer)
+        try:
+            budget.require_frame(df, "Holding the dataset")
+            return _run_in_memory_pipeline(filename, df, steps, budget, job_id, tracer)
+        except MemoryBudgetExceeded as exc:
+            if not filename.endswith('.parquet'):
+                raise
+            logging.warning("Switching %s to streaming preprocessing: %s", filename, exc)
+            del df
+            return _run_streaming_pipeline(filename, temp_path, steps, job_id, tracer)
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _run_in_memory_pipeline(
+    filename: str,
+    df: pd.DataFrame,
+    steps: dict,
+    budget: JobMemoryBudget,
+    job_id: Optional[str],
+    tracer: Tracer,
+) -> dict:
+    original_row_count = len(df)
+
+    plan = compile_plan(steps, df.columns)
+    logging.info(f"Preprocessing plan: {plan.to_dict()}")
+    # The cleaned frame is at most a filtered projection of the source
+    budget.require_frame(df, "Materializing the cleaned dataset", columns=plan.projection)
+    df_cleaned, change_metadata = execute_plan(
+        df,
+        plan,
+        on_progress=lambda progress, message: _update_progress(job_id, progress, message),
+        tracer=tracer,
+    )
+    logging.info(f"DataFrame after preprocessing plan: {len(df_cleaned)} of {original_row_count} rows")
+
+    _update_progress(job_id, 75, "Packaging cleaned dataset")
+    # Sanitizing only rewrites object columns; everything else is shared with df_cleaned
+    object_columns = [col for col, dtype in df_cleaned.dtypes.items() if dtype == object]
+    budget.require_frame(df_cleaned, "Sanitizing the cleaned dataset", columns=object_columns)
+    try:
+        with tracer.span("stage_parquet", df_cleaned) as span:
+            df_to_save = sanitize_dataframe_for_parquet(df_cleaned)
+            logging.info(f"Packaging cleaned dataset: {len(df_to_save)} rows, {len(df_to_save.columns)} columns")
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.parquet') as tmp_file:
+                df_to_save.to_parquet(tmp_file.name, engine='pyarrow', index=False, **PARQUET_WRITE_OPTIONS)
+                temp_cleaned_path = tmp_file.name
+            span.set_output(df_to_save)
+        # Verify the footer instead of reading the whole file back
+        logging.info(f"Verified temp file has {pq.read_metadata(temp_cleaned_path).num_rows} rows after write")
+        del df_to_save
+    except Exception as exc:
+        raise RuntimeError(f"Error saving cleaned Parquet: {exc}") from exc
+
+    _update_progress(job_id, 82, "Summarizing data quality insights")
+    try:
+        with tracer.span("quality_report", df_cleaned):
+            quality_report = analyze_data_quality(df_cleaned)
+    except Exception:
+        quality_report = {}
+
+    return _build_preprocessing_payload(
+        filename,
+        df,
+        df_cleaned,
+        original_row_count=original_row_count,
+        cleaned_row_count=len(df_cleaned),
+        change_metadata=change_metadata,
+        execution_plan=plan.to_dict(),
+        quality_report=quality_report,
+        temp_cleaned_path=temp_cleaned_path,
+        execution_mode="in_memory",
+        job_id=job_id,
+        tracer=tracer,
+    )
+
+
 async def run_preprocessing_job(
     job_id: str,
     filename: str,
@@ -420,7 +593,7 @@ async def run_preprocessing_job(
             full,
             job_id,
         )
-        progress_tracker.complete_job(job_id, result)
+        progress_tracker.complete_job(job_id, result, artifacts={"temp_cleaned_path": result.get("temp_cleaned_path")})
     except Exception as exc:  # noqa: BLE001
         logging.exception("Preprocessing job %s failed", job_id, exc_info=True)
         try:
@@ -445,6 +618,90 @@ async def data_preprocessing(
         None,
     )
 
+def _parse_window_filters(filters) -> list:
+    if not filters:
+        return []
+    if isinstance(filters, str):
+        try:
+            filters = json.loads(filters)
+        except json.JSONDecodeError as exc:
+            raise RowWindowError(f"filters must be a JSON list: {exc}") from exc
+    if isinstance(filters, dict):
+        filters = [filters]
+    if not isinstance(filters, list) or not all(isinstance(spec, dict) for spec in filters):
+        raise RowWindowError("filters must be a list of {column, op, value} objects")
+    return filters
+
+
+def get_row_window(
+    *,
+    job_id: Optional[str] = None,
+    filename: Optional[str] = None,
+    bucket: str = "cleaned-data",
+    offset: int = 0,
+    limit: int = MAX_PREVIEW_ROWS,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    filters=None,
+) -> dict:
+    """Page through a preprocessing result beyond the embedded preview.
+
+    Reads the staged Parquet file of ``job_id`` or the persisted ``filename`` in
+    ``bucket`` (via range requests), touching only the row groups the window needs.
+    Raises ``FileNotFoundError`` when the source is gone and ``RowWindowError`` for
+    invalid window parameters.
+    """
+    filters = _parse_window_filters(filters)
+    if job_id is not None:
+        job = progress_tracker.get_job(job_id)
+        if job is None:
+            raise FileNotFoundError(f"Job {job_id} not found")
+        temp_cleaned_path = job["artifacts"].get("temp_cleaned_path")
+        if not temp_cleaned_path or not os.path.exists(temp_cleaned_path):
+            raise FileNotFoundError(f"Job {job_id} has no staged cleaned dataset")
+        source = temp_cleaned_path
+    elif filename:
+        if not filename.endswith(".parquet"):
+            raise RowWindowError("Row windows are only served from Parquet files")
+        try:
+            source = open_minio_parquet(filename, bucket)
+        except Exception as exc:  # noqa: BLE001
+            raise FileNotFoundError(f"{filename} not found in bucket {bucket}") from exc
+    else:
+        raise RowWindowError("Either job_id or filename is required")
+
+    try:
+        window = read_row_window(
+            source,
+            offset=offset,
+            limit=limit,
+            sort_by=sort_by,
+            descending=descending,
+            filters=filters,
+        )
+    finally:
+        if not isinstance(source, str):
+            source.close()
+    logging.info(
+        "Row window %s+%s of %s rows: read %s/%s row groups",
+        window.offset, len(window.row_numbers), window.total_rows, window.row_groups_read, window.row_groups_total,
+    )
+    return _to_json_safe({
+        "rows": to_preview_records(window.frame, None),
+        "row_numbers": window.row_numbers,
+        "columns": list(window.frame.columns),
+        "total_rows": window.total_rows,
+        "offset": window.offset,
+        "limit": window.limit,
+        "sort_by": window.sort_by,
+        "descending": window.descending,
+        "filters": window.filters,
+        "row_groups_read": window.row_groups_read,
+        "row_groups_total": window.row_groups_total,
+        "key_row_groups_scanned": window.key_row_groups_scanned,
+    })
+
+
 def get_data_preview(filename: str):
     try:
         # First, ensure the MinIO bucket exists before trying to access objects
@@ -545,35 +802,48 @@ def get_data_preview(filename: str):
     }
 
 
-def get_preprocessing_recommendations(filename: str):
-    """Load full dataset and return preprocessing suggestions and quality summary."""
+def get_preprocessing_recommendations(
+    filename: str,
+    sample: bool = True,
+    sample_size: Optional[int] = None,
+    sample_method: str = "auto",
+):
+    """Return preprocessing suggestions and quality summary.
+
+    Large datasets are profiled from a uniform sample of ``sample_size`` rows; the full
+    dataset is only scanned when a suggestion sits too close to its threshold to call.
+    """
+    if not filename.endswith(('.parquet', '.csv', '.xlsx', '.json')):
+        return JSONResponse(content={"error": "Unsupported file format for recommendations."}, status_code=400)
+
     try:
-        # Ensure MinIO bucket exists and load bytes
+        # Ensure MinIO bucket exists; Parquet is read with range requests, not downloaded
         from backend.config import ensure_minio_buckets_exist
         ensure_minio_buckets_exist()
 
-        response = minio_client.get_object(MINIO_BUCKET, filename)
-        file_bytes_buffer = io.BytesIO(response.read())
-        file_bytes_buffer.seek(0)
+        source = open_minio_dataset(filename, MINIO_BUCKET)
     except Exception as e:
         logging.error(f"Error reading file '{filename}' from MinIO for recommendations: {e}", exc_info=True)
         return JSONResponse(content={"error": f"Error reading file from MinIO: {e}"}, status_code=500)
 
     try:
-        if filename.endswith('.parquet'):
-            df = pd.read_parquet(file_bytes_buffer, engine='pyarrow')
-        elif filename.endswith('.csv'):
-            df = pd.read_csv(file_bytes_buffer)
-        elif filename.endswith('.xlsx'):
-            df = pd.read_excel(file_bytes_buffer)
-        elif filename.endswith('.json'):
-            df = pd.read_json(file_bytes_buffer)
-        else:
-            return JSONResponse(content={"error": "Unsupported file format for recommendations."}, status_code=400)
-
-        df = standardize_missing_indicators(df)
-        payload = build_preprocessing_suggestions(df)
+        df, profile, sampling = profile_with_sampling(
+            source,
+            filename,
+            normalize=standardize_missing_indicators,
+            profiler=ColumnProfiler(),
+            sample=sample,
+            sample_rows=sample_size,
+            method=sample_method,
+            thresholds=PREPROCESSING_SAMPLING_THRESHOLDS,
+        )
+        if sampling and sampling["escalated"]:
+            logging.info(f"Recommendations for '{filename}' escalated to a full scan: {sampling['escalation_reasons']}")
+        payload = build_preprocessing_suggestions(df, profile)
+        payload["quality_summary"]["sampling"] = sampling
         return _to_json_safe(payload)
     except Exception as e:
         logging.error(f"Error generating preprocessing recommendations for '{filename}': {e}", exc_info=True)
         return JSONResponse(content={"error": f"Error generating recommendations: {e}"}, status_code=500)
+    finally:
+        source.close()
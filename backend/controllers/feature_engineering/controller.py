@@ -6,14 +6,20 @@ import tempfile
 from typing import Any, Dict, List, Optional, Sequence
 
 import pandas as pd
+import pyarrow.parquet as pq
 
 from backend.config import CLEANED_BUCKET, minio_client
-from backend.controllers.feature_engineering.operations import (
-    apply_binning,
-    apply_encoding,
-    apply_feature_creation,
-    apply_feature_selection,
-    apply_scaling,
+from backend.controllers.feature_engineering.executor import (
+    FEATURE_ENGINEERING_COMPILED,
+    StepResult,
+    execute_steps,
+    fit_step,
+)
+from backend.controllers.feature_engineering.transformers import (
+    FittedPipeline,
+    StepTransformer,
+    load_pipeline,
+    pipeline_object_name,
 )
 from backend.controllers.feature_engineering.types import (
     ApplyFeatureEngineeringRequest,
@@ -24,13 +30,21 @@ from backend.controllers.feature_engineering.types import (
     MinioFile,
     RunFeatureEngineeringRequest,
 )
-from backend.controllers.feature_engineering.recommendations import analyze_dataset
+from backend.controllers.feature_engineering.operations import ONE_HOT_DENSE_MAX_LEVELS, ONE_HOT_SPARSE_MAX_LEVELS
+from backend.controllers.feature_engineering.recommendations import analyze_dataset, column_recommendation
 from backend.controllers.preprocessing.io_utils import (
+    open_minio_dataset,
     sanitize_dataframe_for_parquet,
     standardize_missing_indicators,
     to_preview_records,
 )
-from backend.services import minio_service, progress_tracker
+from backend.controllers.preprocessing.dtype_optimizer import optimize_loaded
+from backend.controllers.preprocessing.multivariate_outliers import DETECTOR_OBJECT_PREFIX
+from backend.controllers.preprocessing.profiler import ColumnProfiler
+from backend.controllers.preprocessing.sampling import SamplingThresholds, profile_with_sampling
+from backend.controllers.preprocessing.sparse_frames import read_parquet, write_parquet
+from backend.services import minio_service, progress_tracker, worker_pool
+from backend.services.tracing import Tracer
 from backend.utils.json_utils import _to_json_safe
 
 FEATURE_ENGINEERED_BUCKET = os.getenv("FEATURE_ENGINEERED_BUCKET", "feature-engineered")
@@ -43,7 +57,7 @@ async def get_minio_files_for_feature_engineering() -> List[MinioFile]:
     try:
         objects = minio_client.list_objects(CLEANED_BUCKET, recursive=True)
         for obj in objects:
-            if getattr(obj, "is_dir", False):
+            if getattr(obj, "is_dir", False) or obj.object_name.startswith(DETECTOR_OBJECT_PREFIX):
                 continue
             files.append(
                 MinioFile(
@@ -60,18 +74,53 @@ async def get_minio_files_for_feature_engineering() -> List[MinioFile]:
     return files
 
 
-async def get_dataset_analysis_with_recommendations(filename: str):
-    """Analyze dataset and provide feature engineering recommendations"""
+# Thresholds the feature engineering recommendations and quality notes compare against
+FE_SAMPLING_THRESHOLDS = SamplingThresholds(
+    missing=(30.0,),
+    outliers=(),
+    rows_with_nulls=(),
+    unique_share=(),
+    skew=(),
+    cardinality=(5, 50, ONE_HOT_DENSE_MAX_LEVELS, 1000, ONE_HOT_SPARSE_MAX_LEVELS),
+    decision=column_recommendation,
+)
+
+
+async def get_dataset_analysis_with_recommendations(
+    filename: str,
+    sample: bool = True,
+    sample_size: Optional[int] = None,
+    sample_method: str = "auto",
+):
+    """Analyze dataset and provide feature engineering recommendations
+
+    Large datasets are analyzed from a uniform sample unless a cardinality or missing
+    share is too close to a recommendation threshold, which triggers a full scan.
+    """
     try:
-        df = _load_dataframe_from_minio(filename, CLEANED_BUCKET)
-        analysis = analyze_dataset(df, filename)
+        # Parquet is read with range requests: the footer and the sampled row groups only
+        with open_minio_dataset(filename, CLEANED_BUCKET) as data:
+            df, profile, sampling = profile_with_sampling(
+                data,
+            filename,
+                normalize=standardize_missing_indicators,
+                profiler=ColumnProfiler(include_duplicates=False),
+                sample=sample,
+                sample_rows=sample_size,
+                method=sample_method,
+                thresholds=FE_SAMPLING_THRESHOLDS,
+            )
+        if sampling and sampling["escalated"]:
+            logging.info(f"Analysis for {filename} escalated to a full scan: {sampling['escalation_reasons']}")
+        analysis = analyze_dataset(df, filename, profile)
+        analysis.sampling = sampling
         return analysis.model_dump()
     except Exception as e:
         logging.error(f"Error analyzing dataset: {str(e)}")
         raise
 
 
-def _load_dataframe_from_minio(filename: str, bucket_name: str) -> pd.DataFrame:
+def _read_minio_object(filename: str, bucket_name: str) -> io.BytesIO:
     response = minio_client.get_object(bucket_name, filename)
     try:
         data = io.BytesIO(response.read())
@@ -80,9 +129,15 @@ def _load_dataframe_from_minio(filename: str, bucket_name: str) -> pd.DataFrame:
     finally:
         response.close()
         response.release_conn()
+    return data
+
+
+def _load_dataframe_from_minio(filename: str, bucket_name: str, span: Any = None) -> pd.DataFrame:
+    data = _read_minio_object(filename, bucket_name)
 
     if filename.endswith(".parquet"):
-        df = pd.read_parquet(data, engine="pyarrow")
+        # Engineered datasets keep sparse one-hot columns as a CSR block
+        df = read_parquet(data)
         logging.info(f"Loaded parquet file: {len(df)} rows, {len(df.columns)} columns")
     elif filename.endswith(".csv"):
         df = pd.read_csv(data)
@@ -96,7 +151,42 @@ def _load_dataframe_from_minio(filename: str, bucket_name: str) -> pd.DataFrame:
     else:
         raise ValueError("Unsupported file format")
 
-    return standardize_missing_indicators(df)
+    return optimize_loaded(standardize_missing_indicators(df), filename, span)
+
+
+def load_saved_pipeline(engineered_filename: str) -> Optional[FittedPipeline]:
+    """The fitted pipeline saved next to ``engineered_filename``, or None if there is none."""
+    object_name = pipeline_object_name(engineered_filename)
+    try:
+        data = _read_minio_object(object_name, FEATURE_ENGINEERED_BUCKET)
+    except Exception:  # noqa: BLE001
+        logging.info("No fitted pipeline %s in %s", object_name, FEATURE_ENGINEERED_BUCKET)
+        return None
+    return load_pipeline(data)
+
+
+def transform_with_pipeline(pipeline: FittedPipeline, df: pd.DataFrame) -> pd.DataFrame:
+    """Replay fitted steps on new rows: no refitting, columns as in the engineered dataset."""
+    transformed = pipeline.transform(standardize_missing_indicators(df))
+    missing = [col for col in pipeline.output_columns if col not in transformed.columns]
+    if missing:
+        logging.info("Transformed rows lack %d engineered columns: %s", len(missing), missing[:5])
+    return transformed[[col for col in pipeline.output_columns if col in transformed.columns]]
+
+
+async def transform_new_data(engineered_filename: str, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Transform raw records with the pipeline fitted for ``engineered_filename``."""
+    pipeline = load_saved_pipeline(engineered_filename)
+    if pipeline is None:
+        return {"error": f"No fitted feature engineering pipeline saved for {engineered_filename}"}
+    transformed = await asyncio.to_thread(transform_with_pipeline, pipeline, pd.DataFrame(data))
+    return _to_json_safe(
+        {
+            "columns": list(transformed.columns),
+            "rows": to_preview_records(transformed, len(transformed)),
+            "pipeline": pipeline.describe(),
+        }
+    )
 
 
 def _filter_ml_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -116,48 +206,18 @@ def _filter_ml_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df[ml_columns]
 
 
-def _apply_step(df: pd.DataFrame, step_config) -> tuple[pd.DataFrame, Dict[str, Any]]:
-    import time
-    start_time = time.time()
-    
+def _apply_step(df: pd.DataFrame, step_config, tracer: Optional[Tracer] = None) -> tuple[pd.DataFrame, Dict[str, Any], StepTransformer]:
+    """Fit ``step_config`` on ``df`` and transform it; also returns the fitted step."""
+    tracer = tracer or Tracer("feature_engineering")
     try:
-        if step_config.type == "scaling":
-            column_methods = getattr(step_config, 'column_methods', None)
-            result = apply_scaling(df, step_config.columns, step_config.method, column_methods)
-        elif step_config.type == "encoding":
-            column_methods = getattr(step_config, 'column_methods', None)
-            result = apply_encoding(df, step_config.columns, step_config.method, column_methods)
-        elif step_config.type == "binning":
-            column_methods = getattr(step_config, 'column_methods', None)
-            result = apply_binning(df, step_config.columns, step_config.method, step_config.bins, column_methods)
-        elif step_config.type == "feature_creation":
-            result = apply_feature_creation(
-                df,
-                step_config.columns,
-                step_config.method,
-                degree=step_config.degree,
-                date_part=step_config.date_part,
-                aggregation_type=step_config.aggregation_type,
-                new_column_name=step_config.new_column_name,
-            )
-        elif step_config.type == "feature_selection":
-            result = apply_feature_selection(
-                df,
-                step_config.columns,
-                step_config.method,
-                threshold=step_config.threshold,
-                n_components=step_config.n_components,
-            )
-        else:
-            raise ValueError(f"Unknown feature engineering step type: {step_config.type}")
-        
-        elapsed = time.time() - start_time
-        df_result, meta = result
-        logging.info(f"⏱️  Step '{step_config.type}' completed in {elapsed:.2f}s | Rows: {len(df_result)} | Cols: {len(df_result.columns)}")
-        return df_result, meta
+        with tracer.span(step_config.type, df) as span:
+            transformer, meta = fit_step(df, step_config)
+            df_result = transformer.transform(df)
+            span.set_output(df_result)
+        logging.info(f"⏱️  Step '{step_config.type}' completed in {tracer.last.wall_seconds:.2f}s | Rows: {len(df_result)} | Cols: {len(df_result.columns)}")
+        return df_result, meta, transformer
     except Exception as e:
-        elapsed = time.time() - start_time
-        logging.error(f"❌ Step '{step_config.type}' failed after {elapsed:.2f}s: {str(e)}")
+        logging.error(f"❌ Step '{step_config.type}' failed after {tracer.last.wall_seconds:.2f}s: {str(e)}")
         raise
 
 
@@ -175,8 +235,10 @@ def _summarize_columns(original: Sequence[str], engineered: Sequence[str]) -> Di
 
 
 def _update_progress(job_id: Optional[str], progress: float, message: str) -> None:
+    """Report progress; also the job's cancellation checkpoint between steps."""
     if not job_id:
         return
+    progress_tracker.raise_if_cancelled(job_id)
     try:
         progress_tracker.update_job(job_id, progress=progress, message=message, status="running")
     except progress_tracker.JobNotFoundError:
@@ -196,33 +258,50 @@ def run_feature_engineering_pipeline(
     
     steps = steps or []
     _update_progress(job_id, 5, "Loading dataset from storage")
-    df_raw = _load_dataframe_from_minio(filename, CLEANED_BUCKET)
+    tracer = Tracer("feature_engineering", job_id)
+    with tracer.span("load") as span:
+        df_raw = worker_pool.load_dataset(
+            CLEANED_BUCKET, filename, lambda: _load_dataframe_from_minio(filename, CLEANED_BUCKET, span)
+        )
+        span.set_output(df_raw)
     _update_progress(job_id, 12, f"Dataset loaded ({len(df_raw)} rows)")
 
     filtered_df = _filter_ml_columns(df_raw)
     _update_progress(job_id, 18, f"{len(filtered_df.columns)} columns ready for feature engineering")
 
-    original_df = filtered_df.copy()
-    processed_df = filtered_df.copy()
+    # Steps return new frames (copy-on-write), so the original needs no copy of its own
+    original_df = filtered_df
+    processed_df = filtered_df
     change_metadata: List[Dict[str, Any]] = []
+    pipeline = FittedPipeline(input_columns=list(original_df.columns))
+
+    steps_to_run = steps if upto_step is None else steps[: upto_step + 1]
+    total_steps = len(steps_to_run)
 
-    total_steps = 0 if not steps else (upto_step + 1 if upto_step is not None else len(steps))
-    for index, step_config in enumerate(steps):
-        if upto_step is not None and index > upto_step:
-            break
-        processed_df, meta = _apply_step(processed_df, step_config)
+    def record_step(result: StepResult) -> None:
+        meta = result.metadata
+        pipeline.steps.append(result.transformer)
         # Ensure details field exists in metadata
         if "details" not in meta:
             meta["details"] = {}
+        meta["trace"] = result.trace
         summary = FeatureEngineeringSummary(**meta).model_dump()
         change_metadata.append(summary)
-        progress_fraction = (index + 1) / max(total_steps, 1)
+        progress_fraction = (result.index + 1) / max(total_steps, 1)
         _update_progress(
             job_id,
             20 + int(60 * progress_fraction),
             f"Applied {summary.get('operation', 'feature')} step",
         )
 
+    if FEATURE_ENGINEERING_COMPILED:
+        processed_df, _ = execute_steps(processed_df, steps_to_run, tracer, on_step=record_step)
+    else:
+        for index, step_config in enumerate(steps_to_run):
+            processed_df, meta, transformer = _apply_step(processed_df, step_config, tracer)
+            record_step(StepResult(index, step_config, transformer, meta, tracer.last.to_dict()))
+
+    pipeline.output_columns = list(processed_df.columns)
     column_summary = _summarize_columns(original_df.columns, processed_df.columns)
 
     # Show limited preview for performance
@@ -246,6 +325,8 @@ def run_feature_engineering_pipeline(
         "column_summary": column_summary,
         "engineered_filename": None,
         "temp_engineered_path": None,
+        "pipeline": pipeline.describe(),
+        "trace": tracer.to_list(),
     }
 
     if include_temp_file:
@@ -253,11 +334,12 @@ def run_feature_engineering_pipeline(
         df_to_save = sanitize_dataframe_for_parquet(processed_df)
         logging.info(f"Staging engineered dataset with {len(df_to_save)} rows (original: {len(original_df)}, processed: {len(processed_df)})")
         with tempfile.NamedTemporaryFile(delete=False, suffix=".parquet") as tmp_file:
-            df_to_save.to_parquet(tmp_file.name, engine="pyarrow", index=False)
+            write_parquet(df_to_save, tmp_file.name)
             temp_path = tmp_file.name
-            # Verify file was written correctly
-            verify_df = pd.read_parquet(temp_path)
-            logging.info(f"Verified temp engineered file has {len(verify_df)} rows after write")
+        # The fitted steps travel with the dataset so new rows can be transformed the same way
+        pipeline.save(pipeline_object_name(temp_path))
+        # Verify the footer instead of reading the whole file back
+        logging.info(f"Verified temp engineered file has {pq.read_metadata(temp_path).num_rows} rows after write")
         base_name = os.path.splitext(os.path.basename(filename))[0]
         engineered_filename = f"feature_engineered_{base_name}.parquet"
         result_payload["engineered_filename"] = engineered_filename
@@ -304,7 +386,12 @@ async def apply_and_save_feature_engineering(request: ApplyFeatureEngineeringReq
         if not temp_path or not engineered_filename:
             return {"error": "Unable to stage engineered dataset for saving"}
 
-        save_result = minio_service.save_feature_engineered_temp(temp_path, engineered_filename)
+        save_result = minio_service.save_feature_engineered_temp(
+            temp_path,
+            engineered_filename,
+            pipeline_path=pipeline_object_name(temp_path),
+            pipeline_filename=pipeline_object_name(engineered_filename),
+        )
         if "error" in save_result:
             return save_result
         return {"message": save_result.get("message", "Engineered data saved successfully.")}
@@ -349,16 +436,13 @@ async def get_feature_engineering_dataset_preview(filename: str, bucket: str = "
         logging.exception("Error loading dataset %s for preview from bucket %s", filename, bucket)
         return {"error": f"Error reading file from MinIO: {exc}"}
 
-    # Calculate stats from FULL dataset
-    columns = list(df.columns)
-    dtypes = {col: str(df[col].dtype) for col in columns}
-    null_counts = {col: int(df[col].isnull().sum()) for col in columns}
-    cardinality = {col: int(df[col].nunique()) for col in columns}
-
-    sample_values: Dict[str, Any] = {}
-    for col in columns:
-        series = df[col].dropna()
-        sample_values[col] = _to_json_safe(series.iloc[0]) if not series.empty else None
+    # Calculate stats from FULL dataset in one profiling pass
+    profile = ColumnProfiler(include_duplicates=False).profile(df)
+    columns = profile.column_names
+    dtypes = {col: profile[col].dtype for col in columns}
+    null_counts = {col: profile[col].missing_count for col in columns}
+    cardinality = {col: profile[col].unique_count for col in columns}
+    sample_values: Dict[str, Any] = {col: _to_json_safe(profile[col].sample_value) for col in columns}
 
     # Show limited preview for performance
     preview_records = to_preview_records(df, MAX_PREVIEW_ROWS)
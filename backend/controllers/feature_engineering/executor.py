@@ -0,0 +1,214 @@
+"""Compiled execution of a feature engineering step list.
+
+Running the steps one after another hands every step the whole frame and makes every
+step build a new one, so a run over ``k`` steps assembles ``k`` frames of the full
+width. :func:`compile_steps` instead reads each step's configuration up front and
+records which columns it reads and which it may write, and orders the steps into
+levels: a step depends on an earlier one when it reads a column the earlier step may
+write (a column it reads, a column named after one of those, or a new column it names),
+or when either step looks at every column (feature selection without explicit columns).
+
+:func:`execute_steps` keeps the data as one Series per column. Each step is fitted and
+transformed on a frame of just the columns it reads, so every column is touched only
+by the steps that name it, independent steps of a level run on threads within the
+job's CPU quota, and the output frame is assembled once at the end. Column order comes
+from each fitted transformer's ``output_columns``, so the result equals running the
+steps in order. Set ``FEATURE_ENGINEERING_COMPILED=0`` to run them in order instead.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from backend.controllers.feature_engineering.operations import (
+    fit_binning,
+    fit_encoding,
+    fit_feature_creation,
+    fit_feature_selection,
+    fit_scaling,
+)
+from backend.controllers.feature_engineering.transformers import StepTransformer
+from backend.services import cpu_budget
+from backend.services.tracing import Tracer
+
+FEATURE_ENGINEERING_COMPILED = os.getenv("FEATURE_ENGINEERING_COMPILED", "1").lower() not in {"0", "false", "no"}
+# Target encoding reads the label column under this name
+TARGET_COLUMN = "target"
+PCA_PREFIX = "pca_component_"
+
+
+@dataclass
+class StepNode:
+    index: int
+    config: Any
+    # Columns the step reads, in configuration order; None when it looks at every column
+    reads: Optional[Tuple[Any, ...]]
+    # New columns the step names itself (aggregation output, PCA components)
+    names: Tuple[str, ...] = ()
+    depends_on: List[int] = field(default_factory=list)
+
+    def may_write(self, column: Any) -> bool:
+        if self.reads is None or column in self.reads:
+            return True
+        # Generated columns start with their source column: x_binned, x_Drama, x^2, x_year
+        text = str(column)
+        return any(text.startswith(str(name)) for name in (*self.reads, *self.names))
+
+
+@dataclass
+class ExecutionPlan:
+    nodes: List[StepNode]
+    # Step indices per level; a level's steps only depend on earlier levels
+    levels: List[List[int]]
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "levels": self.levels,
+            "reads": {node.index: None if node.reads is None else list(node.reads) for node in self.nodes},
+        }
+
+
+@dataclass
+class StepResult:
+    index: int
+    config: Any
+    transformer: StepTransformer
+    metadata: Dict[str, Any]
+    trace: Dict[str, Any]
+
+
+def _reads(config: Any) -> Optional[Tuple[Any, ...]]:
+    columns = list(getattr(config, "columns", None) or [])
+    if config.type == "feature_selection" and not columns:
+        return None
+    if config.type == "encoding":
+        methods = {config.method, *(getattr(config, "column_methods", None) or {}).values()}
+        if "target" in methods and TARGET_COLUMN not in columns:
+            columns.append(TARGET_COLUMN)
+    return tuple(dict.fromkeys(columns))
+
+
+def _names(config: Any) -> Tuple[str, ...]:
+    if config.type == "feature_creation" and getattr(config, "new_column_name", None):
+        return (config.new_column_name,)
+    if config.type == "feature_selection":
+        return (PCA_PREFIX,)
+    return ()
+
+
+def _conflicts(earlier: StepNode, later: StepNode) -> bool:
+    if earlier.reads is None or later.reads is None:
+        return True
+    # Read-after-write, and write-after-write so results can be merged in any order
+    return any(earlier.may_write(col) for col in (*later.reads, *later.names)) or any(
+        later.may_write(col) for col in (*earlier.reads, *earlier.names)
+    )
+
+
+def compile_steps(steps: Sequence[Any]) -> ExecutionPlan:
+    """Build the column-level dependency graph of ``steps`` and group it into levels."""
+    nodes = [StepNode(index, config, _reads(config), _names(config)) for index, config in enumerate(steps)]
+    level_of: Dict[int, int] = {}
+    levels: List[List[int]] = []
+    for node in nodes:
+        node.depends_on = [earlier.index for earlier in nodes[:node.index] if _conflicts(earlier, node)]
+        level = 1 + max((level_of[index] for index in node.depends_on), default=-1)
+        level_of[node.index] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(node.index)
+    return ExecutionPlan(nodes, levels)
+
+
+def fit_step(df: pd.DataFrame, config: Any) -> Tuple[StepTransformer, Dict[str, Any]]:
+    """Dispatch ``config`` to its ``fit_*`` function."""
+    column_methods = getattr(config, "column_methods", None)
+    if config.type == "scaling":
+        return fit_scaling(df, config.columns, config.method, column_methods)
+    if config.type == "encoding":
+        return fit_encoding(df, config.columns, config.method, column_methods)
+    if config.type == "binning":
+        return fit_binning(df, config.columns, config.method, config.bins, column_methods)
+    if config.type == "feature_creation":
+        return fit_feature_creation(
+            df,
+            config.columns,
+            config.method,
+            degree=config.degree,
+            date_part=config.date_part,
+            aggregation_type=config.aggregation_type,
+            new_column_name=config.new_column_name,
+        )
+    if config.type == "feature_selection":
+        return fit_feature_selection(
+            df,
+            config.columns,
+            config.method,
+            threshold=config.threshold,
+            n_components=config.n_components,
+        )
+    raise ValueError(f"Unknown feature engineering step type: {config.type}")
+
+
+def _frame(store: Dict[Any, pd.Series], columns: Sequence[Any], index: pd.Index) -> pd.DataFrame:
+    return pd.DataFrame({col: store[col] for col in columns}, index=index, copy=False)
+
+
+def _run_node(node: StepNode, frame: pd.DataFrame, tracer: Tracer) -> Tuple[StepTransformer, Dict[str, Any], pd.DataFrame, Dict[str, Any]]:
+    with tracer.span(node.config.type, frame) as span:
+        transformer, metadata = fit_step(frame, node.config)
+        result = transformer.transform(frame)
+        span.set_output(result)
+    return transformer, metadata, result, span.trace.to_dict()
+
+
+def execute_steps(
+    df: pd.DataFrame,
+    steps: Sequence[Any],
+    tracer: Optional[Tracer] = None,
+    on_step: Optional[Callable[[StepResult], None]] = None,
+    max_workers: Optional[int] = None,
+) -> Tuple[pd.DataFrame, List[StepResult]]:
+    """Fit and apply ``steps`` to ``df`` in one pass; ``on_step`` sees results in step order."""
+    tracer = tracer or Tracer("feature_engineering")
+    plan = compile_steps(steps)
+    store: Dict[Any, pd.Series] = {col: df[col] for col in df.columns}
+    order: List[Any] = list(df.columns)
+    done: Dict[int, StepResult] = {}
+    folded = 0
+    workers = max(1, max_workers or cpu_budget.current_quota())
+
+    for level in plan.levels:
+        nodes = [plan.nodes[index] for index in level]
+        # Steps of a level read disjoint columns, so the inputs can be cut before any runs
+        frames = {
+            node.index: _frame(store, order if node.reads is None else [col for col in node.reads if col in store], df.index)
+            for node in nodes
+        }
+        if len(nodes) > 1 and workers > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(nodes))) as executor:
+                futures = {node.index: executor.submit(_run_node, node, frames[node.index], tracer) for node in nodes}
+                outputs = {index: future.result() for index, future in futures.items()}
+        else:
+            outputs = {node.index: _run_node(node, frames[node.index], tracer) for node in nodes}
+
+        for node in nodes:
+            transformer, metadata, result, trace = outputs[node.index]
+            for col in frames[node.index].columns:
+                if col not in result.columns:
+                    store.pop(col, None)
+            for col in result.columns:
+                store[col] = result[col]
+            done[node.index] = StepResult(node.index, node.config, transformer, metadata, trace)
+        # Column order follows the steps in their original order
+        while folded in done:
+            order = done[folded].transformer.output_columns(order)
+            if on_step is not None:
+                on_step(done[folded])
+            folded += 1
+
+    if len(set(order)) != len(order) or set(order) != set(store):
+        raise ValueError("Feature engineering steps produced duplicate or inconsistent column names")
+    return _frame(store, order, df.index), [done[index] for index in range(len(steps))]
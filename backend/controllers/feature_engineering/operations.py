@@ -1,3 +1,6 @@
+import logging
+import os
+
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import (
@@ -11,6 +14,16 @@ from sklearn.feature_selection import VarianceThreshold
 from sklearn.decomposition import PCA
 from typing import Dict, Any, List, Tuple, Optional
 
+from backend.controllers.feature_engineering.transformers import (
+    BinningTransformer,
+    EncodingTransformer,
+    FeatureCreationTransformer,
+    ScalingTransformer,
+    SelectionTransformer,
+)
+from backend.controllers.preprocessing.correlation import correlated_pairs
+from backend.controllers.preprocessing.dtype_optimizer import is_text_dtype
+
 """
 PERFORMANCE OPTIMIZATIONS FOR FEATURE ENGINEERING:
 
@@ -57,26 +70,38 @@ Total improvement: ~50-100x faster for encoding, ~10-15x overall
 """
 
 
-def apply_scaling(df: pd.DataFrame, columns: List[str], method: str, column_methods: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    """
-    Apply scaling to numerical columns with support for per-column method overrides.
-    
-    Args:
-        df: Input DataFrame
-        columns: List of columns to scale
-        method: Default scaling method (standard, minmax, robust, or log)
-        column_methods: Optional dict mapping column names to specific methods (overrides default)
-    """
+# Dense one-hot above this many levels falls back to label encoding; sparse one-hot
+# ("one-hot-sparse") stores one entry per row and goes up to ONE_HOT_SPARSE_MAX_LEVELS
+ONE_HOT_DENSE_MAX_LEVELS = int(os.getenv("ONE_HOT_DENSE_MAX_LEVELS", "100"))
+ONE_HOT_SPARSE_MAX_LEVELS = int(os.getenv("ONE_HOT_SPARSE_MAX_LEVELS", "10000"))
+
+
+def _is_scalable(series: pd.Series) -> bool:
+    # Any width: load-time dtype optimization narrows int64/float64 columns
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+SCALERS = {"standard": StandardScaler, "minmax": MinMaxScaler, "robust": RobustScaler}
+SCALING_DETAILS = {
+    "standard": "scaled (standard)",
+    "minmax": "scaled (minmax)",
+    "robust": "scaled (robust)",
+    "log": "log1p transformation applied",
+}
+
+
+def fit_scaling(df: pd.DataFrame, columns: List[str], method: str, column_methods: Optional[Dict[str, str]] = None) -> Tuple[ScalingTransformer, Dict[str, Any]]:
+    """Fit the scalers for :func:`apply_scaling` without transforming ``df``."""
     metadata: Dict[str, Any] = {"operation": "Scaling", "method": method, "columns": columns}
+    transformer = ScalingTransformer()
     if not columns:
-        return df, metadata
+        return transformer, metadata
 
-    df_copy = df.copy()
     column_methods = column_methods or {}
-    valid_cols = [col for col in columns if col in df_copy.columns and df_copy[col].dtype in [np.float64, np.int64, float, int]]
+    valid_cols = [col for col in columns if col in df.columns and _is_scalable(df[col])]
     
     if not valid_cols:
-        return df_copy, metadata
+        return transformer, metadata
     
     # Group columns by their scaling method
     cols_by_method: Dict[str, List[str]] = {
@@ -93,55 +118,46 @@ def apply_scaling(df: pd.DataFrame, columns: List[str], method: str, column_meth
         else:
             metadata.setdefault("details", {})[col] = f"skipped (unknown method: {col_method})"
     
-    # Apply each scaling method to its group of columns
-    if cols_by_method["standard"]:
-        scaler = StandardScaler()
-        df_copy[cols_by_method["standard"]] = scaler.fit_transform(df_copy[cols_by_method["standard"]])
-        for col in cols_by_method["standard"]:
-            metadata.setdefault("details", {})[col] = "scaled (standard)"
-            
-    if cols_by_method["minmax"]:
-        scaler = MinMaxScaler()
-        df_copy[cols_by_method["minmax"]] = scaler.fit_transform(df_copy[cols_by_method["minmax"]])
-        for col in cols_by_method["minmax"]:
-            metadata.setdefault("details", {})[col] = "scaled (minmax)"
-            
-    if cols_by_method["robust"]:
-        scaler = RobustScaler()
-        df_copy[cols_by_method["robust"]] = scaler.fit_transform(df_copy[cols_by_method["robust"]])
-        for col in cols_by_method["robust"]:
-            metadata.setdefault("details", {})[col] = "scaled (robust)"
-            
-    if cols_by_method["log"]:
-        df_copy[cols_by_method["log"]] = np.log1p(np.clip(df_copy[cols_by_method["log"]], a_min=0, a_max=None))
-        for col in cols_by_method["log"]:
-            metadata.setdefault("details", {})[col] = "log1p transformation applied"
+    # One scaler per method group; log1p has nothing to fit
+    for scaling_method, method_cols in cols_by_method.items():
+        if not method_cols:
+            continue
+        scaler = SCALERS[scaling_method]().fit(df[method_cols]) if scaling_method in SCALERS else None
+        transformer.groups[scaling_method] = (method_cols, scaler)
+        for col in method_cols:
+            metadata.setdefault("details", {})[col] = SCALING_DETAILS[scaling_method]
     
     # Mark skipped columns
     for col in columns:
-        if col not in df_copy.columns:
+        if col not in df.columns:
             metadata.setdefault("details", {})[col] = "skipped (column not found)"
         elif col not in valid_cols:
             metadata.setdefault("details", {})[col] = "skipped (non-numeric)"
 
-    return df_copy, metadata
+    return transformer, metadata
 
 
-def apply_encoding(df: pd.DataFrame, columns: List[str], method: str, column_methods: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+def apply_scaling(df: pd.DataFrame, columns: List[str], method: str, column_methods: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
-    Apply encoding to categorical columns with support for per-column method overrides.
+    Apply scaling to numerical columns with support for per-column method overrides.
     
     Args:
         df: Input DataFrame
-        columns: List of columns to encode
-        method: Default encoding method (one-hot, label, or target)
+        columns: List of columns to scale
+        method: Default scaling method (standard, minmax, robust, or log)
         column_methods: Optional dict mapping column names to specific methods (overrides default)
     """
+    transformer, metadata = fit_scaling(df, columns, method, column_methods)
+    return transformer.transform(df), metadata
+
+
+def fit_encoding(df: pd.DataFrame, columns: List[str], method: str, column_methods: Optional[Dict[str, str]] = None) -> Tuple[EncodingTransformer, Dict[str, Any]]:
+    """Learn categories, label classes and target means for :func:`apply_encoding`."""
     metadata: Dict[str, Any] = {"operation": "Encoding", "method": method, "columns": columns}
+    transformer = EncodingTransformer()
     if not columns:
-        return df, metadata
+        return transformer, metadata
 
-    df_copy = df.copy()
     column_methods = column_methods or {}
     
     # Group columns by their encoding method (default or overridden)
@@ -152,7 +168,7 @@ def apply_encoding(df: pd.DataFrame, columns: List[str], method: str, column_met
     }
     
     for col in columns:
-        if col not in df_copy.columns:
+        if col not in df.columns:
             metadata.setdefault("details", {})[col] = "skipped (column not found)"
             continue
         
@@ -160,76 +176,74 @@ def apply_encoding(df: pd.DataFrame, columns: List[str], method: str, column_met
         col_method = column_methods.get(col, method)
         
         # Validate column is categorical
-        if df_copy[col].dtype == "object" or str(df_copy[col].dtype).startswith("category"):
+        if is_text_dtype(df[col].dtype) or str(df[col].dtype).startswith("category"):
             # CRITICAL FIX: Force high-cardinality columns to use label encoding
-            if col_method == "one-hot":
-                unique_count = df_copy[col].nunique()
-                if unique_count > 100:
-                    import logging
+            if col_method in ("one-hot", "one-hot-sparse"):
+                unique_count = df[col].nunique()
+                limit = ONE_HOT_SPARSE_MAX_LEVELS if col_method == "one-hot-sparse" else ONE_HOT_DENSE_MAX_LEVELS
+                if unique_count > limit:
+                    hint = " Use 'one-hot-sparse' to keep its dummies sparse." if unique_count <= ONE_HOT_SPARSE_MAX_LEVELS else ""
                     logging.warning(
                         f"🚫 AUTO-CONVERTING: Column '{col}' has {unique_count} unique values. "
                         f"One-hot encoding would create {unique_count:,} columns and take minutes. "
-                        f"AUTOMATICALLY using LABEL ENCODING instead for performance!"
+                        f"AUTOMATICALLY using LABEL ENCODING instead for performance!{hint}"
                     )
                     col_method = "label"  # FORCE label encoding for high-cardinality
+                elif col_method == "one-hot-sparse":
+                    transformer.sparse.append(col)
+                    col_method = "one-hot"
             
             cols_by_method[col_method].append(col)
         else:
             metadata.setdefault("details", {})[col] = "skipped (non-categorical)"
     
-    # Process ONE-HOT encoding columns in batch (fast!)
-    if cols_by_method["one-hot"]:
-        encoded_df = pd.get_dummies(
-            df_copy[cols_by_method["one-hot"]], 
-            columns=cols_by_method["one-hot"], 
-            prefix=cols_by_method["one-hot"], 
-            drop_first=False, 
-            dtype=np.uint8
-        )
-        df_copy = df_copy.drop(columns=cols_by_method["one-hot"])
-        df_copy = pd.concat([df_copy, encoded_df], axis=1)
-        for col in cols_by_method["one-hot"]:
-            metadata.setdefault("details", {})[col] = "one-hot encoded"
+    # ONE-HOT: the categories fix the dummy columns (all encoded in one get_dummies call)
+    for col in cols_by_method["one-hot"]:
+        transformer.one_hot[col] = pd.Categorical(df[col]).categories.tolist()
+        metadata.setdefault("details", {})[col] = "one-hot encoded (sparse)" if col in transformer.sparse else "one-hot encoded"
     
-    # Process LABEL encoding columns individually (already fast)
-    if cols_by_method["label"]:
-        encoder = LabelEncoder()
-        for col in cols_by_method["label"]:
-            df_copy[col] = encoder.fit_transform(df_copy[col].astype(str))
-            metadata.setdefault("details", {})[col] = "label encoded"
+    # LABEL: classes in LabelEncoder order
+    for col in cols_by_method["label"]:
+        transformer.label[col] = LabelEncoder().fit(df[col].astype(str)).classes_.tolist()
+        metadata.setdefault("details", {})[col] = "label encoded"
     
-    # Process TARGET encoding columns individually
+    # TARGET: per-value means of the target column
     if cols_by_method["target"]:
         target_col = "target"
-        if target_col not in df_copy.columns:
+        if target_col not in df.columns:
             for col in cols_by_method["target"]:
                 metadata.setdefault("details", {})[col] = "target encoding skipped (no target column)"
         else:
+            fallback = float(df[target_col].mean())
             for col in cols_by_method["target"]:
-                means = df_copy.groupby(col)[target_col].transform("mean")
-                df_copy[f"{col}_target_encoded"] = means
-                df_copy = df_copy.drop(columns=[col])
+                means = df.groupby(col, observed=True)[target_col].mean()
+                transformer.target[col] = (means.to_dict(), fallback)
                 metadata.setdefault("details", {})[col] = "target encoded (simplified)"
 
-    return df_copy, metadata
+    return transformer, metadata
 
 
-def apply_binning(df: pd.DataFrame, columns: List[str], method: str, bins: int, column_methods: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+def apply_encoding(df: pd.DataFrame, columns: List[str], method: str, column_methods: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
-    Apply binning to numerical columns with support for per-column method overrides.
+    Apply encoding to categorical columns with support for per-column method overrides.
     
     Args:
         df: Input DataFrame
-        columns: List of columns to bin
-        method: Default binning method (equal-width or quantile)
-        bins: Number of bins
+        columns: List of columns to encode
+        method: Default encoding method (one-hot, one-hot-sparse, label, or target)
         column_methods: Optional dict mapping column names to specific methods (overrides default)
     """
+    transformer, metadata = fit_encoding(df, columns, method, column_methods)
+    return transformer.transform(df), metadata
+
+
+def fit_binning(df: pd.DataFrame, columns: List[str], method: str, bins: int, column_methods: Optional[Dict[str, str]] = None) -> Tuple[BinningTransformer, Dict[str, Any]]:
+    """Learn the bin edges for :func:`apply_binning`."""
     metadata: Dict[str, Any] = {"operation": "Binning", "method": method, "columns": columns, "bins": bins}
+    transformer = BinningTransformer()
     if not columns:
-        return df, metadata
+        return transformer, metadata
 
-    df_copy = df.copy()
     column_methods = column_methods or {}
     
     # Group columns by their binning method
@@ -239,11 +253,11 @@ def apply_binning(df: pd.DataFrame, columns: List[str], method: str, bins: int,
     }
     
     for col in columns:
-        if col not in df_copy.columns:
+        if col not in df.columns:
             metadata.setdefault("details", {})[col] = "skipped (column not found)"
             continue
             
-        if df_copy[col].dtype in [np.float64, np.int64, float, int]:
+        if _is_scalable(df[col]):
             col_method = column_methods.get(col, method)
             if col_method in cols_by_method:
                 cols_by_method[col_method].append(col)
@@ -252,20 +266,35 @@ def apply_binning(df: pd.DataFrame, columns: List[str], method: str, bins: int,
         else:
             metadata.setdefault("details", {})[col] = "skipped (non-numeric)"
     
-    # Apply equal-width binning
+    # Equal-width edges
     for col in cols_by_method["equal-width"]:
-        df_copy[f"{col}_binned"] = pd.cut(df_copy[col], bins=bins, labels=False, include_lowest=True, duplicates='drop')
+        _, transformer.edges[col] = pd.cut(df[col], bins=bins, labels=False, include_lowest=True, duplicates='drop', retbins=True)
         metadata.setdefault("details", {})[col] = "equal-width binned"
     
-    # Apply quantile binning
+    # Quantile edges
     for col in cols_by_method["quantile"]:
-        df_copy[f"{col}_binned"] = pd.qcut(df_copy[col], q=bins, labels=False, duplicates='drop')
+        _, transformer.edges[col] = pd.qcut(df[col], q=bins, labels=False, duplicates='drop', retbins=True)
         metadata.setdefault("details", {})[col] = "quantile binned"
 
-    return df_copy, metadata
+    return transformer, metadata
 
 
-def apply_feature_creation(
+def apply_binning(df: pd.DataFrame, columns: List[str], method: str, bins: int, column_methods: Optional[Dict[str, str]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Apply binning to numerical columns with support for per-column method overrides.
+    
+    Args:
+        df: Input DataFrame
+        columns: List of columns to bin
+        method: Default binning method (equal-width or quantile)
+        bins: Number of bins
+        column_methods: Optional dict mapping column names to specific methods (overrides default)
+    """
+    transformer, metadata = fit_binning(df, columns, method, bins, column_methods)
+    return transformer.transform(df), metadata
+
+
+def fit_feature_creation(
     df: pd.DataFrame,
     columns: List[str],
     method: str,
@@ -273,110 +302,118 @@ def apply_feature_creation(
     date_part: Optional[str] = None,
     aggregation_type: Optional[str] = None,
     new_column_name: Optional[str] = None,
-) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+) -> Tuple[FeatureCreationTransformer, Dict[str, Any]]:
+    """Fit polynomial expansions and group aggregates for :func:`apply_feature_creation`."""
     metadata: Dict[str, Any] = {"operation": "Feature Creation", "method": method, "columns": columns}
-    if not columns:
-        return df, metadata
+    transformer = FeatureCreationTransformer(method=method)
+    present = [col for col in columns if col in df.columns]
+    if not present:
+        return transformer, metadata
 
-    df_copy = df.copy()
-            
-    for col in columns:
-        if col not in df_copy.columns:
-            continue
-
-        if method == "polynomial":
-            if degree is None:
-                raise ValueError("Degree must be provided for polynomial features")
-            
+    if method == "polynomial":
+        if degree is None:
+            raise ValueError("Degree must be provided for polynomial features")
+        for col in present:
             # Handle NaN values properly - only fit on non-null data
-            valid_mask = df_copy[col].notna()
+            valid_mask = df[col].notna()
             if not valid_mask.any():
                 metadata.setdefault("details", {})[col] = "polynomial skipped (no data)"
                 continue
-            
-            valid_data = df_copy.loc[valid_mask, [col]]
-            poly = PolynomialFeatures(degree=degree, include_bias=False)
-            poly_features = poly.fit_transform(valid_data)
-            
-            # Create feature names
-            feature_names = poly.get_feature_names_out([col])
-            
-            # Assign polynomial features - only for valid rows
-            for i, fname in enumerate(feature_names):
-                df_copy.loc[valid_mask, fname] = poly_features[:, i]
-                # Fill NaN for rows that had missing values in original column
-                df_copy.loc[~valid_mask, fname] = np.nan
-            
+            transformer.polynomial[col] = PolynomialFeatures(degree=degree, include_bias=False).fit(df.loc[valid_mask, [col]])
             metadata.setdefault("details", {})[col] = f"polynomial features (degree {degree})"
-        elif method == "datetime_decomposition":
+    elif method == "datetime_decomposition":
+        for col in present:
             try:
-                s = pd.to_datetime(df_copy[col], errors="coerce")
-                df_copy[f"{col}_year"] = s.dt.year
-                df_copy[f"{col}_month"] = s.dt.month
-                df_copy[f"{col}_day"] = s.dt.day
-                df_copy[f"{col}_hour"] = s.dt.hour
-                df_copy[f"{col}_minute"] = s.dt.minute
-                df_copy[f"{col}_second"] = s.dt.second
+                # Raises when the parsed column has no datetime accessor
+                pd.to_datetime(df[col], errors="coerce").dt
+                transformer.datetime_columns.append(col)
                 metadata.setdefault("details", {})[col] = "datetime decomposed"
             except Exception as e:
                 metadata.setdefault("details", {})[col] = f"datetime decomposition failed: {e}"
-        elif method == "aggregations":
-            # This branch expects the first column to be the group key and the rest as values
-            if aggregation_type is None or new_column_name is None:
-                raise ValueError("Aggregation type and new column name must be provided for aggregations")
-            # columns list like [group_col, value_col]
-            if len(columns) < 2:
-                raise ValueError("At least two columns are required for aggregation feature creation")
-            group_col = columns[0]
-            value_cols = columns[1:]
-            if group_col not in df_copy.columns:
-                raise ValueError(f"Grouping column {group_col} not found")
-            for v in value_cols:
-                if v not in df_copy.columns:
-                    raise ValueError(f"Aggregation column {v} not found")
-            if aggregation_type == "sum":
-                df_copy[new_column_name] = df_copy.groupby(group_col)[value_cols].transform("sum").sum(axis=1)
-            elif aggregation_type == "mean":
-                df_copy[new_column_name] = df_copy.groupby(group_col)[value_cols].transform("mean").mean(axis=1)
-            elif aggregation_type == "min":
-                df_copy[new_column_name] = df_copy.groupby(group_col)[value_cols].transform("min").min(axis=1)
-            elif aggregation_type == "max":
-                df_copy[new_column_name] = df_copy.groupby(group_col)[value_cols].transform("max").max(axis=1)
-            elif aggregation_type == "count":
-                df_copy[new_column_name] = df_copy.groupby(group_col)[value_cols].transform("count").sum(axis=1)
-            else:
-                raise ValueError(f"Unknown aggregation type: {aggregation_type}")
-            metadata.setdefault("details", {})["aggregation"] = {
-                "group": group_col,
-                "values": value_cols,
-                "type": aggregation_type,
-                "new_col": new_column_name,
-            }
-        else:
-            raise ValueError(f"Unknown feature creation method: {method}")
+    elif method == "aggregations":
+        # The first column is the group key and the rest are values
+        if aggregation_type is None or new_column_name is None:
+            raise ValueError("Aggregation type and new column name must be provided for aggregations")
+        # columns list like [group_col, value_col]
+        if len(columns) < 2:
+            raise ValueError("At least two columns are required for aggregation feature creation")
+        group_col = columns[0]
+        value_cols = columns[1:]
+        if group_col not in df.columns:
+            raise ValueError(f"Grouping column {group_col} not found")
+        for v in value_cols:
+            if v not in df.columns:
+                raise ValueError(f"Aggregation column {v} not found")
+        if aggregation_type not in ("sum", "mean", "min", "max", "count"):
+            raise ValueError(f"Unknown aggregation type: {aggregation_type}")
+        per_column = df.groupby(group_col)[value_cols].transform(aggregation_type)
+        combine = "sum" if aggregation_type == "count" else aggregation_type
+        aggregated = getattr(per_column, combine)(axis=1)
+        # Constant within a group: keep one value per group key
+        keys = df[group_col]
+        first = (keys.notna() & ~keys.duplicated()).to_numpy()
+        transformer.aggregation = {
+            "group": group_col,
+            "values": value_cols,
+            "type": aggregation_type,
+            "new_col": new_column_name,
+            "mapping": dict(zip(keys[first].astype(object), aggregated[first])),
+            # What rows with a missing (or unseen) group get: an empty sum, else NaN
+            "missing_value": 0 if aggregation_type in ("sum", "count") else np.nan,
+        }
+        metadata.setdefault("details", {})["aggregation"] = {
+            "group": group_col,
+            "values": value_cols,
+            "type": aggregation_type,
+            "new_col": new_column_name,
+        }
+    else:
+        raise ValueError(f"Unknown feature creation method: {method}")
 
-    return df_copy, metadata
+    return transformer, metadata
 
 
-def apply_feature_selection(
+def apply_feature_creation(
+    df: pd.DataFrame,
+    columns: List[str],
+    method: str,
+    degree: Optional[int] = None,
+    date_part: Optional[str] = None,
+    aggregation_type: Optional[str] = None,
+    new_column_name: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    transformer, metadata = fit_feature_creation(
+        df,
+        columns,
+        method,
+        degree=degree,
+        date_part=date_part,
+        aggregation_type=aggregation_type,
+        new_column_name=new_column_name,
+    )
+    return transformer.transform(df), metadata
+
+
+def fit_feature_selection(
     df: pd.DataFrame,
     columns: List[str],
     method: str,
     threshold: Optional[float] = None,
     n_components: Optional[int] = None,
-) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+) -> Tuple[SelectionTransformer, Dict[str, Any]]:
+    """Decide which columns :func:`apply_feature_selection` keeps (or fit the PCA)."""
     metadata: Dict[str, Any] = {"operation": "Feature Selection", "method": method}
-    df_copy = df.copy()
+    transformer = SelectionTransformer(method=method)
             
     if not columns:
-        columns_to_process = df_copy.select_dtypes(include=np.number).columns.tolist()
+        columns_to_process = df.select_dtypes(include=np.number).columns.tolist()
     else:
-        columns_to_process = [c for c in columns if c in df_copy.columns and pd.api.types.is_numeric_dtype(df_copy[c])]
+        columns_to_process = [c for c in columns if c in df.columns and pd.api.types.is_numeric_dtype(df[c])]
         if not columns_to_process:
             metadata["details"] = {"info": "No applicable numeric columns found for selection."}
-            return df_copy, metadata
+            return transformer, metadata
 
-    df_numeric = df_copy[columns_to_process]
+    df_numeric = df[columns_to_process]
     initial_columns = df_numeric.columns.tolist()
 
     if method == "correlation_filter":
@@ -384,32 +421,40 @@ def apply_feature_selection(
             raise ValueError("Threshold must be provided for correlation filter")
         if df_numeric.empty or len(df_numeric.columns) < 2:
             metadata["details"] = {"info": "Not enough numerical columns for correlation filter."}
-            return df_copy, metadata
-        corr = df_numeric.corr().abs()
-        upper = corr.where(np.triu(np.ones(corr.shape), k=1).astype(bool))
-        to_drop = [c for c in upper.columns if any(upper[c] > threshold)]
-        df_copy = df_copy.drop(columns=to_drop)
-        metadata["details"] = {"dropped_columns": to_drop, "threshold": threshold}
+            return transformer, metadata
+        # Blockwise: never holds the full p x p matrix; drops the later column of each pair
+        pairs = correlated_pairs(df_numeric, threshold=threshold)
+        transformer.dropped = list(dict.fromkeys(pair.right for pair in pairs))
+        metadata["details"] = {"dropped_columns": transformer.dropped, "threshold": threshold}
     elif method == "variance_threshold":
         if threshold is None:
             raise ValueError("Threshold must be provided for variance threshold")
         selector = VarianceThreshold(threshold=threshold)
         selector.fit(df_numeric)
-        kept = df_numeric.columns[selector.get_support()].tolist()
-        df_copy = pd.concat([df_copy.drop(columns=initial_columns), df_numeric[kept]], axis=1)
-        metadata["details"] = {"selected_columns": kept, "threshold": threshold}
+        transformer.columns = initial_columns
+        transformer.kept = df_numeric.columns[selector.get_support()].tolist()
+        metadata["details"] = {"selected_columns": transformer.kept, "threshold": threshold}
     elif method == "pca":
         if n_components is None:
             raise ValueError("n_components must be provided for PCA")
         if n_components > len(df_numeric.columns):
             raise ValueError("n_components cannot be greater than the number of columns")
-        pca = PCA(n_components=n_components)
-        pcs = pca.fit_transform(df_numeric)
-        pc_cols = [f"pca_component_{i+1}" for i in range(n_components)]
-        pc_df = pd.DataFrame(pcs, columns=pc_cols, index=df_copy.index)
-        df_copy = pd.concat([df_copy.drop(columns=initial_columns), pc_df], axis=1)
-        metadata["details"] = {"n_components": n_components, "explained_variance_ratio": pca.explained_variance_ratio_.tolist()}
+        transformer.columns = initial_columns
+        transformer.pca = PCA(n_components=n_components).fit(df_numeric)
+        transformer.pc_columns = [f"pca_component_{i+1}" for i in range(n_components)]
+        metadata["details"] = {"n_components": n_components, "explained_variance_ratio": transformer.pca.explained_variance_ratio_.tolist()}
     else:
         raise ValueError(f"Unknown feature selection method: {method}")
 
-    return df_copy, metadata
+    return transformer, metadata
+
+
+def apply_feature_selection(
+    df: pd.DataFrame,
+    columns: List[str],
+    method: str,
+    threshold: Optional[float] = None,
+    n_components: Optional[int] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    transformer, metadata = fit_feature_selection(df, columns, method, threshold=threshold, n_components=n_components)
+    return transformer.transform(df), metadata
@@ -1,8 +1,10 @@
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
 
+from ..preprocessing.profiler import ColumnProfile, ColumnProfiler, DatasetProfile
+from .operations import ONE_HOT_DENSE_MAX_LEVELS, ONE_HOT_SPARSE_MAX_LEVELS
 from .types import (
     ColumnInsight,
     StepRecommendation,
@@ -10,21 +12,42 @@ from .types import (
 )
 
 
-def analyze_column(df: pd.DataFrame, column_name: str) -> ColumnInsight:
+def column_recommendation(profile: ColumnProfile) -> Tuple[Any, ...]:
+    """The encoding and quality notes :func:`get_step_recommendations` and
+    :func:`get_data_quality_notes` derive from one column's profile.
+
+    Sampled analysis only rescans in full when a confidence interval changes this.
+    """
+    is_categorical = profile.is_category or profile.is_object
+    cardinality = profile.unique_count
+    encoding = None
+    if is_categorical:
+        if cardinality > ONE_HOT_SPARSE_MAX_LEVELS:
+            encoding = "label"
+        elif cardinality > ONE_HOT_DENSE_MAX_LEVELS:
+            encoding = "one-hot-sparse"
+        elif cardinality >= 5:
+            encoding = "one-hot"
+    return (
+        encoding,
+        profile.missing_percentage > 30,
+        cardinality == 1,
+        is_categorical and 50 < cardinality <= 1000,
+        is_categorical and cardinality > 1000,
+    )
+
+
+def analyze_column(df: pd.DataFrame, column_name: str, profile: Optional[ColumnProfile] = None) -> ColumnInsight:
     """Analyze a single column and return insights from FULL dataset"""
-    column = df[column_name]
-    dtype = str(column.dtype)
+    if profile is None:
+        profile = ColumnProfiler(include_duplicates=False).profile(df, [column_name])[column_name]
+    dtype = profile.dtype
     
     # Determine column types
-    is_numeric = pd.api.types.is_numeric_dtype(column)
-    is_categorical = pd.api.types.is_categorical_dtype(column) or dtype == 'object'
-    is_datetime = pd.api.types.is_datetime64_any_dtype(column)
-    is_text = dtype == 'object' and not is_datetime
-    
-    # Calculate stats from FULL dataset
-    missing_count = column.isna().sum()
-    missing_percentage = (missing_count / len(column)) * 100 if len(column) > 0 else 0
-    cardinality = column.nunique()
+    is_numeric = profile.is_numeric
+    is_categorical = profile.is_category or profile.is_object
+    is_datetime = profile.is_datetime
+    is_text = profile.is_object and not is_datetime
     
     # Numeric stats from full data
     min_value = None
@@ -34,21 +57,20 @@ def analyze_column(df: pd.DataFrame, column_name: str) -> ColumnInsight:
     unique_values = None
     
     if is_numeric:
-        min_value = float(column.min()) if len(column) > 0 else None
-        max_value = float(column.max()) if len(column) > 0 else None
-        mean_value = float(column.mean()) if len(column) > 0 else None
-        std_value = float(column.std()) if len(column) > 0 else None
+        min_value = profile.min_value
+        max_value = profile.max_value
+        mean_value = profile.mean_value
+        std_value = profile.std_value
     elif is_categorical or is_text:
-        # Get top unique values from full dataset
-        top_values = column.dropna().unique()[:10].tolist()
-        unique_values = [str(v) for v in top_values]
+        # Top unique values from full dataset
+        unique_values = [str(v) for v in profile.top_values]
     
     return ColumnInsight(
         name=column_name,
         dtype=dtype,
-        cardinality=int(cardinality),
-        missing_count=int(missing_count),
-        missing_percentage=float(missing_percentage),
+        cardinality=int(profile.unique_count),
+        missing_count=int(profile.missing_count),
+        missing_percentage=float(profile.missing_percentage),
         is_numeric=bool(is_numeric),
         is_categorical=bool(is_categorical),
         is_datetime=bool(is_datetime),
@@ -71,8 +93,12 @@ def get_step_recommendations(column_insights: List[ColumnInsight]) -> List[StepR
     datetime_cols = [c.name for c in column_insights if c.is_datetime]
     
     # Separate categorical columns by cardinality (IMPORTANT FOR MEMORY!)
-    low_card_cats = [c for c in column_insights if c.is_categorical and 5 <= c.cardinality <= 100]
-    high_card_cats = [c for c in column_insights if c.is_categorical and c.cardinality > 100]
+    low_card_cats = [c for c in column_insights if c.is_categorical and 5 <= c.cardinality <= ONE_HOT_DENSE_MAX_LEVELS]
+    sparse_card_cats = [
+        c for c in column_insights
+        if c.is_categorical and ONE_HOT_DENSE_MAX_LEVELS < c.cardinality <= ONE_HOT_SPARSE_MAX_LEVELS
+    ]
+    high_card_cats = [c for c in column_insights if c.is_categorical and c.cardinality > ONE_HOT_SPARSE_MAX_LEVELS]
     id_cols = [c for c in column_insights if c.is_categorical and c.cardinality > len([x for x in column_insights if x.is_categorical])]
     
     # SCALING - for numeric columns with good variance
@@ -107,6 +133,22 @@ def get_step_recommendations(column_insights: List[ColumnInsight]) -> List[StepR
             why_these_columns=why_map,
         ))
     
+    # SPARSE ONE-HOT for moderately high-cardinality columns
+    sparse_card_names = [c.name for c in sparse_card_cats]
+    if sparse_card_names:
+        why_map = {
+            col: f"{next(c.cardinality for c in column_insights if c.name == col)} unique values - one stored entry per row with sparse one-hot"
+            for col in sparse_card_names
+        }
+        recommendations.append(StepRecommendation(
+            step_type="encoding",
+            step_name="Encoding (Sparse One-Hot)",
+            recommended_columns=sparse_card_names,
+            reason="Use the one-hot-sparse method: dummy columns are kept sparse in memory, on disk and during training. ✓ Memory-safe",
+            compatibility_score=0.85,
+            why_these_columns=why_map,
+        ))
+    
     # WARNING for HIGH-CARDINALITY columns
     high_card_names = [c.name for c in high_card_cats]
     if high_card_names:
@@ -244,11 +286,13 @@ def get_data_quality_notes(column_insights: List[ColumnInsight]) -> List[str]:
     return notes
 
 
-def analyze_dataset(df: pd.DataFrame, filename: str) -> DatasetAnalysis:
+def analyze_dataset(df: pd.DataFrame, filename: str, profile: Optional[DatasetProfile] = None) -> DatasetAnalysis:
     """Analyze entire dataset and provide recommendations"""
+    if profile is None:
+        profile = ColumnProfiler(include_duplicates=False).profile(df)
     
     # Analyze each column
-    column_insights = [analyze_column(df, col) for col in df.columns]
+    column_insights = [analyze_column(df, col, profile[col]) for col in df.columns]
     
     # Get step recommendations
     step_recommendations = get_step_recommendations(column_insights)
@@ -261,7 +305,7 @@ def analyze_dataset(df: pd.DataFrame, filename: str) -> DatasetAnalysis:
     
     return DatasetAnalysis(
         filename=filename,
-        total_rows=len(df),
+        total_rows=profile.total_rows,
         total_columns=len(df.columns),
         column_insights=column_insights,
         step_recommendations=step_recommendations,
@@ -0,0 +1,273 @@
+"""Fitted feature engineering steps.
+
+Each ``fit_*`` function in :mod:`operations` learns what its step needs from the
+training frame (scaler statistics, categories, bin edges, group aggregates, PCA
+components) and returns one of the transformers below. ``transform`` replays the step
+on any frame with the same columns (new uploads, prediction requests) without
+refitting, so engineered columns always mean the same thing.
+
+A :class:`FittedPipeline` chains a run's transformers. It is saved with ``joblib``
+next to the engineered dataset (``<dataset>.pipeline.joblib``), and prediction uses
+it to turn raw rows into the model's features. Columns a step was fitted on but that
+are absent from the new frame are skipped, except for PCA, which needs all of them.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+PIPELINE_SUFFIX = ".pipeline.joblib"
+
+
+def pipeline_object_name(dataset_filename: str) -> str:
+    """Object name of the fitted pipeline stored next to an engineered dataset."""
+    return f"{os.path.splitext(dataset_filename)[0]}{PIPELINE_SUFFIX}"
+
+
+def _present(df: pd.DataFrame, columns) -> List[Any]:
+    return [col for col in columns if col in df.columns]
+
+
+def _appended(columns: List[Any], names) -> List[Any]:
+    # Assigning a new column appends it; assigning an existing one keeps its position
+    out = list(columns)
+    for name in names:
+        if name not in out:
+            out.append(name)
+    return out
+
+
+def _sparse_dummies(series: pd.Series, categories: List[Any]) -> pd.DataFrame:
+    # One stored entry per non-null row; Sparse[uint8, 0] columns named like get_dummies
+    codes = pd.Categorical(series, categories=categories).codes
+    rows = np.flatnonzero(codes >= 0)
+    matrix = sparse.csc_matrix(
+        (np.ones(len(rows), dtype=np.uint8), (rows, codes[rows])), shape=(len(series), len(categories))
+    )
+    columns = [f"{series.name}_{category}" for category in categories]
+    return pd.DataFrame.sparse.from_spmatrix(matrix, index=series.index, columns=columns)
+
+
+def _plain(series: pd.Series) -> pd.Series:
+    # Categorical ``map`` results keep the categorical dtype; look up on plain values
+    return series.astype(object) if isinstance(series.dtype, pd.CategoricalDtype) else series
+
+
+class StepTransformer:
+    """Fitted state of one step; ``transform`` applies it to a new frame."""
+
+    step_type = ""
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def output_columns(self, columns: List[Any]) -> List[Any]:
+        """Columns ``transform`` returns, in order, for a frame with ``columns``."""
+        return list(columns)
+
+
+@dataclass
+class ScalingTransformer(StepTransformer):
+    # method -> (columns, fitted sklearn scaler; None for the stateless log1p)
+    groups: Dict[str, Tuple[List[str], Any]] = field(default_factory=dict)
+    step_type = "scaling"
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        out = df.copy(deep=False)
+        for columns, scaler in self.groups.values():
+            present = _present(out, columns)
+            if not present:
+                continue
+            if scaler is None:
+                out[present] = np.log1p(np.clip(out[present], a_min=0, a_max=None))
+                continue
+            # Scalers were fitted on the whole group; absent columns ride along as NaN
+            scaled = scaler.transform(out.reindex(columns=columns))
+            out[present] = pd.DataFrame(scaled, columns=columns, index=out.index)[present]
+        return out
+
+
+@dataclass
+class EncodingTransformer(StepTransformer):
+    # column -> categories, in the order the dummy columns were created
+    one_hot: Dict[str, List[Any]] = field(default_factory=dict)
+    # one-hot columns whose dummies are pandas sparse columns
+    sparse: List[str] = field(default_factory=list)
+    # column -> sorted string classes (LabelEncoder order); unseen values encode as -1
+    label: Dict[str, List[str]] = field(default_factory=dict)
+    # column -> (value -> target mean, fallback for unseen values)
+    target: Dict[str, Tuple[Dict[Any, float], float]] = field(default_factory=dict)
+    step_type = "encoding"
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        out = df.copy(deep=False)
+        one_hot = _present(out, self.one_hot)
+        if one_hot:
+            # Fixed categories: unseen values get all-zero rows, missing levels still get columns
+            dense = [col for col in one_hot if col not in self.sparse]
+            blocks: Dict[str, pd.DataFrame] = {}
+            if dense:
+                frame = pd.DataFrame(
+                    {col: pd.Categorical(out[col], categories=self.one_hot[col]) for col in dense}, index=out.index
+                )
+                encoded = pd.get_dummies(frame, columns=dense, prefix=dense, drop_first=False, dtype=np.uint8)
+                start = 0
+                for col in dense:
+                    blocks[col] = encoded.iloc[:, start:start + len(self.one_hot[col])]
+                    start += len(self.one_hot[col])
+            for col in one_hot:
+                if col in self.sparse:
+                    blocks[col] = _sparse_dummies(out[col], self.one_hot[col])
+            out = pd.concat([out.drop(columns=one_hot), *(blocks[col] for col in one_hot)], axis=1)
+        for col in _present(out, self.label):
+            out[col] = pd.Index(self.label[col]).get_indexer(out[col].astype(str))
+        for col in _present(out, self.target):
+            means, fallback = self.target[col]
+            values = _plain(out[col])
+            unseen = values.notna() & ~values.isin(list(means))
+            out[f"{col}_target_encoded"] = values.map(means).mask(unseen, fallback)
+            out = out.drop(columns=[col])
+        return out
+
+    def output_columns(self, columns: List[Any]) -> List[Any]:
+        one_hot = [col for col in self.one_hot if col in columns]
+        out = [col for col in columns if col not in one_hot]
+        out += [f"{col}_{category}" for col in one_hot for category in self.one_hot[col]]
+        for col in [col for col in self.target if col in out]:
+            out = [name for name in _appended(out, [f"{col}_target_encoded"]) if name != col]
+        return out
+
+
+@dataclass
+class BinningTransformer(StepTransformer):
+    # column -> bin edges learned at fit time
+    edges: Dict[str, np.ndarray] = field(default_factory=dict)
+    step_type = "binning"
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        out = df.copy(deep=False)
+        for col in _present(out, self.edges):
+            # Open outer edges: values beyond the training range land in the first/last bin
+            edges = np.asarray(self.edges[col], dtype=float).copy()
+            edges[0], edges[-1] = -np.inf, np.inf
+            out[f"{col}_binned"] = pd.cut(out[col], bins=edges, labels=False, include_lowest=True)
+        return out
+
+    def output_columns(self, columns: List[Any]) -> List[Any]:
+        return _appended(columns, [f"{col}_binned" for col in self.edges if col in columns])
+
+
+@dataclass
+class FeatureCreationTransformer(StepTransformer):
+    method: str = ""
+    # column -> fitted PolynomialFeatures
+    polynomial: Dict[str, Any] = field(default_factory=dict)
+    datetime_columns: List[str] = field(default_factory=list)
+    # group, values, type, new_col, mapping (group value -> aggregate), missing_value
+    aggregation: Optional[Dict[str, Any]] = None
+    step_type = "feature_creation"
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        out = df.copy(deep=False)
+        for col in _present(out, self.polynomial):
+            poly = self.polynomial[col]
+            valid_mask = out[col].notna().to_numpy()
+            names = poly.get_feature_names_out([col])
+            full_features = np.full((len(out), len(names)), np.nan)
+            if valid_mask.any():
+                full_features[valid_mask] = poly.transform(out.loc[valid_mask, [col]])
+            for i, fname in enumerate(names):
+                if fname != col:  # degree-1 term is the column itself
+                    out[fname] = full_features[:, i]
+        for col in _present(out, self.datetime_columns):
+            s = pd.to_datetime(out[col], errors="coerce")
+            for part in ("year", "month", "day", "hour", "minute", "second"):
+                out[f"{col}_{part}"] = getattr(s.dt, part)
+        if self.aggregation and self.aggregation["group"] in out.columns:
+            spec = self.aggregation
+            keys = _plain(out[spec["group"]])
+            known = keys.isin(list(spec["mapping"]))
+            out[spec["new_col"]] = keys.map(spec["mapping"]).where(known, spec["missing_value"])
+        return out
+
+    def output_columns(self, columns: List[Any]) -> List[Any]:
+        names: List[Any] = []
+        for col in [col for col in self.polynomial if col in columns]:
+            names += [fname for fname in self.polynomial[col].get_feature_names_out([col]) if fname != col]
+        for col in [col for col in self.datetime_columns if col in columns]:
+            names += [f"{col}_{part}" for part in ("year", "month", "day", "hour", "minute", "second")]
+        if self.aggregation and self.aggregation["group"] in columns:
+            names.append(self.aggregation["new_col"])
+        return _appended(columns, names)
+
+
+@dataclass
+class SelectionTransformer(StepTransformer):
+    method: str = ""
+    # Numeric columns the step looked at
+    columns: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    kept: List[str] = field(default_factory=list)
+    pca: Any = None
+    pc_columns: List[str] = field(default_factory=list)
+    step_type = "feature_selection"
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.method == "correlation_filter":
+            return df.drop(columns=_present(df, self.dropped))
+        if self.method == "variance_threshold" and self.columns:
+            return pd.concat([df.drop(columns=_present(df, self.columns)), df[_present(df, self.kept)]], axis=1)
+        if self.method == "pca" and self.pca is not None:
+            missing = [col for col in self.columns if col not in df.columns]
+            if missing:
+                raise ValueError(f"PCA needs columns that are missing: {missing[:10]}")
+            pcs = pd.DataFrame(self.pca.transform(df[self.columns]), columns=self.pc_columns, index=df.index)
+            return pd.concat([df.drop(columns=self.columns), pcs], axis=1)
+        return df.copy(deep=False)
+
+    def output_columns(self, columns: List[Any]) -> List[Any]:
+        if self.method == "correlation_filter":
+            return [col for col in columns if col not in self.dropped]
+        if self.method == "variance_threshold" and self.columns:
+            return [col for col in columns if col not in self.columns] + [col for col in self.kept if col in columns]
+        if self.method == "pca" and self.pca is not None:
+            return [col for col in columns if col not in self.columns] + list(self.pc_columns)
+        return list(columns)
+
+
+@dataclass
+class FittedPipeline:
+    """A feature engineering run's fitted steps, replayable on new rows."""
+
+    input_columns: List[str]
+    steps: List[StepTransformer] = field(default_factory=list)
+    output_columns: List[str] = field(default_factory=list)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        frame = df[_present(df, self.input_columns)]
+        for step in self.steps:
+            frame = step.transform(frame)
+        return frame
+
+    def save(self, path: str) -> str:
+        joblib.dump(self, path)
+        return path
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "steps": [step.step_type for step in self.steps],
+            "input_columns": list(self.input_columns),
+            "output_columns": list(self.output_columns),
+        }
+
+
+def load_pipeline(source: Any) -> FittedPipeline:
+    """Load a pipeline from a path or a binary file object."""
+    pipeline = joblib.load(source)
+    if not isinstance(pipeline, FittedPipeline):
+        raise ValueError("The object does not contain a feature engineering pipeline")
+    return pipeline
@@ -16,7 +16,7 @@ class ScalingConfig(FeatureEngineeringStep):
 
 class EncodingConfig(FeatureEngineeringStep):
     type: Literal["encoding"]
-    method: Literal["one-hot", "label", "target"]
+    method: Literal["one-hot", "one-hot-sparse", "label", "target"]
     column_methods: Optional[Dict[str, str]] = None  # Per-column method overrides
 
 
@@ -61,6 +61,7 @@ class FeatureEngineeringPreviewRequest(BaseModel):
 class FeatureEngineeringSummary(BaseModel):
     operation: str
     details: Dict[str, Any]
+    trace: Optional[Dict[str, Any]] = None  # Step timing/memory (services.tracing)
 
 
 class FeatureEngineeringResponse(BaseModel):
@@ -74,6 +75,8 @@ class FeatureEngineeringResponse(BaseModel):
     column_summary: Optional[Dict[str, Any]] = None
     engineered_filename: Optional[str] = None
     temp_engineered_path: Optional[str] = None
+    pipeline: Optional[Dict[str, Any]] = None  # Fitted steps (transformers.FittedPipeline.describe)
+    trace: List[Dict[str, Any]] = []
 
 
 class FeatureEngineeringJobResult(FeatureEngineeringResponse):
@@ -134,3 +137,4 @@ class DatasetAnalysis(BaseModel):
     step_recommendations: List[StepRecommendation]
     suggested_pipeline: List[str]  # suggested order of steps
     data_quality_notes: List[str]
+    sampling: Optional[Dict[str, Any]] = None  # sample size, confidence intervals, escalation
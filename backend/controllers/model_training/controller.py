@@ -10,6 +10,7 @@ from typing import Any, Dict, List, Optional
 import joblib
 import numpy as np
 import pandas as pd
+from sklearn.base import clone
 
 from backend.config import (
     FEATURE_ENGINEERED_BUCKET,
@@ -17,6 +18,8 @@ from backend.config import (
     TRAINING_RESULTS_BUCKET,
     minio_client,
 )
+from backend.controllers.feature_engineering.controller import load_saved_pipeline, transform_with_pipeline
+from backend.controllers.feature_engineering.transformers import PIPELINE_SUFFIX
 from backend.controllers.model_training.problem_detector import (
     analyze_target_column,
     detect_problem_type,
@@ -29,11 +32,17 @@ from backend.controllers.model_training.trainers import (
     get_available_models,
     prepare_data_for_training,
     select_best_model,
+    to_prediction_input,
     train_single_model,
 )
 from backend.controllers.model_training.types import MinioFile, TrainedModelInfo
+from backend.controllers.preprocessing.dtype_optimizer import optimize_loaded
+from backend.controllers.preprocessing.sparse_frames import densify, read_parquet, sparse_columns
 from backend.services import progress_tracker
 from backend.services import model_cache
+from backend.services import worker_pool
+from backend.services import cpu_budget
+from backend.services.tracing import Tracer
 from backend.utils.json_utils import _to_json_safe
 
 
@@ -43,7 +52,8 @@ async def get_minio_files_for_training() -> List[MinioFile]:
     try:
         objects = minio_client.list_objects(FEATURE_ENGINEERED_BUCKET, recursive=True)
         for obj in objects:
-            if getattr(obj, "is_dir", False):
+            # Fitted pipelines live next to their datasets
+            if getattr(obj, "is_dir", False) or obj.object_name.endswith(PIPELINE_SUFFIX):
                 continue
             files.append(
                 MinioFile(
@@ -137,12 +147,15 @@ def run_training_job(
     6. Prepare best model and results in memory (do not persist yet)
     7. Complete job with results; client can save later
     """
+    tracer = Tracer("training", job_id)
     try:
         progress_tracker.update_job(job_id, status="running", progress=10)
         
         # Step 1: Load data
         logging.info(f"📂 Loading dataset: {filename}")
-        df = _load_dataframe_from_minio(filename)
+        with tracer.span("load") as span:
+            df = worker_pool.load_dataset(FEATURE_ENGINEERED_BUCKET, filename, lambda: _load_dataframe_from_minio(filename, span))
+            span.set_output(df)
         progress_tracker.update_job(job_id, status="running", progress=20)
         
         # Dataset info
@@ -152,6 +165,8 @@ def run_training_job(
             "total_columns": len(df.columns),
             "features": [col for col in df.columns if col != target_column],
             "target_column": target_column,
+            # Sparse one-hot features train SPARSE_INPUT_MODELS on a CSR matrix
+            "sparse_input": any(col != target_column for col in sparse_columns(df)),
         }
         
         # Step 2: Validate target
@@ -163,10 +178,13 @@ def run_training_job(
         progress_tracker.update_job(job_id, status="running", progress=30)
         
         # Step 3: Prepare data
+        progress_tracker.raise_if_cancelled(job_id)
         logging.info(f"✂️ Splitting data (test_size={test_size})")
-        X_train, X_test, y_train, y_test = prepare_data_for_training(
-            df, target_column, test_size, random_state
-        )
+        with tracer.span("prepare_data", df) as span:
+            X_train, X_test, y_train, y_test = prepare_data_for_training(
+                df, target_column, test_size, random_state
+            )
+            span.set_output(X_train)
         progress_tracker.update_job(job_id, status="running", progress=40)
         
         # Step 4: Select models to train
@@ -185,17 +203,25 @@ def run_training_job(
         trained_models = []
         
         for i, model_name in enumerate(models_to_train):
-            model = model_registry[model_name]
+            # Cancellation checkpoint between model fits
+            progress_tracker.raise_if_cancelled(job_id)
+            # Fresh estimator per job, threaded to the job's CPU quota
+            model = cpu_budget.configure_estimator(clone(model_registry[model_name]))
             
-            result = train_single_model(
-                model_name=model_name,
-                model=model,
-                X_train=X_train,
-                X_test=X_test,
-                y_train=y_train,
-                y_test=y_test,
-                problem_type=problem_type,
-            )
+            with tracer.span(model_name, X_train) as span:
+                result = train_single_model(
+                    model_name=model_name,
+                    model=model,
+                    X_train=X_train,
+                    X_test=X_test,
+                    y_train=y_train,
+                    y_test=y_test,
+                    problem_type=problem_type,
+                )
+                span.set_output(X_test)
+                # train_single_model reports failures in its result instead of raising
+                span.trace.error = result.get('error')
+            result['trace'] = span.trace.to_dict()
             
             trained_models.append(result)
             
@@ -203,6 +229,7 @@ def run_training_job(
             progress = 40 + int((i + 1) / len(models_to_train) * 40)
             progress_tracker.update_job(job_id, status="running", progress=progress)
         
+        progress_tracker.raise_if_cancelled(job_id)
         progress_tracker.update_job(job_id, status="running", progress=85)
         
         # Step 6: Select best model
@@ -238,6 +265,7 @@ def run_training_job(
                     metrics=m['metrics'],
                     training_time=m['training_time'],
                     is_best=(m['model_name'] == best_model_result['model_name']),
+                    trace=m.get('trace'),
                 ).model_dump()
                 for m in trained_models
                 if m['success']
@@ -250,6 +278,7 @@ def run_training_job(
                     metrics=best_model_result['metrics'],
                     training_time=best_model_result['training_time'],
                     is_best=True,
+                    trace=best_model_result.get('trace'),
                 ).model_dump(),
                 # Add visualization data for best model
                 "confusion_matrix": best_model_viz.get('confusion_matrix'),
@@ -261,6 +290,7 @@ def run_training_job(
             "unsaved_model": True,
             "total_training_time": sum(m['training_time'] for m in trained_models),
             "dataset_info": dataset_info,
+            "trace": tracer.to_list(),
         }
         
         progress_tracker.complete_job(job_id, result=final_result)
@@ -327,14 +357,14 @@ def save_trained_model(job_id: str) -> Dict[str, Any]:
     return {"model_id": model_id}
 
 
-def _load_dataframe_from_minio(filename: str) -> pd.DataFrame:
+def _load_dataframe_from_minio(filename: str, span: Any = None) -> pd.DataFrame:
     """Load DataFrame from feature-engineered bucket"""
     response = minio_client.get_object(FEATURE_ENGINEERED_BUCKET, filename)
     try:
         data = io.BytesIO(response.read())
-        df = pd.read_parquet(data)
+        df = read_parquet(data)
         logging.info(f"✅ Loaded {len(df)} rows, {len(df.columns)} columns from {filename}")
-        return df
+        return optimize_loaded(df, filename, span)
     finally:
         response.close()
         response.release_conn()
@@ -465,7 +495,8 @@ def _transform_prediction_data_to_match_training(
     Returns:
         Transformed DataFrame matching training schema
     """
-    df = df_raw.copy()
+    # Only whole columns are reassigned below, so a shallow copy leaves df_raw untouched
+    df = df_raw.copy(deep=False)
     
     # Step 1: Identify which columns need one-hot encoding
     # One-hot columns have pattern: original_column_value (e.g., "department_Sales")
@@ -495,7 +526,7 @@ def _transform_prediction_data_to_match_training(
             expected_values = [col.split(f'{original_col}_')[-1] for col in onehot_cols]
             
             # Create one-hot encoded DataFrame
-            df[original_col] = df[original_col].fillna('missing').astype(str)
+            df[original_col] = df[original_col].astype(object).fillna('missing').astype(str)
             
             # Create dummy variables
             onehot_df = pd.get_dummies(df[[original_col]], prefix=original_col, dtype=np.uint8)
@@ -517,8 +548,17 @@ def _transform_prediction_data_to_match_training(
         result_df = pd.concat([df_numeric] + encoded_dfs, axis=1)
         logging.info(f"📊 Combined {len(df_numeric.columns)} numeric + {sum(len(edf.columns) for edf in encoded_dfs)} encoded columns")
     else:
-        result_df = df_numeric.copy()
+        result_df = df_numeric
     
+    result_df = _align_to_training_features(result_df, training_features)
+    logging.info(f"✅ Transformed {len(df_raw)} rows with {len(df_raw.columns)} columns → {len(result_df.columns)} model features")
+    logging.info(f"🎯 Final feature order matches training: {list(result_df.columns)[:5]}...")
+    
+    return result_df
+
+
+def _align_to_training_features(result_df: pd.DataFrame, training_features: List[str]) -> pd.DataFrame:
+    """Numeric columns in the model's feature order; missing features are 0."""
     # Convert all columns to numeric, replacing any non-numeric with NaN
     for col in result_df.columns:
         result_df[col] = pd.to_numeric(result_df[col], errors='coerce')
@@ -526,13 +566,10 @@ def _transform_prediction_data_to_match_training(
     logging.info(f"📊 After encoding: {len(result_df.columns)} columns present")
     
     # Step 4: Ensure all training features exist (fill missing with 0)
-    missing_features = []
-    for feature in training_features:
-        if feature not in result_df.columns:
-            missing_features.append(feature)
-            result_df[feature] = 0
-    
+    missing_features = [feature for feature in training_features if feature not in result_df.columns]
     if missing_features:
+        # One reindex instead of inserting columns one by one
+        result_df = result_df.reindex(columns=list(result_df.columns) + missing_features, fill_value=0)
         logging.warning(f"⚠️ {len(missing_features)} features not found, filled with 0: {missing_features[:5]}")
     
     # Step 5: Select only training features in correct order
@@ -558,9 +595,6 @@ def _transform_prediction_data_to_match_training(
     if (result_df == '').any().any():
         logging.error(f"⚠️ Still have empty strings after transformation!")
     
-    logging.info(f"✅ Transformed {len(df_raw)} rows with {len(df_raw.columns)} columns → {len(result_df.columns)} model features")
-    logging.info(f"🎯 Final feature order matches training: {list(result_df.columns)[:5]}...")
-    
     return result_df
 
 
@@ -599,10 +633,14 @@ async def make_predictions(
         logging.info(f"🎯 Model expects {len(training_features)} features")
         logging.info(f"🔍 Sample expected features: {training_features[:5]}")
         
-        # Detect if this is raw data (needs transformation) or already encoded data
-        # Strategy: Look for categorical column patterns in training features
+        # Raw rows are replayed through the fitted feature engineering pipeline when one was saved
         input_cols = set(df_raw.columns)
+        pipeline = None
+        if not set(training_features).issubset(input_cols):
+            pipeline = load_saved_pipeline(model_details['dataset_info']['filename'])
         
+        # Detect if this is raw data (needs transformation) or already encoded data
+        # Strategy: Look for categorical column patterns in training features
         # Identify potential categorical base columns by finding patterns like:
         # department_Sales, department_HR, department_IT → base: "department"
         categorical_bases = set()
@@ -631,7 +669,11 @@ async def make_predictions(
             else:
                 logging.info(f"🎯 Detection: PRE-ENCODED data (all features present)")
         
-        if is_raw_data:
+        if pipeline is not None:
+            logging.info(f"🔄 Applying the fitted feature engineering pipeline ({len(pipeline.steps)} steps)")
+            engineered = densify(transform_with_pipeline(pipeline, df_raw))
+            df_transformed = _align_to_training_features(engineered, training_features)
+        elif is_raw_data:
             logging.info("🔄 Detected RAW data - will auto-transform to match training schema")
             df_transformed = _transform_prediction_data_to_match_training(df_raw, training_features, model_details)
         else:
@@ -645,6 +687,11 @@ async def make_predictions(
                 )
             df_transformed = df_raw[training_features]
         
+        # Models trained on a CSR matrix get one again; everything else keeps its frame
+        df_transformed = to_prediction_input(
+            model, df_transformed, bool(model_details['dataset_info'].get('sparse_input'))
+        )
+
         # Make predictions
         predictions = model.predict(df_transformed)
         logging.info(f"✅ Generated {len(predictions)} predictions")
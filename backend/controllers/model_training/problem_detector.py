@@ -28,7 +28,7 @@ def analyze_target_column(df: pd.DataFrame, target_column: str) -> Dict[str, Any
     null_pct = (null_count / len(df)) * 100
     
     is_numeric = pd.api.types.is_numeric_dtype(target)
-    is_categorical = target.dtype == 'object' or target.dtype.name == 'category'
+    is_categorical = pd.api.types.is_string_dtype(target.dtype) or target.dtype.name == 'category'
     is_boolean = target.dtype == bool or set(target_clean.unique()).issubset({0, 1, True, False})
     
     analysis = {
@@ -99,7 +99,7 @@ def detect_problem_type(
         raise ValueError(f"Target column '{target_column}' is entirely null")
     
     # Rule 1: String/object type → classification
-    if target.dtype == 'object' or target.dtype.name == 'category':
+    if pd.api.types.is_string_dtype(target.dtype) or target.dtype.name == 'category':
         logging.info(f"🎯 Detected CLASSIFICATION (target is categorical/object type)")
         return "classification"
     
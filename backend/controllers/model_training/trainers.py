@@ -41,6 +41,8 @@ except ImportError:
     LIGHTGBM_AVAILABLE = False
     logging.warning("LightGBM not available")
 
+from backend.controllers.preprocessing.sparse_frames import densify, has_sparse_columns, to_csr
+
 warnings.filterwarnings('ignore')
 
 
@@ -78,6 +80,31 @@ if LIGHTGBM_AVAILABLE:
     )
 
 
+# Estimators that train on SciPy sparse matrices (sparse one-hot columns stay sparse)
+SPARSE_INPUT_MODELS = {
+    'LogisticRegression', 'LinearRegression', 'Ridge', 'Lasso',
+    'RandomForestClassifier', 'RandomForestRegressor',
+    'GradientBoostingClassifier', 'GradientBoostingRegressor',
+    'SVC', 'SVR', 'XGBClassifier', 'XGBRegressor', 'LGBMClassifier', 'LGBMRegressor',
+}
+
+
+def to_estimator_input(model, X: pd.DataFrame):
+    """CSR matrix for estimators that accept it when ``X`` has sparse columns, else a dense frame."""
+    if not has_sparse_columns(X):
+        return X
+    if type(model).__name__ in SPARSE_INPUT_MODELS:
+        return to_csr(X).astype(np.float64)
+    return densify(X)
+
+
+def to_prediction_input(model, X: pd.DataFrame, sparse_training: bool):
+    """The input form ``model`` was trained on: a float64 CSR matrix if it saw one, else ``X``."""
+    if sparse_training and type(model).__name__ in SPARSE_INPUT_MODELS:
+        return to_csr(X).astype(np.float64)
+    return X
+
+
 def get_available_models(problem_type: Literal["classification", "regression"]) -> List[str]:
     """Get list of available models for problem type"""
     if problem_type == "classification":
@@ -130,7 +157,7 @@ def prepare_data_for_training(
         logging.warning(f"⚠️ Very small test set ({len(X_test)} samples). Consider using cross-validation.")
     
     # Now encode categorical columns AFTER splitting
-    categorical_columns = X_train.select_dtypes(include=['object', 'category']).columns.tolist()
+    categorical_columns = X_train.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
     
     if categorical_columns:
         logging.info(f"🔤 Encoding {len(categorical_columns)} categorical columns: {categorical_columns}")
@@ -144,14 +171,14 @@ def prepare_data_for_training(
             le = LabelEncoder()
             
             # Handle nulls in training data
-            X_train[col] = X_train[col].fillna('missing')
+            X_train[col] = X_train[col].astype(object).fillna('missing')
             
             # Fit encoder on TRAINING data only
             X_train[col] = le.fit_transform(X_train[col].astype(str))
             encoders[col] = le
             
             # Transform TEST data using the same encoder
-            X_test[col] = X_test[col].fillna('missing')
+            X_test[col] = X_test[col].astype(object).fillna('missing')
             
             # Handle unseen categories in test set
             test_values = X_test[col].astype(str)
@@ -183,15 +210,19 @@ def train_single_model(
     start_time = time.time()
     
     try:
+        # Sparse one-hot columns reach the estimator as one CSR matrix when it accepts one
+        train_input = to_estimator_input(model, X_train)
+        test_input = to_estimator_input(model, X_test)
+
         # Train model
-        model.fit(X_train, y_train)
+        model.fit(train_input, y_train)
         
         # Make predictions
-        y_pred = model.predict(X_test)
+        y_pred = model.predict(test_input)
         
         # Calculate metrics and get visualization data
         if problem_type == "classification":
-            metrics, viz_data = _calculate_classification_metrics(y_test, y_pred, model, X_test)
+            metrics, viz_data = _calculate_classification_metrics(y_test, y_pred, model, test_input)
         else:
             metrics, viz_data = _calculate_regression_metrics(y_test, y_pred)
         
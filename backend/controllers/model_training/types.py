@@ -53,6 +53,7 @@ class TrainedModelInfo(BaseModel):
     metrics: ModelMetrics
     training_time: float  # seconds
     is_best: bool = False
+    trace: Optional[Dict[str, Any]] = None  # wall/CPU/memory of the fit, see services.tracing
 
 
 class TrainingJobResult(BaseModel):
@@ -67,6 +68,7 @@ class TrainingJobResult(BaseModel):
     best_model_id: str  # UUID for saved model
     total_training_time: float
     dataset_info: Dict[str, Any]
+    trace: List[Dict[str, Any]] = []
     error: Optional[str] = None
 
 
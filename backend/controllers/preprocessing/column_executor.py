@@ -0,0 +1,193 @@
+"""Per-column task execution on threads or a shared-memory process pool.
+
+Numeric work (quantiles, masks, means) runs in numpy with the GIL released, so a thread
+pool keeps every core busy. Object/string columns (``mode()``, ``median()`` over Python
+objects, hashing) hold the GIL and serialise on threads; large ones are shipped to a
+long-lived process pool instead. Column buffers cross the process boundary through
+``multiprocessing.shared_memory``: numeric arrays are copied in once and reattached in the
+worker as a zero-copy ``np.ndarray`` view, other dtypes are written as an Arrow IPC
+stream straight into the segment and reopened in place with ``pa.ipc.open_stream``.
+
+The pool is shared by every job of the process, so each call keeps at most its job's
+CPU quota (:func:`cpu_budget.current_quota`) of columns in flight there. Job worker
+processes (``JOB_WORKER_MODE=process``) already run one job each on its own cores and
+never start a nested pool; their columns stay on threads.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pandas.api import types as ptypes
+
+from backend.services import cpu_budget, worker_pool
+
+PROCESS_POOL_MIN_ROWS = int(os.getenv("PREPROCESSING_PROCESS_MIN_ROWS", "200000"))
+PROCESS_POOL_WORKERS = int(os.getenv("PREPROCESSING_PROCESS_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+ColumnTask = Callable[..., Any]
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a server process that already runs threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, PROCESS_POOL_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def choose_backend(series: pd.Series, min_process_rows: Optional[int] = None) -> str:
+    """``"process"`` for large GIL-bound (non-numeric) columns, ``"thread"`` otherwise."""
+    threshold = PROCESS_POOL_MIN_ROWS if min_process_rows is None else min_process_rows
+    if cpu_budget.current_quota() < 2 or PROCESS_POOL_WORKERS < 1 or worker_pool.in_worker():
+        return "thread"
+    dtype = series.dtype
+    gil_bound = not (ptypes.is_numeric_dtype(dtype) or ptypes.is_datetime64_any_dtype(dtype))
+    return "process" if gil_bound and len(series) >= threshold else "thread"
+
+
+# ---- shared-memory column transport ---------------------------------------------
+def _share_series(series: pd.Series) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """Place ``series`` in a new shared-memory segment and return it with its descriptor."""
+    name = series.name
+    if ptypes.is_numeric_dtype(series.dtype) and not ptypes.is_extension_array_dtype(series.dtype):
+        values = series.to_numpy()
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+        return shm, {"kind": "numpy", "shm": shm.name, "dtype": values.dtype.str, "length": len(values), "name": name}
+
+    batch = pa.record_batch([pa.Array.from_pandas(series)], names=["values"])
+    mock = pa.MockOutputStream()
+    with pa.ipc.new_stream(mock, batch.schema) as writer:
+        writer.write_batch(batch)
+    size = mock.size()
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    with pa.ipc.new_stream(pa.FixedSizeBufferWriter(pa.py_buffer(shm.buf)), batch.schema) as writer:
+        writer.write_batch(batch)
+    return shm, {"kind": "arrow", "shm": shm.name, "size": size, "dtype": str(series.dtype), "name": name}
+
+
+def _attach_series(descriptor: Dict[str, Any]) -> Tuple[shared_memory.SharedMemory, pd.Series]:
+    # Spawned workers inherit the parent's resource tracker, so attaching only repeats
+    # the parent's registration; the parent unlinks the segment once the task is done
+    shm = shared_memory.SharedMemory(name=descriptor["shm"])
+    if descriptor["kind"] == "numpy":
+        values = np.ndarray((descriptor["length"],), dtype=np.dtype(descriptor["dtype"]), buffer=shm.buf)
+        return shm, pd.Series(values, name=descriptor["name"], copy=False)
+    reader = pa.ipc.open_stream(pa.py_buffer(shm.buf)[: descriptor["size"]])
+    array = reader.read_next_batch().column(0)
+    series = array.to_pandas()
+    if descriptor["dtype"] == "object" and series.dtype != object:
+        series = series.astype(object)
+    series.name = descriptor["name"]
+    return shm, series
+
+
+def _run_shared(task: ColumnTask, descriptor: Dict[str, Any], args: tuple) -> Any:
+    """Worker entry point: reattach the column, run ``task`` and release the mapping."""
+    shm, series = _attach_series(descriptor)
+    try:
+        result = task(series, *args)
+        if isinstance(result, (np.ndarray, pd.Series)):
+            result = np.array(result, copy=True)
+        return result
+    finally:
+        del series
+        shm.close()
+
+
+# ---- public API -----------------------------------------------------------------
+def map_columns(
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    task: ColumnTask,
+    args: Optional[Dict[str, tuple]] = None,
+    row_mask: Optional[pd.Series] = None,
+    min_process_rows: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Run ``task(series, *args[col])`` for every column and return ``column -> result``.
+
+    ``task`` must be a module-level function so it can be pickled for the process pool.
+    ``row_mask`` restricts every column to the selected rows first. Each column goes to
+    the backend :func:`choose_backend` picks; exceptions propagate to the caller.
+    Process-backed tasks see a positional index and array results come back as numpy.
+    Columns Arrow cannot represent (mixed-type objects) run on threads instead.
+    """
+    columns = list(columns)
+    if not columns:
+        return {}
+    args = args or {}
+    selected = {col: (df[col] if row_mask is None else df[col][row_mask]) for col in columns}
+    backends = {col: choose_backend(series, min_process_rows) for col, series in selected.items()}
+
+    results: Dict[str, Any] = {}
+    thread_cols = [col for col in columns if backends[col] == "thread"]
+    process_cols = [col for col in columns if backends[col] == "process"]
+    # The process pool is shared by every job: threads and in-flight pool tasks
+    # together stay within this job's quota
+    quota = cpu_budget.current_quota()
+    window = 0
+    if process_cols:
+        window = min(len(process_cols), max(1, quota // 2) if thread_cols else quota)
+    thread_futures: Dict[str, Future] = {}
+    in_flight: Dict[Future, Tuple[str, shared_memory.SharedMemory]] = {}
+    # Threads start lazily; columns that cannot go to the pool may still be added
+    thread_executor = ThreadPoolExecutor(max_workers=max_workers or max(1, min(len(columns), quota - window)))
+
+    def _on_thread(col: str) -> None:
+        thread_futures[col] = thread_executor.submit(task, selected[col], *args.get(col, ()))
+
+    def _collect(done) -> None:
+        for future in done:
+            col, shm = in_flight.pop(future)
+            try:
+                results[col] = future.result()
+            finally:
+                shm.close()
+                shm.unlink()
+
+    try:
+        for col in thread_cols:
+            _on_thread(col)
+        if process_cols:
+            pool = _get_process_pool()
+            for col in process_cols:
+                try:
+                    shm, descriptor = _share_series(selected[col])
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                    # Object columns mixing types (ints and strings) have no Arrow type
+                    _on_thread(col)
+                    continue
+                in_flight[pool.submit(_run_shared, task, descriptor, args.get(col, ()))] = (col, shm)
+                if len(in_flight) >= window:
+                    _collect(wait(list(in_flight), return_when=FIRST_COMPLETED).done)
+        for col, future in thread_futures.items():
+            results[col] = future.result()
+        _collect(list(in_flight))
+    finally:
+        thread_executor.shutdown(wait=True)
+        for _, shm in in_flight.values():
+            shm.close()
+            shm.unlink()
+    return {col: results[col] for col in columns}
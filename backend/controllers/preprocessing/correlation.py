@@ -0,0 +1,154 @@
+"""Blockwise correlation over many numeric columns.
+
+``DataFrame.corr()`` materialises the full p x p float64 matrix (plus a mask of the
+same size to read its upper triangle), which dominates memory once one-hot encoding
+has produced thousands of columns. :func:`correlated_pairs` instead standardizes the
+columns once, then multiplies ``block_columns``-wide float32 blocks against each
+other and keeps only the pairs whose absolute coefficient exceeds ``threshold``.
+
+Nulls are handled pairwise like pandas: every coefficient uses only the rows where
+both columns are present, via masked sums over each block pair. Spearman ranks each
+column over its own non-null values first (pandas re-ranks per pair, so the two can
+differ slightly when nulls overlap unevenly). Pass ``sample_rows`` to correlate a
+uniform row sample instead of every row.
+"""
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+CORRELATION_BLOCK_COLUMNS = int(os.getenv("CORRELATION_BLOCK_COLUMNS", "256"))
+CORRELATION_SAMPLE_ROWS = int(os.getenv("CORRELATION_SAMPLE_ROWS", "100000"))
+# Pairs at least this strongly correlated are listed in the quality report
+CORRELATION_REPORT_THRESHOLD = float(os.getenv("CORRELATION_REPORT_THRESHOLD", "0.8"))
+CORRELATION_METHODS = ("pearson", "spearman")
+
+
+@dataclass
+class CorrelatedPair:
+    left: str
+    right: str
+    coefficient: float
+    # Rows where both columns are present
+    count: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Block:
+    columns: List[Any]
+    values: np.ndarray  # standardized, nulls as 0
+    mask: Optional[np.ndarray]  # 1 where present; None when the block has no nulls
+
+
+def _prepare(frame: pd.DataFrame, method: str) -> np.ndarray:
+    if method == "spearman":
+        frame = frame.rank(method="average")
+    values = frame.to_numpy(dtype=np.float64, na_value=np.nan)
+    # Centering and scaling in float64 keeps the float32 products well conditioned
+    with np.errstate(invalid="ignore", divide="ignore"):
+        center = np.nanmean(values, axis=0)
+        scale = np.nanstd(values, axis=0)
+    scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+    return (values - np.nan_to_num(center)) / scale
+
+
+def _block(columns: List[Any], standardized: np.ndarray) -> _Block:
+    present = ~np.isnan(standardized)
+    mask = None if present.all() else present.astype(np.float32)
+    return _Block(columns, np.where(present, standardized, 0.0).astype(np.float32), mask)
+
+
+def _block_correlation(a: _Block, b: _Block, n_rows: int):
+    """Coefficients and pairwise counts between the columns of ``a`` and ``b``."""
+    xa, xb = a.values, b.values
+    sxy = xa.T @ xb
+    if a.mask is None and b.mask is None:
+        sxx = np.sum(xa * xa, axis=0)[:, None]
+        syy = np.sum(xb * xb, axis=0)[None, :]
+        counts = np.full(sxy.shape, n_rows, dtype=np.float32)
+        sx = np.sum(xa, axis=0)[:, None]
+        sy = np.sum(xb, axis=0)[None, :]
+    else:
+        ma = a.mask if a.mask is not None else np.ones_like(xa)
+        mb = b.mask if b.mask is not None else np.ones_like(xb)
+        counts = ma.T @ mb
+        sx, sy = xa.T @ mb, ma.T @ xb
+        sxx, syy = (xa * xa).T @ mb, ma.T @ (xb * xb)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / counts
+        var = (sxx - sx * sx / counts) * (syy - sy * sy / counts)
+        coefficients = cov / np.sqrt(var)
+    coefficients[~(var > 1e-6 * np.maximum(counts, 1) ** 2)] = np.nan
+    return np.clip(coefficients, -1.0, 1.0), counts
+
+
+def correlated_pairs(
+    df: pd.DataFrame,
+    columns: Optional[Sequence[Any]] = None,
+    *,
+    method: str = "pearson",
+    threshold: float = 0.0,
+    sample_rows: Optional[int] = None,
+    block_columns: Optional[int] = None,
+    min_periods: int = 2,
+    seed: int = 42,
+) -> List[CorrelatedPair]:
+    """Column pairs with ``|coefficient| > threshold``, earlier column first, in column order."""
+    method = method.lower()
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unsupported correlation method '{method}'")
+    columns = list(df.columns if columns is None else columns)
+    frame = df[columns]
+    if sample_rows and len(frame) > sample_rows:
+        frame = frame.sample(n=sample_rows, random_state=seed)
+    if len(columns) < 2 or frame.empty:
+        return []
+    block_columns = max(1, block_columns or CORRELATION_BLOCK_COLUMNS)
+
+    starts = list(range(0, len(columns), block_columns))
+    blocks = {
+        start: _block(columns[start:start + block_columns], _prepare(frame.iloc[:, start:start + block_columns], method))
+        for start in starts
+    }
+    pairs: List[CorrelatedPair] = []
+    for i, left_start in enumerate(starts):
+        left = blocks[left_start]
+        for right_start in starts[i:]:
+            right = blocks[right_start]
+            coefficients, counts = _block_correlation(left, right, len(frame))
+            keep = (np.abs(coefficients) > threshold) & (counts >= min_periods)
+            if right_start == left_start:
+                keep &= np.triu(np.ones(keep.shape, dtype=bool), k=1)
+            for row, col in zip(*np.nonzero(keep)):
+                pairs.append(CorrelatedPair(
+                    left.columns[row], right.columns[col], float(coefficients[row, col]), int(counts[row, col])
+                ))
+    position = {col: index for index, col in enumerate(columns)}
+    pairs.sort(key=lambda pair: (position[pair.right], position[pair.left]))
+    return pairs
+
+
+def correlation_summary(
+    df: pd.DataFrame,
+    columns: Sequence[Any],
+    *,
+    method: str = "pearson",
+    threshold: Optional[float] = None,
+    sample_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Strongly correlated pairs for the quality report, strongest first."""
+    threshold = CORRELATION_REPORT_THRESHOLD if threshold is None else threshold
+    sample_rows = CORRELATION_SAMPLE_ROWS if sample_rows is None else sample_rows
+    pairs = correlated_pairs(df, columns, method=method, threshold=threshold, sample_rows=sample_rows)
+    pairs.sort(key=lambda pair: -abs(pair.coefficient))
+    return {
+        "method": method,
+        "threshold": threshold,
+        "rows_used": min(len(df), sample_rows) if sample_rows else len(df),
+        "pairs": [pair.to_dict() for pair in pairs],
+    }
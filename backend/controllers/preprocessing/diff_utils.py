@@ -1,11 +1,12 @@
 import math
-import os
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
 
+from backend.services import cpu_budget
+
 
 def _to_comparable(value: Any) -> Any:
     """Normalize values so equality checks behave predictably, even for array-likes."""
@@ -71,7 +72,7 @@ def compute_diff_marks(original: pd.DataFrame, cleaned: pd.DataFrame) -> Tuple[L
                 chunk_updates[idx] = {col: True for col in changed}
         return chunk_updates
 
-    worker_cap = max(1, os.cpu_count() or 1)
+    worker_cap = cpu_budget.current_quota()
     max_workers = min(worker_cap, max(1, len(common) // 500 or 1))
     if max_workers <= 1:
         updated_cells = _process_chunk(common)
@@ -0,0 +1,158 @@
+"""Load-time dtype optimization.
+
+Frames come out of ``read_csv``/``read_parquet`` as ``int64``/``float64`` and ``object``
+strings. :func:`optimize_dtypes` shrinks them without changing any value:
+
+- integer columns are downcast to the narrowest signed type holding their range,
+- float columns become ``float32`` only when every value round-trips exactly,
+- string columns with few distinct values (``DTYPE_CATEGORY_MAX_RATIO``) become
+  ``category``, which Parquet stores as an Arrow dictionary,
+- other string columns optionally move to the pyarrow string type
+  (``DTYPE_STRING_BACKEND=pyarrow``).
+
+Set ``DTYPE_OPTIMIZATION=0`` to load frames unchanged.
+"""
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+DTYPE_OPTIMIZATION = os.getenv("DTYPE_OPTIMIZATION", "1").lower() not in {"0", "false", "no"}
+DTYPE_CATEGORY_MAX_RATIO = float(os.getenv("DTYPE_CATEGORY_MAX_RATIO", "0.5"))
+DTYPE_STRING_BACKEND = os.getenv("DTYPE_STRING_BACKEND", "python").lower()
+# Columns the pipeline relies on keeping as-is
+PRESERVED_COLUMNS = ("_orig_idx",)
+
+
+@dataclass
+class DtypeReport:
+    bytes_before: int = 0
+    bytes_after: int = 0
+    # column -> "old -> new"
+    conversions: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "bytes_saved": self.bytes_saved}
+
+
+def is_text_dtype(dtype: Any) -> bool:
+    """True for ``object``, ``string`` and pyarrow string dtypes (not categories)."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return False
+    return ptypes.is_object_dtype(dtype) or ptypes.is_string_dtype(dtype)
+
+
+def _downcast_integer(series: pd.Series) -> pd.Series:
+    if series.empty:
+        return series
+    return pd.to_numeric(series, downcast="integer")
+
+
+def _downcast_float(series: pd.Series) -> pd.Series:
+    if series.dtype != np.float64:
+        return series
+    values = series.to_numpy()
+    narrowed = values.astype(np.float32)
+    with np.errstate(over="ignore", invalid="ignore"):
+        exact = np.array_equal(narrowed.astype(np.float64), values, equal_nan=True)
+    return series.astype(np.float32) if exact else series
+
+
+def _optimize_text(series: pd.Series, category_max_ratio: float, string_backend: str) -> pd.Series:
+    non_null = series.dropna()
+    if non_null.empty or ptypes.infer_dtype(non_null, skipna=True) != "string":
+        return series
+    if non_null.nunique() <= max(1, int(len(series) * category_max_ratio)):
+        return series.astype("category")
+    if string_backend == "pyarrow" and series.dtype == object:
+        return series.astype("string[pyarrow]")
+    return series
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    *,
+    category_max_ratio: Optional[float] = None,
+    string_backend: Optional[str] = None,
+    exclude: Iterable[str] = PRESERVED_COLUMNS,
+) -> Tuple[pd.DataFrame, DtypeReport]:
+    """Return ``df`` with narrower dtypes (same values) and what that saved."""
+    category_max_ratio = DTYPE_CATEGORY_MAX_RATIO if category_max_ratio is None else category_max_ratio
+    string_backend = (string_backend or DTYPE_STRING_BACKEND).lower()
+    excluded = set(exclude)
+    usage = df.memory_usage(index=False, deep=True)
+    report = DtypeReport(bytes_before=int(usage.sum()))
+
+    converted: Dict[Any, pd.Series] = {}
+    for col in df.columns:
+        if col in excluded:
+            continue
+        series = df[col]
+        dtype = series.dtype
+        if ptypes.is_bool_dtype(dtype):
+            continue
+        if ptypes.is_extension_array_dtype(dtype) and not is_text_dtype(dtype):
+            # Nullable Int64/Float64, categories, datetimes with tz: already deliberate
+            continue
+        if ptypes.is_integer_dtype(dtype):
+            new = _downcast_integer(series)
+        elif ptypes.is_float_dtype(dtype):
+            new = _downcast_float(series)
+        elif is_text_dtype(dtype):
+            new = _optimize_text(series, category_max_ratio, string_backend)
+        else:
+            continue
+        if new.dtype != dtype:
+            converted[col] = new
+            report.conversions[str(col)] = f"{dtype} -> {new.dtype}"
+
+    if not converted:
+        report.bytes_after = report.bytes_before
+        return df, report
+    optimized = _replace_columns(df, converted)
+    report.bytes_after = int(optimized.memory_usage(index=False, deep=True).sum())
+    return optimized, report
+
+
+def _replace_columns(df: pd.DataFrame, converted: Dict[Any, pd.Series]) -> pd.DataFrame:
+    optimized = df.copy(deep=False)
+    for col, series in converted.items():
+        optimized[col] = series
+    return optimized
+
+
+def optimize_loaded(df: pd.DataFrame, label: str, span: Any = None) -> pd.DataFrame:
+    """Apply :func:`optimize_dtypes` to a freshly loaded frame, log it and note it on ``span``."""
+    if not DTYPE_OPTIMIZATION:
+        return df
+    optimized, report = optimize_dtypes(df)
+    if report.conversions:
+        logging.info(
+            "Optimized dtypes of %s: %.1f MB -> %.1f MB (%d columns)",
+            label, report.bytes_before / 1024 ** 2, report.bytes_after / 1024 ** 2, len(report.conversions),
+        )
+    if span is not None:
+        span.set_details(dtype_optimization=report.to_dict())
+    return optimized
+
+
+def with_fill_categories(df: pd.DataFrame, fill_values: Dict[Any, Any]) -> pd.DataFrame:
+    """Add fill values missing from categorical columns' categories so ``fillna`` accepts them."""
+    updates = {}
+    for col, value in fill_values.items():
+        if col not in df.columns or value is None:
+            continue
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+            updates[col] = series.cat.add_categories([value])
+    if not updates:
+        return df
+    return _replace_columns(df, updates)
@@ -1,9 +1,10 @@
-import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 import pandas as pd
 
+from .column_executor import map_columns
+from .dtype_optimizer import with_fill_categories
+
 
 def _resolve_fill_value(series: pd.Series, strategy: str, value):
     if strategy == "mean":
@@ -20,40 +21,46 @@ def _resolve_fill_value(series: pd.Series, strategy: str, value):
     return None
 
 
-def _fill_column(df: pd.DataFrame, column: str, info: Dict) -> Tuple[str, pd.Series, Dict]:
-    strategy = (info.get("strategy") or "mean").lower()
-    value = info.get("value")
-    base_series = df[column]
-    fill_val = _resolve_fill_value(base_series, strategy, value)
-    filled = base_series.fillna(fill_val)
-    meta = {
-        "operation": "Fill Nulls",
-        "column": column,
-        "strategy": strategy,
-        "value": fill_val,
-    }
-    return column, filled, meta
-
+def resolve_fill_values(
+    df: pd.DataFrame,
+    strategies: Dict[str, Dict],
+    row_mask: Optional[pd.Series] = None,
+) -> Dict[str, Dict]:
+    """Compute the fill value for every strategy column without touching the frame.
 
-def apply(df: pd.DataFrame, strategies: Dict[str, Dict]) -> Tuple[pd.DataFrame, Dict]:
+    ``row_mask`` restricts the statistics to the rows that survive earlier filters,
+    so callers can defer materialising the filtered frame. Returns ``column -> meta``
+    where ``meta["value"]`` holds the resolved fill value. Large object columns are
+    resolved on the shared-memory process pool (see ``column_executor``).
+    """
     strategies = strategies or {}
-    df2 = df.copy()
-    meta_list = []
-    valid_columns = [col for col in strategies.keys() if col in df2.columns]
+    valid_columns = [col for col in strategies.keys() if col in df.columns]
     if not valid_columns:
-        return df2, {"summary": meta_list}
+        return {}
 
-    max_workers = min(len(valid_columns), max(1, os.cpu_count() or 1))
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(_fill_column, df, col, strategies[col]): col
-            for col in valid_columns
+    specs = {
+        col: ((strategies[col].get("strategy") or "mean").lower(), strategies[col].get("value"))
+        for col in valid_columns
+    }
+    values = map_columns(df, valid_columns, _resolve_fill_value, args=specs, row_mask=row_mask)
+    return {
+        col: {
+            "operation": "Fill Nulls",
+            "column": col,
+            "strategy": specs[col][0],
+            "value": values[col],
         }
-        for future in as_completed(futures):
-            column, filled_series, meta = future.result()
-            df2[column] = filled_series
-            meta_list.append(meta)
+        for col in valid_columns
+    }
 
-    return df2, {"summary": meta_list}
 
+def apply(df: pd.DataFrame, strategies: Dict[str, Dict]) -> Tuple[pd.DataFrame, Dict]:
+    resolved = resolve_fill_values(df, strategies)
+    df2 = with_fill_categories(df, {col: meta["value"] for col, meta in resolved.items()}).copy(deep=False)
+    meta_list = []
+    for column, meta in resolved.items():
+        df2[column] = df2[column].fillna(meta["value"])
+        meta_list.append(meta)
+
+    return df2, {"summary": meta_list}
 
@@ -0,0 +1,250 @@
+"""Scalable missing-value imputation strategies.
+
+- **group**: per-group median (numeric) and mode (categorical) from one ``groupby``
+  over the key columns, falling back to the global statistic for empty groups.
+- **knn**: approximate nearest neighbours - a ``KDTree`` is built over a bounded
+  sample of rows on the standardized numeric feature columns and every incomplete
+  row is answered from that index in batches, so cost is O(n log s) instead of the
+  O(n^2) of ``KNNImputer``.
+- **iterative**: ``IterativeImputer`` (round-robin regression) fitted on at most
+  ``row_budget`` rows and applied to the full frame chunk by chunk.
+
+Every strategy returns an :class:`ImputationReport` with wall time and peak traced
+memory so callers can surface the cost next to the result.
+"""
+import os
+import time
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+from sklearn.experimental import enable_iterative_imputer  # noqa: F401
+from sklearn.impute import IterativeImputer
+from sklearn.neighbors import KDTree
+
+# Rows used to build the nearest-neighbour index
+IMPUTATION_INDEX_SAMPLE_ROWS = int(os.getenv("IMPUTATION_INDEX_SAMPLE_ROWS", "50000"))
+# Rows the iterative imputer is fitted on
+IMPUTATION_ROW_BUDGET = int(os.getenv("IMPUTATION_ROW_BUDGET", "50000"))
+IMPUTATION_BATCH_ROWS = 100000
+
+
+@dataclass
+class ImputationReport:
+    strategy: str
+    columns: List[str]
+    filled_cells: int = 0
+    seconds: float = 0.0
+    peak_memory_bytes: int = 0
+    rows_used: Optional[int] = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@contextmanager
+def _measure(report: ImputationReport) -> Iterator[ImputationReport]:
+    """Record wall time and peak traced allocations (numpy included) into ``report``."""
+    owns_tracing = not tracemalloc.is_tracing()
+    if owns_tracing:
+        tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield report
+    finally:
+        report.seconds = round(time.perf_counter() - start, 4)
+        _, peak = tracemalloc.get_traced_memory()
+        report.peak_memory_bytes = int(max(0, peak - baseline))
+        if owns_tracing:
+            tracemalloc.stop()
+
+
+def _missing_cells(df: pd.DataFrame, columns: Sequence[str]) -> int:
+    return int(df[list(columns)].isna().sum().sum()) if columns else 0
+
+
+def _global_fill(series: pd.Series):
+    if ptypes.is_numeric_dtype(series.dtype) and not ptypes.is_bool_dtype(series.dtype):
+        return series.median()
+    mode = series.mode()
+    return mode.iloc[0] if len(mode) else None
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    return ptypes.is_numeric_dtype(series.dtype) and not ptypes.is_bool_dtype(series.dtype)
+
+
+# ---- group-wise median / mode ---------------------------------------------------
+def group_impute(df: pd.DataFrame, columns: Sequence[str], by: Sequence[str]) -> Tuple[pd.DataFrame, ImputationReport]:
+    """Fill ``columns`` with the median/mode of their ``by`` group."""
+    by = [col for col in by if col in df.columns]
+    columns = [col for col in columns if col in df.columns and col not in by]
+    report = ImputationReport(strategy="group", columns=columns, details={"by": by})
+    if not columns:
+        return df, report
+    if not by:
+        raise ValueError("Group imputation needs at least one group column")
+
+    with _measure(report):
+        before = _missing_cells(df, columns)
+        result = df.copy()
+        grouped = df.groupby(by, observed=True, dropna=False, sort=False)
+        numeric_cols = [col for col in columns if _is_numeric(df[col])]
+        other_cols = [col for col in columns if col not in numeric_cols]
+
+        if numeric_cols:
+            medians = grouped[numeric_cols].transform("median")
+            result[numeric_cols] = df[numeric_cols].fillna(medians)
+        if other_cols:
+            codes = grouped.ngroup()
+            for col in other_cols:
+                # Most frequent value per group: count (group, value) pairs once, keep the top one
+                pairs = pd.DataFrame({"_group": codes, "_value": df[col]}).dropna(subset=["_value"])
+                counts = pairs.value_counts(sort=True)
+                top = counts.reset_index().drop_duplicates("_group").set_index("_group")["_value"]
+                result[col] = df[col].fillna(codes.map(top))
+
+        for col in columns:
+            if result[col].isna().any():
+                fallback = _global_fill(df[col])
+                if fallback is not None:
+                    result[col] = result[col].fillna(fallback)
+        report.filled_cells = before - _missing_cells(result, columns)
+        report.details["groups"] = int(grouped.ngroups)
+    return result, report
+
+
+# ---- approximate nearest neighbours ---------------------------------------------
+def knn_impute(
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    feature_columns: Optional[Sequence[str]] = None,
+    n_neighbors: int = 5,
+    sample_rows: Optional[int] = None,
+    seed: int = 0,
+) -> Tuple[pd.DataFrame, ImputationReport]:
+    """Fill numeric ``columns`` with the mean of their nearest sampled neighbours.
+
+    Neighbours are searched on ``feature_columns`` (default: the other numeric
+    columns), standardized and median-filled for the query.
+    """
+    columns = [col for col in columns if col in df.columns and _is_numeric(df[col])]
+    if feature_columns is None:
+        feature_columns = [col for col in df.columns if col not in columns and _is_numeric(df[col])]
+    feature_columns = [col for col in feature_columns if col in df.columns and col not in columns]
+    sample_rows = IMPUTATION_INDEX_SAMPLE_ROWS if sample_rows is None else sample_rows
+    report = ImputationReport(strategy="knn", columns=columns, details={"features": list(feature_columns), "n_neighbors": n_neighbors})
+    if not columns:
+        return df, report
+
+    with _measure(report):
+        before = _missing_cells(df, columns)
+        result = df.copy()
+        if feature_columns:
+            features = df[list(feature_columns)].astype(float)
+            center = features.median()
+            scale = features.std(ddof=0).replace(0, 1).fillna(1)
+            points = ((features.fillna(center) - center) / scale).to_numpy(dtype=np.float64)
+            targets = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+            candidates = np.flatnonzero(~np.isnan(targets).all(axis=1))
+            if len(candidates) > sample_rows:
+                candidates = np.sort(np.random.default_rng(seed).choice(candidates, sample_rows, replace=False))
+            report.rows_used = int(len(candidates))
+            if len(candidates):
+                tree = KDTree(points[candidates])
+                k = min(n_neighbors, len(candidates))
+                reference = targets[candidates]
+                incomplete = np.flatnonzero(np.isnan(targets).any(axis=1))
+                for start in range(0, len(incomplete), IMPUTATION_BATCH_ROWS):
+                    rows = incomplete[start:start + IMPUTATION_BATCH_ROWS]
+                    _, neighbours = tree.query(points[rows], k=k)
+                    with np.errstate(invalid="ignore"), _ignore_empty_slices():
+                        estimates = np.nanmean(reference[neighbours], axis=1)
+                    block = targets[rows]
+                    gaps = np.isnan(block)
+                    block[gaps] = estimates[gaps]
+                    targets[rows] = block
+                for position, col in enumerate(columns):
+                    result[col] = pd.Series(targets[:, position], index=df.index).astype(
+                        df[col].dtype if ptypes.is_float_dtype(df[col].dtype) else np.float64
+                    )
+
+        for col in columns:
+            if result[col].isna().any():
+                result[col] = result[col].fillna(df[col].median())
+        report.filled_cells = before - _missing_cells(result, columns)
+    return result, report
+
+
+@contextmanager
+def _ignore_empty_slices():
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Mean of empty slice", category=RuntimeWarning)
+        yield
+
+
+# ---- iterative model-based ------------------------------------------------------
+def iterative_impute(
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    feature_columns: Optional[Sequence[str]] = None,
+    row_budget: Optional[int] = None,
+    max_iter: int = 5,
+    seed: int = 0,
+) -> Tuple[pd.DataFrame, ImputationReport]:
+    """Round-robin regression imputation fitted on at most ``row_budget`` rows."""
+    columns = [col for col in columns if col in df.columns and _is_numeric(df[col])]
+    if feature_columns is None:
+        feature_columns = [col for col in df.columns if col not in columns and _is_numeric(df[col])]
+    model_columns = columns + [col for col in feature_columns if col in df.columns and col not in columns]
+    row_budget = IMPUTATION_ROW_BUDGET if row_budget is None else row_budget
+    report = ImputationReport(strategy="iterative", columns=columns, details={"features": model_columns[len(columns):], "max_iter": max_iter})
+    if not columns:
+        return df, report
+
+    with _measure(report):
+        before = _missing_cells(df, columns)
+        result = df.copy()
+        matrix = df[model_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        fit_rows = np.arange(len(matrix))
+        if len(fit_rows) > row_budget:
+            fit_rows = np.sort(np.random.default_rng(seed).choice(fit_rows, row_budget, replace=False))
+        report.rows_used = int(len(fit_rows))
+
+        imputer = IterativeImputer(max_iter=max_iter, random_state=seed, keep_empty_features=True)
+        imputer.fit(matrix[fit_rows])
+        incomplete = np.flatnonzero(np.isnan(matrix[:, :len(columns)]).any(axis=1))
+        for start in range(0, len(incomplete), IMPUTATION_BATCH_ROWS):
+            rows = incomplete[start:start + IMPUTATION_BATCH_ROWS]
+            matrix[rows] = imputer.transform(matrix[rows])
+        for position, col in enumerate(columns):
+            result[col] = pd.Series(matrix[:, position], index=df.index).astype(
+                df[col].dtype if ptypes.is_float_dtype(df[col].dtype) else np.float64
+            )
+        report.filled_cells = before - _missing_cells(result, columns)
+    return result, report
+
+
+IMPUTATION_STRATEGIES = {
+    "group": group_impute,
+    "knn": knn_impute,
+    "iterative": iterative_impute,
+}
+
+
+def impute(df: pd.DataFrame, strategy: str, columns: Sequence[str], **options) -> Tuple[pd.DataFrame, ImputationReport]:
+    """Dispatch to one of :data:`IMPUTATION_STRATEGIES`."""
+    try:
+        impute_fn = IMPUTATION_STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown imputation strategy: {strategy}") from None
+    return impute_fn(df, columns, **options)
@@ -1,3 +1,4 @@
+import io
 import os
 import tempfile
 from typing import Any, Tuple
@@ -7,6 +8,7 @@ import numpy as np
 from pandas.api import types as ptypes
 from decimal import Decimal
 from backend.config import MINIO_BUCKET, minio_client
+from .dtype_optimizer import optimize_loaded
 
 
 CHUNK_SIZE = 32 * 1024
@@ -25,6 +27,69 @@ def _download_to_tempfile(object_name: str, bucket: str = MINIO_BUCKET) -> str:
         response.release_conn()
 
 
+class MinioRangeReader(io.RawIOBase):
+    """Seekable read-only view of a MinIO object backed by HTTP range requests.
+
+    Lets ``pyarrow.parquet.ParquetFile`` read the footer and individual row groups of
+    a persisted file without downloading the whole object.
+    """
+
+    def __init__(self, object_name: str, bucket: str = MINIO_BUCKET):
+        self.object_name = object_name
+        self.bucket = bucket
+        self.size = minio_client.stat_object(bucket, object_name).size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self.size}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self.size - self._position)
+        if length <= 0:
+            return 0
+        response = minio_client.get_object(self.bucket, self.object_name, offset=self._position, length=length)
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+def open_minio_parquet(object_name: str, bucket: str = MINIO_BUCKET, buffer_size: int = 1024 * 1024) -> io.BufferedReader:
+    """Buffered range reader for a Parquet object, suitable for ``pq.ParquetFile``."""
+    return io.BufferedReader(MinioRangeReader(object_name, bucket), buffer_size=buffer_size)
+
+
+def open_minio_dataset(object_name: str, bucket: str = MINIO_BUCKET) -> io.IOBase:
+    """File-like source for sampled profiling of a stored dataset.
+
+    Parquet objects are read with range requests, so a sample only transfers the footer
+    and the row groups it reads; other formats have no row groups and are downloaded.
+    """
+    if object_name.endswith(".parquet"):
+        return open_minio_parquet(object_name, bucket)
+    response = minio_client.get_object(bucket, object_name)
+    try:
+        return io.BytesIO(response.read())
+    finally:
+        response.close()
+        response.release_conn()
+
+
 def read_parquet_from_minio(filename: str) -> pd.DataFrame:
     temp_path = _download_to_tempfile(filename)
     try:
@@ -32,6 +97,7 @@ def read_parquet_from_minio(filename: str) -> pd.DataFrame:
     finally:
         if os.path.exists(temp_path):
             os.remove(temp_path)
+    df = optimize_loaded(df, filename)
     # Preserve a stable original index for diffing
     if "_orig_idx" not in df.columns:
         df = df.reset_index(drop=False).rename(columns={"index": "_orig_idx"})
@@ -49,8 +115,9 @@ def sanitize_dataframe_for_parquet(df: pd.DataFrame) -> pd.DataFrame:
       - If is NaN -> keep NaN
       - Else -> keep strings; non-strings coerced to str
     This avoids mixed object columns with non-scalar types that pyarrow can't serialize reliably.
+    Only object columns are rewritten; the rest stay shared with ``df``.
     """
-    df2 = df.copy()
+    df2 = df.copy(deep=False)
     for col in df2.columns:
         series = df2[col]
         if series.dtype == object:
@@ -124,7 +191,7 @@ def standardize_missing_indicators(df: pd.DataFrame) -> pd.DataFrame:
 
         return value
 
-    df2 = df.copy()
+    df2 = df.copy(deep=False)
     for col in df2.columns:
         series = df2[col]
         if ptypes.is_numeric_dtype(series):
@@ -0,0 +1,103 @@
+"""Per-job memory budget for in-memory preprocessing.
+
+With pandas copy-on-write the pipeline no longer copies frames defensively, so the
+remaining large allocations are the ones that actually materialise data: loading the
+source, the cleaned projection and the sanitized frame written to Parquet. Each of
+those is admitted against a :class:`JobMemoryBudget` first; when one would not fit,
+:class:`MemoryBudgetExceeded` is raised before allocating and the caller either
+refuses the job or switches it to the streaming path.
+"""
+import logging
+import os
+import resource
+from typing import Optional, Sequence
+
+import pandas as pd
+
+from .streaming import MEMORY_BUDGET_BYTES
+
+# Rough in-memory expansion of text formats over their on-disk size
+TEXT_EXPANSION_FACTOR = float(os.getenv("PREPROCESSING_TEXT_EXPANSION_FACTOR", "3"))
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Raised before an allocation that would push a job past its memory budget."""
+
+    def __init__(self, label: str, needed_bytes: int, held_bytes: int, limit_bytes: int):
+        self.label = label
+        self.needed_bytes = needed_bytes
+        self.held_bytes = held_bytes
+        self.limit_bytes = limit_bytes
+        super().__init__(
+            f"{label} needs {needed_bytes / 1024 ** 2:.0f} MB but the job already holds "
+            f"{held_bytes / 1024 ** 2:.0f} MB of its {limit_bytes / 1024 ** 2:.0f} MB memory budget"
+        )
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss_bytes() -> int:
+    """High-water RSS of this process (``ru_maxrss`` is KiB on Linux)."""
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+
+
+def frame_bytes(frame: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> int:
+    """Deep in-memory size of ``frame`` (or just ``columns``) without slicing it."""
+    usage = frame.memory_usage(index=columns is None, deep=True)
+    return int(usage[list(columns)].sum() if columns is not None else usage.sum())
+
+
+def estimate_file_bytes(path: str, filename: str) -> int:
+    """In-memory estimate for a text-format source before parsing it."""
+    size = os.path.getsize(path)
+    return int(size * TEXT_EXPANSION_FACTOR) if not filename.endswith(".parquet") else size
+
+
+class JobMemoryBudget:
+    """Logical accounting of the frames one job holds against ``limit_bytes``.
+
+    RSS is process-wide and shared by concurrent jobs, so the budget counts the bytes
+    of the frames the job admits rather than sampling the process.
+    """
+
+    def __init__(self, limit_bytes: Optional[int] = None, job_id: Optional[str] = None):
+        self.limit_bytes = MEMORY_BUDGET_BYTES if limit_bytes is None else int(limit_bytes)
+        self.job_id = job_id
+        self.held_bytes = 0
+        self.peak_held_bytes = 0
+
+    def fits(self, nbytes: int) -> bool:
+        return self.held_bytes + nbytes <= self.limit_bytes
+
+    def check(self, nbytes: int, label: str) -> None:
+        """Raise :class:`MemoryBudgetExceeded` if ``nbytes`` more would not fit."""
+        if not self.fits(int(nbytes)):
+            raise MemoryBudgetExceeded(label, int(nbytes), self.held_bytes, self.limit_bytes)
+
+    def require(self, nbytes: int, label: str) -> int:
+        """Admit ``nbytes`` for ``label`` or raise :class:`MemoryBudgetExceeded`."""
+        nbytes = int(nbytes)
+        self.check(nbytes, label)
+        self.held_bytes += nbytes
+        self.peak_held_bytes = max(self.peak_held_bytes, self.held_bytes)
+        logging.debug("Job %s memory: +%s bytes for %s (%s held)", self.job_id, nbytes, label, self.held_bytes)
+        return nbytes
+
+    def require_frame(self, frame: pd.DataFrame, label: str, columns: Optional[Sequence[str]] = None) -> int:
+        return self.require(frame_bytes(frame, columns), label)
+
+    def to_dict(self) -> dict:
+        return {
+            "limit_bytes": self.limit_bytes,
+            "held_bytes": self.held_bytes,
+            "peak_held_bytes": self.peak_held_bytes,
+        }
@@ -0,0 +1,327 @@
+"""Multivariate outlier detection for the remove-outliers step.
+
+Per-column IQR/z-score bounds miss rows that are unusual only in combination. The
+methods here score whole rows on the target columns:
+
+- **isolation_forest**: ``IsolationForest`` path lengths,
+- **mcd**: robust Mahalanobis distance from a ``MinCovDet`` location/covariance,
+- **lof**: ``LocalOutlierFactor`` in novelty mode, so every row's neighbours are
+  looked up among the sampled rows only.
+
+Detectors are fitted on at most ``sample_size`` rows (standardized by the sample's
+median and IQR) and then score any number of rows in ``batch_rows`` batches, so cost
+stays linear in the data and memory bounded per batch. A fitted :class:`OutlierDetector`
+gets a random ``detector_id``; passing that id back in the step config reapplies
+exactly the same cut-off without refitting. Only ids are accepted, never paths.
+
+Fitting writes nothing to disk. The process keeps its last few fitted detectors in
+memory (``OUTLIER_UNSAVED_DETECTORS``); a preprocessing run stages its detector as a
+sidecar of the staged cleaned dataset, so it lives and dies with that artifact, and
+only saving the dataset stores it: uploaded to the cleaned-data bucket and kept in
+``OUTLIER_DETECTOR_DIR``, where ids are resolved (and detectors saved on another host
+are fetched into). Previews, discarded and failed runs leave nothing behind. Null
+cells are scored at the column's sample median, so incomplete rows are judged on
+their observed values.
+"""
+import logging
+import os
+import re
+import tempfile
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+from sklearn.covariance import MinCovDet
+from sklearn.ensemble import IsolationForest
+from sklearn.neighbors import LocalOutlierFactor
+
+from backend.config import CLEANED_BUCKET, minio_client
+from backend.services import cpu_budget
+
+MULTIVARIATE_METHODS = {"isolation_forest": "Isolation Forest", "mcd": "Robust Mahalanobis (MCD)", "lof": "Local Outlier Factor"}
+METHOD_ALIASES = {"iforest": "isolation_forest", "mahalanobis": "mcd", "robust_mahalanobis": "mcd"}
+OUTLIER_SAMPLE_ROWS = int(os.getenv("OUTLIER_SAMPLE_ROWS", "50000"))
+OUTLIER_SCORE_BATCH_ROWS = int(os.getenv("OUTLIER_SCORE_BATCH_ROWS", "100000"))
+# Fitted detectors kept in memory until their run's dataset is staged
+OUTLIER_UNSAVED_DETECTORS = int(os.getenv("OUTLIER_UNSAVED_DETECTORS", "8"))
+OUTLIER_DETECTOR_DIR = os.getenv("OUTLIER_DETECTOR_DIR", os.path.join(tempfile.gettempdir(), "outlier-detectors"))
+# Saved detectors live in the cleaned-data bucket under this prefix, keyed by id
+DETECTOR_OBJECT_PREFIX = "outlier-detectors/"
+# Staged next to a cleaned dataset; holds the detector the run fitted
+STAGED_DETECTOR_SUFFIX = ".outlier-detector"
+DETECTOR_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+DEFAULT_CONTAMINATION = 0.01
+# Chi-square quantile of the squared robust distance used as the MCD cut-off
+DEFAULT_MCD_QUANTILE = 0.975
+# Fewer rows than this give no meaningful neighbourhood or covariance
+MIN_FIT_ROWS = 10
+
+_unsaved: "OrderedDict[str, OutlierDetector]" = OrderedDict()
+_unsaved_lock = Lock()
+
+
+def canonical_method(method: Optional[str]) -> str:
+    method = (method or "").lower()
+    return METHOD_ALIASES.get(method, method)
+
+
+def is_multivariate(method: Optional[str]) -> bool:
+    return canonical_method(method) in MULTIVARIATE_METHODS
+
+
+@dataclass
+class OutlierDetector:
+    """A fitted row scorer: higher scores are more normal, rows below ``threshold`` are outliers."""
+
+    method: str
+    columns: List[str]
+    center: np.ndarray
+    scale: np.ndarray
+    estimator: Any
+    threshold: float
+    sample_rows: int
+    batch_rows: int = OUTLIER_SCORE_BATCH_ROWS
+    detector_id: Optional[str] = None
+
+    def _matrix(self, frame: pd.DataFrame) -> np.ndarray:
+        values = frame[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        values = (values - self.center) / self.scale
+        # Nulls sit at the (standardized) median
+        return np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def _score_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        if self.method == "mcd":
+            return -self.estimator.mahalanobis(matrix)
+        return self.estimator.score_samples(matrix)
+
+    def score(self, frame: pd.DataFrame) -> np.ndarray:
+        """Row scores for ``frame``, computed ``batch_rows`` at a time."""
+        scores = np.empty(len(frame), dtype=float)
+        for start in range(0, len(frame), self.batch_rows):
+            batch = frame.iloc[start:start + self.batch_rows]
+            scores[start:start + len(batch)] = self._score_matrix(self._matrix(batch))
+        return scores
+
+    def keep_mask(self, frame: pd.DataFrame) -> pd.Series:
+        if frame.empty:
+            return pd.Series(True, index=frame.index)
+        return pd.Series(self.score(frame) >= self.threshold, index=frame.index)
+
+    def remember(self) -> str:
+        """Give the detector a new id and keep it in memory until its dataset is staged."""
+        self.detector_id = uuid.uuid4().hex
+        with _unsaved_lock:
+            _unsaved[self.detector_id] = self
+            while len(_unsaved) > OUTLIER_UNSAVED_DETECTORS:
+                _unsaved.popitem(last=False)
+        return self.detector_id
+
+    def describe(self) -> Dict[str, Any]:
+        """JSON-safe summary for the step's change metadata."""
+        return {
+            "method": self.method,
+            "columns": list(self.columns),
+            "threshold": float(self.threshold),
+            "sample_rows": int(self.sample_rows),
+            "detector_id": self.detector_id,
+        }
+
+
+def detector_path(detector_id: Any) -> str:
+    """Local path of ``detector_id`` inside ``OUTLIER_DETECTOR_DIR``; anything but an id is rejected."""
+    if not isinstance(detector_id, str) or not DETECTOR_ID_PATTERN.fullmatch(detector_id):
+        raise ValueError("detector_id must be the id of a saved outlier detector")
+    root = os.path.realpath(OUTLIER_DETECTOR_DIR)
+    path = os.path.realpath(os.path.join(root, f"{detector_id}.joblib"))
+    # A symlink planted in the store must not lead anywhere else
+    if os.path.dirname(path) != root:
+        raise ValueError(f"Outlier detector {detector_id} resolves outside the detector store")
+    return path
+
+
+def detector_object_name(detector_id: str) -> str:
+    return f"{DETECTOR_OBJECT_PREFIX}{detector_id}.joblib"
+
+
+def _fetch_detector(detector_id: str, path: str) -> None:
+    """Download a detector saved by another host into the local store."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.{uuid.uuid4().hex}.part"
+    try:
+        minio_client.fget_object(CLEANED_BUCKET, detector_object_name(detector_id), partial)
+    except Exception as exc:  # noqa: BLE001
+        raise ValueError(f"Outlier detector {detector_id} was not found") from exc
+    os.replace(partial, path)
+
+
+def load_detector(detector_id: str) -> OutlierDetector:
+    path = detector_path(detector_id)
+    with _unsaved_lock:
+        fitted = _unsaved.get(detector_id)
+    if fitted is not None:
+        return fitted
+    if not os.path.exists(path):
+        _fetch_detector(detector_id, path)
+    detector = joblib.load(path)
+    if not isinstance(detector, OutlierDetector):
+        raise ValueError(f"Outlier detector {detector_id} is not a saved detector")
+    detector.detector_id = detector_id
+    return detector
+
+
+def staged_detector_path(dataset_path: str) -> str:
+    return f"{os.path.splitext(dataset_path)[0]}{STAGED_DETECTOR_SUFFIX}"
+
+
+def stage_detector(change_metadata: Sequence[Any], dataset_path: str) -> Optional[str]:
+    """Write the detector the run fitted next to its staged dataset, if any."""
+    for entry in change_metadata:
+        detector_id = entry.get("detector", {}).get("detector_id") if isinstance(entry, dict) else None
+        if not detector_id:
+            continue
+        with _unsaved_lock:
+            detector = _unsaved.get(detector_id)
+        if detector is None:
+            # Reapplied from the store, or evicted by newer fits before staging
+            return None
+        joblib.dump(detector, staged_detector_path(dataset_path))
+        return detector_id
+    return None
+
+
+def publish_staged_detector(dataset_path: str) -> Optional[str]:
+    """Store the detector staged next to ``dataset_path`` so every host can load it by id."""
+    staged = staged_detector_path(dataset_path)
+    if not os.path.exists(staged):
+        return None
+    detector = joblib.load(staged)
+    if not isinstance(detector, OutlierDetector):
+        logging.warning("Ignoring staged outlier detector %s: not a detector", staged)
+        os.unlink(staged)
+        return None
+    path = detector_path(detector.detector_id)
+    minio_client.fput_object(CLEANED_BUCKET, detector_object_name(detector.detector_id), staged, content_type="application/octet-stream")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(staged, path)
+    return detector.detector_id
+
+
+def _standardization(sample: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    center = np.nanmedian(sample, axis=0)
+    q75, q25 = np.nanpercentile(sample, [75, 25], axis=0)
+    scale = q75 - q25
+    fallback = np.nanstd(sample, axis=0)
+    scale = np.where(scale > 0, scale, np.where(fallback > 0, fallback, 1.0))
+    return np.nan_to_num(center, nan=0.0), np.nan_to_num(scale, nan=1.0)
+
+
+def fit_detector(
+    sample: pd.DataFrame,
+    columns: Sequence[str],
+    method: str,
+    config: Optional[Dict[str, Any]] = None,
+) -> OutlierDetector:
+    """Fit ``method`` on ``sample`` (already bounded; see :func:`sample_rows`)."""
+    config = config or {}
+    method = canonical_method(method)
+    columns = list(columns)
+    seed = int(config.get("random_state", 42))
+    raw = sample[columns].to_numpy(dtype=float, na_value=np.nan)
+    center, scale = _standardization(raw)
+    matrix = np.nan_to_num((raw - center) / scale, nan=0.0, posinf=0.0, neginf=0.0)
+    contamination = float(config.get("contamination", DEFAULT_CONTAMINATION))
+
+    if method == "isolation_forest":
+        estimator = IsolationForest(
+            n_estimators=int(config.get("n_estimators", 100)),
+            random_state=seed,
+            n_jobs=cpu_budget.current_quota(),
+        ).fit(matrix)
+    elif method == "lof":
+        n_neighbors = max(1, min(int(config.get("n_neighbors", 20)), len(matrix) - 1))
+        estimator = LocalOutlierFactor(n_neighbors=n_neighbors, novelty=True, n_jobs=cpu_budget.current_quota()).fit(matrix)
+    elif method == "mcd":
+        estimator = MinCovDet(random_state=seed).fit(matrix)
+    else:
+        raise ValueError(f"Unsupported multivariate outlier method '{method}'")
+
+    detector = OutlierDetector(method, columns, center, scale, estimator, threshold=0.0, sample_rows=len(matrix))
+    if method == "mcd" and "contamination" not in config:
+        quantile = float(config.get("quantile", DEFAULT_MCD_QUANTILE))
+        detector.threshold = -float(chi2.ppf(quantile, df=len(columns)))
+    else:
+        # LOF scores of the fitted rows must exclude each row from its own neighbourhood
+        sample_scores = estimator.negative_outlier_factor_ if method == "lof" else detector._score_matrix(matrix)
+        detector.threshold = float(np.quantile(sample_scores, contamination))
+    return detector
+
+
+def sample_rows(frame: pd.DataFrame, sample_size: Optional[int] = None, seed: int = 42) -> pd.DataFrame:
+    sample_size = sample_size or OUTLIER_SAMPLE_ROWS
+    if len(frame) <= sample_size:
+        return frame
+    return frame.sample(n=sample_size, random_state=seed)
+
+
+class RowReservoir:
+    """Uniform bounded sample of rows seen across batches (bottom-k random keys)."""
+
+    def __init__(self, columns: Sequence[str], size: Optional[int] = None, seed: int = 42):
+        self.columns = list(columns)
+        self.size = size or OUTLIER_SAMPLE_ROWS
+        self._rng = np.random.default_rng(seed)
+        self._keys = np.empty(0)
+        self._rows = np.empty((0, len(self.columns)))
+
+    def update(self, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        keys = np.concatenate([self._keys, self._rng.random(len(frame))])
+        rows = np.vstack([self._rows, frame[self.columns].to_numpy(dtype=float, na_value=np.nan)])
+        if len(keys) > self.size:
+            keep = np.argpartition(keys, self.size - 1)[: self.size]
+            keys, rows = keys[keep], rows[keep]
+        self._keys, self._rows = keys, rows
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self._rows, columns=self.columns)
+
+
+def resolve_detector(
+    sample: pd.DataFrame,
+    columns: Sequence[str],
+    config: Dict[str, Any],
+) -> OutlierDetector:
+    """The detector named by ``config["detector_id"]``, or a new one fitted on ``sample``."""
+    if "detector_path" in config:
+        raise ValueError("detector_path is not accepted; pass the detector_id of a saved detector")
+    if config.get("detector_id"):
+        return load_detector(config["detector_id"])
+    detector = fit_detector(sample, columns, config.get("method"), config)
+    detector.batch_rows = int(config.get("batch_rows", OUTLIER_SCORE_BATCH_ROWS))
+    detector.remember()
+    return detector
+
+
+def build_meta(detector: OutlierDetector, rows_removed: int) -> Dict[str, Any]:
+    return {
+        "operation": "Remove Outliers",
+        "method": MULTIVARIATE_METHODS[detector.method],
+        "columns": list(detector.columns),
+        "rows_removed": int(rows_removed),
+        "detector": detector.describe(),
+    }
+
+
+def build_keep_mask(df: pd.DataFrame, columns: Sequence[str], config: Dict[str, Any]) -> Tuple[pd.Series, Dict[str, Any]]:
+    """Fit (or load) the configured detector on a sample of ``df`` and score every row."""
+    sample = sample_rows(df[list(columns)], config.get("sample_size"), int(config.get("random_state", 42)))
+    detector = resolve_detector(sample, columns, config)
+    mask = detector.keep_mask(df)
+    return mask, build_meta(detector, int((~mask).sum()))
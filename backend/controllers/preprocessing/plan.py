@@ -0,0 +1,224 @@
+"""Compile the preprocessing ``steps`` payload into a single fused execution plan.
+
+The sequential pipeline (dedup -> remove nulls -> fill -> drop -> outliers) copies the
+whole frame at almost every step. The plan keeps the same semantics but:
+
+- pushes column drops first, so nothing downstream carries dropped columns
+  (filters that need a dropped column still read it from the source frame),
+- merges duplicate, null and outlier filters into one boolean mask,
+- resolves fill values against the masked rows,
+- copies data at most twice: the masked projection (skipped when no row is filtered,
+  copy-on-write then shares the source columns) and the fill of the filled columns.
+  ``materializations`` reports how many of those copies a run made.
+"""
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from . import fill_nulls, remove_duplicates, remove_nulls, remove_outliers
+from .dtype_optimizer import with_fill_categories
+
+ProgressCallback = Callable[[float, str], None]
+
+DEFAULT_OUTLIER_CONFIG = {"method": "iqr", "factor": 1.5, "columns": []}
+
+
+@dataclass
+class PreprocessingPlan:
+    """Logical plan for one preprocessing run, exposed in the job result as-is."""
+
+    source_columns: List[str]
+    projection: List[str]
+    dropped_columns: List[str] = field(default_factory=list)
+    filters: List[Dict[str, Any]] = field(default_factory=list)
+    fills: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    pruned_fills: List[str] = field(default_factory=list)
+    outliers: Optional[Dict[str, Any]] = None
+    # Copying passes over the output rows, set when the plan runs
+    materializations: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        plan = asdict(self)
+        plan.pop("source_columns")
+        plan["fills"] = {col: {"strategy": spec.get("strategy"), "value": spec.get("value")} for col, spec in self.fills.items()}
+        return plan
+
+
+def compile_plan(steps: Optional[dict], columns: Sequence[str]) -> PreprocessingPlan:
+    """Turn the frontend ``steps`` dict into a :class:`PreprocessingPlan` for ``columns``."""
+    steps = steps or {}
+    source_columns = list(columns)
+    available = set(source_columns)
+
+    dropped: List[str] = []
+    if steps.get("dropColumns"):
+        dropped = [c for c in steps.get("dropColumns", []) if c in available]
+    projection = [c for c in source_columns if c not in set(dropped)]
+
+    filters: List[Dict[str, Any]] = []
+    if steps.get("removeDuplicates"):
+        subset = [c for c in (steps.get("duplicateSubset") or []) if c in available]
+        filters.append({"type": "duplicates", "columns": subset})
+    if steps.get("removeNulls"):
+        null_columns = [c for c in (steps.get("removeNullsColumns") or []) if c in available]
+        filters.append({"type": "nulls", "columns": null_columns})
+
+    fills: Dict[str, Dict[str, Any]] = {}
+    pruned: List[str] = []
+    if steps.get("fillNulls"):
+        for col, spec in (steps.get("fillStrategies") or {}).items():
+            if col not in available:
+                continue
+            if col in dropped:
+                # Filling a column that is dropped afterwards has no visible effect
+                pruned.append(col)
+                continue
+            fills[col] = dict(spec or {})
+
+    outliers = None
+    if steps.get("removeOutliers"):
+        outliers = dict(steps.get("removeOutliersConfig") or DEFAULT_OUTLIER_CONFIG)
+        filters.append({"type": "outliers", "method": (outliers.get("method") or "iqr").lower()})
+
+    return PreprocessingPlan(
+        source_columns=source_columns,
+        projection=projection,
+        dropped_columns=dropped,
+        filters=filters,
+        fills=fills,
+        pruned_fills=pruned,
+        outliers=outliers,
+    )
+
+
+def _combine(mask: Optional[pd.Series], step_mask: pd.Series) -> Tuple[pd.Series, int]:
+    """AND ``step_mask`` into ``mask`` and return how many surviving rows it removed."""
+    if mask is None:
+        return step_mask, int((~step_mask).sum())
+    removed = int((mask & ~step_mask).sum())
+    return mask & step_mask, removed
+
+
+class _NullSpan:
+    def set_output(self, *args, **kwargs) -> None:
+        pass
+
+
+@contextmanager
+def _step_span(tracer, step: str, rows: int, columns: int) -> Iterator[Any]:
+    """``tracer.span`` when a tracer is attached, a no-op span otherwise."""
+    if tracer is None:
+        yield _NullSpan()
+        return
+    with tracer.span(step, rows=rows, columns=columns) as span:
+        yield span
+
+
+def _attach_trace(meta: Any, tracer) -> None:
+    if tracer is not None and isinstance(meta, dict) and tracer.last is not None:
+        meta["trace"] = tracer.last.to_dict()
+
+
+def execute_plan(
+    df: pd.DataFrame,
+    plan: PreprocessingPlan,
+    on_progress: Optional[ProgressCallback] = None,
+    tracer: Optional[Any] = None,
+) -> Tuple[pd.DataFrame, List[Any]]:
+    """Run ``plan`` against ``df`` and return ``(cleaned_df, change_metadata)``.
+
+    ``df`` is never modified; the masked projection and the fill pass are the only copies.
+    Change metadata is reported in the same order and shape as the sequential pipeline.
+    With a ``tracer`` (``services.tracing.Tracer``) every stage is traced and the
+    trace is attached to its change-metadata entry under ``"trace"``.
+    """
+    def _progress(value: float, message: str) -> None:
+        if on_progress is not None:
+            on_progress(value, message)
+
+    def _rows() -> int:
+        return len(df) if row_mask is None else int(row_mask.sum())
+
+    change_metadata: List[Any] = []
+    row_mask: Optional[pd.Series] = None
+    width = len(plan.source_columns)
+
+    for spec in plan.filters:
+        if spec["type"] == "duplicates":
+            _progress(25, "Removing duplicate rows")
+            with _step_span(tracer, "remove_duplicates", _rows(), width) as span:
+                row_mask, removed = _combine(row_mask, remove_duplicates.keep_mask(df, spec["columns"]))
+                span.set_output(rows=_rows(), columns=width)
+            meta = {
+                "operation": "Remove Duplicates",
+                "rows_removed": removed,
+                "columns": spec["columns"] or "all",
+            }
+        elif spec["type"] == "nulls":
+            _progress(35, "Removing rows with null values")
+            with _step_span(tracer, "remove_nulls", _rows(), width) as span:
+                row_mask, removed = _combine(row_mask, remove_nulls.keep_mask(df, spec["columns"]))
+                span.set_output(rows=_rows(), columns=width)
+            meta = {
+                "operation": "Remove Nulls",
+                "rows_removed": removed,
+                "columns": spec["columns"] or "all",
+            }
+        else:
+            continue
+        _attach_trace(meta, tracer)
+        change_metadata.append(meta)
+
+    fill_values: Dict[str, Any] = {}
+    if plan.fills:
+        _progress(45, "Resolving fill values")
+        with _step_span(tracer, "fill_nulls", _rows(), len(plan.fills)) as span:
+            resolved = fill_nulls.resolve_fill_values(df, plan.fills, row_mask)
+            span.set_output(rows=_rows(), columns=len(resolved))
+        for col in plan.fills:
+            meta = resolved.get(col)
+            if meta is None:
+                continue
+            plan.fills[col]["value"] = meta["value"]
+            # One trace covers all fill columns; it is attached to each of their entries
+            _attach_trace(meta, tracer)
+            change_metadata.append(meta)
+            if meta["value"] is not None:
+                fill_values[col] = meta["value"]
+
+    if plan.dropped_columns:
+        change_metadata.append({"operation": "Drop Columns", "columns_dropped": list(plan.dropped_columns)})
+
+    if plan.outliers is not None:
+        _progress(65, "Handling statistical outliers")
+        # Only dtypes matter here; a zero-row slice avoids copying the projected columns
+        target_cols = remove_outliers.resolve_target_columns(df.iloc[:0][plan.projection], plan.outliers)
+        with _step_span(tracer, "remove_outliers", _rows(), len(target_cols)) as span:
+            # Outlier statistics see the same values the sequential pipeline would:
+            # rows that survived earlier filters, with fills already applied.
+            stats_frame = df.loc[row_mask, target_cols] if row_mask is not None else df[target_cols]
+            stats_fills = {col: fill_values[col] for col in target_cols if col in fill_values}
+            if stats_fills:
+                stats_frame = stats_frame.fillna(stats_fills)
+            outlier_mask, meta = remove_outliers.build_keep_mask(stats_frame, plan.outliers)
+            if outlier_mask is not None:
+                outlier_mask = outlier_mask.reindex(df.index, fill_value=False)
+                row_mask = outlier_mask if row_mask is None else row_mask & outlier_mask
+            span.set_output(rows=_rows(), columns=len(target_cols))
+        if "summary" in meta:
+            change_metadata.extend(meta["summary"])
+        else:
+            _attach_trace(meta, tracer)
+            change_metadata.append(meta)
+
+    _progress(70, "Materializing cleaned dataset")
+    with _step_span(tracer, "materialize", _rows(), width) as span:
+        # No defensive copy: with copy-on-write only the filled columns are materialised
+        cleaned = df.loc[:, plan.projection] if row_mask is None else df.loc[row_mask, plan.projection]
+        if fill_values:
+            cleaned = with_fill_categories(cleaned, fill_values).fillna(value=fill_values)
+        plan.materializations = int(row_mask is not None) + int(bool(fill_values))
+        span.set_output(cleaned)
+    return cleaned, change_metadata
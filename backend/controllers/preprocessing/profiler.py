@@ -0,0 +1,182 @@
+"""Single-pass column profiling shared by quality reports and recommendations.
+
+``analyze_data_quality``, the preprocessing suggestions and the feature-engineering
+analysis all need the same per-column facts (nulls, cardinality, numeric summary,
+IQR outliers). :class:`ColumnProfiler` computes them once per frame - the null matrix
+in one vectorized call, per-column aggregates in parallel across columns - and the
+resulting :class:`DatasetProfile` is passed around instead of rescanning the frame.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from backend.services import cpu_budget
+from .dtype_optimizer import is_text_dtype
+from .row_hashing import count_duplicate_rows
+from .sketches import iqr_bounds, sketch_series
+
+TOP_VALUES_LIMIT = 10
+
+
+@dataclass
+class ColumnProfile:
+    name: str
+    dtype: str
+    total_rows: int
+    missing_count: int
+    unique_count: int
+    is_numeric: bool
+    is_bool: bool
+    is_datetime: bool
+    is_object: bool
+    is_category: bool
+    sample_value: Any = None
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    mean_value: Optional[float] = None
+    std_value: Optional[float] = None
+    skew: Optional[float] = None
+    q1: Optional[float] = None
+    q3: Optional[float] = None
+    lower_bound: Optional[float] = None
+    upper_bound: Optional[float] = None
+    outlier_count: int = 0
+    top_values: List[Any] = field(default_factory=list)
+
+    @property
+    def missing_percentage(self) -> float:
+        return (self.missing_count / self.total_rows) * 100 if self.total_rows > 0 else 0.0
+
+    @property
+    def outlier_percentage(self) -> float:
+        return (self.outlier_count / self.total_rows) * 100 if self.total_rows > 0 else 0.0
+
+    @property
+    def unique_share(self) -> float:
+        return self.unique_count / self.total_rows if self.total_rows > 0 else 0.0
+
+    @property
+    def has_outlier_stats(self) -> bool:
+        return self.lower_bound is not None
+
+
+@dataclass
+class DatasetProfile:
+    total_rows: int
+    columns: Dict[str, ColumnProfile]
+    rows_with_any_null: int = 0
+    duplicate_rows: Optional[int] = None
+
+    def __getitem__(self, column: str) -> ColumnProfile:
+        return self.columns[column]
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.columns)
+
+    def numeric_columns(self) -> List[str]:
+        return [name for name, col in self.columns.items() if col.is_numeric and not col.is_bool]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_rows": self.total_rows,
+            "rows_with_any_null": self.rows_with_any_null,
+            "duplicate_rows": self.duplicate_rows,
+            "columns": {name: asdict(col) for name, col in self.columns.items()},
+        }
+
+
+def _float_or_none(value: Any) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(value) else value
+
+
+class ColumnProfiler:
+    """Computes a :class:`DatasetProfile` for a frame in one pass over its columns.
+
+    ``max_workers`` bounds the column thread pool (``1`` profiles serially);
+    ``include_duplicates`` adds a fingerprint-based duplicate-row count.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, include_duplicates: bool = True):
+        self.max_workers = max_workers
+        self.include_duplicates = include_duplicates
+
+    def profile(self, df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> DatasetProfile:
+        columns = list(columns) if columns is not None else list(df.columns)
+        total_rows = len(df)
+        frame = df[columns] if len(columns) != len(df.columns) else df
+
+        null_matrix = frame.isna()
+        missing_counts = null_matrix.sum()
+        rows_with_any_null = int(null_matrix.any(axis=1).sum()) if total_rows > 0 else 0
+        del null_matrix
+
+        def _profile(col: str) -> ColumnProfile:
+            return self._profile_column(frame[col], col, total_rows, int(missing_counts[col]))
+
+        profiles: Dict[str, ColumnProfile] = {}
+        if columns:
+            max_workers = self.max_workers or min(len(columns), cpu_budget.current_quota())
+            if max_workers <= 1:
+                results = [_profile(col) for col in columns]
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(_profile, columns))
+            profiles = {profile.name: profile for profile in results}
+
+        duplicate_rows = None
+        if self.include_duplicates:
+            duplicate_rows = count_duplicate_rows(frame) if total_rows > 0 else 0
+        return DatasetProfile(
+            total_rows=total_rows,
+            columns=profiles,
+            rows_with_any_null=rows_with_any_null,
+            duplicate_rows=duplicate_rows,
+        )
+
+    @staticmethod
+    def _profile_column(series: pd.Series, name: str, total_rows: int, missing_count: int) -> ColumnProfile:
+        dtype = series.dtype
+        is_bool = ptypes.is_bool_dtype(dtype)
+        profile = ColumnProfile(
+            name=name,
+            dtype=str(dtype),
+            total_rows=total_rows,
+            missing_count=missing_count,
+            unique_count=int(series.nunique(dropna=True)),
+            is_numeric=bool(ptypes.is_numeric_dtype(dtype)),
+            is_bool=bool(is_bool),
+            is_datetime=bool(ptypes.is_datetime64_any_dtype(dtype)),
+            is_object=is_text_dtype(dtype),
+            is_category=isinstance(dtype, pd.CategoricalDtype),
+        )
+
+        non_null = series.dropna() if missing_count else series
+        if non_null.empty:
+            return profile
+        profile.sample_value = non_null.iloc[0]
+
+        if profile.is_numeric:
+            values = non_null.astype(float) if is_bool else non_null
+            profile.min_value = _float_or_none(values.min())
+            profile.max_value = _float_or_none(values.max())
+            profile.mean_value = _float_or_none(values.mean())
+            profile.std_value = _float_or_none(values.std())
+            if not is_bool:
+                profile.skew = _float_or_none(values.skew())
+                sketch = sketch_series(values)
+                profile.q1, profile.q3 = (float(q) for q in sketch.quantiles([0.25, 0.75]))
+                profile.lower_bound, profile.upper_bound = iqr_bounds(sketch)
+                profile.outlier_count = int(((values < profile.lower_bound) | (values > profile.upper_bound)).sum())
+        else:
+            profile.top_values = non_null.unique()[:TOP_VALUES_LIMIT].tolist()
+        return profile
+
@@ -1,44 +1,38 @@
 import logging
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
 from .io_utils import standardize_missing_indicators
+from .profiler import ColumnProfile, ColumnProfiler, DatasetProfile
 
 
-def _missing_stats(df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
-    if len(df) == 0:
+def _missing_stats(profile: DatasetProfile) -> Dict[str, Dict[str, float]]:
+    if profile.total_rows == 0:
         return {}
-    pct = (df.isna().sum() / len(df)) * 100
     return {
-        col: {"count": int(df[col].isna().sum()), "percentage": float(pct[col])}
-        for col in df.columns
-        if df[col].isna().any()
+        name: {"count": col.missing_count, "percentage": float(col.missing_percentage)}
+        for name, col in profile.columns.items()
+        if col.missing_count > 0
     }
 
 
-def _outlier_percentage(series: pd.Series) -> float:
-    if series.dropna().empty:
-        return 0.0
-    q1 = series.quantile(0.25)
-    q3 = series.quantile(0.75)
-    iqr = q3 - q1
-    lower = q1 - 1.5 * iqr
-    upper = q3 + 1.5 * iqr
-    mask = (series < lower) | (series > upper)
-    return float(mask.sum() / max(len(series), 1) * 100.0)
-
-
-def _near_constant(series: pd.Series, total_rows: int) -> bool:
+def _near_constant(col: ColumnProfile) -> bool:
     # near-constant if unique share <= 1%
-    try:
-        uniques = series.nunique(dropna=True)
-    except Exception:
-        return False
-    if total_rows <= 0:
+    if col.total_rows <= 0:
         return False
-    return (uniques / total_rows) <= 0.01
+    return col.unique_share <= 0.01
+
+
+def column_recommendation(col: ColumnProfile) -> Tuple[bool, bool, bool]:
+    """``(drop, fill, remove_outliers)`` as :func:`build_preprocessing_suggestions` decides them for ``col``.
+
+    Sampled profiling only rescans in full when a confidence interval changes this.
+    """
+    drop = col.missing_percentage >= 80.0 or _near_constant(col)
+    outliers = col.is_numeric and not col.is_bool and col.outlier_percentage > 5.0
+    return drop, col.missing_count > 0 and not drop, outliers
 
 
 def _infer_fill_strategy(col_name: str, dtype: str, sample_value, null_count: int) -> Tuple[str, str]:
@@ -64,47 +58,44 @@ def _infer_fill_strategy(col_name: str, dtype: str, sample_value, null_count: in
     return "mode", "Categorical/text is safest with the most frequent entry"
 
 
-def build_preprocessing_suggestions(df: pd.DataFrame) -> Dict[str, Any]:
-    df = standardize_missing_indicators(df)
+def build_preprocessing_suggestions(df: pd.DataFrame, profile: Optional[DatasetProfile] = None) -> Dict[str, Any]:
+    """Suggest preprocessing steps; pass ``profile`` of the standardized frame to skip profiling."""
+    if profile is None:
+        df = standardize_missing_indicators(df)
+        profile = ColumnProfiler().profile(df)
 
-    total_rows = len(df)
-    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    total_rows = profile.total_rows
+    columns = profile.column_names
 
-    missing = _missing_stats(df)
-    duplicate_rows = int(df.duplicated().sum())
+    missing = _missing_stats(profile)
+    duplicate_rows = int(profile.duplicate_rows or 0)
 
     outlier_details: Dict[str, Dict[str, float]] = {}
-    for col in numeric_cols:
-        try:
-            pct = _outlier_percentage(df[col].astype(float))
-        except Exception:
-            pct = 0.0
+    for col in profile.numeric_columns():
+        pct = profile[col].outlier_percentage
         if pct > 0:
             outlier_details[col] = {"percentage": pct}
 
     drop_candidates: List[str] = []
     drop_detail: Dict[str, Dict[str, str]] = {}
-    for col in df.columns:
+    for col in columns:
         miss_pct = missing.get(col, {}).get("percentage", 0.0)
         if miss_pct >= 80.0:
             drop_candidates.append(col)
             drop_detail[col] = {"reason": f"{miss_pct:.1f}% missing"}
             continue
-        if _near_constant(df[col], total_rows):
+        if _near_constant(profile[col]):
             drop_candidates.append(col)
             drop_detail[col] = {"reason": "Near-constant (<=1% unique)"}
 
     # Determine when removeNulls is cheaper than fillNulls
-    rows_with_any_null = int(df.isna().any(axis=1).sum()) if total_rows > 0 else 0
+    rows_with_any_null = profile.rows_with_any_null
     small_row_impact = total_rows > 0 and (rows_with_any_null / total_rows) <= 0.03
 
-    fill_columns = [c for c in df.columns if missing.get(c, {"count": 0})["count"] > 0 and c not in drop_candidates]
+    fill_columns = [c for c in columns if missing.get(c, {"count": 0})["count"] > 0 and c not in drop_candidates]
     strategies: Dict[str, Dict[str, str]] = {}
     for col in fill_columns:
-        dtype = str(df[col].dtype)
-        non_null = df[col].dropna()
-        sample_val = non_null.iloc[0] if not non_null.empty else None
-        strat, reason = _infer_fill_strategy(col, dtype, sample_val, missing.get(col, {}).get("count", 0))
+        strat, reason = _infer_fill_strategy(col, profile[col].dtype, profile[col].sample_value, missing.get(col, {}).get("count", 0))
         strategies[col] = {"strategy": strat, "reason": reason, "value": ""}
 
     # Outlier suggestion
@@ -146,11 +137,11 @@ def build_preprocessing_suggestions(df: pd.DataFrame) -> Dict[str, Any]:
 
     quality_summary = {
         "total_rows": total_rows,
-        "total_columns": len(df.columns),
+        "total_columns": len(columns),
         "missing_data": missing,
         "duplicate_rows": duplicate_rows,
         "outliers": outlier_details,
-        "data_types": {c: str(df[c].dtype) for c in df.columns},
+        "data_types": {c: profile[c].dtype for c in columns},
     }
 
     return {"suggestions": suggestions, "quality_summary": quality_summary}
@@ -1,10 +1,17 @@
 from typing import List, Tuple, Dict
 import pandas as pd
 
+from .row_hashing import duplicate_mask
+
+
+def keep_mask(df: pd.DataFrame, subset: List[str] | None) -> pd.Series:
+    """Boolean mask of rows ``drop_duplicates(keep="first")`` would keep."""
+    return pd.Series(~duplicate_mask(df, subset or None), index=df.index)
+
 
 def apply(df: pd.DataFrame, subset: List[str] | None) -> Tuple[pd.DataFrame, Dict]:
     before = len(df)
-    df2 = df.drop_duplicates(subset=subset or None, keep="first")
+    df2 = df[keep_mask(df, subset)]
     removed = before - len(df2)
     meta = {
         "operation": "Remove Duplicates",
@@ -12,5 +19,3 @@ def apply(df: pd.DataFrame, subset: List[str] | None) -> Tuple[pd.DataFrame, Dic
         "columns": subset or "all",
     }
     return df2, meta
-
-
@@ -2,6 +2,12 @@ from typing import List, Tuple, Dict
 import pandas as pd
 
 
+def keep_mask(df: pd.DataFrame, columns: List[str] | None) -> pd.Series:
+    """Boolean mask of rows ``dropna(subset=columns)`` would keep."""
+    frame = df[columns] if columns else df
+    return frame.notna().all(axis=1)
+
+
 def apply(df: pd.DataFrame, columns: List[str] | None) -> Tuple[pd.DataFrame, Dict]:
     before = len(df)
     if columns:
@@ -16,4 +22,3 @@ def apply(df: pd.DataFrame, columns: List[str] | None) -> Tuple[pd.DataFrame, Di
     }
     return df2, meta
 
-
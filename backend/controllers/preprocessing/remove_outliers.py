@@ -1,95 +1,141 @@
-import os
-from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from . import multivariate_outliers
+from .column_executor import map_columns
+from .sketches import QuantileSketch, iqr_bounds
+
 
 def _iqr_bounds(series: pd.Series, factor: float) -> Tuple[float, float]:
-    q1 = series.quantile(0.25)
-    q3 = series.quantile(0.75)
-    iqr = q3 - q1
-    lower = q1 - factor * iqr
-    upper = q3 + factor * iqr
-    return lower, upper
+    return iqr_bounds(series, factor)
 
 
-def apply(df: pd.DataFrame, config: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    """
-    Remove outliers from numeric columns.
+def bounds_from_sketch(sketch: QuantileSketch, method: str, factor: float) -> Dict[str, Any]:
+    """Bounds for one column from its quantile sketch, shaped like ``meta["bounds"][col]``.
 
-    config = {
-      "columns": Optional[List[str]],  # default: all numeric columns
-      "method": "iqr",                # currently only IQR supported
-      "factor": float                  # IQR factor, default 1.5
-    }
+    Used when the column was summarised outside a single frame (e.g. across row groups).
     """
-    method = (config or {}).get("method", "iqr").lower()
-    factor = float((config or {}).get("factor", 1.5))
+    if method == "iqr":
+        if sketch.count == 0:
+            return {"lower": float("nan"), "upper": float("nan")}
+        lower, upper = iqr_bounds(sketch, factor)
+        return {"lower": lower, "upper": upper}
+    if method == "zscore":
+        mu = sketch.mean if sketch.count else float("nan")
+        sigma = sketch.std(ddof=0)
+        if sigma == 0 or np.isnan(sigma):
+            return {"z_threshold": float(factor), "mean": mu if not np.isnan(mu) else 0.0, "std": sigma if not np.isnan(sigma) else 0.0}
+        return {"z_threshold": float(factor), "mean": mu, "std": sigma}
+    return {"unsupported_method": method}
+
+
+def mask_from_bounds(series: pd.Series, method: str, factor: float, info: Dict[str, Any]) -> pd.Series:
+    """Keep-mask for ``series`` given precomputed bounds; nulls are always kept."""
+    if method == "iqr" and not np.isnan(info.get("lower", float("nan"))):
+        return series.between(info["lower"], info["upper"]) | series.isna()
+    if method == "zscore" and info.get("std"):
+        z = (series - info["mean"]) / info["std"]
+        return (z.abs() <= factor) | series.isna()
+    return pd.Series(True, index=series.index)
+
+
+def _column_keep_mask(series: pd.Series, method: str, factor: float) -> Tuple[pd.Series, Dict[str, Any]]:
+    if method == "iqr":
+        clean_series = series.dropna()
+        if clean_series.empty:
+            return pd.Series(True, index=series.index), {"lower": float("nan"), "upper": float("nan")}
+        lower, upper = _iqr_bounds(clean_series, factor)
+        info = {"lower": float(lower), "upper": float(upper)}
+        return mask_from_bounds(series, method, factor, info), info
+    if method == "zscore":
+        mu = series.mean()
+        sigma = series.std(ddof=0)
+        if sigma == 0 or np.isnan(sigma):
+            info = {"z_threshold": float(factor), "mean": float(mu if not np.isnan(mu) else 0.0), "std": float(sigma if not np.isnan(sigma) else 0.0)}
+            return pd.Series(True, index=series.index), info
+        info = {"z_threshold": float(factor), "mean": float(mu), "std": float(sigma)}
+        return mask_from_bounds(series, method, factor, info), info
+    # Unsupported method fallback: keep all
+    return pd.Series(True, index=series.index), {"unsupported_method": method}
+
+
+def resolve_target_columns(df: pd.DataFrame, config: Dict[str, Any]) -> List[str]:
+    """Numeric columns the outlier step will inspect for the given config."""
     columns: List[str] = (config or {}).get("columns") or []
-
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     if not columns:
-        target_cols = numeric_cols
-    else:
-        # only numeric intersection
-        target_cols = [c for c in columns if c in numeric_cols]
+        return numeric_cols
+    # only numeric intersection
+    return [c for c in columns if c in numeric_cols]
+
+
+def build_keep_mask(df: pd.DataFrame, config: Dict[str, Any]) -> Tuple[Optional[pd.Series], Dict[str, Any]]:
+    """
+    Compute the keep-mask for outlier removal without materialising the filtered frame.
+
+    Returns ``(mask, meta)``. ``mask`` is None when the step is a no-op (no numeric
+    columns or an unsupported method); ``meta`` is the change-metadata entry in the
+    same shape ``apply`` reports.
+    """
+    method = (config or {}).get("method", "iqr").lower()
+    factor = float((config or {}).get("factor", 1.5))
+    target_cols = resolve_target_columns(df, config)
 
     if not target_cols:
-        return df.copy(), {"summary": ["Remove Outliers: no numeric columns to process"], "rows_removed": 0}
+        return None, {"summary": ["Remove Outliers: no numeric columns to process"], "rows_removed": 0}
+
+    if multivariate_outliers.is_multivariate(method):
+        if len(df) < multivariate_outliers.MIN_FIT_ROWS and not config.get("detector_id"):
+            return None, {"summary": ["Remove Outliers: too few rows for multivariate detection"], "rows_removed": 0}
+        return multivariate_outliers.build_keep_mask(df, target_cols, config)
 
     mask_keep = pd.Series(True, index=df.index)
     bounds_info = {}
-
-    def _process_column(col: str) -> Tuple[pd.Series, Dict[str, float]]:
-        series = df[col]
-        if method == "iqr":
-            clean_series = series.dropna()
-            if clean_series.empty:
-                return pd.Series(True, index=df.index), {"lower": float("nan"), "upper": float("nan")}
-            lower, upper = _iqr_bounds(clean_series, factor)
-            mask = series.between(lower, upper) | series.isna()
-            info = {"lower": float(lower), "upper": float(upper)}
-            return mask, info
-        if method == "zscore":
-            mu = series.mean()
-            sigma = series.std(ddof=0)
-            if sigma == 0 or np.isnan(sigma):
-                info = {"z_threshold": float(factor), "mean": float(mu if not np.isnan(mu) else 0.0), "std": float(sigma if not np.isnan(sigma) else 0.0)}
-                return pd.Series(True, index=df.index), info
-            z = (series - mu) / sigma
-            mask = (z.abs() <= factor) | series.isna()
-            info = {"z_threshold": float(factor), "mean": float(mu), "std": float(sigma)}
-            return mask, info
-        # Unsupported method fallback: keep all
-        return pd.Series(True, index=df.index), {"unsupported_method": method}
-
-    max_workers = min(len(target_cols), max(1, os.cpu_count() or 1))
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for col, (mask_column, info) in zip(
-            target_cols,
-            executor.map(_process_column, target_cols),
-        ):
-            mask_keep &= mask_column
-            bounds_info[col] = info
+    column_results = map_columns(
+        df,
+        target_cols,
+        _column_keep_mask,
+        args={col: (method, factor) for col in target_cols},
+    )
+    for col, (mask_column, info) in column_results.items():
+        mask_keep &= mask_column
+        bounds_info[col] = info
 
     if method not in {"iqr", "zscore"}:
-        return df.copy(), {"summary": [f"Remove Outliers: unsupported method '{method}'"], "rows_removed": 0}
-
-    before = len(df)
-    df_out = df[mask_keep].copy()
-    removed = before - len(df_out)
+        return None, {"summary": [f"Remove Outliers: unsupported method '{method}'"], "rows_removed": 0}
 
+    removed = int((~mask_keep).sum())
     pretty_method = "IQR" if method == "iqr" else "Z-Score"
     meta = {
         "operation": "Remove Outliers",
         "method": pretty_method,
         "factor": factor,
         "columns": target_cols or "all",
-        "rows_removed": int(removed),
+        "rows_removed": removed,
         "bounds": bounds_info,
     }
-    return df_out, meta
+    return mask_keep, meta
+
+
+def apply(df: pd.DataFrame, config: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Remove outliers from numeric columns.
 
+    config = {
+      "columns": Optional[List[str]],  # default: all numeric columns
+      "method": "iqr",                # "iqr" / "zscore" per column, or a multivariate
+                                       # method: "isolation_forest", "mcd", "lof"
+      "factor": float,                 # IQR factor / z threshold, default 1.5
+      # multivariate only (see multivariate_outliers):
+      "contamination": float,          # expected outlier share, default 0.01
+      "sample_size": int,              # rows the detector is fitted on
+      "detector_id": str,              # reapply a previously saved detector
+    }
+    """
+    mask_keep, meta = build_keep_mask(df, config)
+    if mask_keep is None:
+        return df.copy(deep=False), meta
+    return df[mask_keep], meta
 
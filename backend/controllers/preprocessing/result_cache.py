@@ -0,0 +1,205 @@
+"""Memoized preprocessing results keyed by source version and step spec.
+
+Re-running preprocessing with the same steps on an unchanged object returns the
+previous payload - staged cleaned Parquet, diff marks and quality report - without
+recomputing anything. Keys combine the source object's ETag, the canonical JSON of
+the steps and a fingerprint of the preprocessing code, so editing either the data or
+the pipeline implementation invalidates old entries.
+
+Every staged file has one owner. ``put`` hard-links (or, across filesystems, copies)
+the job's staged Parquet into ``PREPROCESSING_CACHE_DIR`` and the cache owns only that
+link, deleting it when the entry ages out or pushes the cache over its size budget.
+``get`` hands every hit a new link of its own, so evicting an entry never removes a
+file a job's ``temp_cleaned_path`` artifact still points at; jobs outlive cache entries.
+
+The cache is per process: entries live in this process's memory and the files on its
+local disk, so other API or worker processes neither see nor evict them and simply
+recompute on a miss.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from .multivariate_outliers import staged_detector_path
+
+RESULT_CACHE_MAX_BYTES = int(os.getenv("PREPROCESSING_CACHE_MAX_MB", "2048")) * 1024 * 1024
+RESULT_CACHE_MAX_AGE_SECONDS = int(os.getenv("PREPROCESSING_CACHE_TTL_SECONDS", "3600"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("PREPROCESSING_CACHE_MAX_ENTRIES", "32"))
+RESULT_CACHE_DIR = os.getenv("PREPROCESSING_CACHE_DIR", os.path.join(tempfile.gettempdir(), "preprocessing-cache"))
+
+_PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+def _code_version() -> str:
+    """Fingerprint of the preprocessing package sources (overridable via env)."""
+    override = os.getenv("PREPROCESSING_CODE_VERSION")
+    if override:
+        return override
+    digest = hashlib.sha256()
+    for source in sorted(_PACKAGE_DIR.glob("*.py")):
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = _code_version()
+
+
+def canonical_steps(steps: Optional[Dict[str, Any]]) -> str:
+    """Order-independent JSON for a steps payload."""
+    return json.dumps(steps or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def cache_key(etag: str, steps: Optional[Dict[str, Any]], code_version: Optional[str] = None) -> str:
+    material = "\n".join([etag.strip('"'), canonical_steps(steps), code_version or CODE_VERSION])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+@dataclass
+class _CacheEntry:
+    payload: Dict[str, Any]
+    staged_path: Optional[str]
+    size_bytes: int
+    created_at: float
+
+
+class PreprocessingResultCache:
+    """Thread-safe LRU of preprocessing payloads with size- and age-based eviction."""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        directory: Optional[str] = None,
+    ):
+        self.directory = directory or RESULT_CACHE_DIR
+        self.max_bytes = RESULT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_age_seconds = RESULT_CACHE_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        self.max_entries = RESULT_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The cached payload for ``key`` (marked ``cache_hit``), or None.
+
+        The payload's ``temp_cleaned_path`` is a new staged file owned by the caller.
+        """
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(key)
+            if entry is not None and entry.staged_path and not os.path.exists(entry.staged_path):
+                # Staged artifact vanished underneath us; the payload would point nowhere
+                self._entries.pop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            payload = {**entry.payload, "cache_hit": True}
+            if entry.staged_path:
+                payload["temp_cleaned_path"] = _link_staged(
+                    entry.staged_path, os.path.join(tempfile.gettempdir(), f"tmp{uuid.uuid4().hex}.parquet")
+                )
+            return payload
+
+    def put(self, key: str, payload: Dict[str, Any]) -> bool:
+        """Cache ``payload`` with a link of its staged file; False if it is too large.
+
+        The caller keeps its own staged file.
+        """
+        source_path = payload.get("temp_cleaned_path")
+        size_bytes = os.path.getsize(source_path) if source_path and os.path.exists(source_path) else 0
+        if size_bytes > self.max_bytes:
+            return False
+        staged_path = None
+        if source_path and os.path.exists(source_path):
+            os.makedirs(self.directory, exist_ok=True)
+            staged_path = _link_staged(source_path, os.path.join(self.directory, f"{key[:16]}-{uuid.uuid4().hex}.parquet"))
+        entry = _CacheEntry(payload=payload, staged_path=staged_path, size_bytes=size_bytes, created_at=time.time())
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                _remove_staged(previous.staged_path)
+            self._entries[key] = entry
+            self._evict_expired()
+            self._evict_to_budget()
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                _remove_staged(entry.staged_path)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "max_age_seconds": self.max_age_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "code_version": CODE_VERSION,
+            }
+
+    # ---- eviction (callers hold the lock) ---------------------------------------
+    def _evict(self, keys: List[str]) -> None:
+        for key in keys:
+            entry = self._entries.pop(key)
+            _remove_staged(entry.staged_path)
+
+    def _evict_expired(self) -> None:
+        if self.max_age_seconds is None or self.max_age_seconds <= 0:
+            return
+        cutoff = time.time() - self.max_age_seconds
+        self._evict([key for key, entry in self._entries.items() if entry.created_at < cutoff])
+
+    def _evict_to_budget(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            self._evict([next(iter(self._entries))])
+
+
+def _link_staged(source: str, target: str) -> str:
+    """Give ``target`` its own link to ``source`` (a copy across filesystems), sidecar included."""
+    for src, dst in ((source, target), (staged_detector_path(source), staged_detector_path(target))):
+        if src != source and not os.path.exists(src):
+            continue
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+    return target
+
+
+def _remove_staged(path: Optional[str]) -> None:
+    for staged in (path, staged_detector_path(path) if path else None):
+        if staged and os.path.exists(staged):
+            try:
+                os.remove(staged)
+            except OSError:
+                logging.warning("Failed to remove evicted staged file %s", staged)
+
+
+preprocessing_results = PreprocessingResultCache()
@@ -0,0 +1,178 @@
+"""Row fingerprints and a compact cross-batch duplicate tracker.
+
+Rows are reduced to 64- or 128-bit fingerprints with ``pd.util.hash_pandas_object``.
+Inside a batch, rows that share a fingerprint are re-checked exactly with
+``DataFrame.duplicated`` (only those rows), so a hash collision never drops a row.
+Across batches only fingerprints are kept, stored as sorted ``uint64`` runs (8 or 16
+bytes per distinct row instead of a Python set entry), which is what lets duplicate
+removal run over data that never sits in memory at once. Those cross-batch matches are
+not re-checked: a row from a later batch is dropped on a fingerprint match alone, which
+with the tracker's 128-bit fingerprints takes a collision with odds around 2**-64 even
+after billions of rows.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+# Second, independent key for the high 64 bits of 128-bit fingerprints
+_HASH_KEY_HIGH = "9f3c1a7e5b2d4c68"
+# Sorted runs are merged once there are this many
+_MAX_RUNS = 8
+
+
+# Floats at or above this magnitude are not exact int64 values
+_INT64_LIMIT = float(2 ** 63)
+
+
+def _numeric_parts(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """Split a numeric column into an exact ``Int64`` part and a ``float64`` remainder.
+
+    Integral values (ints, and floats such as ``7.0``) land in the ``Int64`` part with
+    full precision; fractional, infinite and out-of-range values stay in the float part.
+    """
+    if ptypes.is_integer_dtype(series.dtype) and not ptypes.is_unsigned_integer_dtype(series.dtype):
+        return series.astype("Int64"), pd.Series(np.nan, index=series.index)
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(invalid="ignore"):
+        integral = np.isfinite(values) & (np.floor(values) == values) & (np.abs(values) < _INT64_LIMIT)
+    whole = np.zeros(len(values), dtype=np.int64)
+    if ptypes.is_unsigned_integer_dtype(series.dtype):
+        # Exact below 2**63; larger uint64 values only exist as uint64 and compare as float
+        raw = series.to_numpy()
+        integral = raw < 2 ** 63
+        whole[integral] = raw[integral].astype(np.int64)
+    else:
+        whole[integral] = values[integral].astype(np.int64)
+    return (
+        pd.Series(pd.arrays.IntegerArray(whole, ~integral), index=series.index),
+        pd.Series(np.where(integral, np.nan, values), index=series.index),
+    )
+
+
+def _hashable_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Give numeric columns a layout that hashes the same in every batch.
+
+    An integer column loads as int64 in batches without nulls and float64 in batches
+    with them; both must produce identical fingerprints without rounding large ids,
+    so every numeric column becomes an ``Int64`` part and a ``float64`` part.
+    """
+    numeric = [
+        col for col, dtype in frame.dtypes.items()
+        if ptypes.is_numeric_dtype(dtype) and not ptypes.is_bool_dtype(dtype)
+        and not isinstance(dtype, pd.SparseDtype)
+    ]
+    if not numeric:
+        return frame
+    numeric_set = set(numeric)
+    parts = {}
+    for position, col in enumerate(frame.columns):
+        if col in numeric_set:
+            parts[(position, "int")], parts[(position, "float")] = _numeric_parts(frame[col])
+        else:
+            parts[(position, "value")] = frame[col]
+    return pd.DataFrame(parts, index=frame.index)
+
+
+def row_fingerprints(frame: pd.DataFrame, columns: Optional[Sequence[str]] = None, bits: int = 64) -> np.ndarray:
+    """Per-row fingerprints over ``columns`` (all columns when empty).
+
+    Returns a ``uint64`` array of shape ``(n,)`` for 64 bits or ``(n, 2)`` for 128 bits.
+    """
+    subset = _hashable_frame(frame[list(columns)] if columns else frame)
+    low = pd.util.hash_pandas_object(subset, index=False).to_numpy(dtype=np.uint64)
+    if bits == 64:
+        return low
+    if bits != 128:
+        raise ValueError("Fingerprint width must be 64 or 128 bits")
+    high = pd.util.hash_pandas_object(subset, index=False, hash_key=_HASH_KEY_HIGH).to_numpy(dtype=np.uint64)
+    return np.stack([low, high], axis=1)
+
+
+def _verified_duplicates(subset: pd.DataFrame, low: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Exact within-frame duplicate flags, checking only rows whose fingerprints repeat.
+
+    Returns ``(is_duplicate, collisions)`` where ``collisions`` counts fingerprint
+    matches that turned out to be different rows.
+    """
+    candidates = pd.Series(low).duplicated(keep="first").to_numpy()
+    is_duplicate = np.zeros(len(low), dtype=bool)
+    if not candidates.any():
+        return is_duplicate, 0
+    involved = np.isin(low, low[candidates])
+    exact = subset.iloc[np.flatnonzero(involved)].duplicated(keep="first").to_numpy()
+    is_duplicate[involved] = exact
+    return is_duplicate, int(candidates.sum() - exact.sum())
+
+
+class DuplicateTracker:
+    """Tracks distinct rows across batches and flags repeats of earlier rows."""
+
+    def __init__(self, columns: Optional[Sequence[str]] = None, bits: int = 128):
+        self.columns = list(columns or [])
+        self.bits = bits
+        self.rows_seen = 0
+        self.duplicate_rows = 0
+        self.collisions = 0
+        self._runs: List[np.ndarray] = []
+
+    @property
+    def unique_rows(self) -> int:
+        return self.rows_seen - self.duplicate_rows
+
+    def size_bytes(self) -> int:
+        return int(sum(run.nbytes for run in self._runs))
+
+    def observe(self, frame: pd.DataFrame) -> np.ndarray:
+        """Return the keep-mask for ``frame`` (True for rows not seen before) and record them."""
+        subset = frame[self.columns] if self.columns else frame
+        fingerprints = row_fingerprints(subset, bits=self.bits)
+        low = fingerprints if fingerprints.ndim == 1 else fingerprints[:, 0]
+
+        is_duplicate, collisions = _verified_duplicates(subset, low)
+        self.collisions += collisions
+        fresh = np.flatnonzero(~is_duplicate)
+        if self._runs and fresh.size:
+            is_duplicate[fresh[self._contains(fingerprints[fresh])]] = True
+
+        keep = ~is_duplicate
+        self._add(fingerprints[keep])
+        self.rows_seen += len(frame)
+        self.duplicate_rows += int(is_duplicate.sum())
+        return keep
+
+    # ---- compact fingerprint set ---------------------------------------------
+    def _as_keys(self, fingerprints: np.ndarray) -> np.ndarray:
+        if fingerprints.ndim == 1:
+            return fingerprints
+        # Structured view keeps (low, high) pairs sortable and searchable as one key
+        return np.ascontiguousarray(fingerprints).view([("low", np.uint64), ("high", np.uint64)]).ravel()
+
+    def _contains(self, fingerprints: np.ndarray) -> np.ndarray:
+        keys = self._as_keys(fingerprints)
+        found = np.zeros(len(keys), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, keys)
+            in_range = positions < len(run)
+            found[in_range] |= run[positions[in_range]] == keys[in_range]
+        return found
+
+    def _add(self, fingerprints: np.ndarray) -> None:
+        if len(fingerprints) == 0:
+            return
+        self._runs.append(np.sort(self._as_keys(fingerprints)))
+        if len(self._runs) > _MAX_RUNS:
+            self._runs = [np.sort(np.concatenate(self._runs))]
+
+
+def duplicate_mask(frame: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> np.ndarray:
+    """``DataFrame.duplicated(subset=columns, keep="first")`` via fingerprints."""
+    subset = frame[list(columns)] if columns else frame
+    low = row_fingerprints(subset, bits=64)
+    is_duplicate, _ = _verified_duplicates(subset, low)
+    return is_duplicate
+
+
+def count_duplicate_rows(frame: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> int:
+    return int(duplicate_mask(frame, columns).sum())
@@ -0,0 +1,232 @@
+"""Serve arbitrary row windows from a Parquet file without loading it.
+
+Job results only embed the first ``MAX_PREVIEW_ROWS`` rows; everything past that is
+read on demand from the staged (or persisted) Parquet file:
+
+- plain windows map ``offset``/``limit`` onto the footer's row-group boundaries and
+  read only the row groups that overlap the window,
+- filters first skip row groups whose min/max statistics cannot match, then read
+  only the filter columns of the remaining groups to find matching rows,
+- sorting reads only the sort (and filter) columns, orders them, and fetches the
+  requested slice from the row groups it falls into.
+
+Staged files are written with :data:`PARQUET_WRITE_OPTIONS` (bounded row groups plus
+a page index) so windows stay cheap on very large outputs.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Rows per row group in staged Parquet files; a window never reads more than
+# ceil(limit / STAGED_ROW_GROUP_ROWS) + 1 groups
+STAGED_ROW_GROUP_ROWS = int(os.getenv("STAGED_ROW_GROUP_ROWS", "65536"))
+PARQUET_WRITE_OPTIONS = {"row_group_size": STAGED_ROW_GROUP_ROWS, "write_page_index": True}
+MAX_WINDOW_ROWS = int(os.getenv("MAX_WINDOW_ROWS", "5000"))
+
+FILTER_OPS = ("eq", "ne", "lt", "le", "gt", "ge", "in", "contains", "isnull", "notnull")
+_COMPARE = {
+    "eq": pc.equal,
+    "ne": pc.not_equal,
+    "lt": pc.less,
+    "le": pc.less_equal,
+    "gt": pc.greater,
+    "ge": pc.greater_equal,
+}
+
+
+class RowWindowError(ValueError):
+    """Raised for an invalid window request (unknown column, operator or value)."""
+
+
+@dataclass
+class RowWindow:
+    frame: pd.DataFrame
+    row_numbers: List[int]
+    total_rows: int
+    offset: int
+    limit: int
+    row_groups_read: int
+    row_groups_total: int
+    # Row groups whose filter/sort columns were scanned to locate the window
+    key_row_groups_scanned: int = 0
+    sort_by: Optional[str] = None
+    descending: bool = False
+    filters: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _row_group_starts(metadata: pq.FileMetaData) -> np.ndarray:
+    counts = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    return np.concatenate([[0], np.cumsum(counts, dtype=np.int64)])
+
+
+def _typed_value(value: Any, arrow_type: pa.DataType, column: str) -> pa.Scalar:
+    try:
+        return pa.array([value]).cast(arrow_type)[0]
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as exc:
+        raise RowWindowError(f"Filter value {value!r} does not match column '{column}' ({arrow_type})") from exc
+
+
+def _normalize_filters(filters: Optional[Sequence[Dict[str, Any]]], schema: pa.Schema) -> List[Dict[str, Any]]:
+    normalized = []
+    for spec in filters or []:
+        column, op = spec.get("column"), (spec.get("op") or "eq").lower()
+        if column not in schema.names:
+            raise RowWindowError(f"Unknown filter column: {column}")
+        if op not in FILTER_OPS:
+            raise RowWindowError(f"Unknown filter operator: {op}")
+        arrow_type = schema.field(column).type
+        value = spec.get("value")
+        if op in _COMPARE:
+            value = _typed_value(value, arrow_type, column)
+        elif op == "in":
+            values = value if isinstance(value, (list, tuple)) else [value]
+            value = pa.array([_typed_value(item, arrow_type, column).as_py() for item in values], type=arrow_type)
+        elif op == "contains":
+            value = str(value)
+        normalized.append({"column": column, "op": op, "value": value})
+    return normalized
+
+
+def _row_group_may_match(metadata: pq.FileMetaData, group: int, schema: pa.Schema, filters: List[Dict[str, Any]]) -> bool:
+    """False only when a filter provably excludes every row of ``group``."""
+    row_group = metadata.row_group(group)
+    for spec in filters:
+        chunk = row_group.column(schema.get_field_index(spec["column"]))
+        stats = chunk.statistics
+        if stats is None:
+            continue
+        if spec["op"] == "isnull" and stats.has_null_count and stats.null_count == 0:
+            return False
+        if spec["op"] == "notnull" and stats.has_null_count and stats.null_count == row_group.num_rows:
+            return False
+        if spec["op"] not in ("eq", "lt", "le", "gt", "ge") or not stats.has_min_max:
+            continue
+        value = spec["value"].as_py()
+        try:
+            if spec["op"] == "eq" and (value < stats.min or value > stats.max):
+                return False
+            if (spec["op"] == "lt" and stats.min >= value) or (spec["op"] == "le" and stats.min > value):
+                return False
+            if (spec["op"] == "gt" and stats.max <= value) or (spec["op"] == "ge" and stats.max < value):
+                return False
+        except TypeError:
+            # Statistics in a physical representation we cannot compare against
+            continue
+    return True
+
+
+def _filter_mask(table: pa.Table, filters: List[Dict[str, Any]]) -> pa.ChunkedArray:
+    mask = None
+    for spec in filters:
+        column = table.column(spec["column"])
+        op = spec["op"]
+        if op in _COMPARE:
+            step = _COMPARE[op](column, spec["value"])
+        elif op == "in":
+            step = pc.is_in(column, value_set=spec["value"])
+        elif op == "contains":
+            step = pc.match_substring(column.cast(pa.string()), spec["value"], ignore_case=True)
+        elif op == "isnull":
+            step = pc.is_null(column)
+        else:
+            step = pc.is_valid(column)
+        step = pc.fill_null(step, False)
+        mask = step if mask is None else pc.and_(mask, step)
+    return mask
+
+
+def _take_rows(parquet_file: pq.ParquetFile, positions: np.ndarray, starts: np.ndarray, columns: Optional[List[str]]) -> tuple:
+    """Fetch the rows at global ``positions`` (in that order) reading only their row groups."""
+    if len(positions) == 0:
+        return parquet_file.schema_arrow.empty_table().select(columns or parquet_file.schema_arrow.names), 0
+    order = np.argsort(positions, kind="stable")
+    sorted_positions = positions[order]
+    groups = np.searchsorted(starts, sorted_positions, side="right") - 1
+    pieces = []
+    unique_groups = np.unique(groups)
+    for group in unique_groups:
+        local = sorted_positions[groups == group] - starts[group]
+        pieces.append(parquet_file.read_row_group(int(group), columns=columns).take(pa.array(local)))
+    table = pa.concat_tables(pieces)
+    return table.take(pa.array(np.argsort(order))), len(unique_groups)
+
+
+def read_row_window(
+    source: Any,
+    offset: int = 0,
+    limit: int = 100,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    filters: Optional[Sequence[Dict[str, Any]]] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> RowWindow:
+    """Return rows ``[offset, offset + limit)`` of ``source`` after filtering and sorting.
+
+    ``source`` is a path or seekable file object. ``filters`` are
+    ``{"column", "op", "value"}`` dicts combined with AND (see :data:`FILTER_OPS`).
+    Row numbers in the result are positions in the unfiltered file.
+    """
+    if offset < 0 or limit < 0:
+        raise RowWindowError("offset and limit must be non-negative")
+    limit = min(int(limit), MAX_WINDOW_ROWS)
+    parquet_file = pq.ParquetFile(source)
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+    starts = _row_group_starts(metadata)
+    if columns is not None:
+        missing = [col for col in columns if col not in schema.names]
+        if missing:
+            raise RowWindowError(f"Unknown columns: {missing}")
+        columns = list(columns)
+    if sort_by is not None and sort_by not in schema.names:
+        raise RowWindowError(f"Unknown sort column: {sort_by}")
+    filters = _normalize_filters(filters, schema)
+
+    keys_read = 0
+    if not filters and sort_by is None:
+        total = int(metadata.num_rows)
+        positions = np.arange(min(offset, total), min(offset + limit, total), dtype=np.int64)
+    else:
+        key_columns = list(dict.fromkeys([spec["column"] for spec in filters] + ([sort_by] if sort_by else [])))
+        candidates = [g for g in range(metadata.num_row_groups) if _row_group_may_match(metadata, g, schema, filters)]
+        keys_read = len(candidates)
+        if candidates:
+            keys = parquet_file.read_row_groups(candidates, columns=key_columns)
+            base = np.concatenate([np.arange(starts[g], starts[g + 1], dtype=np.int64) for g in candidates])
+        else:
+            keys = schema.empty_table().select(key_columns)
+            base = np.empty(0, dtype=np.int64)
+        if filters:
+            selected = np.asarray(_filter_mask(keys, filters), dtype=bool)
+            keys = keys.filter(pa.array(selected))
+            base = base[selected]
+        if sort_by is not None:
+            ordering = pc.sort_indices(
+                keys,
+                sort_keys=[(sort_by, "descending" if descending else "ascending")],
+                null_placement="at_end",
+            )
+            base = base[np.asarray(ordering)]
+        total = int(len(base))
+        positions = base[offset:offset + limit]
+
+    table, groups_read = _take_rows(parquet_file, positions, starts, columns)
+    return RowWindow(
+        frame=table.to_pandas(),
+        row_numbers=[int(pos) for pos in positions],
+        total_rows=total,
+        offset=int(offset),
+        limit=limit,
+        row_groups_read=groups_read,
+        row_groups_total=int(metadata.num_row_groups),
+        key_row_groups_scanned=keys_read,
+        sort_by=sort_by,
+        descending=bool(descending),
+        filters=[{"column": spec["column"], "op": spec["op"]} for spec in filters],
+    )
@@ -0,0 +1,410 @@
+"""Sample-based dataset profiling for recommendations.
+
+Recommendations only compare statistics against coarse thresholds (10% missing, 1%
+unique share, skew > 1, ...), so they can be computed on a uniform sample:
+
+- **stratified**: a random subset of Parquet row groups holding about
+  ``STRATIFIED_READ_FACTOR`` times the sample is read, one group at a time and only the
+  requested columns, and each contributes rows in proportion to its size. The rest of
+  the file is never decoded, so duplicate rows are estimated from the sample.
+- **reservoir**: CSV chunks (or Parquet batches) stream through a bottom-k reservoir
+  keyed by random priorities, a uniform sample without knowing the row count upfront.
+
+:func:`sampling_summary` attaches Wilson confidence intervals to missing and outlier
+shares and lists the columns whose interval straddles a decision threshold and, when
+the thresholds carry a ``decision`` function, whose recommendation differs between
+the two ends of the interval; callers escalate to a full scan when that list is
+non-empty.
+"""
+import math
+import os
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .profiler import ColumnProfile, ColumnProfiler, DatasetProfile
+from .row_hashing import DuplicateTracker
+
+RECOMMENDATION_SAMPLE_ROWS = int(os.getenv("RECOMMENDATION_SAMPLE_ROWS", "100000"))
+CSV_SAMPLE_CHUNK_ROWS = 200000
+CONFIDENCE_Z = 1.96  # 95% intervals
+# Distinct-count estimates from a sample are treated as good to within this factor
+CARDINALITY_ERROR_FACTOR = 2.0
+# Stratified samples read row groups holding about this many times the sample rows
+STRATIFIED_READ_FACTOR = int(os.getenv("STRATIFIED_READ_FACTOR", "4"))
+
+SAMPLING_METHODS = {"auto", "stratified", "reservoir", "full"}
+
+
+@dataclass
+class DatasetSample:
+    frame: pd.DataFrame
+    total_rows: int
+    method: str
+    # Exact count from fingerprints of every scanned row, when the sampler saw them all
+    duplicate_rows: Optional[int] = None
+    # Row groups the stratified sampler decoded, out of the file's total
+    row_groups_read: Optional[Tuple[int, int]] = None
+
+    @property
+    def is_sampled(self) -> bool:
+        return self.method != "full"
+
+    @property
+    def sample_rows(self) -> int:
+        return len(self.frame)
+
+
+@dataclass
+class SamplingThresholds:
+    """Decision thresholds the recommendations compare against (percentages unless noted)."""
+
+    missing: Sequence[float] = (10.0, 50.0, 80.0)
+    outliers: Sequence[float] = (5.0,)
+    rows_with_nulls: Sequence[float] = (3.0,)
+    unique_share: Sequence[float] = (1.0,)
+    skew: Sequence[float] = (1.0,)
+    cardinality: Sequence[int] = field(default_factory=tuple)
+    # What the caller recommends for a column; a straddled threshold only escalates when
+    # this differs between the two ends of the interval
+    decision: Optional[Callable[[ColumnProfile], Any]] = None
+
+
+def read_frame(source: Any, filename: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read a whole dataset from a path or file-like ``source`` by extension."""
+    if filename.endswith(".parquet"):
+        return pd.read_parquet(source, engine="pyarrow", columns=None if columns is None else list(columns))
+    if filename.endswith(".csv"):
+        return pd.read_csv(source)
+    if filename.endswith(".xlsx"):
+        return pd.read_excel(source)
+    if filename.endswith(".json"):
+        return pd.read_json(source)
+    raise ValueError("Unsupported file format")
+
+
+def _rewind(source: Any) -> None:
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _reservoir(chunks, sample_rows: int, rng: np.random.Generator, tracker: DuplicateTracker) -> Tuple[pd.DataFrame, int]:
+    """Bottom-k reservoir over an iterator of frames; returns ``(sample, rows_seen)``."""
+    reservoir: Optional[pd.DataFrame] = None
+    keys = np.empty(0)
+    seen = 0
+    for chunk in chunks:
+        chunk = chunk.reset_index(drop=True)
+        tracker.observe(chunk)
+        chunk.index = pd.RangeIndex(seen, seen + len(chunk))
+        seen += len(chunk)
+        chunk_keys = rng.random(len(chunk))
+        if reservoir is not None and len(reservoir) >= sample_rows:
+            # Only rows that beat the current k-th smallest key can enter
+            threshold = keys.max()
+            take = chunk_keys < threshold
+            if not take.any():
+                continue
+            chunk, chunk_keys = chunk[take], chunk_keys[take]
+        combined = chunk if reservoir is None else pd.concat([reservoir, chunk])
+        keys = np.concatenate([keys, chunk_keys])
+        if len(combined) > sample_rows:
+            keep = np.argpartition(keys, sample_rows - 1)[:sample_rows]
+            combined, keys = combined.iloc[keep], keys[keep]
+        reservoir = combined
+    if reservoir is None:
+        return pd.DataFrame(), 0
+    return reservoir.sort_index().reset_index(drop=True), seen
+
+
+def _chosen_row_groups(parquet_file: pq.ParquetFile, sample_rows: int, rng: np.random.Generator) -> List[int]:
+    """Random row groups holding at least ``STRATIFIED_READ_FACTOR`` times the sample, in file order."""
+    metadata = parquet_file.metadata
+    target = min(metadata.num_rows, sample_rows * max(STRATIFIED_READ_FACTOR, 1))
+    chosen: List[int] = []
+    rows = 0
+    for index in rng.permutation(metadata.num_row_groups):
+        if rows >= target:
+            break
+        chosen.append(int(index))
+        rows += metadata.row_group(int(index)).num_rows
+    return sorted(chosen)
+
+
+def _stratified_row_groups(
+    parquet_file: pq.ParquetFile,
+    sample_rows: int,
+    rng: np.random.Generator,
+    columns: Optional[Sequence[str]] = None,
+) -> Tuple[pd.DataFrame, List[int]]:
+    chosen = _chosen_row_groups(parquet_file, sample_rows, rng)
+    chosen_rows = sum(parquet_file.metadata.row_group(index).num_rows for index in chosen)
+    fraction = sample_rows / max(chosen_rows, 1)
+    projection = None if columns is None else list(columns)
+    parts: List[pd.DataFrame] = []
+    for index in chosen:
+        group = parquet_file.read_row_group(index, columns=projection).to_pandas()
+        take = min(len(group), int(round(len(group) * fraction)))
+        if take <= 0:
+            continue
+        positions = np.sort(rng.choice(len(group), size=take, replace=False))
+        parts.append(group.iloc[positions])
+    if not parts:
+        schema = parquet_file.schema_arrow
+        empty = schema.empty_table() if projection is None else schema.empty_table().select(projection)
+        return empty.to_pandas(), chosen
+    return pd.concat(parts, ignore_index=True), chosen
+
+
+def load_sample(
+    source: Any,
+    filename: str,
+    sample_rows: Optional[int] = None,
+    method: str = "auto",
+    seed: int = 0,
+    columns: Optional[Sequence[str]] = None,
+) -> DatasetSample:
+    """Load a uniform sample of at most ``sample_rows`` rows (full data when smaller).
+
+    Parquet sources are read projected to ``columns`` (all columns by default).
+    """
+    sample_rows = sample_rows or RECOMMENDATION_SAMPLE_ROWS
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unsupported sampling method '{method}'")
+    rng = np.random.default_rng(seed)
+    tracker = DuplicateTracker()
+
+    if method == "full":
+        frame = read_frame(source, filename, columns)
+        return DatasetSample(frame, len(frame), "full")
+
+    if filename.endswith(".parquet"):
+        parquet_file = pq.ParquetFile(source)
+        total_rows = parquet_file.metadata.num_rows
+        if total_rows <= sample_rows:
+            _rewind(source)
+            frame = read_frame(source, filename, columns)
+            return DatasetSample(frame, len(frame), "full")
+        projection = None if columns is None else list(columns)
+        if method == "reservoir":
+            batches = (
+                batch.to_pandas()
+                for batch in parquet_file.iter_batches(batch_size=CSV_SAMPLE_CHUNK_ROWS, columns=projection)
+            )
+            frame, _ = _reservoir(batches, sample_rows, rng, tracker)
+            return DatasetSample(frame, total_rows, "reservoir", tracker.duplicate_rows)
+        frame, chosen = _stratified_row_groups(parquet_file, sample_rows, rng, projection)
+        return DatasetSample(frame, total_rows, "stratified", row_groups_read=(len(chosen), parquet_file.num_row_groups))
+
+    if filename.endswith(".csv"):
+        frame, total_rows = _reservoir(pd.read_csv(source, chunksize=CSV_SAMPLE_CHUNK_ROWS), sample_rows, rng, tracker)
+        if total_rows <= sample_rows:
+            return DatasetSample(frame, total_rows, "full")
+        return DatasetSample(frame, total_rows, "reservoir", tracker.duplicate_rows)
+
+    # Excel/JSON have no streaming reader; sample after loading so profiling stays cheap
+    frame = read_frame(source, filename)
+    if len(frame) <= sample_rows:
+        return DatasetSample(frame, len(frame), "full")
+    positions = np.sort(rng.choice(len(frame), size=sample_rows, replace=False))
+    tracker.observe(frame)
+    return DatasetSample(frame.iloc[positions].reset_index(drop=True), len(frame), "reservoir", tracker.duplicate_rows)
+
+
+def wilson_interval(successes: int, n: int, z: float = CONFIDENCE_Z) -> Tuple[float, float]:
+    """Wilson score interval for a proportion, returned in percent."""
+    if n <= 0:
+        return 0.0, 100.0
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, (centre - half) * 100), min(100.0, (centre + half) * 100)
+
+
+def estimate_cardinality(series: pd.Series, total_rows: int) -> int:
+    """Guaranteed-error estimator (GEE) of the distinct count in the full column."""
+    counts = series.value_counts(dropna=True)
+    sample_size = int(counts.sum())
+    if sample_size == 0:
+        return 0
+    singletons = int((counts == 1).sum())
+    repeated = len(counts) - singletons
+    estimate = math.sqrt(max(total_rows, sample_size) / sample_size) * singletons + repeated
+    return int(min(max(round(estimate), len(counts)), total_rows))
+
+
+def _straddles(interval: Tuple[float, float], thresholds: Sequence[float]) -> Optional[float]:
+    low, high = interval
+    for threshold in thresholds:
+        if low <= threshold <= high:
+            return threshold
+    return None
+
+
+def _flips(
+    decision: Optional[Callable[[ColumnProfile], Any]],
+    col: ColumnProfile,
+    low: Dict[str, Any],
+    high: Dict[str, Any],
+) -> bool:
+    """Whether ``decision`` differs between ``col`` at the two ends of an interval."""
+    if decision is None:
+        return True
+    return decision(replace(col, **low)) != decision(replace(col, **high))
+
+
+def sampling_summary(
+    profile: DatasetProfile,
+    sample: DatasetSample,
+    thresholds: Optional[SamplingThresholds] = None,
+    estimated_cardinality: Optional[Dict[str, int]] = None,
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Confidence intervals for a sampled profile and the reasons (if any) to rescan in full.
+
+    ``profile`` must describe ``sample.frame`` (not yet extrapolated).
+    """
+    thresholds = thresholds or SamplingThresholds()
+    decision = thresholds.decision
+    n = profile.total_rows
+    total = max(sample.total_rows, 1)
+    intervals: Dict[str, Dict[str, Any]] = {}
+    reasons: List[str] = []
+
+    def count(percentage: float) -> int:
+        return int(round(percentage / 100 * sample.total_rows))
+
+    rows_interval = wilson_interval(profile.rows_with_any_null, n)
+    threshold = _straddles(rows_interval, thresholds.rows_with_nulls)
+    if threshold is not None:
+        reasons.append(f"rows with nulls near {threshold}%")
+
+    for name, col in profile.columns.items():
+        estimate = estimated_cardinality[name] if estimated_cardinality else col.unique_count
+        # The column as the population is estimated to look, for the decision to judge
+        population = replace(
+            col,
+            total_rows=sample.total_rows,
+            missing_count=count(col.missing_percentage),
+            outlier_count=count(col.outlier_percentage),
+            unique_count=estimate,
+        )
+        entry: Dict[str, Any] = {"missing_percentage": wilson_interval(col.missing_count, n)}
+        low, high = entry["missing_percentage"]
+        threshold = _straddles(entry["missing_percentage"], thresholds.missing)
+        if threshold is not None and _flips(decision, population, {"missing_count": count(low)}, {"missing_count": count(high)}):
+            reasons.append(f"{name}: missing share near {threshold}%")
+
+        if col.has_outlier_stats:
+            entry["outlier_percentage"] = wilson_interval(col.outlier_count, n)
+            low, high = entry["outlier_percentage"]
+            threshold = _straddles(entry["outlier_percentage"], thresholds.outliers)
+            if threshold is not None and _flips(decision, population, {"outlier_count": count(low)}, {"outlier_count": count(high)}):
+                reasons.append(f"{name}: outlier share near {threshold}%")
+
+        if col.skew is not None and col.missing_count < n:
+            # Standard error of sample skewness is ~sqrt(6 / n)
+            se = math.sqrt(6.0 / max(n - col.missing_count, 1))
+            entry["skew"] = (col.skew - CONFIDENCE_Z * se, col.skew + CONFIDENCE_Z * se)
+            threshold = _straddles((abs(col.skew) - CONFIDENCE_Z * se, abs(col.skew) + CONFIDENCE_Z * se), thresholds.skew)
+            if threshold is not None and _flips(decision, population, {"skew": entry["skew"][0]}, {"skew": entry["skew"][1]}):
+                reasons.append(f"{name}: skew near {threshold}")
+
+        entry["estimated_cardinality"] = estimate
+        cardinality_interval = (
+            max(col.unique_count, estimate / CARDINALITY_ERROR_FACTOR),
+            min(sample.total_rows, estimate * CARDINALITY_ERROR_FACTOR),
+        )
+        cardinality_ends = ({"unique_count": int(cardinality_interval[0])}, {"unique_count": int(math.ceil(cardinality_interval[1]))})
+        share_interval = tuple(value / total * 100 for value in cardinality_interval)
+        threshold = _straddles(share_interval, thresholds.unique_share)
+        if threshold is not None and _flips(decision, population, *cardinality_ends):
+            reasons.append(f"{name}: unique share near {threshold}%")
+        if not col.is_numeric:
+            threshold = _straddles(cardinality_interval, thresholds.cardinality)
+            if threshold is not None and _flips(decision, population, *cardinality_ends):
+                reasons.append(f"{name}: cardinality near {threshold}")
+        intervals[name] = entry
+
+    summary = {
+        "method": sample.method,
+        "sample_rows": sample.sample_rows,
+        "total_rows": sample.total_rows,
+        "confidence": 0.95,
+        "rows_with_nulls_percentage": rows_interval,
+        "intervals": intervals,
+    }
+    if sample.row_groups_read is not None:
+        summary["row_groups_read"] = list(sample.row_groups_read)
+    return summary, reasons
+
+
+def extrapolate_profile(profile: DatasetProfile, sample: DatasetSample) -> Tuple[DatasetProfile, Dict[str, int]]:
+    """Scale a sample profile to the full row count so threshold checks read population estimates.
+
+    Returns the scaled profile and the per-column distinct-count estimates.
+    """
+    if not sample.is_sampled or profile.total_rows == 0:
+        return profile, {}
+    factor = sample.total_rows / profile.total_rows
+    estimates: Dict[str, int] = {}
+    columns = {}
+    for name, col in profile.columns.items():
+        estimates[name] = estimate_cardinality(sample.frame[name], sample.total_rows)
+        columns[name] = replace(
+            col,
+            total_rows=sample.total_rows,
+            missing_count=int(round(col.missing_count * factor)),
+            outlier_count=int(round(col.outlier_count * factor)),
+            unique_count=estimates[name],
+        )
+    scaled = DatasetProfile(
+        total_rows=sample.total_rows,
+        columns=columns,
+        rows_with_any_null=int(round(profile.rows_with_any_null * factor)),
+        duplicate_rows=sample.duplicate_rows if sample.duplicate_rows is not None else _scaled(profile.duplicate_rows, factor),
+    )
+    return scaled, estimates
+
+
+def _scaled(value: Optional[int], factor: float) -> Optional[int]:
+    return None if value is None else int(round(value * factor))
+
+
+def profile_with_sampling(
+    source: Any,
+    filename: str,
+    *,
+    normalize: Callable[[pd.DataFrame], pd.DataFrame],
+    profiler: ColumnProfiler,
+    sample: bool = True,
+    sample_rows: Optional[int] = None,
+    method: str = "auto",
+    thresholds: Optional[SamplingThresholds] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> Tuple[pd.DataFrame, DatasetProfile, Optional[Dict[str, Any]]]:
+    """Profile a dataset from a sample, rescanning in full if a threshold is too close to call.
+
+    Returns ``(frame, profile, sampling)``: ``frame`` is the (normalized) data the profile
+    was computed on and ``sampling`` describes the sample, or is None for a full scan.
+    Parquet sources are only read for ``columns`` (all columns by default).
+    """
+    loaded = load_sample(source, filename, sample_rows, method if sample else "full", columns=columns)
+    loaded.frame = normalize(loaded.frame)
+    profile = profiler.profile(loaded.frame)
+    if not loaded.is_sampled:
+        return loaded.frame, profile, None
+
+    scaled, estimates = extrapolate_profile(profile, loaded)
+    sampling, reasons = sampling_summary(profile, loaded, thresholds, estimates)
+    sampling["escalated"] = bool(reasons)
+    sampling["escalation_reasons"] = reasons
+    if not reasons:
+        return loaded.frame, scaled, sampling
+
+    _rewind(source)
+    frame = normalize(read_frame(source, filename, columns))
+    return frame, profiler.profile(frame), sampling
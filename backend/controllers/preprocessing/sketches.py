@@ -0,0 +1,232 @@
+"""Mergeable sketches for IQR bounds, distribution summaries and mode fills.
+
+:class:`QuantileSketch` stores values exactly until it has seen ``exact_limit`` of them
+(so small and medium columns get the same answer as ``Series.quantile``) and then
+switches to a KLL compactor hierarchy whose size depends only on the accuracy bound.
+Sketches built over different chunks or partitions can be merged, which is what the
+streaming and parallel code paths rely on.
+
+:class:`FrequencySketch` does the same for value counts: exact up to ``capacity``
+distinct values, then a Misra-Gries summary that keeps every frequent value.
+"""
+import math
+import os
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Normalized rank error the KLL compactors aim for once a sketch stops being exact
+QUANTILE_SKETCH_EPSILON = float(os.getenv("QUANTILE_SKETCH_EPSILON", "0.01"))
+# Columns up to this many values are summarised exactly
+QUANTILE_SKETCH_EXACT_LIMIT = int(os.getenv("QUANTILE_SKETCH_EXACT_LIMIT", "200000"))
+# Distinct values a frequency sketch counts exactly before it drops rare ones
+FREQUENCY_SKETCH_CAPACITY = int(os.getenv("FREQUENCY_SKETCH_CAPACITY", "100000"))
+
+_CAPACITY_DECAY = 2.0 / 3.0
+_MIN_CAPACITY = 8
+
+
+def _k_for_epsilon(epsilon: float) -> int:
+    return max(_MIN_CAPACITY, int(math.ceil(2.0 / max(epsilon, 1e-6))))
+
+
+class QuantileSketch:
+    """KLL quantile sketch over float values with an exact small-data mode.
+
+    Also keeps count, mean and the sum of squared deviations (Chan et al. merge), so
+    z-score bounds come from the same pass.
+    """
+
+    def __init__(self, epsilon: Optional[float] = None, exact_limit: Optional[int] = None, seed: int = 0):
+        self.epsilon = QUANTILE_SKETCH_EPSILON if epsilon is None else float(epsilon)
+        self.exact_limit = QUANTILE_SKETCH_EXACT_LIMIT if exact_limit is None else int(exact_limit)
+        self.k = _k_for_epsilon(self.epsilon)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._exact = True
+        self._rng = np.random.default_rng(seed)
+
+    # ---- construction ---------------------------------------------------------
+    @classmethod
+    def from_values(cls, values, epsilon: Optional[float] = None, exact_limit: Optional[int] = None) -> "QuantileSketch":
+        sketch = cls(epsilon=epsilon, exact_limit=exact_limit)
+        sketch.update(values)
+        return sketch
+
+    def update(self, values) -> "QuantileSketch":
+        """Add values (NaNs are ignored)."""
+        arr = np.asarray(values, dtype=float).ravel()
+        arr = arr[~np.isnan(arr)]
+        if arr.size == 0:
+            return self
+        self._update_moments(arr.size, float(arr.mean()), float(((arr - arr.mean()) ** 2).sum()))
+        self._levels[0] = np.concatenate([self._levels[0], arr])
+        self._compress()
+        return self
+
+    def update_repeated(self, value: float, count: int, chunk: int = 1_000_000) -> "QuantileSketch":
+        """Add ``value`` ``count`` times without materialising one huge array."""
+        while count > 0:
+            step = min(count, chunk)
+            self.update(np.full(step, float(value)))
+            count -= step
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold ``other`` into this sketch; the result summarises both inputs."""
+        if other.count == 0:
+            return self
+        self._update_moments(other.count, other.mean, other.m2)
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for height, items in enumerate(other._levels):
+            if items.size:
+                self._levels[height] = np.concatenate([self._levels[height], items])
+        self._exact = self._exact and other._exact
+        self._compress()
+        return self
+
+    def _update_moments(self, n: int, mean: float, m2: float) -> None:
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    # ---- KLL compaction -------------------------------------------------------
+    def _capacity(self, height: int) -> int:
+        depth = len(self._levels) - height - 1
+        return max(_MIN_CAPACITY, int(math.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def _compress(self) -> None:
+        if self._exact:
+            if self._levels[0].size <= self.exact_limit and len(self._levels) == 1:
+                return
+            self._exact = False
+        height = 0
+        while height < len(self._levels):
+            items = self._levels[height]
+            if items.size > self._capacity(height):
+                if height + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                keep_odd = items.size % 2
+                survivors, items = items[:keep_odd], items[keep_odd:]
+                # Every other item is promoted with doubled weight
+                promoted = items[self._rng.integers(0, 2)::2]
+                self._levels[height] = survivors
+                self._levels[height + 1] = np.concatenate([self._levels[height + 1], promoted])
+            height += 1
+
+    # ---- queries --------------------------------------------------------------
+    @property
+    def is_exact(self) -> bool:
+        return self._exact
+
+    def std(self, ddof: int = 0) -> float:
+        if self.count - ddof <= 0:
+            return float("nan")
+        return math.sqrt(self.m2 / (self.count - ddof))
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Quantiles at ``qs``; linear interpolation while exact, weighted ranks after."""
+        qs = np.asarray(qs, dtype=float)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        if self._exact:
+            return np.quantile(self._levels[0], qs)
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(level.size, 2.0 ** h) for h, level in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        items, weights = items[order], weights[order]
+        cumulative = np.cumsum(weights)
+        targets = qs * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side="left")
+        return items[np.clip(positions, 0, items.size - 1)]
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def size_bytes(self) -> int:
+        return int(sum(level.nbytes for level in self._levels))
+
+
+class FrequencySketch:
+    """Misra-Gries heavy-hitters summary of value counts with an exact small-data mode.
+
+    Counts are exact while at most ``capacity`` distinct values have been seen. Past
+    that, every fold subtracts the ``capacity + 1``-th largest count from all counters
+    and drops the ones that reach zero, so memory and the cost of a fold stay
+    O(capacity) and every value seen more than ``total / (capacity + 1)`` times is
+    kept, undercounted by at most that much.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = max(1, FREQUENCY_SKETCH_CAPACITY if capacity is None else int(capacity))
+        self.total = 0
+        self.counts: Optional[pd.Series] = None
+        self._exact = True
+
+    def update(self, values: pd.Series) -> "FrequencySketch":
+        """Count the non-null values of ``values``."""
+        counts = values.value_counts(dropna=True)
+        counts = counts[counts > 0]
+        if counts.empty:
+            return self
+        self.total += int(counts.sum())
+        self._fold(counts)
+        return self
+
+    def merge(self, other: "FrequencySketch") -> "FrequencySketch":
+        if other.counts is None:
+            return self
+        self.total += other.total
+        self._exact = self._exact and other._exact
+        self._fold(other.counts)
+        return self
+
+    def _fold(self, counts: pd.Series) -> None:
+        merged = counts if self.counts is None else self.counts.add(counts, fill_value=0)
+        if len(merged) > self.capacity:
+            floor = merged.nlargest(self.capacity + 1).iloc[-1]
+            merged = merged[merged > floor] - floor
+            self._exact = False
+        self.counts = merged
+
+    @property
+    def is_exact(self) -> bool:
+        return self._exact
+
+    def most_common(self) -> Any:
+        """The most frequent value (the smallest one on ties, like ``Series.mode()``), or None."""
+        if self.counts is None or self.counts.empty:
+            return None
+        top = self.counts[self.counts == self.counts.max()].index
+        try:
+            return sorted(top)[0]
+        except TypeError:
+            return top[0]
+
+
+def merge_sketches(sketches: Iterable[QuantileSketch]) -> QuantileSketch:
+    merged = QuantileSketch()
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
+
+
+def sketch_series(series: pd.Series, epsilon: Optional[float] = None) -> QuantileSketch:
+    """Sketch the non-null values of a numeric series."""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return QuantileSketch.from_values(values, epsilon=epsilon)
+
+
+def iqr_bounds(source, factor: float = 1.5) -> Tuple[float, float]:
+    """``(lower, upper)`` Tukey fences from a series or an existing sketch."""
+    sketch = source if isinstance(source, QuantileSketch) else sketch_series(source)
+    q1, q3 = sketch.quantiles([0.25, 0.75])
+    iqr = q3 - q1
+    return float(q1 - factor * iqr), float(q3 + factor * iqr)
@@ -0,0 +1,126 @@
+"""Sparse columns: conversion to SciPy matrices and compact Parquet storage.
+
+Sparse one-hot encoding keeps its dummy columns as pandas ``Sparse[uint8, 0]`` so a
+column with thousands of levels costs one stored entry per row instead of one byte per
+row and level. Arrow has no sparse type, so :func:`write_parquet` stores every sparse
+column with a zero fill value as one CSR matrix: two list columns hold each row's
+column positions and values (the CSR ``indices``/``data`` with the list offsets as
+``indptr``), and the schema metadata records the sparse column names, their dtypes
+and the frame's column order. :func:`read_parquet` rebuilds the same frame; files
+without sparse columns are written and read exactly as before.
+
+:func:`to_model_matrix` hands a frame with sparse columns to estimators as a CSR
+matrix (dense columns included), in the frame's column order.
+"""
+import json
+from typing import Any, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy import sparse
+
+SPARSE_INDICES_COLUMN = "__sparse_indices__"
+SPARSE_VALUES_COLUMN = "__sparse_values__"
+SPARSE_METADATA_KEY = b"sparse_columns"
+
+
+def sparse_columns(df: pd.DataFrame) -> List[Any]:
+    """Columns stored as pandas sparse arrays with a zero fill value."""
+    return [
+        col for col, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.SparseDtype) and dtype.fill_value == 0
+    ]
+
+
+def has_sparse_columns(df: pd.DataFrame) -> bool:
+    return any(isinstance(dtype, pd.SparseDtype) for dtype in df.dtypes)
+
+
+def to_csr(df: pd.DataFrame, columns: Optional[List[Any]] = None) -> sparse.csr_matrix:
+    """CSR matrix of ``columns`` (all of ``df`` by default); dense columns are converted too."""
+    columns = list(df.columns if columns is None else columns)
+    sparse_set = set(sparse_columns(df))
+    blocks = []
+    for col in columns:
+        series = df[col]
+        if col in sparse_set:
+            blocks.append(_column_csc(series))
+        else:
+            blocks.append(sparse.csc_matrix(series.to_numpy(dtype=np.float64, na_value=np.nan).reshape(-1, 1)))
+    if not blocks:
+        return sparse.csr_matrix((len(df), 0))
+    return sparse.hstack(blocks, format="csr")
+
+
+def _column_csc(series: pd.Series) -> sparse.csc_matrix:
+    values = series.array
+    rows = values.sp_index.indices
+    return sparse.csc_matrix(
+        (values.sp_values, rows, np.array([0, len(rows)])), shape=(len(series), 1)
+    )
+
+
+def to_model_matrix(df: pd.DataFrame) -> Any:
+    """``df`` unchanged without sparse columns, else a float64 CSR matrix of every column."""
+    if not sparse_columns(df):
+        return df
+    return to_csr(df).astype(np.float64)
+
+
+def densify(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace sparse columns with dense ones for consumers that cannot take them."""
+    columns = [col for col, dtype in df.dtypes.items() if isinstance(dtype, pd.SparseDtype)]
+    if not columns:
+        return df
+    out = df.copy(deep=False)
+    for col in columns:
+        out[col] = df[col].sparse.to_dense()
+    return out
+
+
+def write_parquet(df: pd.DataFrame, path: Any) -> None:
+    """Write ``df`` to Parquet, storing its sparse columns as one CSR block."""
+    columns = sparse_columns(df)
+    if not columns:
+        densify(df).to_parquet(path, engine="pyarrow", index=False)
+        return
+    table = pa.Table.from_pandas(densify(df.drop(columns=columns)), preserve_index=False)
+    matrix = to_csr(df, columns)
+    value_dtype = np.result_type(*[df[col].dtype.subtype for col in columns])
+    offsets = pa.array(matrix.indptr.astype(np.int64))
+    table = table.append_column(
+        SPARSE_INDICES_COLUMN, pa.LargeListArray.from_arrays(offsets, pa.array(matrix.indices.astype(np.int32)))
+    )
+    table = table.append_column(
+        SPARSE_VALUES_COLUMN, pa.LargeListArray.from_arrays(offsets, pa.array(matrix.data.astype(value_dtype)))
+    )
+    layout = {
+        "columns": [str(col) for col in columns],
+        "dtypes": [str(df[col].dtype.subtype) for col in columns],
+        "order": [str(col) for col in df.columns],
+    }
+    metadata = {**(table.schema.metadata or {}), SPARSE_METADATA_KEY: json.dumps(layout).encode()}
+    pq.write_table(table.replace_schema_metadata(metadata), path)
+
+
+def read_parquet(source: Any) -> pd.DataFrame:
+    """Read a Parquet file written by :func:`write_parquet` (or any other Parquet file)."""
+    table = pq.read_table(source)
+    raw = (table.schema.metadata or {}).get(SPARSE_METADATA_KEY)
+    if raw is None:
+        return table.to_pandas()
+    layout = json.loads(raw)
+    indices = table.column(SPARSE_INDICES_COLUMN).combine_chunks()
+    values = table.column(SPARSE_VALUES_COLUMN).combine_chunks()
+    dense = table.drop_columns([SPARSE_INDICES_COLUMN, SPARSE_VALUES_COLUMN]).to_pandas()
+    matrix = sparse.csr_matrix(
+        (values.flatten().to_numpy(), indices.flatten().to_numpy(), indices.offsets.to_numpy()),
+        shape=(table.num_rows, len(layout["columns"])),
+    )
+    encoded = pd.DataFrame.sparse.from_spmatrix(matrix, index=dense.index, columns=layout["columns"])
+    encoded = encoded.astype({
+        col: pd.SparseDtype(np.dtype(dtype), 0) for col, dtype in zip(layout["columns"], layout["dtypes"])
+    })
+    return pd.concat([dense, encoded], axis=1)[layout["order"]]
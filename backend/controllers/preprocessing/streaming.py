@@ -0,0 +1,439 @@
+"""Out-of-core execution of a :class:`~.plan.PreprocessingPlan` over Parquet row groups.
+
+Large datasets never get loaded as one DataFrame. The file is read in record batches twice:
+
+1. **Statistics pass** - builds the duplicate/null keep-mask (packed per batch), and
+   gathers everything that needs the whole column: fill means, frequency sketches for
+   modes, quantile sketches for medians and outlier bounds (or, for multivariate outlier methods, a
+   bounded row sample to fit the detector on), over the rows that survive the earlier
+   filters. It also unifies each output column's Arrow type over every batch (an
+   all-null first batch, ints that later turn into floats or text), which fixes the
+   output schema before anything is written.
+2. **Transform pass** - re-reads each batch, applies the mask, fills, projection and
+   outlier bounds or detector scores, and appends the cleaned batch to the output Parquet file as its
+   own row group.
+
+Only the first ``head_rows`` rows of input and output are kept in memory so the caller
+can build previews and diffs exactly like the in-memory path.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import multivariate_outliers, remove_nulls, remove_outliers
+from .plan import PreprocessingPlan, ProgressCallback, compile_plan
+from .row_hashing import DuplicateTracker
+from .row_window import PARQUET_WRITE_OPTIONS
+from .sketches import FrequencySketch, QuantileSketch
+
+FrameHook = Callable[[pd.DataFrame], pd.DataFrame]
+
+MEMORY_BUDGET_BYTES = int(os.getenv("PREPROCESSING_MEMORY_BUDGET_MB", "2048")) * 1024 * 1024
+STREAMING_BATCH_ROWS = int(os.getenv("PREPROCESSING_STREAMING_BATCH_ROWS", "250000"))
+# The in-memory path holds the source frame, the cleaned frame and a sanitized copy at once
+WORKING_SET_FACTOR = 3
+ROW_WIDTH_SAMPLE_ROWS = 10000
+
+
+@dataclass
+class StreamingResult:
+    output_path: str
+    original_row_count: int
+    cleaned_row_count: int
+    change_metadata: List[Any]
+    original_head: pd.DataFrame
+    cleaned_head: pd.DataFrame
+    missing_counts: Dict[str, int] = field(default_factory=dict)
+    duplicate_rows: int = 0
+    batches: int = 0
+
+
+def estimate_frame_bytes(path: str) -> int:
+    """Estimate the in-memory size of the whole file from the footer row count and a sampled batch."""
+    parquet_file = pq.ParquetFile(path)
+    num_rows = parquet_file.metadata.num_rows
+    if num_rows == 0:
+        return 0
+    sample = next(parquet_file.iter_batches(batch_size=ROW_WIDTH_SAMPLE_ROWS)).to_pandas()
+    if len(sample) == 0:
+        return 0
+    row_width = sample.memory_usage(index=True, deep=True).sum() / len(sample)
+    return int(row_width * num_rows)
+
+
+def should_stream(path: str, budget_bytes: Optional[int] = None) -> bool:
+    """True when materialising ``path`` in memory would exceed the preprocessing budget."""
+    budget = MEMORY_BUDGET_BYTES if budget_bytes is None else budget_bytes
+    return estimate_frame_bytes(path) * WORKING_SET_FACTOR > budget
+
+
+def _identity(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame
+
+
+def _iter_frames(path: str, batch_rows: int, normalize: FrameHook) -> Iterator[pd.DataFrame]:
+    """Yield normalized batches with a global ``_orig_idx`` and a positional RangeIndex."""
+    parquet_file = pq.ParquetFile(path)
+    offset = 0
+    for batch in parquet_file.iter_batches(batch_size=batch_rows):
+        frame = batch.to_pandas()
+        if "_orig_idx" not in frame.columns:
+            if isinstance(frame.index, pd.RangeIndex):
+                frame.index = pd.RangeIndex(offset, offset + len(frame))
+            frame = frame.reset_index(drop=False).rename(columns={"index": "_orig_idx"})
+        frame = normalize(frame)
+        if "_orig_idx" not in frame.columns:
+            frame = frame.reset_index(drop=False).rename(columns={"index": "_orig_idx"})
+        frame.index = pd.RangeIndex(offset, offset + len(frame))
+        offset += len(frame)
+        yield frame
+
+
+def _empty_frame(path: str, normalize: FrameHook) -> pd.DataFrame:
+    frame = pq.ParquetFile(path).schema_arrow.empty_table().to_pandas()
+    if "_orig_idx" not in frame.columns:
+        frame = frame.reset_index(drop=False).rename(columns={"index": "_orig_idx"})
+    return normalize(frame)
+
+
+class _FillAccumulator:
+    """Mergeable running state for one column's fill statistic."""
+
+    def __init__(self, strategy: str, value: Any):
+        self.strategy = strategy
+        self.value = value
+        self.total = 0.0
+        self.count = 0
+        self.sketch = QuantileSketch()
+        self.frequencies = FrequencySketch()
+        self.numeric = True
+
+    def update(self, series: pd.Series) -> None:
+        if self.strategy in {"mean", "median"}:
+            if not pd.api.types.is_numeric_dtype(series):
+                self.numeric = False
+                return
+            values = series.dropna().to_numpy(dtype=float)
+            if self.strategy == "mean":
+                self.total += float(values.sum())
+                self.count += int(values.size)
+            else:
+                self.sketch.update(values)
+        elif self.strategy == "mode":
+            self.frequencies.update(series)
+
+    def result(self) -> Any:
+        if self.strategy == "custom":
+            return self.value
+        if self.strategy == "mean":
+            return self.total / self.count if self.numeric and self.count else None
+        if self.strategy == "median":
+            if not self.numeric or self.sketch.count == 0:
+                return None
+            return self.sketch.quantile(0.5)
+        if self.strategy == "mode":
+            return self.frequencies.most_common()
+        return None
+
+    @property
+    def approximate(self) -> bool:
+        """True when the statistic came from a sketch that is no longer exact."""
+        if self.strategy == "median":
+            return not self.sketch.is_exact
+        if self.strategy == "mode":
+            return not self.frequencies.is_exact
+        return False
+
+
+def _unify_type(current: Optional[pa.DataType], new: pa.DataType) -> pa.DataType:
+    """Common Arrow type of two batches' column types; conflicting types become strings."""
+    if current is None or current == new:
+        return new
+    try:
+        unified = pa.unify_schemas(
+            [pa.schema([("value", current)]), pa.schema([("value", new)])], promote_options="permissive"
+        )
+    except (pa.ArrowInvalid, pa.ArrowTypeError, NotImplementedError):
+        return pa.string()
+    return unified.field(0).type
+
+
+def _observe_types(column_types: Dict[str, pa.DataType], frame: pd.DataFrame) -> None:
+    """Fold the Arrow types ``frame`` would be written with into ``column_types``.
+
+    Only object columns are converted to infer their type; the rest map from the dtype.
+    """
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    for field_ in schema:
+        column_types[field_.name] = _unify_type(column_types.get(field_.name), field_.type)
+
+
+def _output_schema(columns: List[str], column_types: Dict[str, pa.DataType]) -> pa.Schema:
+    fields = []
+    for col in columns:
+        type_ = column_types.get(col, pa.null())
+        fields.append(pa.field(col, pa.string() if pa.types.is_null(type_) else type_))
+    return pa.schema(fields)
+
+
+def _write_batch(writer_state: Dict[str, Any], frame: pd.DataFrame, output_path: str) -> None:
+    """Append ``frame`` as a row group, cast to the output schema fixed before the first write."""
+    schema: pa.Schema = writer_state["schema"]
+    # Columns that are text elsewhere get the str() values sanitizing a mixed column produces
+    text = [col for col in frame.columns if pa.types.is_string(schema.field(col).type) and frame[col].dtype != object]
+    if text:
+        frame = frame.astype({col: object for col in text})
+        for col in text:
+            frame[col] = frame[col].map(lambda value: value if pd.isna(value) else str(value))
+    table = pa.Table.from_pandas(frame, preserve_index=False).replace_schema_metadata(None)
+    writer: Optional[pq.ParquetWriter] = writer_state.get("writer")
+    if writer is None:
+        writer = pq.ParquetWriter(output_path, schema, write_page_index=PARQUET_WRITE_OPTIONS["write_page_index"])
+        writer_state["writer"] = writer
+    writer.write_table(table.cast(schema), row_group_size=PARQUET_WRITE_OPTIONS["row_group_size"])
+
+
+def run_streaming_plan(
+    path: str,
+    steps: Optional[dict],
+    output_path: str,
+    *,
+    normalize: Optional[FrameHook] = None,
+    sanitize: Optional[FrameHook] = None,
+    head_rows: int = 5000,
+    batch_rows: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Tuple[PreprocessingPlan, StreamingResult]:
+    """Run the preprocessing ``steps`` over the Parquet file at ``path`` batch by batch.
+
+    ``normalize`` is applied to every input batch (e.g. missing-indicator cleanup) and
+    ``sanitize`` to every output batch before it is written. Returns the compiled plan and
+    a :class:`StreamingResult`; the change metadata has the same shape as ``execute_plan``.
+    """
+    normalize = normalize or _identity
+    sanitize = sanitize or _identity
+    batch_rows = batch_rows or STREAMING_BATCH_ROWS
+
+    def _progress(value: float, message: str) -> None:
+        if on_progress is not None:
+            on_progress(value, message)
+
+    total_rows = pq.ParquetFile(path).metadata.num_rows
+    frames = _iter_frames(path, batch_rows, normalize)
+    first = next(frames, None)
+    probe = first if first is not None else _empty_frame(path, normalize)
+    plan = compile_plan(steps, probe.columns)
+
+    duplicate_filter = next((f for f in plan.filters if f["type"] == "duplicates"), None)
+    null_filter = next((f for f in plan.filters if f["type"] == "nulls"), None)
+    accumulators = {
+        col: _FillAccumulator((spec.get("strategy") or "mean").lower(), spec.get("value"))
+        for col, spec in plan.fills.items()
+    }
+    outlier_method = None
+    outlier_factor = 1.5
+    target_cols: List[str] = []
+    if plan.outliers is not None:
+        outlier_method = (plan.outliers.get("method") or "iqr").lower()
+        outlier_factor = float(plan.outliers.get("factor", 1.5))
+        target_cols = remove_outliers.resolve_target_columns(probe[plan.projection], plan.outliers)
+    # Multivariate methods fit on a bounded row sample instead of per-column sketches
+    outlier_reservoir = None
+    if target_cols and multivariate_outliers.is_multivariate(outlier_method):
+        outlier_reservoir = multivariate_outliers.RowReservoir(target_cols, plan.outliers.get("sample_size"))
+        target_sketch_cols: List[str] = []
+    else:
+        target_sketch_cols = target_cols
+    outlier_sketches: Dict[str, QuantileSketch] = {col: QuantileSketch() for col in target_sketch_cols}
+    outlier_nulls: Dict[str, int] = {col: 0 for col in target_sketch_cols}
+
+    # ---- pass 1: global statistics ------------------------------------------------
+    duplicate_tracker = DuplicateTracker(duplicate_filter["columns"]) if duplicate_filter is not None else None
+    packed_masks: List[np.ndarray] = []
+    batch_lengths: List[int] = []
+    source_nulls: Dict[str, int] = {}
+    nulls_removed = 0
+    original_head: List[pd.DataFrame] = []
+    head_count = 0
+    processed = 0
+    # Output column types over every batch, so the writer's schema fits all of them
+    column_types: Dict[str, pa.DataType] = {}
+
+    def _all_frames() -> Iterator[pd.DataFrame]:
+        if first is not None:
+            yield first
+        yield from frames
+
+    for frame in _all_frames():
+        if head_count < head_rows:
+            original_head.append(frame.head(head_rows - head_count))
+            head_count += len(original_head[-1])
+        for col, count in frame.isna().sum().items():
+            source_nulls[col] = source_nulls.get(col, 0) + int(count)
+
+        keep = np.ones(len(frame), dtype=bool)
+        if duplicate_filter is not None:
+            keep &= duplicate_tracker.observe(frame)
+        if null_filter is not None:
+            null_keep = remove_nulls.keep_mask(frame, null_filter["columns"]).to_numpy()
+            nulls_removed += int((keep & ~null_keep).sum())
+            keep &= null_keep
+
+        survivors = frame[keep] if not keep.all() else frame
+        for col, acc in accumulators.items():
+            acc.update(survivors[col])
+        for col in target_sketch_cols:
+            series = survivors[col]
+            outlier_sketches[col].update(series.to_numpy(dtype=float, na_value=np.nan))
+            outlier_nulls[col] += int(series.isna().sum())
+        if outlier_reservoir is not None:
+            outlier_reservoir.update(survivors)
+        _observe_types(column_types, sanitize(survivors[plan.projection]))
+
+        packed_masks.append(np.packbits(keep))
+        batch_lengths.append(len(frame))
+        processed += len(frame)
+        if total_rows:
+            _progress(15 + 30 * processed / total_rows, f"Scanning dataset ({processed}/{total_rows} rows)")
+
+    change_metadata: List[Any] = []
+    if duplicate_filter is not None:
+        change_metadata.append({
+            "operation": "Remove Duplicates",
+            "rows_removed": duplicate_tracker.duplicate_rows,
+            "columns": duplicate_filter["columns"] or "all",
+        })
+    if null_filter is not None:
+        change_metadata.append({
+            "operation": "Remove Nulls",
+            "rows_removed": nulls_removed,
+            "columns": null_filter["columns"] or "all",
+        })
+
+    fill_values: Dict[str, Any] = {}
+    for col, acc in accumulators.items():
+        value = acc.result()
+        plan.fills[col]["value"] = value
+        fill_meta = {"operation": "Fill Nulls", "column": col, "strategy": acc.strategy, "value": value}
+        if acc.approximate:
+            fill_meta["approximate"] = True
+        change_metadata.append(fill_meta)
+        if value is not None:
+            fill_values[col] = value
+
+    if plan.dropped_columns:
+        change_metadata.append({"operation": "Drop Columns", "columns_dropped": list(plan.dropped_columns)})
+
+    bounds: Dict[str, Dict[str, Any]] = {}
+    detector: Optional[multivariate_outliers.OutlierDetector] = None
+    outlier_meta: Optional[Dict[str, Any]] = None
+    if plan.outliers is not None:
+        if not target_cols:
+            change_metadata.append("Remove Outliers: no numeric columns to process")
+        elif outlier_reservoir is not None:
+            sample = outlier_reservoir.frame()
+            if fill_values:
+                sample = sample.fillna({col: fill_values[col] for col in target_cols if col in fill_values})
+            if len(sample) < multivariate_outliers.MIN_FIT_ROWS and not plan.outliers.get("detector_id"):
+                change_metadata.append("Remove Outliers: too few rows for multivariate detection")
+            else:
+                detector = multivariate_outliers.resolve_detector(sample, target_cols, plan.outliers)
+                outlier_meta = multivariate_outliers.build_meta(detector, 0)
+                change_metadata.append(outlier_meta)
+        elif outlier_method not in {"iqr", "zscore"}:
+            change_metadata.append(f"Remove Outliers: unsupported method '{outlier_method}'")
+        else:
+            for col in target_cols:
+                sketch = outlier_sketches[col]
+                if col in fill_values and outlier_nulls[col]:
+                    sketch.update_repeated(fill_values[col], outlier_nulls[col])
+                bounds[col] = remove_outliers.bounds_from_sketch(sketch, outlier_method, outlier_factor)
+            outlier_meta = {
+                "operation": "Remove Outliers",
+                "method": "IQR" if outlier_method == "iqr" else "Z-Score",
+                "factor": outlier_factor,
+                "columns": target_cols,
+                "rows_removed": 0,
+                "bounds": bounds,
+            }
+            change_metadata.append(outlier_meta)
+
+    # Integer columns with nulls anywhere load as float64 in memory; keep every batch consistent
+    promote_to_float = [col for col in plan.projection if source_nulls.get(col, 0) > 0]
+    for col in promote_to_float:
+        if pa.types.is_integer(column_types.get(col, pa.null())):
+            column_types[col] = pa.float64()
+    # Fill values land in the output too; a string filled into a numeric column makes it text
+    for col, value in fill_values.items():
+        if col in plan.projection:
+            _observe_types(column_types, sanitize(pd.DataFrame({col: pd.Series([value], dtype=object)})))
+    if not column_types:
+        _observe_types(column_types, sanitize(probe.loc[:, plan.projection].head(0)))
+
+    # ---- pass 2: transform and write -------------------------------------------------
+    writer_state: Dict[str, Any] = {"schema": _output_schema(plan.projection, column_types)}
+    cleaned_head: List[pd.DataFrame] = []
+    cleaned_head_count = 0
+    cleaned_rows = 0
+    missing_counts: Dict[str, int] = {}
+    # Exact full-row duplicate count of the output for the quality report
+    output_duplicates = DuplicateTracker()
+    processed = 0
+    try:
+        for index, frame in enumerate(_iter_frames(path, batch_rows, normalize)):
+            keep = np.unpackbits(packed_masks[index], count=batch_lengths[index]).astype(bool)
+            out = frame.loc[keep, plan.projection]
+            promoted = {col: "float64" for col in promote_to_float if pd.api.types.is_integer_dtype(out[col])}
+            if promoted:
+                out = out.astype(promoted)
+            if fill_values:
+                out = out.fillna(value=fill_values)
+            # Copying passes over this batch: masked projection, promotion, fills, outlier filter
+            passes = 1 + bool(promoted) + bool(fill_values) + bool(bounds or detector is not None)
+            plan.materializations = max(plan.materializations or 0, passes)
+            if bounds or detector is not None:
+                if detector is not None:
+                    outlier_keep = detector.keep_mask(out)
+                else:
+                    outlier_keep = pd.Series(True, index=out.index)
+                    for col in target_cols:
+                        outlier_keep &= remove_outliers.mask_from_bounds(out[col], outlier_method, outlier_factor, bounds[col])
+                outlier_meta["rows_removed"] += int((~outlier_keep).sum())
+                out = out[outlier_keep]
+
+            if cleaned_head_count < head_rows:
+                cleaned_head.append(out.head(head_rows - cleaned_head_count))
+                cleaned_head_count += len(cleaned_head[-1])
+            for col, count in out.isna().sum().items():
+                missing_counts[col] = missing_counts.get(col, 0) + int(count)
+            output_duplicates.observe(out)
+            cleaned_rows += len(out)
+            _write_batch(writer_state, sanitize(out), output_path)
+
+            processed += len(frame)
+            if total_rows:
+                _progress(45 + 35 * processed / total_rows, f"Writing cleaned row groups ({processed}/{total_rows} rows)")
+        if writer_state.get("writer") is None:
+            empty = probe.loc[:, plan.projection].head(0)
+            _write_batch(writer_state, sanitize(empty), output_path)
+    finally:
+        if writer_state.get("writer") is not None:
+            writer_state["writer"].close()
+
+    result = StreamingResult(
+        output_path=output_path,
+        original_row_count=int(total_rows),
+        cleaned_row_count=int(cleaned_rows),
+        change_metadata=change_metadata,
+        original_head=pd.concat(original_head) if original_head else probe.head(0),
+        cleaned_head=pd.concat(cleaned_head) if cleaned_head else probe.loc[:, plan.projection].head(0),
+        missing_counts=missing_counts,
+        duplicate_rows=output_duplicates.duplicate_rows,
+        batches=len(batch_lengths),
+    )
+    return plan, result
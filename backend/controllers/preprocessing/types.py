@@ -17,6 +17,8 @@ class StepsPayload(TypedDict, total=False):
     fillNulls: bool
     fillStrategies: Dict[str, FillStrategyItem]
     dropColumns: List[str]
+    removeOutliers: bool
+    removeOutliersConfig: Dict
 
 
 class DiffMarks(TypedDict, total=False):
@@ -30,6 +32,9 @@ class PreprocessResult(TypedDict, total=False):
     full_data: Optional[List[Dict]]
     diff_marks: DiffMarks
     change_metadata: List[str]
+    execution_plan: Dict
+    execution_mode: str
+    cache_hit: bool
     quality_report: Dict
     temp_cleaned_path: Optional[str]
     cleaned_filename: Optional[str]
@@ -4,6 +4,7 @@ from fastapi import FastAPI
 from starlette.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+import pandas as pd
 
 # Ensure project root is on sys.path so `backend.*` imports work regardless of CWD
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -17,9 +18,15 @@ from backend.routes.auth_routes import router as auth_router
 from backend.routes.feature_engineering_routes import router as feature_engineering_router
 from backend.routes.model_training_routes import router as model_training_router
 from backend.routes.pipeline_routes import router as pipeline_router
+from backend.services import worker_pool
+from backend.services import tracing
 
 load_dotenv()
 
+# Copy-on-write: pipeline steps share column buffers until one is actually modified,
+# so they return new frames without defensive deep copies
+pd.set_option("mode.copy_on_write", True)
+
 app = FastAPI()
 
 # Allow CORS for frontend
@@ -38,3 +45,16 @@ app.include_router(feature_engineering_router, prefix="/api/feature-engineering"
 app.include_router(model_training_router, prefix="/api/model-training", tags=["Model Training"])
 app.include_router(auth_router)
 app.include_router(pipeline_router, prefix="/api/pipeline", tags=["Pipeline Runs"])
+
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    # Worker processes of JOB_WORKER_MODE=process (services.worker_pool)
+    worker_pool.shutdown()
+
+# Per-step timing/memory histograms (services.tracing), aggregated over API workers
+# and job worker processes
+from prometheus_client import make_asgi_app  # noqa: E402
+
+tracing.prune_metric_files()
+app.mount("/metrics", make_asgi_app(registry=tracing.metrics_registry()))
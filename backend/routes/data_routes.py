@@ -1,20 +1,28 @@
 # FastAPI route definitions for data-related endpoints
+import asyncio
 import logging
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, Response, WebSocket
 from backend.controllers import data_controller
+from backend.controllers.preprocessing.row_window import RowWindowError
 from backend.services import minio_service, sql_service, progress_tracker
+from backend.services.job_events import job_sse_response, stream_job_websocket
+from backend.services.job_responses import job_result_response, job_status_response
+from backend.services.job_scheduler import scheduler
 from backend.models.pydantic_models import UploadFromURLRequest, SQLConnectRequest, SQLWorkbenchRequest
 
 router = APIRouter()
 
 @router.post("/preprocess/{filename}")
-async def data_preprocessing(filename: str, request: Request, background_tasks: BackgroundTasks, full: bool = False):
+async def data_preprocessing(filename: str, request: Request, full: bool = False):
     body = await request.json()
     steps = body.get("steps", {})
     preprocessing = body.get("preprocessing")
 
     job_id = progress_tracker.create_job()
-    background_tasks.add_task(
+    scheduler.submit(
+        "preprocessing",
+        job_id,
         data_controller.run_preprocessing_job,
         job_id,
         filename,
@@ -26,11 +34,83 @@ async def data_preprocessing(filename: str, request: Request, background_tasks:
 
 
 @router.get("/preprocess/status/{job_id}")
-async def data_preprocessing_status(job_id: str):
-    job = progress_tracker.get_job(job_id)
-    if not job:
+async def data_preprocessing_status(job_id: str, include_result: bool = True):
+    response = job_status_response(job_id, include_result)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return response
+
+
+@router.post("/preprocess/cancel/{job_id}")
+async def data_preprocessing_cancel(job_id: str):
+    """Cancel a queued job, or ask a running one to stop at its next step."""
+    snapshot = scheduler.cancel(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return snapshot
+
+
+@router.get("/preprocess/result/{job_id}")
+async def data_preprocessing_result(job_id: str):
+    response = job_result_response(job_id)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Job result not found")
+    return response
+
+
+@router.get("/preprocess/events/{job_id}")
+async def data_preprocessing_events(job_id: str):
+    """Server-Sent Events stream of job progress, ending with a result reference."""
+    if not progress_tracker.get_job(job_id):
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    return job_sse_response(job_id, f"/api/data/preprocess/result/{job_id}")
+
+
+@router.websocket("/preprocess/ws/{job_id}")
+async def data_preprocessing_ws(websocket: WebSocket, job_id: str):
+    await stream_job_websocket(websocket, job_id, f"/api/data/preprocess/result/{job_id}")
+
+def _row_window_response(**kwargs):
+    try:
+        return data_controller.get_row_window(**kwargs)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except RowWindowError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/preprocess/rows/{job_id}")
+async def data_preprocessing_rows(
+    job_id: str,
+    offset: int = 0,
+    limit: int = 100,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    filters: Optional[str] = None,
+):
+    """Window of the job's staged cleaned dataset; ``filters`` is a JSON list of {column, op, value}."""
+    return await asyncio.to_thread(
+        _row_window_response,
+        job_id=job_id, offset=offset, limit=limit, sort_by=sort_by, descending=descending, filters=filters,
+    )
+
+
+@router.get("/rows/{filename}")
+async def data_rows(
+    filename: str,
+    offset: int = 0,
+    limit: int = 100,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    filters: Optional[str] = None,
+    bucket: str = "cleaned-data",
+):
+    """Window of a persisted Parquet dataset, read with range requests."""
+    return await asyncio.to_thread(
+        _row_window_response,
+        filename=filename, bucket=bucket, offset=offset, limit=limit, sort_by=sort_by, descending=descending, filters=filters,
+    )
+
 
 @router.post("/sql-list-databases")
 async def sql_list_databases_route(request_body: SQLConnectRequest):
@@ -98,10 +178,17 @@ async def upload_from_url_route(request: UploadFromURLRequest):
 
 @router.get("/preview/{filename}")
 async def data_preview(filename: str):
-    return data_controller.get_data_preview(filename)
+    return await scheduler.run("preview", data_controller.get_data_preview, filename)
 
 
 @router.get("/recommendations/{filename}")
-async def data_recommendations(filename: str):
+async def data_recommendations(
+    filename: str,
+    sample: bool = True,
+    sample_size: Optional[int] = None,
+    sample_method: str = "auto",
+):
     """Analyze dataset and return preprocessing suggestions (like feature engineering analyze)."""
-    return data_controller.get_preprocessing_recommendations(filename)
+    return await scheduler.run(
+        "preview", data_controller.get_preprocessing_recommendations, filename, sample, sample_size, sample_method
+    )
@@ -1,10 +1,14 @@
 import logging
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response
-from typing import Any, Dict
+from fastapi import APIRouter, HTTPException, Request, Response, WebSocket
+from typing import Any, Dict, Optional
 
 from backend.controllers.feature_engineering import controller as fe_controller
+from backend.controllers.feature_engineering.transformers import pipeline_object_name
 from backend.controllers.feature_engineering.types import RunFeatureEngineeringRequest
 from backend.services import minio_service, progress_tracker
+from backend.services.job_events import job_sse_response, stream_job_websocket
+from backend.services.job_responses import job_result_response, job_status_response
+from backend.services.job_scheduler import scheduler
 
 router = APIRouter()
 
@@ -19,10 +23,15 @@ async def list_cleaned_files_for_fe():
 
 
 @router.get("/analyze/{filename:path}")
-async def analyze_dataset_for_recommendations(filename: str):
+async def analyze_dataset_for_recommendations(
+    filename: str,
+    sample: bool = True,
+    sample_size: Optional[int] = None,
+    sample_method: str = "auto",
+):
     """Analyze dataset and provide feature engineering recommendations"""
     try:
-        return await fe_controller.get_dataset_analysis_with_recommendations(filename)
+        return await fe_controller.get_dataset_analysis_with_recommendations(filename, sample, sample_size, sample_method)
     except Exception as e:
         logging.error(f"Error analyzing dataset: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -38,7 +47,7 @@ async def feature_engineering_dataset_preview(filename: str, bucket: str = "clea
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/apply-feature-engineering/{filename}")
-async def apply_feature_engineering(filename: str, request: Request, background_tasks: BackgroundTasks):
+async def apply_feature_engineering(filename: str, request: Request):
     """Apply feature engineering and run as background job"""
     try:
         body = await request.json()
@@ -46,7 +55,9 @@ async def apply_feature_engineering(filename: str, request: Request, background_
 
         job_id = progress_tracker.create_job()
         fe_request = RunFeatureEngineeringRequest(filename=filename, steps=steps)
-        background_tasks.add_task(
+        scheduler.submit(
+            "feature_engineering",
+            job_id,
             fe_controller.run_feature_engineering_job,
             job_id,
             fe_request,
@@ -59,17 +70,50 @@ async def apply_feature_engineering(filename: str, request: Request, background_
 
 
 @router.get("/status/{job_id}")
-async def feature_engineering_job_status(job_id: str):
+async def feature_engineering_job_status(job_id: str, include_result: bool = True):
     """Get feature engineering job status"""
     try:
-        job = progress_tracker.get_job(job_id)
-        if not job:
+        response = job_status_response(job_id, include_result)
+        if response is None:
             raise HTTPException(status_code=404, detail="Job not found")
-        return job
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error getting feature engineering status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.post("/cancel/{job_id}")
+async def feature_engineering_job_cancel(job_id: str):
+    """Cancel a queued feature engineering job, or stop a running one after its current step"""
+    snapshot = scheduler.cancel(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return snapshot
+
+
+@router.get("/result/{job_id}")
+async def feature_engineering_job_result(job_id: str):
+    """Get the result of a completed feature engineering job"""
+    response = job_result_response(job_id)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Job result not found")
+    return response
+
+
+@router.get("/events/{job_id}")
+async def feature_engineering_job_events(job_id: str):
+    """Server-Sent Events stream of feature engineering progress"""
+    if not progress_tracker.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_sse_response(job_id, f"/api/feature-engineering/result/{job_id}")
+
+
+@router.websocket("/ws/{job_id}")
+async def feature_engineering_job_ws(websocket: WebSocket, job_id: str):
+    await stream_job_websocket(websocket, job_id, f"/api/feature-engineering/result/{job_id}")
+
 @router.post("/save-to-minio")
 async def save_feature_engineered_to_minio(request: Request):
     """Save feature engineered data to MinIO feature-engineered bucket"""
@@ -83,7 +127,12 @@ async def save_feature_engineered_to_minio(request: Request):
         
         if temp_path and filename:
             logging.info(f"Using save_feature_engineered_temp path: {temp_path} -> {filename}")
-            return minio_service.save_feature_engineered_temp(temp_path, filename)
+            return minio_service.save_feature_engineered_temp(
+                temp_path,
+                filename,
+                pipeline_path=pipeline_object_name(temp_path),
+                pipeline_filename=pipeline_object_name(filename),
+            )
 
         if data and filename:
             logging.info(f"Using save_data_to_minio path for {filename} (CSV data)")
@@ -97,6 +146,22 @@ async def save_feature_engineered_to_minio(request: Request):
 
 
 
+@router.post("/transform/{filename}")
+async def transform_with_saved_pipeline(filename: str, request: Request):
+    """Transform raw rows with the pipeline fitted for an engineered dataset (no refitting)"""
+    body = await request.json()
+    data = body.get("data", [])
+    if not data:
+        raise HTTPException(status_code=400, detail="No data provided")
+    try:
+        result = await fe_controller.transform_new_data(filename, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+
 @router.post("/download-csv")
 async def download_feature_engineered_csv(request: Request):
     """Download feature engineered dataset as CSV"""
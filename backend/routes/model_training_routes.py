@@ -1,7 +1,7 @@
 """FastAPI routes for model training"""
 import logging
 from typing import List
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, WebSocket
 
 from backend.controllers import model_training
 from backend.controllers.model_training.types import (
@@ -11,6 +11,9 @@ from backend.controllers.model_training.types import (
     TrainingConfig,
 )
 from backend.services import progress_tracker
+from backend.services.job_events import job_sse_response, stream_job_websocket
+from backend.services.job_responses import job_result_response, job_status_response
+from backend.services.job_scheduler import scheduler
 
 router = APIRouter()
 
@@ -49,7 +52,6 @@ async def get_training_recommendations(filename: str, target_column: str):
 async def start_training(
     filename: str,
     request: Request,
-    background_tasks: BackgroundTasks
 ):
     """
     Start model training job.
@@ -68,8 +70,10 @@ async def start_training(
         # Create job
         job_id = progress_tracker.create_job()
         
-        # Queue background training task
-        background_tasks.add_task(
+        # Queue training; it starts once a training slot is free
+        scheduler.submit(
+            "training",
+            job_id,
             model_training.run_training_job,
             job_id=job_id,
             filename=filename,
@@ -86,7 +90,7 @@ async def start_training(
             "job_id": job_id,
             "filename": filename,
             "target_column": config.target_column,
-            "message": "Training job started"
+            "message": "Training job queued"
         }
         
     except Exception as e:
@@ -95,12 +99,43 @@ async def start_training(
 
 
 @router.get("/training/status/{job_id}")
-async def get_training_status(job_id: str):
+async def get_training_status(job_id: str, include_result: bool = True):
     """Get status of training job"""
-    job = progress_tracker.get_job(job_id)
-    if not job:
+    response = job_status_response(job_id, include_result)
+    if response is None:
         raise HTTPException(status_code=404, detail="Training job not found")
-    return job
+    return response
+
+
+@router.post("/training/cancel/{job_id}")
+async def cancel_training(job_id: str):
+    """Cancel a queued training job, or stop a running one before its next model fit"""
+    snapshot = scheduler.cancel(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return snapshot
+
+
+@router.get("/training/result/{job_id}")
+async def get_training_result(job_id: str):
+    """Get the result of a completed training job"""
+    response = job_result_response(job_id)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Training result not found")
+    return response
+
+
+@router.get("/training/events/{job_id}")
+async def get_training_events(job_id: str):
+    """Server-Sent Events stream of training progress"""
+    if not progress_tracker.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job_sse_response(job_id, f"/api/model-training/training/result/{job_id}")
+
+
+@router.websocket("/training/ws/{job_id}")
+async def training_ws(websocket: WebSocket, job_id: str):
+    await stream_job_websocket(websocket, job_id, f"/api/model-training/training/result/{job_id}")
 
 
 @router.get("/training/models")
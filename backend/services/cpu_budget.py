@@ -0,0 +1,126 @@
+"""Core budget shared by concurrently running jobs.
+
+Estimators with ``n_jobs=-1``, BLAS thread pools and per-column executors each size
+themselves to the whole machine, so a few concurrent jobs start hundreds of runnable
+threads. The scheduler instead reserves a CPU quota for every job it starts:
+
+- a job asks for ``CPU_QUOTA_<KIND>`` cores and gets what is free (at least one) out
+  of ``CPU_BUDGET_CORES``; the cores return to the budget when the job ends,
+- code running inside the job reads its quota with :func:`current_quota` (a context
+  variable, so it follows the job into ``asyncio.to_thread``),
+- :func:`configure_estimator` overrides ``n_jobs``/``nthread``/``thread_count``,
+- BLAS/OpenMP pools are capped via ``threadpoolctl``. Those limits are process-wide:
+  a ``services.worker_pool`` process runs one job at a time and caps them at the
+  job's quota (:func:`use_quota`); a process running several jobs at once caps them
+  at the per-job share of the budget (:func:`limit_shared_process`).
+"""
+import contextlib
+import contextvars
+import itertools
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:  # pragma: no cover - threadpoolctl ships with scikit-learn
+    THREADPOOLCTL_AVAILABLE = False
+
+CPU_BUDGET_CORES = int(os.getenv("CPU_BUDGET_CORES", str(os.cpu_count() or 1)))
+DEFAULT_SHARES = {"preview": 0.25, "preprocessing": 0.5, "feature_engineering": 0.5, "training": 1.0}
+ESTIMATOR_THREAD_PARAMS = ("n_jobs", "nthread", "thread_count")
+
+_quota: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("cpu_quota", default=None)
+_shared_limits: Any = None
+
+
+def _requested(kind: str, total: int) -> int:
+    share = os.getenv(f"CPU_QUOTA_{kind.upper()}")
+    if share is not None:
+        return max(1, int(share))
+    return max(1, int(total * DEFAULT_SHARES.get(kind, 0.5)))
+
+
+class CoreBudget:
+    def __init__(self, total: Optional[int] = None):
+        self.total = max(1, total or CPU_BUDGET_CORES)
+        self._lock = threading.Lock()
+        self._granted: Dict[int, int] = {}
+        self._tokens = itertools.count(1)
+
+    @property
+    def free(self) -> int:
+        with self._lock:
+            return max(0, self.total - sum(self._granted.values()))
+
+    def acquire(self, kind: str) -> Tuple[int, int]:
+        """Reserve cores for a ``kind`` job; returns ``(token, cores)``."""
+        with self._lock:
+            free = self.total - sum(self._granted.values())
+            cores = max(1, min(_requested(kind, self.total), free))
+            token = next(self._tokens)
+            self._granted[token] = cores
+            return token, cores
+
+    def release(self, token: int) -> None:
+        with self._lock:
+            self._granted.pop(token, None)
+
+    @contextlib.contextmanager
+    def reserve(self, kind: str) -> Iterator[int]:
+        """Hold a quota for the block and expose it through :func:`current_quota`."""
+        token, cores = self.acquire(kind)
+        reset = _quota.set(cores)
+        try:
+            yield cores
+        finally:
+            _quota.reset(reset)
+            self.release(token)
+
+
+def current_quota(default: Optional[int] = None) -> int:
+    """Cores the running job may use (``default`` or all cores outside a job)."""
+    quota = _quota.get()
+    if quota is not None:
+        return quota
+    return default if default is not None else max(1, os.cpu_count() or 1)
+
+
+@contextlib.contextmanager
+def use_quota(cores: int) -> Iterator[int]:
+    """Run the block as the only job of this process, with ``cores`` granted by the API process."""
+    cores = max(1, int(cores))
+    reset = _quota.set(cores)
+    try:
+        with threadpool_limits(limits=cores) if THREADPOOLCTL_AVAILABLE else contextlib.nullcontext():
+            yield cores
+    finally:
+        _quota.reset(reset)
+
+
+def configure_estimator(estimator: Any, cores: Optional[int] = None) -> Any:
+    """Point the estimator's thread-count parameters at the job's quota."""
+    cores = cores or current_quota()
+    get_params = getattr(estimator, "get_params", None)
+    if get_params is None:
+        return estimator
+    params = get_params(deep=False)
+    overrides = {name: cores for name in ESTIMATOR_THREAD_PARAMS if name in params}
+    if overrides:
+        estimator.set_params(**overrides)
+    return estimator
+
+
+def limit_shared_process(max_concurrent_jobs: int, total: Optional[int] = None) -> None:
+    """Cap BLAS pools of a process running several jobs at their per-job share."""
+    global _shared_limits
+    if not THREADPOOLCTL_AVAILABLE or _shared_limits is not None:
+        return
+    share = max(1, (total or CPU_BUDGET_CORES) // max(1, max_concurrent_jobs))
+    _shared_limits = threadpool_limits(limits=share)
+    logging.info("Capped BLAS/OpenMP thread pools at %s threads", share)
+
+
+budget = CoreBudget()
@@ -0,0 +1,119 @@
+"""Push job progress to clients over Server-Sent Events or WebSockets.
+
+Each stream subscribes to ``progress_tracker`` updates for one job. Updates only set a
+flag, and the stream sends the latest snapshot at most ``max_rate`` times per second,
+so a burst of updates becomes one message. The stream ends with a ``result`` message
+that references the result endpoint instead of carrying the result itself.
+
+With a shared job store the job may run in another API worker whose updates never
+reach this process's listeners, so the stream also re-reads the snapshot every
+``JOB_STREAM_POLL_SECONDS``.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, Optional
+
+from starlette.responses import StreamingResponse
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from . import progress_tracker
+
+JOB_STREAM_MAX_RATE = float(os.getenv("JOB_STREAM_MAX_MESSAGES_PER_SECOND", "4"))
+JOB_STREAM_HEARTBEAT_SECONDS = float(os.getenv("JOB_STREAM_HEARTBEAT_SECONDS", "15"))
+JOB_STREAM_POLL_SECONDS = float(os.getenv("JOB_STREAM_POLL_SECONDS", "1"))
+
+
+def _result_reference(snapshot: Dict[str, Any], result_url: str) -> Dict[str, Any]:
+    return {
+        "job_id": snapshot["job_id"],
+        "status": snapshot["status"],
+        "error": snapshot.get("error"),
+        "result_url": result_url if snapshot.get("result_available") else None,
+        "result_size_bytes": snapshot.get("result_size_bytes"),
+        "artifacts": snapshot.get("artifacts", {}),
+    }
+
+
+async def job_events(
+    job_id: str,
+    result_url: str,
+    max_rate: Optional[float] = None,
+    heartbeat_seconds: Optional[float] = None,
+    poll_seconds: Optional[float] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield ``{"event", "data"}`` messages for ``job_id`` until it finishes.
+
+    Events are ``progress`` (the job snapshot), ``heartbeat`` when nothing changed
+    for ``heartbeat_seconds``, ``error`` for an unknown job, and a final ``result``.
+    """
+    interval = 1.0 / (max_rate or JOB_STREAM_MAX_RATE)
+    heartbeat_seconds = heartbeat_seconds or JOB_STREAM_HEARTBEAT_SECONDS
+    if poll_seconds is None and progress_tracker.job_store.shared:
+        poll_seconds = JOB_STREAM_POLL_SECONDS
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def _on_update(_snapshot: Dict[str, Any]) -> None:
+        loop.call_soon_threadsafe(changed.set)
+
+    unsubscribe = progress_tracker.subscribe(job_id, _on_update)
+    try:
+        last_version = None
+        last_sent = loop.time()
+        while True:
+            changed.clear()
+            snapshot = progress_tracker.get_job(job_id)
+            if snapshot is None:
+                yield {"event": "error", "data": {"job_id": job_id, "error": "Job not found"}}
+                return
+            if snapshot["version"] != last_version:
+                last_version = snapshot["version"]
+                last_sent = loop.time()
+                yield {"event": "progress", "data": snapshot}
+            if snapshot["status"] in progress_tracker.TERMINAL_STATUSES:
+                yield {"event": "result", "data": _result_reference(snapshot, result_url)}
+                return
+            if loop.time() - last_sent >= heartbeat_seconds:
+                last_sent = loop.time()
+                yield {"event": "heartbeat", "data": {"job_id": job_id}}
+            # Coalesce: whatever arrives during the interval is sent as one snapshot
+            await asyncio.sleep(interval)
+            timeout = max(0.0, heartbeat_seconds - (loop.time() - last_sent))
+            if poll_seconds:
+                timeout = min(timeout, poll_seconds)
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        unsubscribe()
+
+
+def format_sse(message: Dict[str, Any]) -> str:
+    return f"event: {message['event']}\ndata: {json.dumps(message['data'], default=str)}\n\n"
+
+
+async def _sse_body(job_id: str, result_url: str) -> AsyncIterator[str]:
+    async for message in job_events(job_id, result_url):
+        yield format_sse(message)
+
+
+def job_sse_response(job_id: str, result_url: str) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_body(job_id, result_url),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def stream_job_websocket(websocket: WebSocket, job_id: str, result_url: str) -> None:
+    """Send the same messages as the SSE stream as JSON frames, then close."""
+    await websocket.accept()
+    try:
+        async for message in job_events(job_id, result_url):
+            await websocket.send_text(json.dumps(message, default=str))
+        await websocket.close()
+    except WebSocketDisconnect:
+        logging.info("Progress websocket for job %s disconnected", job_id)
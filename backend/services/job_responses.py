@@ -0,0 +1,40 @@
+"""HTTP responses for tracked jobs that return stored results without decoding them."""
+from typing import Iterator, Optional
+
+from starlette.responses import Response, StreamingResponse
+
+from . import progress_tracker
+
+
+def _status_body(snapshot: dict, stored: Optional[progress_tracker.StoredResult]) -> Iterator[bytes]:
+    head = progress_tracker.encode_result(snapshot)
+    if stored is None:
+        yield head[:-1] + b', "result": null}'
+        return
+    yield head[:-1] + b', "result": '
+    yield from stored.iter_chunks()
+    yield b"}"
+
+
+def job_status_response(job_id: str, include_result: bool = True) -> Optional[Response]:
+    """Job progress snapshot; once completed, the stored result is spliced in as ``result``.
+
+    Returns ``None`` when the job is unknown so routes keep their own 404 wording.
+    """
+    snapshot = progress_tracker.get_job(job_id)
+    if snapshot is None:
+        return None
+    stored = progress_tracker.get_stored_result(job_id) if include_result else None
+    if stored is None or stored.data is not None:
+        return Response(content=b"".join(_status_body(snapshot, stored)), media_type="application/json")
+    return StreamingResponse(_status_body(snapshot, stored), media_type="application/json")
+
+
+def job_result_response(job_id: str) -> Optional[Response]:
+    """The stored result of a completed job as-is, or ``None`` if there is none."""
+    stored = progress_tracker.get_stored_result(job_id)
+    if stored is None:
+        return None
+    if stored.data is not None:
+        return Response(content=stored.data, media_type="application/json")
+    return StreamingResponse(stored.iter_chunks(), media_type="application/json")
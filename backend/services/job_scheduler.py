@@ -0,0 +1,183 @@
+"""Bounded, prioritized execution of background jobs.
+
+Jobs used to start immediately as FastAPI ``BackgroundTasks``; now they are queued
+here and started when both their kind and the scheduler have a free slot:
+
+- every kind has a concurrency limit (``SCHEDULER_LIMIT_<KIND>``) and the scheduler a
+  global one (``SCHEDULER_MAX_CONCURRENT``),
+- queued work starts in priority order, so interactive previews run ahead of
+  preprocessing and feature engineering, which run ahead of training,
+- queued jobs have their ``queue_position`` kept current in ``progress_tracker``,
+- every started job holds a CPU quota from ``services.cpu_budget`` while it runs,
+- :meth:`JobScheduler.cancel` drops a queued job or asks a running one to stop at its
+  next checkpoint (see ``progress_tracker.raise_if_cancelled``).
+
+The scheduler lives on the event loop: sync job functions run in worker threads (or,
+for tracked jobs with ``JOB_WORKER_MODE=process``, in ``services.worker_pool``
+processes), coroutine functions are awaited. Limits hold per API process: with
+several uvicorn workers sharing the job store, each runs its own scheduler, and a
+job queued by one worker can be cancelled through any other.
+"""
+import asyncio
+import inspect
+import itertools
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from . import cpu_budget, progress_tracker, worker_pool
+
+PRIORITIES = {"preview": 0, "preprocessing": 1, "feature_engineering": 1, "training": 2}
+DEFAULT_LIMITS = {"preview": 4, "preprocessing": 2, "feature_engineering": 2, "training": 1}
+SCHEDULER_MAX_CONCURRENT = int(os.getenv("SCHEDULER_MAX_CONCURRENT", str(max(2, os.cpu_count() or 1))))
+
+
+def _kind_limit(kind: str) -> int:
+    return int(os.getenv(f"SCHEDULER_LIMIT_{kind.upper()}", str(DEFAULT_LIMITS.get(kind, 1))))
+
+
+@dataclass(order=True)
+class _Task:
+    priority: int
+    sequence: int
+    kind: str = field(compare=False)
+    fn: Callable[..., Any] = field(compare=False)
+    args: tuple = field(compare=False, default=())
+    kwargs: Dict[str, Any] = field(compare=False, default_factory=dict)
+    job_id: Optional[str] = field(compare=False, default=None)
+    future: Optional[asyncio.Future] = field(compare=False, default=None)
+    # Last queue position published for the job
+    position: Optional[int] = field(compare=False, default=None)
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        max_concurrent: Optional[int] = None,
+        budget: Optional[cpu_budget.CoreBudget] = None,
+    ):
+        self.limits = dict(limits) if limits is not None else {kind: _kind_limit(kind) for kind in PRIORITIES}
+        self.max_concurrent = max_concurrent or SCHEDULER_MAX_CONCURRENT
+        self.budget = budget or cpu_budget.budget
+        self._pending: List[_Task] = []
+        self._running: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._sequence = itertools.count()
+
+    # ---- submission -----------------------------------------------------------
+    def submit(self, kind: str, job_id: str, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> None:
+        """Queue a tracked job; ``fn(*args, **kwargs)`` reports through ``progress_tracker``."""
+        self._enqueue(_Task(PRIORITIES.get(kind, max(PRIORITIES.values())), next(self._sequence), kind, fn, args, kwargs, job_id))
+
+    async def run(self, kind: str, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """Run untracked work (e.g. a preview) under the scheduler's limits and return its result."""
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(_Task(PRIORITIES.get(kind, max(PRIORITIES.values())), next(self._sequence), kind, fn, args, kwargs, None, future))
+        return await future
+
+    def _enqueue(self, task: _Task) -> None:
+        self._pending.append(task)
+        self._pending.sort()
+        self._dispatch()
+
+    # ---- cancellation ---------------------------------------------------------
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued job outright, or request a running one to stop."""
+        for task in self._pending:
+            if task.job_id == job_id:
+                self._pending.remove(task)
+                snapshot = progress_tracker.cancel_job(job_id)
+                self._publish_positions()
+                return snapshot
+        snapshot = progress_tracker.get_job(job_id)
+        if snapshot is None or snapshot["status"] in progress_tracker.TERMINAL_STATUSES:
+            return snapshot
+        if snapshot["status"] == "queued":
+            # Queued by another API worker sharing the job store; it drops the job on dispatch
+            return progress_tracker.cancel_job(job_id)
+        return progress_tracker.request_cancel(job_id)
+
+    # ---- dispatch -------------------------------------------------------------
+    def _has_capacity(self, kind: str) -> bool:
+        return (
+            sum(self._running.values()) < self.max_concurrent
+            and self._running.get(kind, 0) < self.limits.get(kind, 1)
+        )
+
+    def _dispatch(self) -> None:
+        started = False
+        for task in list(self._pending):
+            if sum(self._running.values()) >= self.max_concurrent:
+                break
+            if not self._has_capacity(task.kind):
+                continue
+            self._pending.remove(task)
+            if task.job_id and self._already_finished(task.job_id):
+                continue
+            self._running[task.kind] = self._running.get(task.kind, 0) + 1
+            runner = asyncio.get_running_loop().create_task(self._execute(task))
+            self._tasks.add(runner)
+            runner.add_done_callback(self._tasks.discard)
+            started = True
+        if started or self._pending:
+            self._publish_positions()
+
+    @staticmethod
+    def _already_finished(job_id: str) -> bool:
+        snapshot = progress_tracker.get_job(job_id)
+        return snapshot is None or snapshot["status"] in progress_tracker.TERMINAL_STATUSES
+
+    def _publish_positions(self) -> None:
+        position = 0
+        for task in self._pending:
+            if not task.job_id:
+                continue
+            position += 1
+            if task.position == position:
+                continue
+            task.position = position
+            try:
+                progress_tracker.set_queue_position(task.job_id, position)
+            except progress_tracker.JobNotFoundError:
+                logging.warning("Queued job %s is no longer tracked", task.job_id)
+
+    async def _execute(self, task: _Task) -> None:
+        try:
+            if task.job_id:
+                try:
+                    progress_tracker.set_queue_position(task.job_id, None)
+                except progress_tracker.JobNotFoundError:
+                    logging.warning("Scheduled job %s is no longer tracked", task.job_id)
+            with self.budget.reserve(task.kind) as cores:
+                if task.job_id and worker_pool.enabled():
+                    result = await worker_pool.run(task.job_id, cores, task.fn, *task.args, **task.kwargs)
+                else:
+                    cpu_budget.limit_shared_process(self.max_concurrent, self.budget.total)
+                    if inspect.iscoroutinefunction(task.fn):
+                        result = await task.fn(*task.args, **task.kwargs)
+                    else:
+                        result = await asyncio.to_thread(task.fn, *task.args, **task.kwargs)
+            if task.future is not None and not task.future.done():
+                task.future.set_result(result)
+        except Exception as exc:  # noqa: BLE001 - delivered to the awaiting caller or logged
+            if task.future is not None and not task.future.done():
+                task.future.set_exception(exc)
+            else:
+                logging.exception("Scheduled %s job %s failed", task.kind, task.job_id)
+        finally:
+            self._running[task.kind] -= 1
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": dict(self._running),
+            "queued": [{"kind": task.kind, "job_id": task.job_id} for task in self._pending],
+            "limits": dict(self.limits),
+            "max_concurrent": self.max_concurrent,
+            "free_cores": self.budget.free,
+        }
+
+
+scheduler = JobScheduler()
@@ -0,0 +1,316 @@
+"""Pluggable key/value store for job state, job results and cached models.
+
+Entries live in a namespace (``jobs``, ``results``, ``models``) and carry an optional
+TTL, so finished work expires on its own instead of accumulating for the lifetime of
+the process. Two backends:
+
+- :class:`MemoryJobStore` keeps values as Python objects with TTL plus per-namespace
+  entry/byte caps (least recently used entries are evicted first),
+- :class:`SQLiteJobStore` serializes values into a local SQLite file so jobs survive
+  worker restarts.
+
+Values that own external resources expose ``discard()``; stores call it when an entry
+expires, is evicted or is deleted. Pick the backend with ``JOB_STORE_BACKEND``
+(``memory``, ``sqlite`` or ``auto``) and ``JOB_STORE_PATH``. ``auto`` (the default)
+uses SQLite when ``WEB_CONCURRENCY`` asks for several API workers: every worker then
+opens the same file, so a status poll or model save can land on any of them.
+"""
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "auto").lower()
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "automl-job-store.sqlite3"))
+# Expired entries are swept at most this often on writes
+PURGE_INTERVAL_SECONDS = 30
+
+Codec = Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]
+Updater = Callable[[Optional[Any]], Any]
+TTL = Optional[Any]  # seconds, or a callable mapping the new value to seconds
+
+JSON_CODEC: Codec = (lambda value: json.dumps(value).encode("utf-8"), lambda data: json.loads(data))
+PICKLE_CODEC: Codec = (lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads)
+
+# Serialization per namespace for backends that store bytes (default: pickle)
+_CODECS: Dict[str, Codec] = {}
+
+
+def register_codec(namespace: str, codec: Codec) -> None:
+    _CODECS[namespace] = codec
+
+
+def _resolve_ttl(ttl_seconds: TTL, value: Any) -> Optional[float]:
+    return ttl_seconds(value) if callable(ttl_seconds) else ttl_seconds
+
+
+def _discard(value: Any) -> None:
+    discard = getattr(value, "discard", None)
+    if callable(discard):
+        try:
+            discard()
+        except OSError:
+            logging.warning("Failed to release expired job store value", exc_info=True)
+
+
+class JobStore:
+    """Interface shared by the backends; a networked store can implement the same methods."""
+
+    #: True when values are held as live objects (no serialization round trip)
+    keeps_objects = False
+    #: True when other processes read and write the same entries
+    shared = False
+
+    def set_limits(self, namespace: str, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """Cap ``namespace``; backends without a memory footprint may ignore this."""
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def put(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None, size: int = 0) -> None:
+        raise NotImplementedError
+
+    def update(self, namespace: str, key: str, updater: Updater, ttl_seconds: TTL = None) -> Any:
+        """Atomically replace the value with ``updater(current)`` and return it.
+
+        ``updater`` may raise to abort without writing; ``ttl_seconds`` may be a
+        callable of the new value.
+        """
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> None:
+        raise NotImplementedError
+
+    def pop(self, namespace: str, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def keys(self, namespace: str) -> List[str]:
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryJobStore(JobStore):
+    keeps_objects = True
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._entries: Dict[str, "OrderedDict[str, Tuple[Any, Optional[float], int]]"] = {}
+        self._limits: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+        self._bytes: Dict[str, int] = {}
+        self._last_purge = clock()
+
+    def set_limits(self, namespace: str, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        with self._lock:
+            self._limits[namespace] = (max_entries, max_bytes)
+            self._enforce_limits(namespace)
+
+    def _namespace(self, namespace: str) -> "OrderedDict[str, Tuple[Any, Optional[float], int]]":
+        return self._entries.setdefault(namespace, OrderedDict())
+
+    def _remove(self, namespace: str, key: str) -> Optional[Any]:
+        entry = self._namespace(namespace).pop(key, None)
+        if entry is None:
+            return None
+        self._bytes[namespace] = self._bytes.get(namespace, 0) - entry[2]
+        return entry[0]
+
+    def _live(self, namespace: str, key: str) -> Optional[Tuple[Any, Optional[float], int]]:
+        entry = self._namespace(namespace).get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= self._clock():
+            _discard(self._remove(namespace, key))
+            return None
+        return entry
+
+    def _store(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float], size: int) -> None:
+        previous = self._remove(namespace, key)
+        if previous is not None and previous is not value:
+            _discard(previous)
+        expires_at = self._clock() + ttl_seconds if ttl_seconds is not None else None
+        self._namespace(namespace)[key] = (value, expires_at, int(size))
+        self._bytes[namespace] = self._bytes.get(namespace, 0) + int(size)
+        self._enforce_limits(namespace)
+        if self._clock() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+
+    def _enforce_limits(self, namespace: str) -> None:
+        max_entries, max_bytes = self._limits.get(namespace, (None, None))
+        entries = self._namespace(namespace)
+        while entries and (
+            (max_entries is not None and len(entries) > max_entries)
+            or (max_bytes is not None and self._bytes.get(namespace, 0) > max_bytes and len(entries) > 1)
+        ):
+            key = next(iter(entries))
+            logging.info("Evicting %s/%s from the job store", namespace, key)
+            _discard(self._remove(namespace, key))
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._live(namespace, key)
+            if entry is None:
+                return None
+            self._namespace(namespace).move_to_end(key)
+            return entry[0]
+
+    def put(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None, size: int = 0) -> None:
+        with self._lock:
+            self._store(namespace, key, value, ttl_seconds, size)
+
+    def update(self, namespace: str, key: str, updater: Updater, ttl_seconds: TTL = None) -> Any:
+        with self._lock:
+            entry = self._live(namespace, key)
+            value = updater(entry[0] if entry is not None else None)
+            self._store(namespace, key, value, _resolve_ttl(ttl_seconds, value), entry[2] if entry is not None else 0)
+            return value
+
+    def delete(self, namespace: str, key: str) -> None:
+        _discard(self.pop(namespace, key))
+
+    def pop(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._remove(namespace, key) if self._live(namespace, key) is not None else None
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            return [key for key in list(self._namespace(namespace)) if self._live(namespace, key) is not None]
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            now = self._clock()
+            self._last_purge = now
+            removed = 0
+            for namespace, entries in self._entries.items():
+                for key in [k for k, (_, expires_at, _) in entries.items() if expires_at is not None and expires_at <= now]:
+                    _discard(self._remove(namespace, key))
+                    removed += 1
+            return removed
+
+
+class SQLiteJobStore(JobStore):
+    """Durable store in one SQLite file (WAL mode, one connection per thread).
+
+    Any number of processes on the host may open the same file.
+    """
+
+    shared = True
+
+    def __init__(self, path: str = JOB_STORE_PATH, clock: Callable[[], float] = time.time):
+        self.path = path
+        self._clock = clock
+        self._local = threading.local()
+        self._last_purge = 0.0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+                " expires_at REAL, updated_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_expiry ON entries (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _codec(self, namespace: str) -> Codec:
+        return _CODECS.get(namespace, PICKLE_CODEC)
+
+    def _expiry(self, ttl_seconds: Optional[float]) -> Optional[float]:
+        return self._clock() + ttl_seconds if ttl_seconds is not None else None
+
+    def _select(self, conn: sqlite3.Connection, namespace: str, key: str) -> Optional[Any]:
+        row = conn.execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, self._clock()),
+        ).fetchone()
+        return self._codec(namespace)[1](row[0]) if row is not None else None
+
+    def _write(self, conn: sqlite3.Connection, namespace: str, key: str, value: Any, ttl_seconds: Optional[float]) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, sqlite3.Binary(self._codec(namespace)[0](value)), self._expiry(ttl_seconds), self._clock()),
+        )
+
+    def _maybe_purge(self) -> None:
+        if self._clock() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        return self._select(self._connection(), namespace, key)
+
+    def put(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None, size: int = 0) -> None:
+        self._write(self._connection(), namespace, key, value, ttl_seconds)
+        # The store now holds its own serialized copy; release what the value owned
+        _discard(value)
+        self._maybe_purge()
+
+    def update(self, namespace: str, key: str, updater: Updater, ttl_seconds: TTL = None) -> Any:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            value = updater(self._select(conn, namespace, key))
+            self._write(conn, namespace, key, value, _resolve_ttl(ttl_seconds, value))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self._maybe_purge()
+        return value
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._connection().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def pop(self, namespace: str, key: str) -> Optional[Any]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            value = self._select(conn, namespace, key)
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return value
+
+    def keys(self, namespace: str) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT key FROM entries WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, self._clock()),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def purge_expired(self) -> int:
+        self._last_purge = self._clock()
+        cursor = self._connection().execute(
+            "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (self._last_purge,)
+        )
+        return cursor.rowcount
+
+
+def create_job_store(backend: str = JOB_STORE_BACKEND, path: str = JOB_STORE_PATH) -> JobStore:
+    if backend == "auto":
+        backend = "sqlite" if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 else "memory"
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore(path)
+    raise ValueError(f"Unknown JOB_STORE_BACKEND: {backend}")
+
+
+job_store: JobStore = create_job_store()
@@ -3,9 +3,13 @@ import io
 import os
 import logging
 import pandas as pd
+import pyarrow.parquet as pq
 import tempfile
 from typing import Optional, Tuple
 
+from backend.controllers.preprocessing import multivariate_outliers
+from backend.controllers.preprocessing.sparse_frames import densify, read_parquet
+
 def ensure_bucket_exists(bucket_name: str):
     if not minio_client.bucket_exists(bucket_name):
         minio_client.make_bucket(bucket_name)
@@ -41,6 +45,8 @@ def list_files(folder: str = None):
                 # For root folder listing, only include files that are not in subfolders
                 if folder is None and '/' in obj.object_name:
                     continue  # Skip files in subfolders
+                if obj.object_name.startswith(multivariate_outliers.DETECTOR_OBJECT_PREFIX):
+                    continue  # Fitted outlier detectors are not datasets
                 files.append({
                     "name": obj.object_name,
                     "lastModified": getattr(obj, 'last_modified', None),
@@ -81,6 +87,10 @@ def save_cleaned_to_minio(temp_cleaned_path: str, cleaned_filename: str):
         logging.info(f"Verified uploaded file has {len(uploaded_df)} rows")
         resp.close()
         resp.release_conn()
+
+        detector_id = multivariate_outliers.publish_staged_detector(temp_cleaned_path)
+        if detector_id:
+            logging.info(f"Saved outlier detector {detector_id} with {cleaned_filename}")
         
         return {"message": f"{cleaned_filename} saved to Minio bucket {output_bucket}."}
     except Exception as e:
@@ -109,15 +119,22 @@ def save_data_to_minio(data: str, filename: str, folder: str = "cleaned-data"):
         logging.error(f"Error saving data to Minio: {e}")
         return {"error": f"Error saving data to Minio: {e}"}
 
-def save_feature_engineered_temp(temp_path: str, filename: str, bucket: str = "feature-engineered"):
+def save_feature_engineered_temp(
+    temp_path: str,
+    filename: str,
+    bucket: str = "feature-engineered",
+    pipeline_path: Optional[str] = None,
+    pipeline_filename: Optional[str] = None,
+):
+    """Upload a staged engineered dataset, plus its fitted pipeline file when one was staged."""
     try:
         if not os.path.exists(temp_path):
             return {"error": "Temporary engineered file not found."}
         
         # Verify file contents before uploading
         import pandas as pd
-        verify_df = pd.read_parquet(temp_path)
-        logging.info(f"Uploading feature engineered file with {len(verify_df)} rows to MinIO as {filename}")
+        # Footer only: sparse one-hot columns are stored as list columns that pandas would expand per row
+        logging.info(f"Uploading feature engineered file with {pq.read_metadata(temp_path).num_rows} rows to MinIO as {filename}")
         
         if not minio_client.bucket_exists(bucket):
             minio_client.make_bucket(bucket)
@@ -132,12 +149,16 @@ def save_feature_engineered_temp(temp_path: str, filename: str, bucket: str = "f
         import io
         resp = minio_client.get_object(bucket, filename)
         data = io.BytesIO(resp.read())
-        uploaded_df = pd.read_parquet(data)
-        logging.info(f"Verified uploaded engineered file has {len(uploaded_df)} rows")
+        logging.info(f"Verified uploaded engineered file has {pq.read_metadata(data).num_rows} rows")
         resp.close()
         resp.release_conn()
         
         os.unlink(temp_path)
+
+        if pipeline_path and pipeline_filename and os.path.exists(pipeline_path):
+            minio_client.fput_object(bucket, pipeline_filename, pipeline_path, content_type="application/octet-stream")
+            os.unlink(pipeline_path)
+            logging.info(f"Saved fitted feature engineering pipeline as {pipeline_filename}")
         return {"message": f"{filename} saved to Minio bucket {bucket}."}
     except Exception as e:
         logging.error(f"Error saving engineered file to Minio: {e}")
@@ -164,7 +185,7 @@ def download_cleaned_file(filename: str):
 def _read_dataframe_from_path(path: str) -> pd.DataFrame:
     lower = path.lower()
     if lower.endswith(".parquet"):
-        return pd.read_parquet(path, engine="pyarrow")
+        return densify(read_parquet(path))
     if lower.endswith(".csv"):
         return pd.read_csv(path)
     if lower.endswith(".xlsx"):
@@ -178,7 +199,7 @@ def _read_dataframe_from_bytes(data: bytes, filename: str) -> pd.DataFrame:
     lower = filename.lower()
     buffer = io.BytesIO(data)
     if lower.endswith(".parquet"):
-        return pd.read_parquet(buffer, engine="pyarrow")
+        return densify(read_parquet(buffer))
     if lower.endswith(".csv"):
         return pd.read_csv(buffer)
     if lower.endswith(".xlsx"):
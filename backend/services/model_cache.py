@@ -1,23 +1,28 @@
-"""In-memory cache for unsaved trained models and metadata.
-Thread-safe store keyed by job_id.
+"""Cache for unsaved trained models and metadata, keyed by job_id.
+
+Entries live in the ``models`` namespace of ``services.job_store``: they expire after
+``MODEL_CACHE_TTL_SECONDS`` and at most ``MODEL_CACHE_MAX_ENTRIES`` are kept (least
+recently used first out) by the in-memory store.
 """
-from threading import Lock
+import os
 from typing import Any, Dict, Optional
 
-_store: Dict[str, Dict[str, Any]] = {}
-_lock = Lock()
+from .job_store import job_store
+
+MODEL_CACHE_TTL_SECONDS = float(os.getenv("MODEL_CACHE_TTL_SECONDS", "3600"))
+MODEL_CACHE_MAX_ENTRIES = int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "8"))
+
+MODELS = "models"
+job_store.set_limits(MODELS, max_entries=MODEL_CACHE_MAX_ENTRIES)
 
 
 def put(job_id: str, payload: Dict[str, Any]) -> None:
-    with _lock:
-        _store[job_id] = payload
+    job_store.put(MODELS, job_id, payload, ttl_seconds=MODEL_CACHE_TTL_SECONDS)
 
 
 def get(job_id: str) -> Optional[Dict[str, Any]]:
-    with _lock:
-        return _store.get(job_id)
+    return job_store.get(MODELS, job_id)
 
 
 def pop(job_id: str) -> Optional[Dict[str, Any]]:
-    with _lock:
-        return _store.pop(job_id, None)
+    return job_store.pop(MODELS, job_id)
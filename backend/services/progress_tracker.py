@@ -1,22 +1,201 @@
-import copy
+"""Job tracker shared by the preprocessing, feature engineering and training jobs.
+
+Progress state is kept as small snapshots that are replaced, never mutated, so readers
+get them without copying. Job results are serialized to JSON once on completion and
+stored out of line: as bytes, or spilled to a file above ``RESULT_SPILL_BYTES``. Status
+polls therefore never copy the result; the routes stream the stored bytes (see
+``services.job_responses``).
+
+Snapshots and results live in ``services.job_store`` (``jobs`` and ``results``
+namespaces). Finished jobs expire after ``JOB_TTL_SECONDS``; unfinished ones after
+``JOB_ACTIVE_TTL_SECONDS`` without an update.
+"""
+import json
+import logging
+import math
+import os
+import tempfile
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from threading import Lock
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .job_store import JSON_CODEC, job_store, register_codec
+
+RESULT_SPILL_BYTES = int(os.getenv("JOB_RESULT_SPILL_MB", "16")) * 1024 * 1024
+RESULT_SPILL_DIR = os.getenv("JOB_RESULT_SPILL_DIR", os.path.join(tempfile.gettempdir(), "job-results"))
+RESULT_CHUNK_BYTES = 1024 * 1024
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", str(6 * 3600)))
+JOB_ACTIVE_TTL_SECONDS = float(os.getenv("JOB_ACTIVE_TTL_SECONDS", str(24 * 3600)))
+JOB_STORE_MAX_JOBS = int(os.getenv("JOB_STORE_MAX_JOBS", "10000"))
+JOB_RESULT_STORE_MAX_BYTES = int(os.getenv("JOB_RESULT_STORE_MAX_MB", "1024")) * 1024 * 1024
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+Listener = Callable[[Dict[str, Any]], None]
 
 
 class JobNotFoundError(KeyError):
     """Raised when attempting to access a job that does not exist."""
 
 
+class JobCancelled(Exception):
+    """Raised at a cancellation checkpoint of a job whose cancellation was requested."""
+
+
+@dataclass(frozen=True)
+class StoredResult:
+    """A job result serialized once: in memory (``data``) or spilled to ``path``."""
+
+    size: int
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+
+    def read(self) -> bytes:
+        if self.data is not None:
+            return self.data
+        with open(self.path, "rb") as handle:
+            return handle.read()
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        if self.data is not None:
+            yield self.data
+            return
+        with open(self.path, "rb") as handle:
+            while chunk := handle.read(RESULT_CHUNK_BYTES):
+                yield chunk
+
+    def discard(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
 _lock = Lock()
-_jobs: Dict[str, Dict[str, Any]] = {}
+_listeners: Dict[str, List[Listener]] = {}
+# Set in worker processes: hands every snapshot to the API process (see services.worker_pool)
+_forward: Optional[Callable[[str, Dict[str, Any]], None]] = None
+
+JOBS, RESULTS = "jobs", "results"
+register_codec(JOBS, JSON_CODEC)
+register_codec(RESULTS, (lambda stored: stored.read(), lambda data: StoredResult(size=len(data), data=bytes(data))))
+job_store.set_limits(JOBS, max_entries=JOB_STORE_MAX_JOBS)
+job_store.set_limits(RESULTS, max_bytes=JOB_RESULT_STORE_MAX_BYTES)
 
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def _finite(value: Any) -> Any:
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def encode_result(result: Any) -> bytes:
+    """Serialize a job result to strict JSON (non-finite floats become null)."""
+    try:
+        return json.dumps(result, default=_json_default, allow_nan=False).encode("utf-8")
+    except ValueError:
+        round_trip = json.loads(json.dumps(result, default=_json_default))
+        return json.dumps(_finite(round_trip), allow_nan=False).encode("utf-8")
+
+
+def _store_result(job_id: str, result: Any) -> Optional[StoredResult]:
+    if result is None:
+        return None
+    data = encode_result(result)
+    # Serializing stores keep results on disk already; spilling is for the memory store
+    if len(data) <= RESULT_SPILL_BYTES or not job_store.keeps_objects:
+        return StoredResult(size=len(data), data=data)
+    os.makedirs(RESULT_SPILL_DIR, exist_ok=True)
+    path = os.path.join(RESULT_SPILL_DIR, f"{job_id}.json")
+    with open(path, "wb") as handle:
+        handle.write(data)
+    logging.info("Spilled %s byte result of job %s to %s", len(data), job_id, path)
+    return StoredResult(size=len(data), path=path)
+
+
+def _ttl(job: Dict[str, Any]) -> float:
+    return JOB_TTL_SECONDS if job["status"] in TERMINAL_STATUSES else JOB_ACTIVE_TTL_SECONDS
+
+
+def _replace(job_id: str, **changes: Any) -> Dict[str, Any]:
+    """Atomically publish a new snapshot of ``job_id`` with ``changes``."""
+    def _apply(job: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return {**job, **changes, "version": job["version"] + 1, "updated_at": _utc_now_iso()}
+
+    return job_store.update(JOBS, job_id, _apply, ttl_seconds=_ttl)
+
+
+def _notify(job_id: str, snapshot: Dict[str, Any]) -> None:
+    """Call the job's listeners with a published snapshot; caller must not hold ``_lock``."""
+    if _forward is not None:
+        try:
+            _forward(job_id, snapshot)
+        except Exception:  # noqa: BLE001 - progress relay is best effort
+            logging.warning("Could not forward progress of job %s", job_id, exc_info=True)
+    with _lock:
+        listeners = list(_listeners.get(job_id, ()))
+    for listener in listeners:
+        try:
+            listener(snapshot)
+        except Exception:  # noqa: BLE001 - a broken subscriber must not fail the job
+            logging.warning("Progress listener for job %s failed", job_id, exc_info=True)
+
+
+def notify_listeners(job_id: str, snapshot: Dict[str, Any]) -> None:
+    """Deliver a snapshot published by another process to this process's listeners."""
+    _notify(job_id, snapshot)
+
+
+def forward_updates(forward: Optional[Callable[[str, Dict[str, Any]], None]]) -> None:
+    """Also pass every published snapshot to ``forward(job_id, snapshot)``."""
+    global _forward
+    _forward = forward
+
+
+def subscribe(job_id: str, listener: Listener) -> Callable[[], None]:
+    """Call ``listener(snapshot)`` after every update of ``job_id``; returns an unsubscribe function.
+
+    Listeners run on the updating thread and must be quick (e.g. set a flag).
+    """
+    with _lock:
+        _listeners.setdefault(job_id, []).append(listener)
+
+    def _unsubscribe() -> None:
+        with _lock:
+            remaining = [item for item in _listeners.get(job_id, ()) if item is not listener]
+            if remaining:
+                _listeners[job_id] = remaining
+            else:
+                _listeners.pop(job_id, None)
+
+    return _unsubscribe
+
+
+def _public(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    return {**snapshot, "trace": list(snapshot["trace"]), "artifacts": dict(snapshot["artifacts"])}
+
+
 def create_job() -> str:
     """Create a new progress job and return its identifier."""
     job_id = uuid.uuid4().hex
@@ -26,76 +205,159 @@ def create_job() -> str:
         "status": "pending",
         "progress": 0,
         "message": "Queued",
-        "result": None,
         "error": None,
+        "result_available": False,
+        "result_size_bytes": None,
+        "artifacts": {},
+        "queue_position": None,
+        "cancel_requested": False,
+        "trace": (),
+        "version": 0,
         "created_at": timestamp,
         "updated_at": timestamp,
     }
-    with _lock:
-        _jobs[job_id] = job_payload
+    job_store.put(JOBS, job_id, job_payload, ttl_seconds=JOB_ACTIVE_TTL_SECONDS)
     return job_id
 
 
 def update_job(job_id: str, *, progress: Optional[float] = None, message: Optional[str] = None,
                status: Optional[str] = None) -> Dict[str, Any]:
     """Update the given job with the provided values."""
-    with _lock:
-        job = _jobs.get(job_id)
+    changes: Dict[str, Any] = {}
+    if progress is not None:
+        changes["progress"] = max(0.0, min(100.0, float(progress)))
+    if message is not None:
+        changes["message"] = message
+    if status is not None:
+        changes["status"] = status
+    snapshot = _replace(job_id, **changes)
+    _notify(job_id, snapshot)
+    return _public(snapshot)
+
+
+def append_trace(job_id: str, entry: Dict[str, Any]) -> None:
+    """Append a finished step trace (see ``services.tracing``) to the job."""
+    def _append(job: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         if job is None:
             raise JobNotFoundError(job_id)
+        return {**job, "trace": tuple(job["trace"]) + (entry,), "version": job["version"] + 1, "updated_at": _utc_now_iso()}
 
-        if progress is not None:
-            progress_value = max(0.0, min(100.0, float(progress)))
-            job["progress"] = progress_value
-        if message is not None:
-            job["message"] = message
-        if status is not None:
-            job["status"] = status
-        job["updated_at"] = _utc_now_iso()
-        return copy.deepcopy(job)
+    snapshot = job_store.update(JOBS, job_id, _append, ttl_seconds=_ttl)
+    _notify(job_id, snapshot)
 
 
-def complete_job(job_id: str, result: Any, message: str = "Preprocessing complete") -> Dict[str, Any]:
-    """Mark the job as completed with the provided result."""
-    with _lock:
-        job = _jobs.get(job_id)
-        if job is None:
-            raise JobNotFoundError(job_id)
-        job.update({
-            "status": "completed",
-            "progress": 100.0,
-            "message": message,
-            "result": result,
-            "error": None,
-            "updated_at": _utc_now_iso(),
-        })
-        return copy.deepcopy(job)
+def complete_job(job_id: str, result: Any, message: str = "Preprocessing complete",
+                 artifacts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Mark the job as completed; ``result`` is serialized once and stored out of line.
+
+    ``artifacts`` are small references (e.g. staged file paths) kept on the snapshot so
+    later requests can use them without decoding the result.
+    """
+    if job_store.get(JOBS, job_id) is None:
+        raise JobNotFoundError(job_id)
+    stored = _store_result(job_id, result)
+    if stored is not None:
+        job_store.put(RESULTS, job_id, stored, ttl_seconds=JOB_TTL_SECONDS, size=stored.size)
+    else:
+        job_store.delete(RESULTS, job_id)
+    snapshot = _replace(
+        job_id,
+        status="completed",
+        progress=100.0,
+        message=message,
+        error=None,
+        result_available=stored is not None,
+        result_size_bytes=stored.size if stored is not None else None,
+        artifacts=dict(artifacts or {}),
+    )
+    _notify(job_id, snapshot)
+    return _public(snapshot)
 
 
 def fail_job(job_id: str, error_message: str) -> Dict[str, Any]:
-    """Mark the job as failed and capture the error message."""
-    with _lock:
-        job = _jobs.get(job_id)
-        if job is None:
-            raise JobNotFoundError(job_id)
-        job.update({
-            "status": "failed",
-            "progress": 100.0,
-            "message": "Preprocessing failed",
-            "error": error_message,
-            "updated_at": _utc_now_iso(),
-        })
-        return copy.deepcopy(job)
+    """Mark the job as failed and capture the error message.
+
+    A job whose cancellation was requested ends as ``cancelled`` instead, so the
+    :class:`JobCancelled` raised at a checkpoint needs no special handling by callers.
+    """
+    job = job_store.get(JOBS, job_id)
+    if job is not None and job.get("cancel_requested"):
+        return cancel_job(job_id)
+    snapshot = _replace(
+        job_id,
+        status="failed",
+        progress=100.0,
+        message="Preprocessing failed",
+        error=error_message,
+    )
+    _notify(job_id, snapshot)
+    return _public(snapshot)
+
+
+def set_queue_position(job_id: str, position: Optional[int]) -> Dict[str, Any]:
+    """Record the job's place in the scheduler queue (``None`` once it starts)."""
+    changes: Dict[str, Any] = {"queue_position": position}
+    if position is not None:
+        changes.update(status="queued", message=f"Queued (position {position})")
+    else:
+        changes.update(status="running", message="Starting")
+    snapshot = _replace(job_id, **changes)
+    _notify(job_id, snapshot)
+    return _public(snapshot)
+
+
+def request_cancel(job_id: str) -> Dict[str, Any]:
+    """Ask a job to stop at its next cancellation checkpoint."""
+    snapshot = _replace(job_id, cancel_requested=True, message="Cancelling")
+    _notify(job_id, snapshot)
+    return _public(snapshot)
+
+
+def cancel_job(job_id: str, message: str = "Cancelled") -> Dict[str, Any]:
+    """Mark the job as cancelled."""
+    snapshot = _replace(
+        job_id,
+        status="cancelled",
+        message=message,
+        error=None,
+        queue_position=None,
+        cancel_requested=True,
+    )
+    _notify(job_id, snapshot)
+    return _public(snapshot)
+
+
+def raise_if_cancelled(job_id: Optional[str]) -> None:
+    """Cancellation checkpoint: raise :class:`JobCancelled` if the job should stop."""
+    if not job_id:
+        return
+    job = job_store.get(JOBS, job_id)
+    if job is not None and job.get("cancel_requested"):
+        raise JobCancelled(f"Job {job_id} was cancelled")
 
 
 def get_job(job_id: str) -> Optional[Dict[str, Any]]:
-    """Return a copy of the job payload if it exists."""
-    with _lock:
-        job = _jobs.get(job_id)
-        return copy.deepcopy(job) if job is not None else None
+    """Return the job's progress snapshot (without its result) if it exists."""
+    job = job_store.get(JOBS, job_id)
+    return _public(job) if job is not None else None
+
+
+def get_stored_result(job_id: str) -> Optional[StoredResult]:
+    """The serialized result of a completed job, for returning as-is.
+
+    ``None`` once the result expired or was evicted, even if the snapshot still says
+    ``result_available``.
+    """
+    return job_store.get(RESULTS, job_id)
+
+
+def get_result(job_id: str) -> Optional[Any]:
+    """Decode the job's result; for server-side callers that need individual fields."""
+    stored = get_stored_result(job_id)
+    return json.loads(stored.read()) if stored is not None else None
 
 
 def reset_job(job_id: str) -> None:
     """Remove a job from the tracker."""
-    with _lock:
-        _jobs.pop(job_id, None)
+    job_store.delete(JOBS, job_id)
+    job_store.delete(RESULTS, job_id)
@@ -0,0 +1,212 @@
+"""Per-step tracing for preprocessing, feature engineering and model training.
+
+A :class:`Tracer` is created per job and handed to the code that runs the steps. Each
+``tracer.span(...)`` records wall time, CPU time, RSS change, the growth of the
+process' peak RSS and rows/columns in and out. Finished spans are appended to the
+job in ``progress_tracker`` (so the status endpoints show them while the job runs),
+returned with the job result, and observed into Prometheus histograms.
+
+The histograms run in ``prometheus_client``'s multiprocess mode: every process that
+runs steps (each API worker under ``WEB_CONCURRENCY``, each ``JOB_WORKER_MODE=process``
+worker) writes its samples to files in ``PROMETHEUS_MULTIPROC_DIR``, and ``/metrics``
+serves :func:`metrics_registry`, which aggregates all of them. The directory defaults
+to ``<tmp>/pipeline-metrics`` and must be shared by every process of one deployment.
+
+CPU time and RSS are process-wide, so they include work from concurrent jobs.
+"""
+import glob
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import progress_tracker
+
+# prometheus_client picks its value storage on import; set the directory first.
+# Spawned job workers inherit it through the environment.
+METRICS_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "pipeline-metrics"))
+os.makedirs(METRICS_DIR, exist_ok=True)
+if "prometheus_client" in sys.modules:
+    logging.warning("prometheus_client was imported before services.tracing; step metrics stay in this process")
+
+from prometheus_client import CollectorRegistry, Histogram, multiprocess  # noqa: E402
+
+_PAGE_SIZE = resource.getpagesize()
+
+# Samples go to METRICS_DIR, not to a registry; metrics_registry() reads them back
+STEP_WALL_SECONDS = Histogram(
+    "pipeline_step_wall_seconds",
+    "Wall-clock time per pipeline step",
+    ["stage", "step"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+    registry=None,
+)
+STEP_CPU_SECONDS = Histogram(
+    "pipeline_step_cpu_seconds",
+    "Process CPU time per pipeline step",
+    ["stage", "step"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+    registry=None,
+)
+STEP_PEAK_RSS_DELTA_BYTES = Histogram(
+    "pipeline_step_peak_rss_delta_bytes",
+    "Growth of the process peak RSS during a pipeline step",
+    ["stage", "step"],
+    buckets=tuple(2 ** power for power in range(20, 36, 2)),
+    registry=None,
+)
+STEP_ROWS_IN = Histogram(
+    "pipeline_step_rows_in",
+    "Rows entering a pipeline step",
+    ["stage", "step"],
+    buckets=(1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8),
+    registry=None,
+)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry that aggregates the step histograms of every process sharing METRICS_DIR."""
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=METRICS_DIR)
+    return registry
+
+
+def prune_metric_files() -> None:
+    """Drop sample files left by processes that no longer run (earlier deployments)."""
+    for path in glob.glob(os.path.join(METRICS_DIR, "*.db")):
+        try:
+            pid = int(os.path.basename(path).rsplit("_", 1)[-1][:-len(".db")])
+        except ValueError:
+            continue
+        if pid == os.getpid():
+            continue
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        except PermissionError:
+            # Running under another user; keep its samples
+            continue
+
+
+def _current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _peak_rss_bytes() -> int:
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+
+
+def _shape(frame: Any) -> tuple:
+    shape = getattr(frame, "shape", None)
+    if not shape:
+        return None, None
+    return int(shape[0]), int(shape[1]) if len(shape) > 1 else 1
+
+
+@dataclass
+class StepTrace:
+    stage: str
+    step: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rss_delta_bytes: int = 0
+    peak_rss_delta_bytes: int = 0
+    rows_in: Optional[int] = None
+    columns_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    columns_out: Optional[int] = None
+    error: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Span:
+    def __init__(self, trace: StepTrace):
+        self.trace = trace
+
+    def set_output(self, frame: Any = None, *, rows: Optional[int] = None, columns: Optional[int] = None) -> None:
+        """Record the step's output shape from ``frame`` or explicit counts."""
+        if frame is not None:
+            rows, columns = _shape(frame)
+        if rows is not None:
+            self.trace.rows_out = int(rows)
+        if columns is not None:
+            self.trace.columns_out = int(columns)
+
+    def set_details(self, **values: Any) -> None:
+        """Attach JSON-safe, step-specific facts to the trace."""
+        self.trace.details = {**(self.trace.details or {}), **values}
+
+
+class Tracer:
+    """Collects :class:`StepTrace` records for one job stage."""
+
+    def __init__(self, stage: str, job_id: Optional[str] = None):
+        self.stage = stage
+        self.job_id = job_id
+        self.steps: List[StepTrace] = []
+
+    @contextmanager
+    def span(
+        self,
+        step: str,
+        frame: Any = None,
+        *,
+        rows: Optional[int] = None,
+        columns: Optional[int] = None,
+    ) -> Iterator[_Span]:
+        """Trace the enclosed block as ``step``; input shape from ``frame`` or explicit counts."""
+        rows_in, columns_in = _shape(frame) if frame is not None else (rows, columns)
+        trace = StepTrace(stage=self.stage, step=step, rows_in=rows_in, columns_in=columns_in)
+        span = _Span(trace)
+        rss_before = _current_rss_bytes()
+        peak_before = _peak_rss_bytes()
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        try:
+            yield span
+        except Exception as exc:
+            trace.error = str(exc)
+            raise
+        finally:
+            trace.wall_seconds = round(time.perf_counter() - wall_before, 6)
+            trace.cpu_seconds = round(time.process_time() - cpu_before, 6)
+            trace.rss_delta_bytes = _current_rss_bytes() - rss_before
+            trace.peak_rss_delta_bytes = max(0, _peak_rss_bytes() - peak_before)
+            self._record(trace)
+
+    def _record(self, trace: StepTrace) -> None:
+        self.steps.append(trace)
+        labels = (trace.stage, trace.step)
+        STEP_WALL_SECONDS.labels(*labels).observe(trace.wall_seconds)
+        STEP_CPU_SECONDS.labels(*labels).observe(trace.cpu_seconds)
+        STEP_PEAK_RSS_DELTA_BYTES.labels(*labels).observe(trace.peak_rss_delta_bytes)
+        if trace.rows_in is not None:
+            STEP_ROWS_IN.labels(*labels).observe(trace.rows_in)
+        if self.job_id:
+            try:
+                progress_tracker.append_trace(self.job_id, trace.to_dict())
+            except progress_tracker.JobNotFoundError:
+                logging.warning("Skipping trace for %s; job %s no longer tracked", trace.step, self.job_id)
+
+    @property
+    def last(self) -> Optional[StepTrace]:
+        return self.steps[-1] if self.steps else None
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [trace.to_dict() for trace in self.steps]
@@ -0,0 +1,190 @@
+"""Out-of-process execution of heavy jobs.
+
+With ``JOB_WORKER_MODE=process`` the scheduler hands preprocessing, feature
+engineering and training jobs to a pool of long-lived worker processes instead of
+the API process's threads, so pandas/sklearn work no longer competes with request
+handling:
+
+- workers are spawned once and warm up on start (pandas copy-on-write, controller
+  and sklearn imports), so a job pays no import cost,
+- jobs report through ``progress_tracker`` as usual; snapshots and results land in
+  the shared SQLite job store, and each published snapshot is also relayed over a
+  local queue so progress listeners (SSE/WebSocket) in the API process fire,
+- each job runs under the CPU quota the scheduler reserved for it
+  (``services.cpu_budget``); coroutine job functions run to completion in the worker,
+- ``JOB_WORKER_DATASET_CACHE`` > 0 keeps that many loaded datasets per worker,
+  keyed by object ETag (see :func:`load_dataset`).
+
+Process mode needs ``JOB_STORE_BACKEND=sqlite``; with the in-memory store jobs keep
+running in threads. ``progress_tracker`` is imported lazily throughout: a worker
+must point the job store at the parent's file before the store is created.
+"""
+import asyncio
+import importlib
+import inspect
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+JOB_WORKER_MODE = os.getenv("JOB_WORKER_MODE", "thread").lower()
+JOB_WORKER_PROCESSES = int(os.getenv("JOB_WORKER_PROCESSES", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+JOB_WORKER_DATASET_CACHE = int(os.getenv("JOB_WORKER_DATASET_CACHE", "0"))
+WARM_MODULES = (
+    "backend.controllers.data_controller",
+    "backend.controllers.feature_engineering.controller",
+    "backend.controllers.model_training",
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_relay: Optional[threading.Thread] = None
+_events: Any = None
+_pool_lock = threading.Lock()
+_warned_store = False
+
+# Worker-side state
+_in_worker = False
+_datasets: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+
+
+# ---- worker side ------------------------------------------------------------
+def _init_worker(events: Any, store_path: str, warm_modules: Tuple[str, ...]) -> None:
+    global _in_worker
+    os.environ["JOB_STORE_BACKEND"] = "sqlite"
+    os.environ["JOB_STORE_PATH"] = store_path
+    _in_worker = True
+
+    import pandas as pd
+    pd.set_option("mode.copy_on_write", True)
+    for module in warm_modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            logging.warning("Worker could not preload %s", module, exc_info=True)
+
+    from . import progress_tracker
+    progress_tracker.forward_updates(lambda job_id, snapshot: events.put((job_id, snapshot)))
+
+
+def _call(cores: int, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+    from . import cpu_budget
+
+    with cpu_budget.use_quota(cores):
+        result = fn(*args, **kwargs)
+        if inspect.iscoroutine(result):
+            result = asyncio.run(result)
+        return result
+
+
+def in_worker() -> bool:
+    """Whether this process is a job worker process."""
+    return _in_worker
+
+
+def load_dataset(bucket: str, filename: str, loader: Callable[[], Any]) -> Any:
+    """``loader()``, memoized per worker process by the object's ETag when enabled.
+
+    Each job gets a shallow copy; copy-on-write keeps its edits away from the cached frame.
+    """
+    if not _in_worker or JOB_WORKER_DATASET_CACHE <= 0:
+        return loader()
+    from backend.config import minio_client
+
+    try:
+        etag = minio_client.stat_object(bucket, filename).etag
+    except Exception:  # noqa: BLE001 - no ETag, no caching
+        return loader()
+    key = (bucket, filename, etag)
+    if key in _datasets:
+        _datasets.move_to_end(key)
+        logging.info("Reusing cached %s/%s in worker %s", bucket, filename, os.getpid())
+        return _datasets[key].copy(deep=False)
+    frame = loader()
+    _datasets[key] = frame
+    while len(_datasets) > JOB_WORKER_DATASET_CACHE:
+        _datasets.popitem(last=False)
+    return frame.copy(deep=False)
+
+
+# ---- API process side -------------------------------------------------------
+def _shared_store_path() -> Optional[str]:
+    from . import progress_tracker
+    from .job_store import SQLiteJobStore
+
+    store = progress_tracker.job_store
+    return store.path if isinstance(store, SQLiteJobStore) else None
+
+
+def enabled() -> bool:
+    """True when heavy jobs should run in worker processes."""
+    global _warned_store
+    if JOB_WORKER_MODE != "process" or JOB_WORKER_PROCESSES < 1:
+        return False
+    if _shared_store_path() is None:
+        if not _warned_store:
+            _warned_store = True
+            logging.warning("JOB_WORKER_MODE=process needs JOB_STORE_BACKEND=sqlite; running jobs in threads")
+        return False
+    return True
+
+
+def _relay_events(events: Any) -> None:
+    from . import progress_tracker
+
+    while True:
+        item = events.get()
+        if item is None:
+            return
+        progress_tracker.notify_listeners(*item)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _relay, _events
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a server process that already runs threads is unsafe
+            context = multiprocessing.get_context("spawn")
+            _events = context.Queue()
+            _relay = threading.Thread(target=_relay_events, args=(_events,), name="job-worker-relay", daemon=True)
+            _relay.start()
+            _pool = ProcessPoolExecutor(
+                max_workers=JOB_WORKER_PROCESSES,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(_events, _shared_store_path(), WARM_MODULES),
+            )
+        return _pool
+
+
+def shutdown(pool: Optional[ProcessPoolExecutor] = None) -> None:
+    """Stop the worker pool (only if it is still ``pool``, when given)."""
+    global _pool, _relay, _events
+    with _pool_lock:
+        if _pool is not None and (pool is None or pool is _pool):
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _events.put(None)
+            _relay.join(timeout=5)
+            _pool, _relay, _events = None, None, None
+
+
+async def run(job_id: str, cores: int, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+    """Run ``fn(*args, **kwargs)`` in a worker process limited to ``cores``.
+
+    Coroutine functions are run to completion in the worker; a crashed worker fails
+    the job.
+    """
+    pool = _get_pool()
+    try:
+        return await asyncio.wrap_future(pool.submit(_call, cores, fn, args, kwargs))
+    except BrokenProcessPool:
+        from . import progress_tracker
+
+        logging.exception("Worker process died while running job %s", job_id)
+        # The next job starts a fresh pool
+        await asyncio.to_thread(shutdown, pool)
+        progress_tracker.fail_job(job_id, "Worker process exited unexpectedly")
+        return None
@@ -0,0 +1,139 @@
+"""
+Verify the shared-memory process backend returns the same results as threads, keeps
+each job within its CPU quota and is never nested inside job worker processes
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+# column_executor imports backend.services; make the repository root importable in script mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from controllers.preprocessing import column_executor
+from controllers.preprocessing.column_executor import choose_backend, map_columns
+from controllers.preprocessing.fill_nulls import _resolve_fill_value, resolve_fill_values
+from backend.services import cpu_budget, worker_pool
+
+
+def _make_frame(n_rows: int = 20000) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        'city': rng.choice(['paris', 'lyon', 'nice', None], n_rows, p=[0.2, 0.5, 0.2, 0.1]),
+        'grade': pd.Series(rng.choice(['a', 'b', None], n_rows)).astype('category'),
+        'amount': rng.normal(100, 15, n_rows),
+    })
+    df.loc[df.index[::7], 'amount'] = np.nan
+    return df
+
+
+def test_backend_choice():
+    df = _make_frame()
+    assert choose_backend(df['amount'], min_process_rows=0) == 'thread'
+    assert choose_backend(df['city'], min_process_rows=len(df) + 1) == 'thread'
+    if column_executor.PROCESS_POOL_WORKERS > 1 and (column_executor.os.cpu_count() or 1) > 1:
+        assert choose_backend(df['city'], min_process_rows=0) == 'process'
+    print("✅ PASS: numeric columns stay on threads, large object columns go to processes")
+
+
+def test_shared_memory_roundtrip():
+    df = _make_frame(1000)
+    for col in df.columns:
+        shm, descriptor = column_executor._share_series(df[col])
+        try:
+            attached_shm, attached = column_executor._attach_series(descriptor)
+            pd.testing.assert_series_equal(attached, df[col].reset_index(drop=True), check_categorical=False)
+            del attached
+            attached_shm.close()
+        finally:
+            shm.close()
+            shm.unlink()
+    print("✅ PASS: columns reattach unchanged from shared memory")
+
+
+def test_process_results_match_threads():
+    print("🧪 Testing process-pool fill values against the thread backend\n")
+    df = _make_frame()
+    mask = df['amount'].notna()
+    specs = {'city': ('mode', None), 'grade': ('mode', None), 'amount': ('median', None)}
+    threaded = map_columns(df, list(specs), _resolve_fill_value, args=specs, row_mask=mask,
+                           min_process_rows=len(df) + 1)
+    # Force every column onto the pool, even on single-core machines
+    original = column_executor.choose_backend
+    column_executor.choose_backend = lambda series, min_process_rows=None: 'process'
+    try:
+        pooled = map_columns(df, list(specs), _resolve_fill_value, args=specs, row_mask=mask)
+    finally:
+        column_executor.choose_backend = original
+        column_executor.shutdown_process_pool()
+    assert threaded == pooled
+    assert threaded['city'] == df.loc[mask, 'city'].mode().iloc[0]
+    print(f"   fill values: {pooled}")
+
+    resolved = resolve_fill_values(df, {'city': {'strategy': 'mode'}, 'amount': {'strategy': 'mean'}})
+    assert resolved['amount']['value'] == df['amount'].mean()
+    assert resolved['city']['operation'] == 'Fill Nulls'
+    print("✅ PASS: process pool and threads agree")
+
+
+
+def test_mixed_type_objects_fall_back_to_threads():
+    n_rows = column_executor.PROCESS_POOL_MIN_ROWS + 1
+    df = pd.DataFrame({'code': pd.Series([7, 'x', 'x', None] * (n_rows // 4 + 1), dtype=object)[:n_rows]})
+    original_workers, original_cpu_count = column_executor.PROCESS_POOL_WORKERS, column_executor.os.cpu_count
+    column_executor.PROCESS_POOL_WORKERS = 4
+    column_executor.os.cpu_count = lambda: 4
+    try:
+        assert choose_backend(df['code']) == 'process'
+        resolved = resolve_fill_values(df, {'code': {'strategy': 'mode'}})
+    finally:
+        column_executor.PROCESS_POOL_WORKERS = original_workers
+        column_executor.os.cpu_count = original_cpu_count
+        column_executor.shutdown_process_pool()
+    assert resolved['code']['value'] == 'x'
+    print("✅ PASS: mixed int/str columns run on threads instead of failing in Arrow")
+
+
+_running = {"now": 0, "peak": 0}
+_running_lock = threading.Lock()
+
+
+def _count_concurrent(series):
+    with _running_lock:
+        _running["now"] += 1
+        _running["peak"] = max(_running["peak"], _running["now"])
+    time.sleep(0.05)
+    with _running_lock:
+        _running["now"] -= 1
+    return series.nunique()
+
+
+def test_pool_work_stays_within_the_job_quota():
+    df = pd.DataFrame({f"c{i}": [f"v{j % (i + 2)}" for j in range(1000)] for i in range(6)})
+    original = column_executor.PROCESS_POOL_WORKERS, column_executor._get_process_pool
+    # A wide stand-in for the shared pool: only the job's quota may limit it
+    shared = ThreadPoolExecutor(max_workers=8)
+    column_executor.PROCESS_POOL_WORKERS = 8
+    column_executor._get_process_pool = lambda: shared
+    try:
+        with cpu_budget.use_quota(2):
+            assert choose_backend(df["c0"], min_process_rows=0) == "process"
+            results = map_columns(df, list(df.columns), _count_concurrent, min_process_rows=0)
+        worker_pool._in_worker = True
+        assert choose_backend(df["c0"], min_process_rows=0) == "thread", "no nested pool inside job workers"
+    finally:
+        worker_pool._in_worker = False
+        column_executor.PROCESS_POOL_WORKERS, column_executor._get_process_pool = original
+        shared.shutdown()
+    assert results == {f"c{i}": i + 2 for i in range(6)}
+    assert _running["peak"] == 2, _running
+    print("✅ PASS: a job keeps at most its quota of columns in the shared pool")
+
+if __name__ == "__main__":
+    test_backend_choice()
+    test_shared_memory_roundtrip()
+    test_process_results_match_threads()
+    test_mixed_type_objects_fall_back_to_threads()
+    test_pool_work_stays_within_the_job_quota()
@@ -0,0 +1,59 @@
+"""
+Verify the shared column profiler against direct pandas aggregates
+"""
+import numpy as np
+import pandas as pd
+import time
+from controllers.preprocessing.profiler import ColumnProfiler
+from controllers.feature_engineering.recommendations import analyze_column, analyze_dataset
+
+
+def _make_frame(n_rows: int = 50000) -> pd.DataFrame:
+    rng = np.random.default_rng(9)
+    df = pd.DataFrame({
+        'amount': rng.lognormal(3, 1, n_rows),
+        'count': rng.integers(0, 20, n_rows),
+        'segment': rng.choice(['retail', 'pro', None], n_rows),
+        'active': rng.choice([True, False], n_rows),
+    })
+    df.loc[::11, 'amount'] = np.nan
+    return pd.concat([df, df.head(100)], ignore_index=True)
+
+
+def test_profile_matches_pandas():
+    print("🧪 Testing single-pass column profiler\n")
+    df = _make_frame()
+    start = time.time()
+    profile = ColumnProfiler().profile(df)
+    print(f"   Profiled {len(df.columns)} columns x {len(df)} rows in {time.time() - start:.3f}s")
+
+    assert profile.total_rows == len(df)
+    assert profile.duplicate_rows == int(df.duplicated().sum())
+    assert profile.rows_with_any_null == int(df.isna().any(axis=1).sum())
+    assert profile.numeric_columns() == ['amount', 'count']
+    for col in df.columns:
+        assert profile[col].missing_count == int(df[col].isna().sum())
+        assert profile[col].unique_count == int(df[col].nunique())
+
+    amount = df['amount']
+    q1, q3 = amount.quantile(0.25), amount.quantile(0.75)
+    lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    assert profile['amount'].outlier_count == int(((amount < lower) | (amount > upper)).sum())
+    assert np.isclose(profile['amount'].skew, amount.skew())
+    assert profile['segment'].top_values == df['segment'].dropna().unique()[:10].tolist()
+    print("✅ PASS: profile aggregates match pandas")
+
+
+def test_feature_engineering_insights_use_profile():
+    df = _make_frame(5000)
+    analysis = analyze_dataset(df, "sample.parquet")
+    insights = {c.name: c for c in analysis.column_insights}
+    assert insights['count'].std_value == float(df['count'].std())
+    assert insights['segment'].missing_count == int(df['segment'].isna().sum())
+    assert analyze_column(df, 'amount') == insights['amount']
+    print("✅ PASS: feature engineering insights come from the shared profile")
+
+
+if __name__ == "__main__":
+    test_profile_matches_pandas()
+    test_feature_engineering_insights_use_profile()
@@ -0,0 +1,70 @@
+"""
+Verify the blockwise correlation engine: it agrees with ``DataFrame.corr()`` on data
+with nulls whatever the block size, and drives the correlation filter and the quality
+report's correlation section.
+"""
+import os
+import sys
+# io_utils imports backend.config; make the repository root importable in script mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from controllers.data_controller import analyze_data_quality
+from controllers.feature_engineering.operations import apply_feature_selection
+from controllers.preprocessing.correlation import correlated_pairs
+
+
+def _correlated_frame(n_rows: int = 3000, n_columns: int = 60, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n_rows, 6))
+    mixed = base @ rng.normal(size=(6, n_columns - 6)) * 0.4 + rng.normal(size=(n_rows, n_columns - 6))
+    df = pd.DataFrame(np.hstack([base, mixed]), columns=[f"c{i}" for i in range(n_columns)])
+    df["twin"] = df["c0"] * 2 + rng.normal(0, 0.01, n_rows)
+    df["constant"] = 1.0
+    return df.mask(rng.random(df.shape) < 0.05)
+
+
+def _dense_upper_pairs(df: pd.DataFrame, threshold: float) -> dict:
+    corr = df.corr()
+    upper = corr.where(np.triu(np.ones(corr.shape), k=1).astype(bool))
+    stacked = upper.stack()
+    return stacked[stacked.abs() > threshold].to_dict()
+
+
+def test_blocks_match_dense_pearson():
+    df = _correlated_frame()
+    expected = _dense_upper_pairs(df, 0.3)
+    for block_columns in (7, 64):
+        pairs = correlated_pairs(df, threshold=0.3, block_columns=block_columns)
+        found = {(pair.left, pair.right): pair.coefficient for pair in pairs}
+        assert set(found) == set(expected), f"block size {block_columns} changed the pairs"
+        assert max(abs(found[key] - expected[key]) for key in expected) < 1e-4
+    assert not any("constant" in key for key in found)
+
+    sampled = correlated_pairs(df, threshold=0.99, sample_rows=500)
+    assert [(pair.left, pair.right) for pair in sampled] == [("c0", "twin")]
+    assert sampled[0].count <= 500
+    print(f"✅ PASS: blockwise Pearson matches DataFrame.corr() ({len(expected)} pairs)")
+
+
+def test_filter_and_quality_report_use_pairs():
+    df = _correlated_frame(n_columns=30)
+    numeric = df.drop(columns=["constant"])
+    corr = numeric.corr().abs()
+    upper = corr.where(np.triu(np.ones(corr.shape), k=1).astype(bool))
+    expected = [c for c in upper.columns if any(upper[c] > 0.5)]
+
+    filtered, meta = apply_feature_selection(numeric, [], "correlation_filter", threshold=0.5)
+    assert meta["details"]["dropped_columns"] == expected
+    assert "twin" not in filtered.columns and "c0" in filtered.columns
+
+    report = analyze_data_quality(df)["correlations"]
+    assert report["method"] == "pearson" and report["rows_used"] == len(df)
+    assert report["pairs"][0]["left"] == "c0" and report["pairs"][0]["right"] == "twin"
+    assert all(abs(pair["coefficient"]) > report["threshold"] for pair in report["pairs"])
+    print("✅ PASS: correlation filter and quality report use the blockwise pairs")
+
+
+if __name__ == "__main__":
+    test_blocks_match_dense_pearson()
+    test_filter_and_quality_report_use_pairs()
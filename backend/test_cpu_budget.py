@@ -0,0 +1,63 @@
+"""
+Verify the CPU budget: concurrent jobs split the cores, the quota reaches code running
+inside a scheduled job, and estimator thread counts follow it.
+"""
+import asyncio
+from services import cpu_budget, progress_tracker
+from services.job_scheduler import JobScheduler
+
+
+class _Estimator:
+    def __init__(self):
+        self.n_jobs = -1
+
+    def get_params(self, deep=True):
+        return {"n_jobs": self.n_jobs, "max_depth": None}
+
+    def set_params(self, **params):
+        for name, value in params.items():
+            setattr(self, name, value)
+        return self
+
+
+def test_concurrent_jobs_share_the_budget():
+    budget = cpu_budget.CoreBudget(total=8)
+    first, training = budget.acquire("training")
+    second, preprocessing = budget.acquire("preprocessing")
+    assert training == 8 and preprocessing == 1, "cores already granted are not handed out twice"
+    budget.release(first)
+    third, preprocessing = budget.acquire("preprocessing")
+    assert preprocessing == 4 and budget.free == 3
+    budget.release(second)
+    budget.release(third)
+    assert budget.free == 8
+    print("✅ PASS: quotas never exceed the free cores (beyond one per job)")
+
+
+def test_scheduled_jobs_see_their_quota():
+    seen = {}
+
+    def job(job_id):
+        seen[job_id] = cpu_budget.current_quota()
+        seen[job_id + "-n_jobs"] = cpu_budget.configure_estimator(_Estimator()).n_jobs
+        progress_tracker.complete_job(job_id, None)
+
+    async def _run():
+        scheduler = JobScheduler(limits={"training": 1}, max_concurrent=2, budget=cpu_budget.CoreBudget(total=6))
+        job_id = progress_tracker.create_job()
+        scheduler.submit("training", job_id, job, job_id)
+        while scheduler.stats()["running"].get("training") or scheduler.stats()["queued"]:
+            await asyncio.sleep(0.05)
+        assert scheduler.stats()["free_cores"] == 6
+        return job_id
+
+    job_id = asyncio.run(asyncio.wait_for(_run(), timeout=30))
+    assert seen[job_id] == 6 and seen[job_id + "-n_jobs"] == 6
+    assert cpu_budget.current_quota(default=1) == 1, "the quota does not leak outside the job"
+    progress_tracker.reset_job(job_id)
+    print("✅ PASS: jobs run with their quota and size estimators from it")
+
+
+if __name__ == "__main__":
+    test_concurrent_jobs_share_the_budget()
+    test_scheduled_jobs_see_their_quota()
@@ -0,0 +1,86 @@
+"""
+Verify load-time dtype optimization: columns shrink without changing any value, the
+narrowed frame still runs through preprocessing, Parquet and feature engineering, and
+the loader reports what it saved on the load span.
+"""
+import os
+import sys
+import tempfile
+# io_utils imports backend.config; make the repository root importable in script mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from controllers.data_controller import _load_source_frame
+from controllers.feature_engineering.operations import apply_scaling
+from controllers.preprocessing.dtype_optimizer import optimize_dtypes
+from controllers.preprocessing.memory_budget import JobMemoryBudget
+from controllers.preprocessing.plan import compile_plan, execute_plan
+from services.tracing import Tracer
+
+
+def _make_frame(n_rows: int = 20000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    city = pd.Series(rng.choice(["Oslo", "Lima", "Pune", ""], n_rows), dtype=object)
+    return pd.DataFrame({
+        "age": rng.integers(0, 100, n_rows),
+        "big": rng.integers(0, 2 ** 40, n_rows),
+        "half": rng.integers(0, 8, n_rows) / 2,
+        "price": rng.normal(100, 15, n_rows),
+        "city": city.mask(city == ""),
+        "uid": [f"user-{i}" for i in range(n_rows)],
+        "flag": rng.random(n_rows) > 0.5,
+    })
+
+
+def test_values_survive_narrower_dtypes():
+    df = _make_frame()
+    optimized, report = optimize_dtypes(df)
+    assert optimized["age"].dtype == np.int8 and optimized["big"].dtype == np.int64
+    assert optimized["half"].dtype == np.float32, "exactly representable floats narrow"
+    assert optimized["price"].dtype == np.float64, "floats that would round stay float64"
+    assert isinstance(optimized["city"].dtype, pd.CategoricalDtype)
+    assert optimized["uid"].dtype == object and optimized["flag"].dtype == bool
+    pd.testing.assert_frame_equal(optimized.astype(df.dtypes.to_dict()), df)
+    assert report.bytes_saved > 0 and set(report.conversions) == {"age", "half", "city"}
+    print(f"   {report.bytes_before / 1024 ** 2:.1f} MB -> {report.bytes_after / 1024 ** 2:.1f} MB")
+
+    pyarrow_strings, _ = optimize_dtypes(df, string_backend="pyarrow")
+    assert str(pyarrow_strings["uid"].dtype) == "string"
+    assert pyarrow_strings["uid"].tolist() == df["uid"].tolist()
+    print("✅ PASS: dtypes shrink without changing any value")
+
+
+def test_optimized_frames_run_through_the_pipeline():
+    df, _ = optimize_dtypes(_make_frame())
+    steps = {"fillNulls": True, "fillStrategies": {"city": {"strategy": "custom", "value": "Unknown"}}}
+    cleaned, _ = execute_plan(df, compile_plan(steps, df.columns))
+    assert cleaned["city"].notna().all() and (cleaned["city"] == "Unknown").any()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cleaned.parquet")
+        cleaned.to_parquet(path, index=False)
+        restored = pd.read_parquet(path)
+    assert isinstance(restored["city"].dtype, pd.CategoricalDtype), "categories are stored as dictionaries"
+
+    scaled, meta = apply_scaling(cleaned, ["age", "half"], "standard")
+    assert abs(scaled["age"].mean()) < 1e-6 and abs(scaled["half"].mean()) < 1e-6
+    print("✅ PASS: narrowed dtypes work with fills, Parquet and scaling")
+
+
+def test_loader_reports_memory_saved():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "source.csv")
+        _make_frame(5000).to_csv(path, index=False)
+        tracer = Tracer("preprocessing")
+        with tracer.span("load") as span:
+            df = _load_source_frame("source.csv", path, JobMemoryBudget(limit_bytes=1 << 30), span)
+    details = tracer.last.details["dtype_optimization"]
+    assert df["age"].dtype == np.int8 and df["_orig_idx"].dtype == np.int64
+    assert details["bytes_saved"] > 0 and "age" in details["conversions"]
+    print("✅ PASS: the load step records the memory dtype optimization saved")
+
+
+if __name__ == "__main__":
+    test_values_survive_narrower_dtypes()
+    test_optimized_frames_run_through_the_pipeline()
+    test_loader_reports_memory_saved()
@@ -0,0 +1,100 @@
+"""
+Verify the compiled feature engineering executor: it produces exactly the frame the
+steps produce one after another, runs independent steps in the same level, and (with
+RUN_FE_BENCHMARK=1) how it compares on the movie dataset scaled to 10M rows.
+"""
+import os
+import sys
+import time
+# io_utils imports backend.config; make the repository root importable in script mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from controllers.feature_engineering.controller import _apply_step
+from controllers.feature_engineering.executor import compile_steps, execute_steps
+from controllers.feature_engineering.types import (
+    BinningConfig,
+    EncodingConfig,
+    FeatureCreationConfig,
+    FeatureSelectionConfig,
+    ScalingConfig,
+)
+
+STEPS = [
+    ScalingConfig(id="s", type="scaling", columns=["age", "rating"], method="standard", column_methods={"rating": "minmax"}),
+    EncodingConfig(id="e", type="encoding", columns=["genres"], method="one-hot"),
+    EncodingConfig(id="l", type="encoding", columns=["imdb_id"], method="label"),
+    BinningConfig(id="b", type="binning", columns=["age"], method="quantile", bins=10),
+    FeatureCreationConfig(id="p", type="feature_creation", columns=["rating"], method="polynomial", degree=2),
+    FeatureCreationConfig(id="g", type="feature_creation", columns=["genres_Drama", "rating"], method="aggregations", aggregation_type="mean", new_column_name="drama_rating"),
+]
+
+
+def _movies(n_rows: int = 45463) -> pd.DataFrame:
+    """The movie-like frame of test_performance.py, tiled when more rows are asked for."""
+    rng = np.random.default_rng(42)
+    base_rows = min(n_rows, 45463)
+    base = pd.DataFrame({
+        "genres": rng.choice(["Action", "Comedy", "Drama", "Horror", "Romance"], base_rows),
+        "imdb_id": rng.choice([f"tt{i:07d}" for i in range(1000)], base_rows),
+        "title": [f"Movie {i}" for i in range(base_rows)],
+        "age": rng.uniform(0, 100, base_rows),
+        "rating": rng.uniform(1, 10, base_rows),
+    })
+    if n_rows == base_rows:
+        return base
+    return base.iloc[np.arange(n_rows) % base_rows].reset_index(drop=True)
+
+
+def _sequential(df: pd.DataFrame, steps) -> pd.DataFrame:
+    for step in steps:
+        df, _, _ = _apply_step(df, step)
+    return df
+
+
+def test_compiled_matches_sequential():
+    df = _movies(20000)
+    steps = STEPS + [
+        FeatureSelectionConfig(id="v", type="feature_selection", columns=[], method="variance_threshold", threshold=0.01),
+        FeatureSelectionConfig(id="c", type="feature_selection", columns=[], method="correlation_filter", threshold=0.95),
+    ]
+    engineered, results = execute_steps(df, steps, max_workers=4)
+    pd.testing.assert_frame_equal(engineered, _sequential(df, steps))
+    assert [result.index for result in results] == list(range(len(steps)))
+    assert results[2].metadata["details"]["imdb_id"] == "label encoded"
+    assert results[3].trace["columns_in"] == 1, "binning only sees the column it reads"
+    print("✅ PASS: compiled execution matches running the steps in order")
+
+
+def test_plan_levels_follow_column_dependencies():
+    plan = compile_steps(STEPS)
+    # Scaling, one-hot and label encoding touch different columns; binning reads scaled
+    # age; the aggregation reads a one-hot column and the rating the polynomial step reads
+    assert plan.levels == [[0, 1, 2], [3, 4], [5]]
+    barrier = compile_steps(STEPS[:2] + [FeatureSelectionConfig(id="v", type="feature_selection", columns=[], method="variance_threshold", threshold=0.0)] + STEPS[2:3])
+    assert barrier.levels == [[0, 1], [2], [3]], "selection over every column separates the steps around it"
+    print("✅ PASS: steps are grouped by the columns they read and write")
+
+
+def test_benchmark_ten_million_rows():
+    if not os.getenv("RUN_FE_BENCHMARK"):
+        print("⏭️  SKIP: set RUN_FE_BENCHMARK=1 to time 10M rows")
+        return
+    n_rows = int(os.getenv("FE_BENCHMARK_ROWS", "10000000"))
+    df = _movies(n_rows)
+    start = time.perf_counter()
+    sequential = _sequential(df, STEPS)
+    sequential_seconds = time.perf_counter() - start
+    del sequential
+    start = time.perf_counter()
+    execute_steps(df, STEPS)
+    compiled_seconds = time.perf_counter() - start
+    print(f"   {n_rows:,} rows: sequential {sequential_seconds:.2f}s, compiled {compiled_seconds:.2f}s")
+    assert compiled_seconds < sequential_seconds * 1.2
+    print("✅ PASS: compiled execution is not slower at 10M rows")
+
+
+if __name__ == "__main__":
+    test_compiled_matches_sequential()
+    test_plan_levels_follow_column_dependencies()
+    test_benchmark_ten_million_rows()
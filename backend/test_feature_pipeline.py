@@ -0,0 +1,88 @@
+"""
+Verify fitted feature engineering pipelines: replaying the saved steps on the training
+rows reproduces the engineered dataset, and new rows (unseen categories, values out of
+range, no target column) get the same columns without refitting.
+"""
+import os
+import sys
+import tempfile
+# io_utils imports backend.config; make the repository root importable in script mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from controllers.feature_engineering.controller import _apply_step, transform_with_pipeline
+from controllers.feature_engineering.transformers import FittedPipeline, load_pipeline, pipeline_object_name
+from controllers.feature_engineering.types import (
+    BinningConfig,
+    EncodingConfig,
+    FeatureCreationConfig,
+    ScalingConfig,
+)
+
+STEPS = [
+    ScalingConfig(id="s", type="scaling", columns=["budget", "runtime"], method="standard", column_methods={"runtime": "minmax"}),
+    EncodingConfig(id="e", type="encoding", columns=["genre", "language"], method="one-hot", column_methods={"language": "label"}),
+    BinningConfig(id="b", type="binning", columns=["popularity"], method="quantile", bins=4),
+    FeatureCreationConfig(id="f", type="feature_creation", columns=["genre_Drama", "popularity"], method="aggregations", aggregation_type="mean", new_column_name="drama_popularity"),
+]
+
+
+def _movies(n_rows: int = 2000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "budget": rng.lognormal(16, 1, n_rows),
+        "runtime": rng.normal(105, 20, n_rows),
+        "popularity": rng.exponential(5, n_rows),
+        "genre": rng.choice(["Drama", "Comedy", "Action"], n_rows),
+        "language": rng.choice(["en", "fr", "es"], n_rows),
+        "target": rng.integers(0, 2, n_rows),
+    })
+
+
+def _fit(df: pd.DataFrame):
+    pipeline = FittedPipeline(input_columns=list(df.columns))
+    engineered = df
+    for step in STEPS:
+        engineered, _, transformer = _apply_step(engineered, step)
+        pipeline.steps.append(transformer)
+    pipeline.output_columns = list(engineered.columns)
+    return pipeline, engineered
+
+
+def test_replay_reproduces_the_engineered_dataset():
+    df = _movies()
+    pipeline, engineered = _fit(df)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pipeline.save(pipeline_object_name(os.path.join(tmp, "feature_engineered_movies.parquet")))
+        assert path.endswith("feature_engineered_movies.pipeline.joblib")
+        restored = load_pipeline(path)
+    pd.testing.assert_frame_equal(transform_with_pipeline(restored, df), engineered)
+    assert [step.step_type for step in restored.steps] == ["scaling", "encoding", "binning", "feature_creation"]
+    print("✅ PASS: the saved pipeline reproduces the engineered dataset")
+
+
+def test_new_rows_use_fitted_state():
+    df = _movies()
+    pipeline, engineered = _fit(df)
+    new_rows = pd.DataFrame({
+        "budget": [df["budget"].mean(), 1e12],
+        "runtime": [105.0, 400.0],
+        "popularity": [-1.0, 1e6],
+        "genre": ["Drama", "Documentary"],
+        "language": ["fr", "de"],
+    })
+    transformed = transform_with_pipeline(pipeline, new_rows)
+    assert list(transformed.columns) == [col for col in pipeline.output_columns if col != "target"]
+    assert abs(transformed.loc[0, "budget"]) < 1e-9, "the training mean scales to 0"
+    assert transformed.loc[1, "runtime"] > 1, "minmax keeps the training range"
+    assert transformed.loc[1, ["genre_Action", "genre_Comedy", "genre_Drama"]].sum() == 0, "unseen genre has no dummy"
+    assert transformed.loc[0, "language"] == 2 and transformed.loc[1, "language"] == -1
+    assert transformed["popularity_binned"].tolist() == [0, 3], "out-of-range values fall in the outer bins"
+    drama_mean = engineered.loc[engineered["genre_Drama"] == 1, "popularity"].mean()
+    assert abs(transformed.loc[0, "drama_popularity"] - drama_mean) < 1e-9
+    print("✅ PASS: new rows are transformed with the fitted parameters")
+
+
+if __name__ == "__main__":
+    test_replay_reproduces_the_engineered_dataset()
+    test_new_rows_use_fitted_state()
@@ -0,0 +1,117 @@
+"""
+Verify push-based job progress: bursts of tracker updates are coalesced into a few
+messages and the stream ends with a result reference.
+"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from services import progress_tracker
+from services.job_store import SQLiteJobStore
+from services.job_events import format_sse, job_events
+
+
+def _collect(job_id: str, producer, max_rate: float = 10.0) -> list:
+    async def _run():
+        messages = []
+        thread = threading.Thread(target=producer)
+        stream = job_events(job_id, f"/result/{job_id}", max_rate=max_rate, heartbeat_seconds=0.2)
+        thread.start()
+        async for message in stream:
+            messages.append(message)
+        thread.join()
+        return messages
+    return asyncio.run(asyncio.wait_for(_run(), timeout=30))
+
+
+def test_bursts_are_coalesced():
+    job_id = progress_tracker.create_job()
+
+    def producer():
+        for step in range(500):
+            progress_tracker.update_job(job_id, progress=step / 5, status="running")
+            if step % 100 == 0:
+                time.sleep(0.05)
+        progress_tracker.complete_job(job_id, {"rows": 3}, artifacts={"temp_cleaned_path": "/tmp/x.parquet"})
+
+    start = time.perf_counter()
+    messages = _collect(job_id, producer, max_rate=10.0)
+    elapsed = time.perf_counter() - start
+    progress = [m for m in messages if m["event"] == "progress"]
+    assert len(progress) <= int(elapsed * 10) + 2, f"{len(progress)} messages in {elapsed:.2f}s"
+    assert progress[-1]["data"]["status"] == "completed"
+    versions = [m["data"]["version"] for m in progress]
+    assert versions == sorted(set(versions))
+
+    final = messages[-1]
+    assert final["event"] == "result"
+    assert final["data"]["result_url"] == f"/result/{job_id}"
+    assert final["data"]["artifacts"]["temp_cleaned_path"] == "/tmp/x.parquet"
+    assert "rows" not in final["data"]
+    progress_tracker.reset_job(job_id)
+    print(f"✅ PASS: 501 updates coalesced into {len(progress)} progress messages")
+
+
+def test_failed_and_missing_jobs_end_the_stream():
+    job_id = progress_tracker.create_job()
+
+    def producer():
+        time.sleep(1.0)
+        progress_tracker.fail_job(job_id, "boom")
+
+    messages = _collect(job_id, producer)
+    assert "heartbeat" in [m["event"] for m in messages]
+    assert messages[-1]["event"] == "result" and messages[-1]["data"]["error"] == "boom"
+    assert messages[-1]["data"]["result_url"] is None
+    progress_tracker.reset_job(job_id)
+
+    missing = _collect("missing", lambda: None)
+    assert [m["event"] for m in missing] == ["error"]
+    assert not progress_tracker._listeners
+    print("✅ PASS: failed and unknown jobs end their streams")
+
+
+def test_shared_store_updates_from_other_workers_are_polled():
+    original = progress_tracker.job_store
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.sqlite3")
+        progress_tracker.job_store = SQLiteJobStore(path)
+        try:
+            job_id = progress_tracker.create_job()
+            # Another API worker: same file, no listeners in this process
+            other_worker = SQLiteJobStore(path)
+
+            def producer():
+                time.sleep(0.5)
+                other_worker.update(
+                    progress_tracker.JOBS, job_id,
+                    lambda job: {**job, "status": "completed", "version": job["version"] + 1},
+                )
+
+            async def _run():
+                thread = threading.Thread(target=producer)
+                thread.start()
+                messages = [m async for m in job_events(job_id, "/r", heartbeat_seconds=30, poll_seconds=0.1)]
+                thread.join()
+                return messages
+
+            messages = asyncio.run(asyncio.wait_for(_run(), timeout=10))
+            assert [m["event"] for m in messages] == ["progress", "progress", "result"]
+            progress_tracker.reset_job(job_id)
+        finally:
+            progress_tracker.job_store = original
+    print("✅ PASS: streams pick up updates published by other workers")
+
+
+def test_sse_format():
+    text = format_sse({"event": "progress", "data": {"progress": 50.0}})
+    assert text == 'event: progress\ndata: {"progress": 50.0}\n\n'
+    print("✅ PASS: messages are framed as Server-Sent Events")
+
+
+if __name__ == "__main__":
+    test_bursts_are_coalesced()
+    test_failed_and_missing_jobs_end_the_stream()
+    test_shared_store_updates_from_other_workers_are_polled()
+    test_sse_format()
@@ -0,0 +1,111 @@
+"""
+Verify the job scheduler: per-kind limits, priority order, queue positions in the
+tracker and cooperative cancellation.
+"""
+import asyncio
+import threading
+import time
+from services import progress_tracker
+from services.job_scheduler import JobScheduler
+
+
+def test_limits_priorities_and_queue_positions():
+    order = []
+    release = threading.Event()
+
+    def training(job_id):
+        order.append(job_id)
+        release.wait(10)
+        progress_tracker.complete_job(job_id, {"ok": True})
+
+    def preview(name):
+        order.append(name)
+        return name
+
+    async def _run():
+        scheduler = JobScheduler(limits={"training": 1, "preview": 1}, max_concurrent=4)
+        jobs = [progress_tracker.create_job() for _ in range(3)]
+        for job_id in jobs:
+            scheduler.submit("training", job_id, training, job_id)
+        await asyncio.sleep(0.1)
+        assert scheduler.stats()["running"]["training"] == 1
+        assert progress_tracker.get_job(jobs[1])["queue_position"] == 1
+        assert progress_tracker.get_job(jobs[2])["queue_position"] == 2
+        assert progress_tracker.get_job(jobs[2])["status"] == "queued"
+
+        # Previews are not stuck behind queued training
+        assert await scheduler.run("preview", preview, "preview") == "preview"
+
+        cancelled = scheduler.cancel(jobs[1])
+        assert cancelled["status"] == "cancelled"
+        assert progress_tracker.get_job(jobs[2])["queue_position"] == 1
+
+        release.set()
+        while scheduler.stats()["running"].get("training") or scheduler.stats()["queued"]:
+            await asyncio.sleep(0.05)
+        return jobs
+
+    jobs = asyncio.run(asyncio.wait_for(_run(), timeout=30))
+    assert order == [jobs[0], "preview", jobs[2]]
+    assert progress_tracker.get_job(jobs[2])["status"] == "completed"
+    for job_id in jobs:
+        progress_tracker.reset_job(job_id)
+    print("✅ PASS: limits, priorities and queue positions hold")
+
+
+def test_running_job_stops_at_checkpoint():
+    started = threading.Event()
+
+    def steps(job_id):
+        try:
+            started.set()
+            for step in range(100):
+                progress_tracker.raise_if_cancelled(job_id)
+                time.sleep(0.02)
+            progress_tracker.complete_job(job_id, {"steps": 100})
+        except Exception as exc:
+            progress_tracker.fail_job(job_id, str(exc))
+
+    async def _run():
+        scheduler = JobScheduler(limits={"preprocessing": 1}, max_concurrent=1)
+        job_id = progress_tracker.create_job()
+        scheduler.submit("preprocessing", job_id, steps, job_id)
+        await asyncio.to_thread(started.wait, 10)
+        assert scheduler.cancel(job_id)["cancel_requested"]
+        while scheduler.stats()["running"].get("preprocessing"):
+            await asyncio.sleep(0.05)
+        return job_id
+
+    job_id = asyncio.run(asyncio.wait_for(_run(), timeout=30))
+    snapshot = progress_tracker.get_job(job_id)
+    assert snapshot["status"] == "cancelled" and snapshot["error"] is None
+    progress_tracker.reset_job(job_id)
+    print("✅ PASS: running jobs end as cancelled at their next checkpoint")
+
+
+def test_job_cancelled_by_another_worker_is_not_started():
+    ran = []
+
+    async def _run():
+        scheduler = JobScheduler(limits={"training": 1}, max_concurrent=1)
+        other_worker = JobScheduler(limits={"training": 1}, max_concurrent=1)
+        blocker, job_id = progress_tracker.create_job(), progress_tracker.create_job()
+        scheduler.submit("training", blocker, progress_tracker.complete_job, blocker, None)
+        scheduler.submit("training", job_id, ran.append, job_id)
+        assert progress_tracker.get_job(job_id)["status"] == "queued"
+        assert other_worker.cancel(job_id)["status"] == "cancelled"
+        while scheduler.stats()["running"].get("training") or scheduler.stats()["queued"]:
+            await asyncio.sleep(0.05)
+        return blocker, job_id
+
+    blocker, job_id = asyncio.run(asyncio.wait_for(_run(), timeout=30))
+    assert ran == [] and progress_tracker.get_job(job_id)["status"] == "cancelled"
+    progress_tracker.reset_job(blocker)
+    progress_tracker.reset_job(job_id)
+    print("✅ PASS: jobs cancelled through another worker never start")
+
+
+if __name__ == "__main__":
+    test_limits_priorities_and_queue_positions()
+    test_running_job_stops_at_checkpoint()
+    test_job_cancelled_by_another_worker_is_not_started()
@@ -0,0 +1,176 @@
+"""
+Verify the job store: small progress snapshots, results serialized once and stored
+out of line (in memory or spilled to disk), status/result responses, TTL and size
+caps, and SQLite-backed jobs surviving a restart.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import numpy as np
+from services import job_responses, model_cache, progress_tracker
+from services.job_store import MemoryJobStore, SQLiteJobStore
+
+
+def _body(response) -> bytes:
+    if hasattr(response, "body_iterator"):
+        async def _collect():
+            return b"".join([chunk async for chunk in response.body_iterator])
+        return asyncio.run(_collect())
+    return response.body
+
+
+def _large_result(n_rows: int = 2000) -> dict:
+    return {
+        "preview": [{"id": i, "score": float(i) / 3, "label": f"row-{i}"} for i in range(n_rows)],
+        "metrics": {"rmse": np.float32(0.5), "count": np.int64(n_rows), "r2": float("nan")},
+        "temp_cleaned_path": "/tmp/staged.parquet",
+    }
+
+
+def test_snapshots_exclude_result():
+    job_id = progress_tracker.create_job()
+    progress_tracker.update_job(job_id, progress=40, message="Working", status="running")
+    before = progress_tracker.get_job(job_id)
+    progress_tracker.update_job(job_id, progress=60)
+    assert before["progress"] == 40, "published snapshots must not change"
+
+    progress_tracker.complete_job(job_id, _large_result(), artifacts={"temp_cleaned_path": "/tmp/staged.parquet"})
+    job = progress_tracker.get_job(job_id)
+    assert "result" not in job and job["result_available"]
+    assert job["artifacts"]["temp_cleaned_path"] == "/tmp/staged.parquet"
+    assert progress_tracker.get_stored_result(job_id) is progress_tracker.get_stored_result(job_id)
+
+    result = progress_tracker.get_result(job_id)
+    assert result["metrics"] == {"rmse": 0.5, "count": 2000, "r2": None}
+    assert job["result_size_bytes"] == len(progress_tracker.get_stored_result(job_id).data)
+    progress_tracker.reset_job(job_id)
+    assert progress_tracker.get_job(job_id) is None
+    print("✅ PASS: snapshots are immutable and carry no result payload")
+
+
+def test_status_and_result_responses():
+    job_id = progress_tracker.create_job()
+    pending = json.loads(_body(job_responses.job_status_response(job_id)))
+    assert pending["status"] == "pending" and pending["result"] is None
+    assert job_responses.job_result_response(job_id) is None
+
+    progress_tracker.complete_job(job_id, _large_result(50))
+    status = json.loads(_body(job_responses.job_status_response(job_id)))
+    assert status["status"] == "completed" and len(status["result"]["preview"]) == 50
+    light = json.loads(_body(job_responses.job_status_response(job_id, include_result=False)))
+    assert light["result"] is None and light["result_available"]
+    result = json.loads(_body(job_responses.job_result_response(job_id)))
+    assert result == status["result"]
+    assert job_responses.job_status_response("missing") is None
+    progress_tracker.reset_job(job_id)
+    print("✅ PASS: status splices the stored result; result endpoint returns it as-is")
+
+
+def test_large_results_spill_to_disk():
+    original_limit = progress_tracker.RESULT_SPILL_BYTES
+    progress_tracker.RESULT_SPILL_BYTES = 1024
+    try:
+        job_id = progress_tracker.create_job()
+        progress_tracker.complete_job(job_id, _large_result())
+        stored = progress_tracker.get_stored_result(job_id)
+        assert stored.data is None and os.path.exists(stored.path)
+        status = json.loads(_body(job_responses.job_status_response(job_id)))
+        assert len(status["result"]["preview"]) == 2000
+        assert json.loads(_body(job_responses.job_result_response(job_id))) == status["result"]
+        progress_tracker.reset_job(job_id)
+        assert not os.path.exists(stored.path)
+    finally:
+        progress_tracker.RESULT_SPILL_BYTES = original_limit
+    print("✅ PASS: large results spill to disk and are streamed back")
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Resource:
+    def __init__(self):
+        self.discarded = False
+
+    def discard(self):
+        self.discarded = True
+
+
+def test_memory_store_ttl_and_caps():
+    clock = _Clock()
+    store = MemoryJobStore(clock=clock)
+    store.put("jobs", "a", {"status": "completed"}, ttl_seconds=10)
+    clock.now += 11
+    assert store.get("jobs", "a") is None
+
+    store.set_limits("results", max_bytes=100)
+    first, second = _Resource(), _Resource()
+    store.put("results", "old", first, size=80)
+    store.put("results", "new", second, size=80)
+    assert store.get("results", "old") is None and first.discarded
+    assert store.get("results", "new") is second and not second.discarded
+
+    store.set_limits("models", max_entries=2)
+    for key in ("m1", "m2"):
+        store.put("models", key, {"model": key})
+    store.get("models", "m1")  # m1 becomes most recently used
+    store.put("models", "m3", {"model": "m3"})
+    assert sorted(store.keys("models")) == ["m1", "m3"]
+    print("✅ PASS: memory store expires entries and evicts least recently used past caps")
+
+
+def test_sqlite_jobs_survive_restart():
+    original_store = progress_tracker.job_store
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "jobs.sqlite3")
+        try:
+            progress_tracker.job_store = SQLiteJobStore(path)
+            job_id = progress_tracker.create_job()
+            progress_tracker.update_job(job_id, progress=50, status="running")
+            progress_tracker.complete_job(job_id, {"rows": [1, 2, 3]}, artifacts={"temp_cleaned_path": "/tmp/a.parquet"})
+
+            # A fresh store on the same file stands in for a restarted worker
+            restarted = SQLiteJobStore(path)
+            progress_tracker.job_store = restarted
+            job = progress_tracker.get_job(job_id)
+            assert job["status"] == "completed" and job["artifacts"]["temp_cleaned_path"] == "/tmp/a.parquet"
+            assert progress_tracker.get_result(job_id) == {"rows": [1, 2, 3]}
+
+            try:
+                progress_tracker.update_job("missing", progress=1)
+            except progress_tracker.JobNotFoundError:
+                pass
+            else:
+                raise AssertionError("updating an unknown job must fail")
+            assert restarted.get("jobs", "missing") is None
+
+            clock = _Clock()
+            expiring = SQLiteJobStore(path, clock=clock)
+            expiring.put("models", "m", {"weights": [1.0]}, ttl_seconds=5)
+            assert expiring.get("models", "m") == {"weights": [1.0]}
+            clock.now += 6
+            assert expiring.get("models", "m") is None and expiring.purge_expired() >= 1
+        finally:
+            progress_tracker.job_store = original_store
+    print("✅ PASS: SQLite-backed jobs and results survive a restart and expire")
+
+
+def test_model_cache_pop():
+    model_cache.put("job-1", {"best_model_result": {"model_name": "ridge"}})
+    assert model_cache.get("job-1")["best_model_result"]["model_name"] == "ridge"
+    assert model_cache.pop("job-1") is not None and model_cache.get("job-1") is None
+    print("✅ PASS: model cache entries are popped once saved")
+
+
+if __name__ == "__main__":
+    test_snapshots_exclude_result()
+    test_status_and_result_responses()
+    test_large_results_spill_to_disk()
+    test_memory_store_ttl_and_caps()
+    test_sqlite_jobs_survive_restart()
+    test_model_cache_pop()
@@ -0,0 +1,116 @@
+"""
+Verify copy-free pipeline steps, the per-job memory budget, and (opt-in) peak RSS
+for a ~1 GB dataset end to end.
+
+The regression run is gated: RUN_MEMORY_REGRESSION=1 python -m pytest test_memory_budget.py
+(size via MEMORY_REGRESSION_DATASET_MB, allowed peak RSS / dataset size via
+MEMORY_REGRESSION_MAX_RATIO).
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+# io_utils imports backend.config; make the repository root importable in script mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from controllers.preprocessing.io_utils import sanitize_dataframe_for_parquet, standardize_missing_indicators
+from controllers.preprocessing.memory_budget import JobMemoryBudget, MemoryBudgetExceeded, current_rss_bytes, frame_bytes, peak_rss_bytes
+from controllers.preprocessing.plan import compile_plan, execute_plan
+
+STEPS = {
+    "removeDuplicates": True,
+    "fillNulls": True,
+    "fillStrategies": {"f0": {"strategy": "mean"}, "label": {"strategy": "mode"}},
+    "removeOutliers": True,
+    "removeOutliersConfig": {"method": "iqr", "factor": 3.0, "columns": ["f1"]},
+}
+
+
+def _make_frame(n_rows: int, n_numeric: int = 12, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {f"f{i}": rng.normal(size=n_rows) for i in range(n_numeric)}
+    data["label"] = pd.Series(rng.choice(["alpha", "beta", "gamma", None], n_rows), dtype=object)
+    df = pd.DataFrame(data)
+    df.loc[df.index[::97], "f0"] = np.nan
+    return df
+
+
+def test_steps_share_untouched_columns():
+    with pd.option_context("mode.copy_on_write", True):
+        df = _make_frame(20000)
+        df["_orig_idx"] = np.arange(len(df))
+        snapshot = df.copy()
+        sanitized = sanitize_dataframe_for_parquet(df)
+        assert np.shares_memory(sanitized["f3"].to_numpy(), df["f3"].to_numpy())
+        normalized = standardize_missing_indicators(df)
+        cleaned, _ = execute_plan(normalized, compile_plan({"fillNulls": True, "fillStrategies": {"f0": {"strategy": "mean"}}}, df.columns))
+        assert cleaned["f0"].notna().all()
+        pd.testing.assert_frame_equal(df, snapshot)
+    print("✅ PASS: steps return new frames without copying or mutating their input")
+
+
+def test_budget_refuses_before_allocating():
+    df = _make_frame(10000)
+    size = frame_bytes(df)
+    budget = JobMemoryBudget(limit_bytes=int(size * 1.5))
+    budget.require_frame(df, "Holding the dataset")
+    assert budget.held_bytes == size
+    budget.require_frame(df, "Projection", columns=["f0", "f1"])
+    try:
+        budget.require_frame(df, "Second full copy")
+    except MemoryBudgetExceeded as exc:
+        assert exc.label == "Second full copy" and exc.limit_bytes == budget.limit_bytes
+        print(f"   refused: {exc}")
+    else:
+        raise AssertionError("budget admitted a copy past its limit")
+    assert budget.peak_held_bytes == budget.held_bytes
+    print("✅ PASS: memory budget refuses copies that would exceed it")
+
+
+def _run_pipeline(path: str, queue) -> None:
+    pd.set_option("mode.copy_on_write", True)
+    baseline = current_rss_bytes()
+    start = time.time()
+    df = standardize_missing_indicators(pd.read_parquet(path))
+    df = df.reset_index(drop=False).rename(columns={"index": "_orig_idx"})
+    cleaned, _ = execute_plan(df, compile_plan(STEPS, df.columns))
+    out_path = path + ".cleaned.parquet"
+    sanitize_dataframe_for_parquet(cleaned).to_parquet(out_path, index=False)
+    os.remove(out_path)
+    queue.put((frame_bytes(df), peak_rss_bytes() - baseline, len(cleaned), time.time() - start))
+
+
+def test_peak_rss_for_large_dataset():
+    if not os.getenv("RUN_MEMORY_REGRESSION"):
+        print("⏭️  SKIP: set RUN_MEMORY_REGRESSION=1 to measure peak RSS on a ~1 GB dataset")
+        return
+    target_mb = int(os.getenv("MEMORY_REGRESSION_DATASET_MB", "1024"))
+    max_ratio = float(os.getenv("MEMORY_REGRESSION_MAX_RATIO", "3.5"))
+    print(f"🧪 Measuring peak RSS for a ~{target_mb} MB dataset\n")
+
+    bytes_per_row = frame_bytes(_make_frame(10000)) / 10000
+    n_rows = int(target_mb * 1024 * 1024 / bytes_per_row)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "large.parquet")
+        _make_frame(n_rows).to_parquet(path, index=False)
+        # A fresh interpreter so ru_maxrss covers only this pipeline
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=_run_pipeline, args=(path, queue))
+        process.start()
+        dataset_bytes, peak, cleaned_rows, elapsed = queue.get()
+        process.join()
+
+    ratio = peak / dataset_bytes
+    print(f"   {n_rows:,} rows, {dataset_bytes / 1024 ** 2:.0f} MB in memory -> {cleaned_rows:,} rows in {elapsed:.1f}s")
+    print(f"   peak RSS above the interpreter baseline {peak / 1024 ** 2:.0f} MB ({ratio:.2f}x the dataset)")
+    assert ratio <= max_ratio, f"peak RSS {ratio:.2f}x dataset exceeds {max_ratio}x"
+    print("✅ PASS: peak RSS within the regression bound")
+
+
+if __name__ == "__main__":
+    test_steps_share_untouched_columns()
+    test_budget_refuses_before_allocating()
+    test_peak_rss_for_large_dataset()
@@ -0,0 +1,167 @@
+"""
+Verify multivariate outlier removal: rows that are unusual only in combination are
+caught, a saved detector reapplies the same cut-off (loaded by id only, from any
+host), and the streaming path uses the same detector as the in-memory one.
+"""
+import os
+import tempfile
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from controllers.preprocessing import multivariate_outliers, remove_outliers
+from controllers.preprocessing.streaming import run_streaming_plan
+
+
+def _jointly_rare(n_rows: int = 20000, n_anomalies: int = 40, seed: int = 3) -> Tuple[pd.DataFrame, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    columns = ["a", "b", "c", "d", "e"]
+    df = pd.DataFrame(rng.normal(0, 1, (n_rows, len(columns))), columns=columns)
+    # Every value stays inside the IQR fences; being far out in all columns at once is rare
+    anomalies = rng.choice(n_rows, n_anomalies, replace=False)
+    df.iloc[anomalies, :] = rng.choice([-1.0, 1.0], (n_anomalies, len(columns))) * rng.uniform(2.0, 2.5, (n_anomalies, len(columns)))
+    df["label"] = rng.choice(["x", "y"], n_rows)
+    df.loc[rng.choice(n_rows, 200, replace=False), "a"] = np.nan
+    return df, anomalies
+
+
+def test_joint_outliers_are_detected():
+    df, anomalies = _jointly_rare()
+    iqr_mask, _ = remove_outliers.build_keep_mask(df, {"method": "iqr", "factor": 1.5})
+    assert iqr_mask.loc[anomalies].all(), "per-column bounds keep joint outliers"
+
+    for method in ("isolation_forest", "mcd", "lof"):
+        mask, meta = remove_outliers.build_keep_mask(
+            df, {"method": method, "contamination": 0.005, "sample_size": 5000}
+        )
+        caught = (~mask.loc[anomalies]).mean()
+        assert caught > 0.9, f"{method} caught only {caught:.0%} of joint outliers"
+        assert meta["rows_removed"] < len(df) * 0.02
+        assert meta["detector"]["sample_rows"] == 5000
+        print(f"   {meta['method']}: removed {meta['rows_removed']} rows, caught {caught:.0%}")
+    print("✅ PASS: multivariate methods catch rows that per-column bounds keep")
+
+
+def _stored_detectors() -> set:
+    store = multivariate_outliers.OUTLIER_DETECTOR_DIR
+    return set(os.listdir(store)) if os.path.isdir(store) else set()
+
+
+def test_saved_detector_is_reapplied():
+    df, _ = _jointly_rare(seed=5)
+    config = {"method": "mcd", "sample_size": 4000}
+    before = _stored_detectors()
+    mask, meta = remove_outliers.build_keep_mask(df, config)
+    detector_id = meta["detector"]["detector_id"]
+    # Fitting writes nothing; the process keeps the detector until its dataset is staged
+    assert _stored_detectors() == before
+
+    other, _ = _jointly_rare(seed=6)
+    detector = multivariate_outliers.load_detector(detector_id)
+    reapplied, reapplied_meta = remove_outliers.build_keep_mask(other, {**config, "detector_id": detector_id})
+    assert reapplied.equals(detector.keep_mask(other))
+    assert reapplied_meta["detector"]["threshold"] == meta["detector"]["threshold"]
+    print("✅ PASS: detectors are reapplied without refitting")
+
+
+def test_only_saved_detector_ids_are_loaded():
+    df, _ = _jointly_rare(seed=8)
+    with tempfile.TemporaryDirectory() as tmp:
+        planted = os.path.join(tmp, "payload.joblib")
+        open(planted, "wb").close()
+        os.makedirs(multivariate_outliers.OUTLIER_DETECTOR_DIR, exist_ok=True)
+        link_id = "f" * 32
+        link = os.path.join(multivariate_outliers.OUTLIER_DETECTOR_DIR, f"{link_id}.joblib")
+        os.symlink(planted, link)
+        try:
+            for config in (
+                {"detector_path": planted},
+                {"detector_id": planted},
+                {"detector_id": "../" + "a" * 32},
+                {"detector_id": link_id},
+            ):
+                try:
+                    remove_outliers.build_keep_mask(df, {"method": "mcd", **config})
+                except ValueError:
+                    continue
+                raise AssertionError(f"{config} was loaded")
+        finally:
+            os.remove(link)
+    print("✅ PASS: paths, traversal and links out of the detector store are rejected")
+
+
+class _FakeBucket:
+    """Stands in for the cleaned-data bucket shared by every host."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def fput_object(self, bucket, name, path, content_type=None):
+        with open(path, "rb") as handle:
+            self.objects[(bucket, name)] = handle.read()
+
+    def fget_object(self, bucket, name, path):
+        with open(path, "wb") as handle:
+            handle.write(self.objects[(bucket, name)])
+
+
+def test_detector_travels_with_the_saved_dataset():
+    df, _ = _jointly_rare(seed=9)
+    mask, meta = remove_outliers.build_keep_mask(df, {"method": "isolation_forest", "sample_size": 3000})
+    detector_id = meta["detector"]["detector_id"]
+    bucket = _FakeBucket()
+    original_client = multivariate_outliers.minio_client
+    multivariate_outliers.minio_client = bucket
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = os.path.join(tmp, "cleaned.parquet")
+            assert multivariate_outliers.stage_detector(["Remove Nulls: none", meta], dataset) == detector_id
+            assert not os.path.exists(multivariate_outliers.detector_path(detector_id)), "stored before the dataset was saved"
+            assert multivariate_outliers.publish_staged_detector(dataset) == detector_id
+            assert not os.path.exists(multivariate_outliers.staged_detector_path(dataset))
+        assert (multivariate_outliers.CLEANED_BUCKET, multivariate_outliers.detector_object_name(detector_id)) in bucket.objects
+        # Another host has nothing in memory or in its local store and fetches the detector by id
+        multivariate_outliers._unsaved.pop(detector_id)
+        os.remove(multivariate_outliers.detector_path(detector_id))
+        reapplied, _ = remove_outliers.build_keep_mask(df, {"method": "isolation_forest", "detector_id": detector_id})
+        assert reapplied.equals(mask)
+        try:
+            multivariate_outliers.load_detector("0" * 32)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("an unknown detector id was loaded")
+    finally:
+        multivariate_outliers.minio_client = original_client
+        os.remove(multivariate_outliers.detector_path(detector_id))
+    print("✅ PASS: a saved dataset's detector can be reapplied from another host")
+
+
+def test_streaming_scores_in_batches():
+    df, _ = _jointly_rare(seed=7)
+    steps = {
+        "removeOutliers": True,
+        "removeOutliersConfig": {"method": "isolation_forest", "columns": ["a", "b", "c", "d", "e"], "contamination": 0.005},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.parquet")
+        output = os.path.join(tmp, "cleaned.parquet")
+        df.drop(columns=["label"]).to_parquet(source, index=False, row_group_size=3000)
+        _, result = run_streaming_plan(source, steps, output, head_rows=100, batch_rows=2500)
+        meta = next(m for m in result.change_metadata if isinstance(m, dict) and m.get("operation") == "Remove Outliers")
+        streamed = pd.read_parquet(output)
+        assert result.batches > 1
+        assert meta["method"] == "Isolation Forest"
+        assert len(streamed) == len(df) - meta["rows_removed"]
+        assert 0 < meta["rows_removed"] < len(df) * 0.02
+        assert not os.path.exists(multivariate_outliers.detector_path(meta["detector"]["detector_id"]))
+    print("✅ PASS: streaming fits once on a row sample and scores every batch")
+
+
+if __name__ == "__main__":
+    test_joint_outliers_are_detected()
+    test_saved_detector_is_reapplied()
+    test_only_saved_detector_ids_are_loaded()
+    test_detector_travels_with_the_saved_dataset()
+    test_streaming_scores_in_batches()
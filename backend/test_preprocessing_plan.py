@@ -0,0 +1,108 @@
+"""
+Verify the fused preprocessing plan matches the sequential step-by-step pipeline
+"""
+import numpy as np
+import pandas as pd
+import time
+from controllers.preprocessing.plan import compile_plan, execute_plan
+from controllers.preprocessing.remove_duplicates import apply as apply_remove_duplicates
+from controllers.preprocessing.remove_nulls import apply as apply_remove_nulls
+from controllers.preprocessing.fill_nulls import apply as apply_fill_nulls
+from controllers.preprocessing.drop_columns import apply as apply_drop_columns
+from controllers.preprocessing.remove_outliers import apply as apply_remove_outliers
+
+
+def _make_dataset(n_rows: int = 20000) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        'price': rng.normal(100, 15, n_rows),
+        'quantity': rng.integers(1, 50, n_rows).astype(float),
+        'region': rng.choice(['north', 'south', 'east', None], n_rows),
+        'notes': rng.choice(['a', 'b', None], n_rows),
+        'score': rng.exponential(3.0, n_rows),
+    })
+    df.loc[rng.choice(n_rows, 500, replace=False), 'price'] = np.nan
+    df.loc[rng.choice(n_rows, 50, replace=False), 'price'] = 10_000.0
+    df = pd.concat([df, df.head(300)], ignore_index=True)
+    return df.reset_index(drop=False).rename(columns={"index": "_orig_idx"})
+
+
+def _run_sequential(df: pd.DataFrame, steps: dict) -> pd.DataFrame:
+    out = df.copy()
+    if steps.get("removeDuplicates"):
+        out, _ = apply_remove_duplicates(out, steps.get("duplicateSubset", []))
+    if steps.get("removeNulls"):
+        out, _ = apply_remove_nulls(out, steps.get("removeNullsColumns", []))
+    if steps.get("fillNulls"):
+        out, _ = apply_fill_nulls(out, steps.get("fillStrategies", {}))
+    if steps.get("dropColumns"):
+        out, _ = apply_drop_columns(out, steps.get("dropColumns", []))
+    if steps.get("removeOutliers"):
+        out, _ = apply_remove_outliers(out, steps.get("removeOutliersConfig", {}))
+    return out
+
+
+def test_fused_plan_matches_sequential():
+    print("🧪 Testing fused preprocessing plan\n")
+    df = _make_dataset()
+    steps = {
+        "removeDuplicates": True,
+        "duplicateSubset": ["price", "quantity", "region", "notes", "score"],
+        "removeNulls": True,
+        "removeNullsColumns": ["region"],
+        "fillNulls": True,
+        "fillStrategies": {
+            "price": {"strategy": "median"},
+            "notes": {"strategy": "mode"},
+            "score": {"strategy": "mean"},
+        },
+        "dropColumns": ["notes"],
+        "removeOutliers": True,
+        "removeOutliersConfig": {"method": "iqr", "factor": 1.5, "columns": []},
+    }
+
+    start = time.time()
+    expected = _run_sequential(df, steps)
+    sequential_elapsed = time.time() - start
+
+    start = time.time()
+    plan = compile_plan(steps, df.columns)
+    fused, change_metadata = execute_plan(df, plan)
+    fused_elapsed = time.time() - start
+
+    print(f"   Sequential: {sequential_elapsed:.3f}s | Fused: {fused_elapsed:.3f}s")
+    print(f"   Plan: {plan.to_dict()}")
+
+    pd.testing.assert_frame_equal(fused, expected)
+    assert plan.dropped_columns == ["notes"]
+    assert plan.pruned_fills == ["notes"]
+    assert "notes" not in plan.fills
+    operations = [m["operation"] if isinstance(m, dict) else m for m in change_metadata]
+    assert operations == ["Remove Duplicates", "Remove Nulls", "Fill Nulls", "Fill Nulls", "Drop Columns", "Remove Outliers"]
+    removed = sum(m.get("rows_removed", 0) for m in change_metadata if isinstance(m, dict))
+    assert removed == len(df) - len(fused)
+    print("✅ PASS: fused plan output matches sequential pipeline")
+
+
+def test_plan_leaves_source_untouched():
+    df = _make_dataset(2000)
+    before = df.copy()
+    steps = {"fillNulls": True, "fillStrategies": {"price": {"strategy": "custom", "value": 0}}}
+    plan = compile_plan(steps, df.columns)
+    fused, _ = execute_plan(df, plan)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert fused["price"].isna().sum() == 0
+    # No filter: the projection shares the source columns, only the fill pass copies
+    assert plan.to_dict()["materializations"] == 1
+
+    steps["removeNulls"] = True
+    plan = compile_plan(steps, df.columns)
+    execute_plan(df, plan)
+    assert plan.to_dict()["materializations"] == 2
+    print("✅ PASS: source frame untouched, copying passes reported")
+
+
+if __name__ == "__main__":
+    test_fused_plan_matches_sequential()
+    test_plan_leaves_source_untouched()
@@ -0,0 +1,109 @@
+"""
+Verify preprocessing result memoization and staged-file eviction, and that evicting
+an entry never removes a staged file a job still points at
+"""
+import os
+import tempfile
+import time
+from controllers.preprocessing.multivariate_outliers import staged_detector_path
+from controllers.preprocessing.result_cache import PreprocessingResultCache, cache_key, canonical_steps
+
+
+def _staged_payload(size: int) -> dict:
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.parquet') as tmp:
+        tmp.write(b'\0' * size)
+    return {"temp_cleaned_path": tmp.name, "cleaned_row_count": size}
+
+
+def test_key_is_canonical():
+    a = {"fillNulls": True, "fillStrategies": {"x": {"strategy": "mean"}, "y": {"strategy": "mode"}}}
+    b = {"fillStrategies": {"y": {"strategy": "mode"}, "x": {"strategy": "mean"}}, "fillNulls": True}
+    assert canonical_steps(a) == canonical_steps(b)
+    assert cache_key('"etag-1"', a, "v1") == cache_key('etag-1', b, "v1")
+    assert cache_key('etag-1', a, "v1") != cache_key('etag-2', a, "v1")
+    assert cache_key('etag-1', a, "v1") != cache_key('etag-1', a, "v2")
+    assert cache_key('etag-1', a, "v1") != cache_key('etag-1', {"fillNulls": False}, "v1")
+    print("✅ PASS: keys ignore step ordering but track ETag, steps and code version")
+
+
+def test_hit_and_size_eviction():
+    print("🧪 Testing result cache hits and size-based eviction\n")
+    cache = PreprocessingResultCache(max_bytes=2500, max_age_seconds=3600, max_entries=10)
+    payloads = [_staged_payload(1000) for _ in range(3)]
+    cache.put("k0", payloads[0])
+    cache.put("k1", payloads[1])
+    hit = cache.get("k0")
+    assert hit["cache_hit"] and hit["temp_cleaned_path"] != payloads[0]["temp_cleaned_path"]
+    assert os.path.getsize(hit["temp_cleaned_path"]) == 1000
+    assert "cache_hit" not in payloads[0]
+
+    # k1 is now least recently used and goes first; only the cache's own link is removed
+    evicted = cache._entries["k1"].staged_path
+    cache.put("k2", payloads[2])
+    assert cache.get("k1") is None and not os.path.exists(evicted)
+    assert os.path.exists(payloads[1]["temp_cleaned_path"])
+    hits = [cache.get("k0"), cache.get("k2")]
+    assert all(h is not None for h in hits)
+    assert cache.total_bytes == 2000
+
+    oversized = _staged_payload(5000)
+    assert not cache.put("big", oversized)
+    assert os.path.exists(oversized["temp_cleaned_path"])
+    os.remove(oversized["temp_cleaned_path"])
+
+    owned = [entry.staged_path for entry in cache._entries.values()]
+    cache.clear()
+    assert not any(os.path.exists(path) for path in owned)
+    assert all(os.path.exists(p["temp_cleaned_path"]) for p in [hit, *hits, *payloads])
+    for p in [hit, *hits, *payloads]:
+        os.remove(p["temp_cleaned_path"])
+    print(f"   stats: {cache.stats()}")
+    print("✅ PASS: LRU entries and their staged files are evicted to stay under budget")
+
+
+def test_age_eviction_and_missing_files():
+    cache = PreprocessingResultCache(max_bytes=10_000, max_age_seconds=1, max_entries=10)
+    old = _staged_payload(10)
+    cache.put("old", old)
+    cache._entries["old"].created_at = time.time() - 5
+    evicted = cache._entries["old"].staged_path
+    assert cache.get("old") is None and not os.path.exists(evicted)
+    assert os.path.exists(old["temp_cleaned_path"]), "the job's staged file outlives the cache entry"
+
+    gone = _staged_payload(10)
+    cache.put("gone", gone)
+    os.remove(cache._entries["gone"].staged_path)
+    assert cache.get("gone") is None and len(cache) == 0
+    for p in (old, gone):
+        os.remove(p["temp_cleaned_path"])
+    print("✅ PASS: expired entries and entries whose staged file vanished are dropped")
+
+
+def test_hits_carry_the_staged_detector():
+    cache = PreprocessingResultCache(max_bytes=10_000, max_age_seconds=3600, max_entries=1)
+    job = _staged_payload(10)
+    sidecar = staged_detector_path(job["temp_cleaned_path"])
+    with open(sidecar, "w") as handle:
+        handle.write("a" * 32)
+    cache.put("k", job)
+    hit = cache.get("k")
+    with open(staged_detector_path(hit["temp_cleaned_path"])) as handle:
+        assert handle.read() == "a" * 32
+
+    # Pushing the entry out leaves both jobs' files and sidecars in place
+    other = _staged_payload(10)
+    cache.put("other", other)
+    os.remove(other["temp_cleaned_path"])
+    for path in (job["temp_cleaned_path"], hit["temp_cleaned_path"]):
+        assert os.path.exists(path) and os.path.exists(staged_detector_path(path))
+        os.remove(path)
+        os.remove(staged_detector_path(path))
+    cache.clear()
+    print("✅ PASS: each hit owns its staged file and detector sidecar")
+
+
+if __name__ == "__main__":
+    test_key_is_canonical()
+    test_hit_and_size_eviction()
+    test_age_eviction_and_missing_files()
+    test_hits_carry_the_staged_detector()
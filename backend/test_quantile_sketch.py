@@ -0,0 +1,78 @@
+"""
+Verify the mergeable quantile sketch used for IQR bounds
+"""
+import numpy as np
+import pandas as pd
+import time
+from controllers.preprocessing.sketches import FrequencySketch, QuantileSketch, iqr_bounds, merge_sketches
+
+
+def test_exact_mode_matches_pandas():
+    rng = np.random.default_rng(3)
+    series = pd.Series(rng.lognormal(0, 1, 50000))
+    series[::97] = np.nan
+
+    q1, q3 = series.quantile(0.25), series.quantile(0.75)
+    expected = (q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1))
+    assert iqr_bounds(series) == expected
+    sketch = QuantileSketch.from_values(series.to_numpy())
+    assert sketch.is_exact
+    assert np.isclose(sketch.std(), series.std(ddof=0))
+    print("✅ PASS: small columns get exact pandas quartiles")
+
+
+def test_approximate_mode_within_rank_error():
+    print("🧪 Testing KLL sketch accuracy on 2M values\n")
+    rng = np.random.default_rng(5)
+    values = rng.standard_cauchy(2_000_000)
+    epsilon = 0.01
+
+    start = time.time()
+    partitions = [
+        QuantileSketch(epsilon=epsilon, exact_limit=10_000).update(chunk)
+        for chunk in np.array_split(values, 16)
+    ]
+    merged = merge_sketches(partitions)
+    elapsed = time.time() - start
+
+    assert not merged.is_exact
+    assert merged.count == values.size
+    assert np.isclose(merged.mean, values.mean())
+    sorted_values = np.sort(values)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        estimate = merged.quantile(q)
+        rank = np.searchsorted(sorted_values, estimate) / values.size
+        assert abs(rank - q) <= epsilon, (q, rank)
+    print(f"   Sketched and merged in {elapsed:.3f}s, {merged.size_bytes()} bytes retained")
+    print("✅ PASS: merged partition sketches stay within the rank-error bound")
+
+
+def test_frequency_sketch_keeps_the_mode_in_bounded_memory():
+    rng = np.random.default_rng(5)
+    exact = FrequencySketch(capacity=1000)
+    values = pd.Series(rng.choice(["b", "a", "c"], 5000))
+    for batch in np.array_split(values, 5):
+        exact.update(batch)
+    assert exact.is_exact and exact.most_common() == values.mode().iloc[0]
+
+    # Half a million distinct ids around one value that is frequent, but nowhere near a majority
+    sketch = FrequencySketch(capacity=1000)
+    ids = pd.Series([f"id_{i}" for i in range(500_000)] + ["popular"] * 2000).sample(frac=1, random_state=0)
+    for batch in np.array_split(ids, 50):
+        sketch.update(batch)
+        assert len(sketch.counts) <= 1000
+    assert not sketch.is_exact
+    assert sketch.total == len(ids)
+    assert sketch.most_common() == "popular"
+
+    left, right = FrequencySketch(capacity=1000), FrequencySketch(capacity=1000)
+    left.update(ids.iloc[:250_000])
+    right.update(ids.iloc[250_000:])
+    assert left.merge(right).most_common() == "popular"
+    print("✅ PASS: frequency sketches find the mode of 500k distinct values in 1000 counters")
+
+
+if __name__ == "__main__":
+    test_exact_mode_matches_pandas()
+    test_approximate_mode_within_rank_error()
+    test_frequency_sketch_keeps_the_mode_in_bounded_memory()
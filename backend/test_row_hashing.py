@@ -0,0 +1,85 @@
+"""
+Verify fingerprint-based duplicate detection against pandas
+"""
+import numpy as np
+import pandas as pd
+import time
+from controllers.preprocessing.row_hashing import DuplicateTracker, duplicate_mask, row_fingerprints
+
+
+def _make_frame(n_rows: int = 60000) -> pd.DataFrame:
+    rng = np.random.default_rng(21)
+    df = pd.DataFrame({
+        'user': rng.integers(0, 3000, n_rows),
+        'city': rng.choice(['paris', 'lyon', None], n_rows),
+        'amount': rng.choice([1.5, 2.0, np.nan], n_rows),
+    })
+    return df
+
+
+def test_duplicate_mask_matches_pandas():
+    df = _make_frame()
+    for subset in (None, ['user', 'city']):
+        expected = df.duplicated(subset=subset, keep='first').to_numpy()
+        assert np.array_equal(duplicate_mask(df, subset), expected)
+    print("✅ PASS: fingerprint duplicate mask matches DataFrame.duplicated")
+
+
+def test_tracker_across_batches():
+    print("🧪 Testing cross-batch duplicate tracking\n")
+    df = _make_frame()
+    # Ints in some batches, floats (with nulls) in others must hash alike
+    df['user'] = df['user'].astype(float)
+    df.loc[df.index[-10:], 'user'] = np.nan
+    expected = ~df.duplicated(subset=['user', 'city', 'amount'], keep='first').to_numpy()
+
+    start = time.time()
+    tracker = DuplicateTracker(['user', 'city', 'amount'])
+    masks = []
+    for chunk in np.array_split(np.arange(len(df)), 13):
+        batch = df.iloc[chunk]
+        if not batch['user'].isna().any():
+            batch = batch.astype({'user': 'int64'})
+        masks.append(tracker.observe(batch))
+    elapsed = time.time() - start
+
+    assert np.array_equal(np.concatenate(masks), expected)
+    assert tracker.duplicate_rows == int((~expected).sum())
+    assert tracker.size_bytes() == 16 * tracker.unique_rows
+    print(f"   {tracker.rows_seen} rows in {elapsed:.3f}s, {tracker.size_bytes()} bytes of fingerprints")
+    print("✅ PASS: tracker keeps the first occurrence across batches")
+
+
+def test_collisions_are_verified():
+    df = pd.DataFrame({'a': [1, 2, 1, 3], 'b': ['x', 'y', 'x', 'z']})
+    fingerprints = row_fingerprints(df)
+    assert fingerprints.dtype == np.uint64 and fingerprints[0] == fingerprints[2]
+    assert row_fingerprints(df, bits=128).shape == (4, 2)
+    # Force every row onto the same fingerprint: only real duplicates may be flagged
+    import controllers.preprocessing.row_hashing as row_hashing
+    original = row_hashing.row_fingerprints
+    row_hashing.row_fingerprints = lambda frame, columns=None, bits=64: np.zeros(len(frame), dtype=np.uint64)
+    try:
+        assert duplicate_mask(df).tolist() == [False, False, True, False]
+    finally:
+        row_hashing.row_fingerprints = original
+    print("✅ PASS: fingerprint collisions never drop distinct rows")
+
+
+
+def test_large_ids_keep_their_precision_across_batches():
+    tracker = DuplicateTracker(['id'])
+    assert tracker.observe(pd.DataFrame({'id': [10 ** 18]})).tolist() == [True]
+    assert tracker.observe(pd.DataFrame({'id': [10 ** 18 + 1]})).tolist() == [True], "ids above 2**53 are distinct"
+    assert tracker.observe(pd.DataFrame({'id': [10 ** 18, 10 ** 18 + 2]})).tolist() == [False, True]
+    # The same ids arriving as floats (a batch with nulls) still match exactly
+    assert tracker.observe(pd.DataFrame({'id': [7.0, np.nan]})).tolist() == [True, True]
+    assert tracker.observe(pd.DataFrame({'id': [7, 8]})).tolist() == [False, True]
+    assert tracker.duplicate_rows == 2
+    print("✅ PASS: int64 ids above 2**53 stay distinct across batches")
+
+if __name__ == "__main__":
+    test_duplicate_mask_matches_pandas()
+    test_tracker_across_batches()
+    test_collisions_are_verified()
+    test_large_ids_keep_their_precision_across_batches()
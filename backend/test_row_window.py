@@ -0,0 +1,103 @@
+"""
+Verify paginated row windows over Parquet: results match pandas and only the
+row groups a window needs are read.
+"""
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from controllers.preprocessing.row_window import RowWindowError, read_row_window
+
+ROW_GROUP_ROWS = 1000
+
+
+def _write_dataset(path: str, n_rows: int = 20000) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "id": np.arange(n_rows),
+        "score": rng.normal(size=n_rows),
+        "city": rng.choice(["Paris", "Lyon", "Nice"], n_rows),
+    })
+    df.loc[df.index[::50], "score"] = np.nan
+    df.to_parquet(path, index=False, row_group_size=ROW_GROUP_ROWS, write_page_index=True)
+    return df
+
+
+def test_plain_window_reads_overlapping_row_groups():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "rows.parquet")
+        df = _write_dataset(path)
+        window = read_row_window(path, offset=12950, limit=100)
+        expected = df.iloc[12950:13050].reset_index(drop=True)
+        pd.testing.assert_frame_equal(window.frame, expected)
+        assert window.row_numbers == list(range(12950, 13050))
+        assert window.total_rows == len(df)
+        assert window.row_groups_read == 2 and window.key_row_groups_scanned == 0
+        assert window.row_groups_total == len(df) // ROW_GROUP_ROWS
+
+        tail = read_row_window(path, offset=len(df) - 5, limit=100)
+        assert tail.row_numbers == list(range(len(df) - 5, len(df)))
+        empty = read_row_window(path, offset=len(df) + 10, limit=10)
+        assert empty.frame.empty and empty.total_rows == len(df)
+    print("✅ PASS: plain windows read only overlapping row groups")
+
+
+def test_filter_prunes_by_statistics():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "rows.parquet")
+        df = _write_dataset(path)
+        window = read_row_window(path, offset=5, limit=20, filters=[{"column": "id", "op": "ge", "value": "15000"}])
+        expected = df[df["id"] >= 15000]
+        assert window.total_rows == len(expected)
+        assert window.row_numbers == list(expected.index[5:25])
+        assert window.key_row_groups_scanned == 5 and window.row_groups_read == 1
+
+        combined = read_row_window(
+            path,
+            limit=50,
+            filters=[{"column": "city", "op": "in", "value": ["Nice"]}, {"column": "score", "op": "notnull"}],
+        )
+        expected = df[(df["city"] == "Nice") & df["score"].notna()]
+        assert combined.total_rows == len(expected)
+        assert combined.row_numbers == list(expected.index[:50])
+    print("✅ PASS: filters skip row groups via statistics and match pandas")
+
+
+def test_sorted_window_matches_pandas():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "rows.parquet")
+        df = _write_dataset(path)
+        window = read_row_window(path, offset=100, limit=30, sort_by="score", descending=True)
+        ordered = df.sort_values("score", ascending=False, na_position="last", kind="stable")
+        assert window.row_numbers == list(ordered.index[100:130])
+        pd.testing.assert_series_equal(
+            window.frame["score"], ordered["score"].iloc[100:130].reset_index(drop=True)
+        )
+        last = read_row_window(path, offset=len(df) - 3, limit=3, sort_by="score")
+        assert last.frame["score"].isna().all()
+    print("✅ PASS: sorted windows match pandas ordering with nulls last")
+
+
+def test_invalid_requests_are_rejected():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "rows.parquet")
+        _write_dataset(path, n_rows=100)
+        for kwargs in (
+            {"sort_by": "missing"},
+            {"filters": [{"column": "id", "op": "between", "value": 1}]},
+            {"filters": [{"column": "id", "op": "eq", "value": "not-a-number"}]},
+            {"offset": -1},
+        ):
+            try:
+                read_row_window(path, **kwargs)
+            except RowWindowError:
+                continue
+            raise AssertionError(f"accepted invalid window request {kwargs}")
+    print("✅ PASS: invalid window requests raise RowWindowError")
+
+
+if __name__ == "__main__":
+    test_plain_window_reads_overlapping_row_groups()
+    test_filter_prunes_by_statistics()
+    test_sorted_window_matches_pandas()
+    test_invalid_requests_are_rejected()
@@ -0,0 +1,178 @@
+"""
+Verify sample-based profiling, confidence intervals and full-scan escalation, that
+stratified samples decode only some row groups and columns, and that a straddled
+threshold only escalates when the recommendation flips
+"""
+import io
+import os
+import sys
+import time
+# The recommendation endpoint imports backend.config; make the repository root importable in script mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from backend import config
+from backend.controllers import data_controller
+from backend.controllers.preprocessing import io_utils
+from controllers.preprocessing.profiler import ColumnProfiler
+from controllers.preprocessing.recommendations import column_recommendation
+from controllers.preprocessing.sampling import (
+    SamplingThresholds,
+    load_sample,
+    profile_with_sampling,
+    wilson_interval,
+)
+
+
+def _make_frame(n_rows: int = 400000) -> pd.DataFrame:
+    rng = np.random.default_rng(13)
+    df = pd.DataFrame({
+        'amount': rng.lognormal(3, 1, n_rows),
+        'plan': rng.choice(['basic', 'plus', 'pro'], n_rows),
+        'region': rng.choice(['north', 'south', None], n_rows, p=[0.45, 0.45, 0.10]),
+    })
+    df.loc[rng.random(n_rows) < 0.4, 'amount'] = np.nan
+    return df
+
+
+def _parquet_buffer(df: pd.DataFrame) -> io.BytesIO:
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, row_group_size=50000)
+    buffer.seek(0)
+    return buffer
+
+
+def test_stratified_sample_intervals_cover_truth():
+    print("🧪 Testing sampled recommendations profile\n")
+    df = _make_frame()
+    thresholds = SamplingThresholds(missing=(80.0,), outliers=(), rows_with_nulls=(), unique_share=(), skew=())
+
+    start = time.time()
+    frame, profile, sampling = profile_with_sampling(
+        _parquet_buffer(df), "data.parquet",
+        normalize=lambda f: f, profiler=ColumnProfiler(), sample_rows=20000, thresholds=thresholds,
+    )
+    print(f"   Sampled profile in {time.time() - start:.3f}s ({sampling['sample_rows']} of {sampling['total_rows']} rows)")
+
+    assert sampling["method"] == "stratified" and not sampling["escalated"]
+    assert len(frame) == 20000 and profile.total_rows == len(df)
+    assert sampling["row_groups_read"][0] < sampling["row_groups_read"][1]
+    # Duplicates are estimated from the sample; nearly every null-amount row repeats here
+    truth = int(df.duplicated().sum())
+    assert abs(profile.duplicate_rows - truth) < truth * 0.05, (profile.duplicate_rows, truth)
+    for col in ('amount', 'region'):
+        low, high = sampling["intervals"][col]["missing_percentage"]
+        truth = df[col].isna().mean() * 100
+        assert low <= truth <= high, (col, low, truth, high)
+    assert profile['plan'].unique_count == 3
+    print("✅ PASS: intervals cover the true missing shares; counts extrapolated")
+
+
+def test_near_threshold_escalates_to_full_scan():
+    df = _make_frame(200000)
+    # 40% missing in 'amount' sits right on a 40% decision threshold
+    thresholds = SamplingThresholds(missing=(40.0,))
+    frame, profile, sampling = profile_with_sampling(
+        _parquet_buffer(df), "data.parquet",
+        normalize=lambda f: f, profiler=ColumnProfiler(), sample_rows=10000, thresholds=thresholds,
+    )
+    assert sampling["escalated"]
+    assert any(reason.startswith("amount") for reason in sampling["escalation_reasons"])
+    assert len(frame) == len(df)
+    assert profile['amount'].missing_count == int(df['amount'].isna().sum())
+    print("✅ PASS: near-threshold sample escalates to an exact full scan")
+
+
+def test_stratified_sample_reads_some_row_groups_and_columns():
+    df = _make_frame(400000)
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, row_group_size=10000)
+    buffer.seek(0)
+    sample = load_sample(buffer, "data.parquet", sample_rows=5000, columns=["amount", "region"])
+    read, total = sample.row_groups_read
+    assert sample.method == "stratified" and total == 40
+    assert read == 2, "5000 rows at 4x are covered by two 10k-row groups"
+    assert list(sample.frame.columns) == ["amount", "region"]
+    assert abs(len(sample.frame) - 5000) <= read
+    print(f"✅ PASS: stratified sample decoded {read} of {total} row groups, two columns")
+
+
+def test_escalation_only_when_the_recommendation_flips():
+    df = _make_frame(200000)
+    # 40% missing in 'amount' straddles 40%, but the suggestions (fill below 80%) do not change
+    thresholds = SamplingThresholds(missing=(40.0,), outliers=(), decision=column_recommendation)
+    frame, _, sampling = profile_with_sampling(
+        _parquet_buffer(df), "data.parquet",
+        normalize=lambda f: f, profiler=ColumnProfiler(), sample_rows=10000, thresholds=thresholds,
+    )
+    assert not sampling["escalated"] and len(frame) == 10000
+
+    # Around 80% missing the column flips between fill and drop
+    df.loc[np.random.default_rng(1).random(len(df)) < 0.667, 'amount'] = np.nan
+    thresholds = SamplingThresholds(missing=(80.0,), outliers=(), decision=column_recommendation)
+    frame, _, sampling = profile_with_sampling(
+        _parquet_buffer(df), "data.parquet",
+        normalize=lambda f: f, profiler=ColumnProfiler(), sample_rows=10000, thresholds=thresholds,
+    )
+    assert sampling["escalation_reasons"] == ["amount: missing share near 80.0%"]
+    assert len(frame) == len(df)
+    print("✅ PASS: only thresholds that flip a suggestion escalate to a full scan")
+
+
+def test_csv_reservoir_and_small_files():
+    df = _make_frame(30000)
+    csv = io.BytesIO(df.to_csv(index=False).encode())
+    sample = load_sample(csv, "data.csv", sample_rows=5000, method="reservoir")
+    assert sample.method == "reservoir" and sample.sample_rows == 5000 and sample.total_rows == 30000
+    csv.seek(0)
+    assert load_sample(csv, "data.csv", sample_rows=50000).method == "full"
+    low, high = wilson_interval(0, 100)
+    assert low == 0.0 and 0 < high < 5
+    print("✅ PASS: CSV reservoir sampling and small-file passthrough")
+
+
+class _RangeBucket:
+    """Serves one stored object through stat/ranged get calls and counts the bytes sent."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.bytes_sent = 0
+
+    def stat_object(self, bucket, name):
+        return type("Stat", (), {"size": len(self.data)})()
+
+    def get_object(self, bucket, name, offset=0, length=0):
+        end = len(self.data) if not length else offset + length
+        chunk = self.data[offset:end]
+        self.bytes_sent += len(chunk)
+        return type("Response", (), {"read": lambda _: chunk, "close": lambda _: None, "release_conn": lambda _: None})()
+
+
+def test_recommendations_fetch_only_sampled_row_groups():
+    rng = np.random.default_rng(21)
+    n_rows = 400000
+    df = pd.DataFrame({
+        'amount': rng.lognormal(3, 1, n_rows),
+        'plan': rng.choice(['basic', 'plus', 'pro'], n_rows),
+        **{f'reading_{i}': rng.normal(0, 1, n_rows) for i in range(4)},
+    })
+    bucket = _RangeBucket(_parquet_buffer(df).getvalue())
+    original = io_utils.minio_client, config.ensure_minio_buckets_exist
+    io_utils.minio_client, config.ensure_minio_buckets_exist = bucket, lambda: None
+    try:
+        payload = data_controller.get_preprocessing_recommendations("orders.parquet", sample_size=20000)
+    finally:
+        io_utils.minio_client, config.ensure_minio_buckets_exist = original
+    sampling = payload["quality_summary"]["sampling"]
+    assert len(sampling["row_groups_read"]) < 8 and not sampling["escalated"], sampling
+    assert bucket.bytes_sent < len(bucket.data) / 2, (bucket.bytes_sent, len(bucket.data))
+    print(f"✅ PASS: recommendations fetched {bucket.bytes_sent / len(bucket.data):.0%} of the stored Parquet")
+
+
+if __name__ == "__main__":
+    test_stratified_sample_intervals_cover_truth()
+    test_near_threshold_escalates_to_full_scan()
+    test_stratified_sample_reads_some_row_groups_and_columns()
+    test_escalation_only_when_the_recommendation_flips()
+    test_csv_reservoir_and_small_files()
+    test_recommendations_fetch_only_sampled_row_groups()
@@ -0,0 +1,133 @@
+"""
+Verify sparse one-hot encoding end to end: a few-thousand-level column is one-hot
+encoded into sparse columns with the same values as dense dummies, survives the
+Parquet round trip as a CSR block, and trains models as a sparse matrix; predictions
+hand such models a CSR matrix again and leave every other model its frame.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+# io_utils imports backend.config; make the repository root importable in script mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+from controllers.feature_engineering.operations import apply_encoding, fit_encoding
+from controllers.model_training import controller as training_controller
+from controllers.model_training.trainers import prepare_data_for_training, to_estimator_input, train_single_model
+from controllers.preprocessing.sparse_frames import densify, read_parquet, write_parquet
+
+
+def _listings(n_rows: int = 20000, n_cities: int = 3000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    city = pd.Series(rng.choice([f"city_{i:04d}" for i in range(n_cities)], n_rows))
+    df = pd.DataFrame({
+        "city": city.mask(rng.random(n_rows) < 0.01),
+        "room": rng.choice(["entire", "private", "shared"], n_rows),
+        "nights": rng.integers(1, 30, n_rows),
+    })
+    df["target"] = (city.str[-1].astype(int) % 2 == 0).astype(int)
+    return df
+
+
+def test_sparse_dummies_match_dense_dummies():
+    df = _listings()
+    encoded, meta = apply_encoding(df, ["city", "room"], "one-hot-sparse")
+    assert meta["details"]["city"] == "one-hot encoded (sparse)"
+    city_columns = [col for col in encoded.columns if col.startswith("city_")]
+    assert len(city_columns) == df["city"].nunique()
+    assert all(isinstance(encoded[col].dtype, pd.SparseDtype) for col in city_columns)
+
+    expected = pd.get_dummies(df["city"], prefix="city", dtype=np.uint8)
+    pd.testing.assert_frame_equal(densify(encoded[city_columns]), expected)
+    sparse_bytes = encoded[city_columns].memory_usage(index=False).sum()
+    assert sparse_bytes * 50 < expected.memory_usage(index=False).sum()
+
+    # Plain one-hot keeps falling back to label encoding above 100 levels
+    _, dense_meta = apply_encoding(df, ["city"], "one-hot")
+    assert dense_meta["details"]["city"] == "label encoded"
+
+    transformer, _ = fit_encoding(df, ["city"], "one-hot-sparse")
+    new_rows = transformer.transform(pd.DataFrame({"city": ["city_0001", "nowhere"]}))
+    assert new_rows.sum(axis=1).tolist() == [1, 0], "unseen cities encode as all zeros"
+    print(f"✅ PASS: sparse dummies match get_dummies in {sparse_bytes / expected.memory_usage(index=False).sum():.1%} of the memory")
+
+
+def test_parquet_round_trip_keeps_columns_sparse():
+    encoded, _ = apply_encoding(_listings(), ["city", "room"], "one-hot-sparse")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "feature_engineered_listings.parquet")
+        write_parquet(encoded, path)
+        restored = read_parquet(path)
+        size = os.path.getsize(path)
+    pd.testing.assert_frame_equal(restored, encoded)
+    assert size < 1024 ** 2, f"CSR block should stay small on disk, got {size} bytes"
+    print(f"✅ PASS: {len(encoded.columns)} columns round-trip through {size / 1024:.0f} KiB of Parquet")
+
+
+def test_training_receives_a_sparse_matrix():
+    encoded, _ = apply_encoding(_listings(), ["city", "room"], "one-hot-sparse")
+    X_train, X_test, y_train, y_test = prepare_data_for_training(encoded, "target")
+    assert sparse.issparse(to_estimator_input(LogisticRegression(), X_train))
+
+    sparse_result = train_single_model("logistic_regression", LogisticRegression(max_iter=1000), X_train, X_test, y_train, y_test, "classification")
+    dense_result = train_single_model(
+        "logistic_regression", LogisticRegression(max_iter=1000), densify(X_train), densify(X_test), y_train, y_test, "classification"
+    )
+    assert sparse_result["success"], sparse_result.get("error")
+    assert abs(sparse_result["metrics"]["accuracy"] - dense_result["metrics"]["accuracy"]) < 1e-9
+    print(f"✅ PASS: sparse training matches dense training (accuracy {sparse_result['metrics']['accuracy']:.3f})")
+
+
+class _NightsRule:
+    """Reads a column by name, so it needs the frame; it has no ``feature_names_in_``."""
+
+    def predict(self, X):
+        return (X["nights"] > 10).astype(float).to_numpy()
+
+
+def _predict(model, features, rows, sparse_input):
+    details = {
+        "dataset_info": {"features": features, "filename": "listings.parquet", "sparse_input": sparse_input},
+        "target_column": "target",
+        "problem_type": "regression",
+        "best_model": {"model_name": type(model).__name__},
+    }
+
+    async def model_details(model_id):
+        return details
+
+    original = training_controller.get_model_details, training_controller.load_model_for_prediction
+    training_controller.get_model_details = model_details
+    training_controller.load_model_for_prediction = lambda model_id: model
+    try:
+        result = asyncio.run(training_controller.make_predictions("model", rows))
+    finally:
+        training_controller.get_model_details, training_controller.load_model_for_prediction = original
+    return [row["prediction"] for row in result["predictions"]]
+
+
+def test_predictions_match_the_training_input():
+    df = _listings(2000, 200)
+    rows = df[["nights", "target"]].head(20).to_dict("records")
+    # A dataset with sparse features does not turn every model's input into an array
+    predictions = _predict(_NightsRule(), ["nights", "target"], rows, sparse_input=True)
+    assert predictions == [float(row["nights"] > 10) for row in rows]
+
+    encoded, _ = apply_encoding(df, ["city", "room"], "one-hot-sparse")
+    X_train, _, y_train, _ = prepare_data_for_training(encoded, "target")
+    model = LogisticRegression(max_iter=1000).fit(to_estimator_input(LogisticRegression(), X_train), y_train)
+    assert not hasattr(model, "feature_names_in_")
+    sample = densify(X_train.head(20))
+    predictions = _predict(model, list(X_train.columns), sample.to_dict("records"), sparse_input=True)
+    assert predictions == model.predict(to_estimator_input(model, X_train.head(20))).astype(float).tolist()
+    print("✅ PASS: predictions use a CSR matrix only for models trained on one")
+
+
+if __name__ == "__main__":
+    test_sparse_dummies_match_dense_dummies()
+    test_parquet_round_trip_keeps_columns_sparse()
+    test_training_receives_a_sparse_matrix()
+    test_predictions_match_the_training_input()
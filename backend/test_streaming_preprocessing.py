@@ -0,0 +1,119 @@
+"""
+Verify out-of-core (row-group streaming) preprocessing matches the in-memory plan
+"""
+import os
+import sys
+import tempfile
+import time
+# io_utils imports backend.config; make the repository root importable in script mode
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from controllers.preprocessing.io_utils import sanitize_dataframe_for_parquet
+from controllers.preprocessing.plan import compile_plan, execute_plan
+from controllers.preprocessing.streaming import run_streaming_plan, should_stream
+
+
+def _write_dataset(path: str, n_rows: int = 30000) -> None:
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({
+        'price': rng.normal(100, 15, n_rows),
+        'quantity': rng.integers(1, 50, n_rows),
+        'region': rng.choice(['north', 'south', 'east', None], n_rows),
+        'notes': rng.choice(['a', 'b', None], n_rows),
+        'score': rng.exponential(3.0, n_rows),
+    })
+    df.loc[rng.choice(n_rows, 600, replace=False), 'price'] = np.nan
+    df.loc[rng.choice(n_rows, 60, replace=False), 'price'] = 10_000.0
+    # Duplicates spanning row groups
+    df = pd.concat([df, df.head(400), df.iloc[15000:15200]], ignore_index=True)
+    df.to_parquet(path, index=False, row_group_size=4000)
+
+
+def test_streaming_matches_in_memory():
+    print("🧪 Testing streaming preprocessing against the in-memory plan\n")
+    steps = {
+        "removeDuplicates": True,
+        "duplicateSubset": ["price", "quantity", "region", "notes"],
+        "removeNulls": True,
+        "removeNullsColumns": ["region"],
+        "fillNulls": True,
+        "fillStrategies": {
+            "price": {"strategy": "median"},
+            "notes": {"strategy": "mode"},
+            "score": {"strategy": "mean"},
+        },
+        "dropColumns": ["score"],
+        "removeOutliers": True,
+        "removeOutliersConfig": {"method": "iqr", "factor": 1.5, "columns": []},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.parquet")
+        output = os.path.join(tmp, "cleaned.parquet")
+        _write_dataset(source)
+
+        df = pd.read_parquet(source)
+        df = df.reset_index(drop=False).rename(columns={"index": "_orig_idx"})
+        expected, expected_meta = execute_plan(df, compile_plan(steps, df.columns))
+
+        start = time.time()
+        plan, result = run_streaming_plan(source, steps, output, head_rows=500, batch_rows=3000)
+        print(f"   Streamed {result.batches} batches in {time.time() - start:.3f}s")
+
+        streamed = pd.read_parquet(output)
+        assert result.batches > 1
+        assert result.original_row_count == len(df)
+        assert result.cleaned_row_count == len(expected) == len(streamed)
+        pd.testing.assert_frame_equal(streamed, expected.reset_index(drop=True), check_dtype=False)
+        assert [m["rows_removed"] for m in result.change_metadata if "rows_removed" in m] == \
+            [m["rows_removed"] for m in expected_meta if isinstance(m, dict) and "rows_removed" in m]
+        assert len(result.original_head) == 500 and len(result.cleaned_head) == 500
+        assert result.missing_counts == {col: int(n) for col, n in expected.isna().sum().items()}
+        assert plan.fills["notes"]["value"] == expected_meta[3]["value"]
+    print("✅ PASS: streaming output matches in-memory plan")
+
+
+def test_output_schema_covers_every_batch():
+    n_rows = 6000
+    df = pd.DataFrame({
+        "score": np.linspace(0, 1, n_rows),
+        "comment": pd.Series(["ok"] * n_rows, dtype=object),
+    })
+    # Gaps only after the first row group: the first batch has no nulls to fill with text,
+    # and its comments are all null
+    df.loc[4500:4600, "score"] = np.nan
+    df.loc[:2999, "comment"] = None
+    steps = {"fillNulls": True, "fillStrategies": {"score": {"strategy": "custom", "value": "unknown"}}}
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.parquet")
+        output = os.path.join(tmp, "cleaned.parquet")
+        df.to_parquet(source, index=False, row_group_size=3000)
+        _, result = run_streaming_plan(
+            source, steps, output, head_rows=100, batch_rows=3000, sanitize=sanitize_dataframe_for_parquet
+        )
+        schema = pq.read_schema(output)
+        streamed = pd.read_parquet(output)
+    assert result.batches == 2
+    assert schema.field("score").type == pa.string() and schema.field("comment").type == pa.string()
+    assert streamed["score"].iloc[4500] == "unknown" and streamed["score"].iloc[0] == "0.0"
+    assert streamed["comment"].isna().sum() == 3000 and (streamed["comment"].iloc[3000:] == "ok").all()
+    print("✅ PASS: the output schema is unified over every batch before writing")
+
+
+def test_should_stream_respects_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.parquet")
+        _write_dataset(source, 2000)
+        assert should_stream(source, budget_bytes=1024)
+        assert not should_stream(source, budget_bytes=1024 ** 3)
+    print("✅ PASS: streaming is selected only above the memory budget")
+
+
+if __name__ == "__main__":
+    test_streaming_matches_in_memory()
+    test_output_schema_covers_every_batch()
+    test_should_stream_respects_budget()
@@ -0,0 +1,73 @@
+"""
+Verify worker-process mode: a scheduled job runs in another process, its progress
+reaches listeners in this process and its result lands in the shared job store.
+"""
+import asyncio
+import os
+import tempfile
+import time
+from services import job_store, progress_tracker, worker_pool
+from services.job_scheduler import JobScheduler
+
+
+def _job(job_id):
+    for step in range(1, 4):
+        progress_tracker.update_job(job_id, progress=step * 25, status="running")
+        time.sleep(0.05)
+    progress_tracker.complete_job(job_id, {"pid": os.getpid()})
+
+
+async def _async_job(job_id):
+    # Preprocessing and feature engineering jobs are coroutine functions
+    await asyncio.sleep(0)
+    progress_tracker.complete_job(job_id, {"pid": os.getpid()})
+
+
+def test_jobs_run_in_worker_processes():
+    original_store, original_mode = progress_tracker.job_store, worker_pool.JOB_WORKER_MODE
+    with tempfile.TemporaryDirectory() as tmp:
+        progress_tracker.job_store = job_store.SQLiteJobStore(os.path.join(tmp, "jobs.sqlite3"))
+        worker_pool.JOB_WORKER_MODE = "process"
+        try:
+            job_id, async_job_id = progress_tracker.create_job(), progress_tracker.create_job()
+            seen = []
+            unsubscribe = progress_tracker.subscribe(job_id, lambda snapshot: seen.append(snapshot["status"]))
+
+            async def _run():
+                scheduler = JobScheduler(limits={"training": 1}, max_concurrent=1)
+                scheduler.submit("training", job_id, _job, job_id)
+                scheduler.submit("training", async_job_id, _async_job, async_job_id)
+                while scheduler.stats()["running"].get("training") or scheduler.stats()["queued"]:
+                    await asyncio.sleep(0.05)
+
+            asyncio.run(asyncio.wait_for(_run(), timeout=120))
+            # Relayed snapshots arrive on the relay thread
+            deadline = time.time() + 10
+            while "completed" not in seen and time.time() < deadline:
+                time.sleep(0.05)
+            unsubscribe()
+
+            assert progress_tracker.get_job(job_id)["status"] == "completed"
+            assert progress_tracker.get_result(job_id)["pid"] != os.getpid()
+            assert "running" in seen and seen[-1] == "completed"
+            assert progress_tracker.get_result(async_job_id)["pid"] != os.getpid()
+        finally:
+            worker_pool.shutdown()
+            progress_tracker.job_store, worker_pool.JOB_WORKER_MODE = original_store, original_mode
+    print("✅ PASS: jobs run in worker processes and report back through the job store")
+
+
+def test_memory_store_keeps_jobs_in_threads():
+    original_mode = worker_pool.JOB_WORKER_MODE
+    worker_pool.JOB_WORKER_MODE = "process"
+    try:
+        assert isinstance(progress_tracker.job_store, job_store.MemoryJobStore)
+        assert not worker_pool.enabled()
+    finally:
+        worker_pool.JOB_WORKER_MODE = original_mode
+    print("✅ PASS: the in-memory store falls back to thread execution")
+
+
+if __name__ == "__main__":
+    test_jobs_run_in_worker_processes()
+    test_memory_store_keeps_jobs_in_threads()
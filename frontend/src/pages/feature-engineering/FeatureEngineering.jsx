@@ -166,7 +166,7 @@ export default function FeatureEngineering() {
   }, [collapseEnabled, isBuilderCollapsed]);
 
   useEffect(() => {
-    if (status === "failed" && isBuilderCollapsed) {
+    if ((status === "failed" || status === "cancelled") && isBuilderCollapsed) {
       setBuilderCollapsed(false);
     }
   }, [status, isBuilderCollapsed]);
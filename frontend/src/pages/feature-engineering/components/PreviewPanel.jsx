@@ -118,17 +118,19 @@ export const PreviewPanel = ({
       )}
       {progressInfo.status !== "idle" && (
         <div
-          className={`${styles.progressCard} ${progressInfo.status === "completed" ? styles.progressCardSuccess : ""} ${progressInfo.status === "failed" ? styles.progressCardError : ""}`}
+          className={`${styles.progressCard} ${progressInfo.status === "completed" ? styles.progressCardSuccess : ""} ${progressInfo.status === "failed" ? styles.progressCardError : ""} ${progressInfo.status === "cancelled" ? styles.progressCardCancelled : ""}`}
         >
           <div className={styles.progressMeta}>
             <span className={styles.progressLabel}>
               {progressInfo.status === "failed"
                 ? "Processing failed"
-                : progressInfo.status === "completed"
-                  ? "Processing complete"
-                  : progressInfo.status === "queued"
-                    ? "Preparing job"
-                    : "Processing dataset"}
+                : progressInfo.status === "cancelled"
+                  ? "Processing cancelled"
+                  : progressInfo.status === "completed"
+                    ? "Processing complete"
+                    : progressInfo.status === "queued"
+                      ? "Preparing job"
+                      : "Processing dataset"}
             </span>
             <span className={styles.progressPercent}>{Math.round(clampedAnimatedProgress)}%</span>
           </div>
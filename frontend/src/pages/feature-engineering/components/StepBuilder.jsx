@@ -125,7 +125,7 @@ export const StepBuilder = ({
             stepType="encoding"
             stepMethod={steps.encoding.method}
             dataPreview={dataPreview}
-            label="Columns to encode (each can have different method: One-Hot / Label / Target)"
+            label="Columns to encode (each can have different method: One-Hot / Sparse One-Hot / Label / Target)"
             placeholder={DEFAULT_COLUMNS_LABEL}
             allowColumnMethods={true}
             columnMethods={steps.encoding.columnMethods || {}}
@@ -2,7 +2,7 @@ import React from "react";
 import { getValidColumnsForStep, getColumnReason, getSuggestedMethod } from "../utils/columnValidators";
 
 const SCALING_METHODS = ["standard", "minmax", "robust", "log"];
-const ENCODING_METHODS = ["one-hot", "label", "target"];
+const ENCODING_METHODS = ["one-hot", "one-hot-sparse", "label", "target"];
 const BINNING_METHODS = ["equal-width", "quantile"];
 
 const getMethodsForStep = (stepType) => {
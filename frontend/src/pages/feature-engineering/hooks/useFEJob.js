@@ -1,4 +1,5 @@
 import { useCallback, useEffect, useRef, useState } from "react";
+import { isTerminalJobStatus } from "@/utils/jobStatus";
 
 // Unified FE job hook with analyze + apply support
 // Contract:
@@ -180,6 +181,16 @@ export default function useFEJob({ notify } = {}) {
           notify?.error?.(payload.error || "Feature engineering failed");
 
           // no pipeline patching
+        } else if (payload.status === "cancelled") {
+          setStatus("cancelled");
+          setProgress(clampProgress(payload.progress));
+          setMessage(payload.message || "Feature engineering cancelled");
+          setError(null);
+          setJobId(null);
+          const startedAt = startTimeRef.current;
+          clearTimer();
+          if (startedAt) setElapsedTime(Date.now() - startedAt);
+          notify?.error?.(payload.message || "Feature engineering cancelled");
         }
       } catch (e) {
         if (cancelled) return;
@@ -207,7 +218,7 @@ export default function useFEJob({ notify } = {}) {
 
   // Auto-clear transient progress banner after completion/failure
   useEffect(() => {
-    if (status === "completed" || status === "failed") {
+    if (isTerminalJobStatus(status)) {
       const t = setTimeout(() => {
         setStatus((prev) => (prev === status ? INITIAL_PROGRESS.status : prev));
         setProgress((prev) => (status !== "idle" ? INITIAL_PROGRESS.progress : prev));
@@ -1,4 +1,5 @@
 import { useCallback, useEffect, useRef, useState } from "react";
+import { isTerminalJobStatus } from "@/utils/jobStatus";
 
 const INITIAL_PROGRESS = {
   status: "idle",
@@ -178,6 +179,22 @@ export const useFeatureEngineeringJob = ({ selectedFile, notify }) => {
             setElapsedMs(Date.now() - startedAt);
           }
           notify?.error?.(payload.error || "Feature engineering failed");
+        } else if (payload.status === "cancelled") {
+          setProgressInfo((prev) => ({
+            ...prev,
+            status: "cancelled",
+            progress: clampProgress(payload.progress),
+            message: payload.message || "Feature engineering cancelled",
+            error: null,
+          }));
+          setLoading(false);
+          setJobId(null);
+          const startedAt = startTimeRef.current;
+          clearTimer();
+          if (startedAt) {
+            setElapsedMs(Date.now() - startedAt);
+          }
+          notify?.error?.(payload.message || "Feature engineering cancelled");
         }
       } catch (error) {
         if (cancelled) {
@@ -211,7 +228,7 @@ export const useFeatureEngineeringJob = ({ selectedFile, notify }) => {
   }, [jobId, clearPolling, notify, clearTimer]);
 
   useEffect(() => {
-    if (progressInfo.status === "completed" || progressInfo.status === "failed") {
+    if (isTerminalJobStatus(progressInfo.status)) {
       const timeout = setTimeout(() => {
         setProgressInfo((prev) => (prev.status === progressInfo.status ? INITIAL_PROGRESS : prev));
       }, 1800);
@@ -55,7 +55,11 @@ export const getColumnValidators = (dataPreview) => {
         if (cardinality <= 100) {
           return "one-hot";
         }
-        // High cardinality (>100 unique): Label encoding to prevent memory crash
+        // Up to 10k unique: sparse one-hot stores one entry per row
+        else if (cardinality <= 10000) {
+          return "one-hot-sparse";
+        }
+        // Very high cardinality: Label encoding to prevent memory crash
         else {
           return "label";
         }
@@ -10,10 +10,12 @@ import TrainingLoading from "./components/TrainingLoading";
 import TrainingConfigure from "./components/TrainingConfigure";
 import TrainingProgress from "./components/TrainingProgress";
 import TrainingFailed from "./components/TrainingFailed";
+import TrainingCancelled from "./components/TrainingCancelled";
 import TrainingResults from "./components/TrainingResults";
 import ErrorBoundary from "./components/ErrorBoundary";
 import ConfirmDialog from "../../components/ConfirmDialog";
 import { useTrainingJob } from "./hooks/useTrainingJob";
+import { isTerminalJobStatus } from "@/utils/jobStatus";
 
 
 function ModelTrainingInner() {
@@ -54,6 +56,7 @@ function ModelTrainingInner() {
     progress,
     result: trainingResult,
     error: trainingError,
+    message: trainingMessage,
     elapsedTime,
     savedModelId,
     startTraining,
@@ -382,7 +385,7 @@ function ModelTrainingInner() {
           )}
 
           {/* Step 3: Training in Progress */}
-          {step === "training" && trainingStatus !== "completed" && trainingStatus !== "failed" && (
+          {step === "training" && !isTerminalJobStatus(trainingStatus) && (
             <TrainingProgress
               status={trainingStatus}
               progress={progress}
@@ -402,6 +405,15 @@ function ModelTrainingInner() {
             />
           )}
 
+          {/* Training Cancelled */}
+          {step === "training" && trainingStatus === "cancelled" && (
+            <TrainingCancelled
+              message={trainingMessage}
+              onBack={() => setStep("configure")}
+              onRetry={handleStartTraining}
+            />
+          )}
+
           {/* Step 4: Results */}
           {step === "training" && trainingStatus === "completed" && trainingResult && (
             <TrainingResults
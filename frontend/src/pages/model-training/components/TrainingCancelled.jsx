@@ -0,0 +1,24 @@
+import React from "react";
+import styles from "../ModelTraining.module.css";
+
+export default function TrainingCancelled({ message, onBack, onRetry }) {
+  return (
+    <div className={styles.card}>
+      <div className={styles.cardHeader}>
+        <h2 className={styles.cardTitle}>⏹️ Training Cancelled</h2>
+        <p className={styles.cardDescription}>The training job was cancelled before it finished. No model was trained.</p>
+      </div>
+      <div className={styles.cardContent}>
+        {message && (
+          <div className={styles.infoBox}>
+            <strong>Status:</strong> {message}
+          </div>
+        )}
+        <div className={styles.actionBar}>
+          <button className={styles.secondaryButton} onClick={onBack}>← Back to Configuration</button>
+          <button className={styles.primaryButton} onClick={onRetry}>Start Training Again</button>
+        </div>
+      </div>
+    </div>
+  );
+}
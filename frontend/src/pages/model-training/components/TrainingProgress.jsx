@@ -1,9 +1,10 @@
 import React from "react";
 import styles from "../ModelTraining.module.css";
 import { formatTime } from "../utils/trainingUtils";
+import { isTerminalJobStatus } from "@/utils/jobStatus";
 
 export default function TrainingProgress({ status, progress, selectedFile, targetColumn, elapsedTime, jobId }) {
-  if (status === "completed" || status === "failed") return null;
+  if (isTerminalJobStatus(status)) return null;
   return (
     <div className={styles.card}>
       <div className={styles.cardHeader}>
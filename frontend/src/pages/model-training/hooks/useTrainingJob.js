@@ -1,4 +1,5 @@
 import { useCallback, useEffect, useRef, useState } from "react";
+import { isTerminalJobStatus } from "@/utils/jobStatus";
 
 export function useTrainingJob() {
   const [jobId, setJobId] = useState(null);
@@ -8,6 +9,7 @@ export function useTrainingJob() {
   const [error, setError] = useState(null);
   const [elapsedTime, setElapsedTime] = useState(0);
   const [savedModelId, setSavedModelId] = useState(null);
+  const [message, setMessage] = useState("");
 
   const pollingRef = useRef(null);
   const startTimeRef = useRef(null);
@@ -43,7 +45,7 @@ export function useTrainingJob() {
   }, []);
 
   useEffect(() => {
-    if (!jobId || status === "completed" || status === "failed") return;
+    if (!jobId || isTerminalJobStatus(status)) return;
 
     const pollStatus = async () => {
       try {
@@ -52,6 +54,7 @@ export function useTrainingJob() {
         const job = await resp.json();
         setProgress(job.progress || 0);
         setStatus(job.status);
+        setMessage(job.message || "");
         if (job.status === "completed") {
           setResult(job.result);
           if (job.result?.best_model_id) setSavedModelId(job.result.best_model_id);
@@ -89,6 +92,8 @@ export function useTrainingJob() {
               });
             } catch { /* noop */ }
           }
+        } else if (job.status === "cancelled") {
+          clearInterval(pollingRef.current);
         }
       } catch {
         // swallow polling errors
@@ -131,6 +136,7 @@ export function useTrainingJob() {
     setProgress(0);
     setResult(null);
     setError(null);
+    setMessage("");
     setElapsedTime(0);
     setSavedModelId(null);
     startTimeRef.current = null;
@@ -142,6 +148,7 @@ export function useTrainingJob() {
     progress,
     result,
     error,
+    message,
     elapsedTime,
     savedModelId,
     setSavedModelId,
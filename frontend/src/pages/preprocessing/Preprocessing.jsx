@@ -193,7 +193,7 @@ export default function Preprocessing() {
   }, [collapseEnabled, isBuilderCollapsed]);
 
   useEffect(() => {
-    if (status === "failed" && isBuilderCollapsed) {
+    if ((status === "failed" || status === "cancelled") && isBuilderCollapsed) {
       setBuilderCollapsed(false);
     }
   }, [status, isBuilderCollapsed]);
@@ -1,4 +1,5 @@
 import { useCallback, useEffect, useRef, useState } from "react";
+import { isTerminalJobStatus } from "@/utils/jobStatus";
 
 // Contract:
 // - startPreprocess(filename, steps)
@@ -155,6 +156,16 @@ export default function usePreprocessJob({ notify } = {}) {
           notify?.error?.(payload.error || "Preprocessing failed");
 
           // no pipeline patching
+        } else if (payload.status === "cancelled") {
+          setStatus("cancelled");
+          setProgress(clampProgress(payload.progress));
+          setMessage(payload.message || "Preprocessing cancelled");
+          setError(null);
+          setJobId(null);
+          const startedAt = startTimeRef.current;
+          clearTimer();
+          if (startedAt) setElapsedTime(Date.now() - startedAt);
+          notify?.error?.(payload.message || "Preprocessing cancelled");
         }
       } catch (e) {
         if (cancelled) return;
@@ -181,7 +192,7 @@ export default function usePreprocessJob({ notify } = {}) {
   }, [jobId, clearPolling, notify, clearTimer]);
 
   useEffect(() => {
-    if (status === "completed" || status === "failed") {
+    if (isTerminalJobStatus(status)) {
       const t = setTimeout(() => {
         setStatus((prev) => (prev === status ? INITIAL_PROGRESS.status : prev));
         setProgress((prev) => (status !== "idle" ? INITIAL_PROGRESS.progress : prev));
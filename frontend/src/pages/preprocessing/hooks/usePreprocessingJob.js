@@ -1,4 +1,5 @@
 import { useCallback, useEffect, useRef, useState } from "react";
+import { isTerminalJobStatus } from "@/utils/jobStatus";
 
 const INITIAL_PROGRESS = {
   status: "idle",
@@ -181,6 +182,22 @@ export const usePreprocessingJob = ({
             setElapsedMs(Date.now() - startedAt);
           }
           notify?.error?.(payload.error || "Preprocessing failed");
+        } else if (payload.status === "cancelled") {
+          setProgressInfo((prev) => ({
+            ...prev,
+            status: "cancelled",
+            progress: clampProgress(payload.progress),
+            message: payload.message || "Preprocessing cancelled",
+            error: null,
+          }));
+          setLoading(false);
+          setJobId(null);
+          const startedAt = startTimeRef.current;
+          clearTimer();
+          if (startedAt) {
+            setElapsedMs(Date.now() - startedAt);
+          }
+          notify?.error?.(payload.message || "Preprocessing cancelled");
         }
       } catch (error) {
         if (cancelled) {
@@ -214,7 +231,7 @@ export const usePreprocessingJob = ({
   }, [jobId, clearPolling, notify, clearTimer]);
 
   useEffect(() => {
-    if (progressInfo.status === "completed" || progressInfo.status === "failed") {
+    if (isTerminalJobStatus(progressInfo.status)) {
       const timeout = setTimeout(() => {
         setProgressInfo((prev) => (prev.status === progressInfo.status ? INITIAL_PROGRESS : prev));
       }, 1800);
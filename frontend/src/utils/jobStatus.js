@@ -0,0 +1,5 @@
+// Job statuses that never change again (TERMINAL_STATUSES in backend/services/progress_tracker.py).
+// Polling stops and progress cards leave their running state on any of them.
+export const TERMINAL_JOB_STATUSES = ["completed", "failed", "cancelled"];
+
+export const isTerminalJobStatus = (status) => TERMINAL_JOB_STATUSES.includes(status);